@@ -0,0 +1,329 @@
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import shutil
+import tempfile
+import time
+import paramiko
+import yaml
+from core.logger import Logger
+
+def _simulator_process(conn, node_count, root_dir, options, log_file):
+    """
+    模拟节点进程：启动模拟集群，把节点列表发给控制进程，收到停止请求后返回统计
+    """
+    from bench.sim_node import SimulatedCluster
+    logger = Logger(log_file=log_file, log_level=logging.WARNING).get_logger()
+    cluster = SimulatedCluster(node_count, root_dir, logger=logger, **options)
+    try:
+        conn.send({"nodes": cluster.start()})
+    except Exception as e:
+        conn.send({"error": f"启动模拟节点失败：{e}"})
+        return
+    conn.recv()
+    stats = cluster.stats()
+    cluster.stop()
+    conn.send(stats)
+
+def _deployer_process(conn, config_file, log_file, log_level, log_mode, profile_file):
+    """
+    部署器进程：在独立进程中运行Deployer.run()，峰值内存只包含部署器本身
+    """
+    from core.deployer import Deployer
+    # 控制台只输出错误，完整日志写入文件
+    logger = Logger(log_file=log_file, log_level=log_level, async_mode=log_mode == "async", console_level=logging.ERROR).get_logger()
+    
+    deployer = Deployer(config_file, logger=logger, mode="cluster", profile_file=profile_file)
+    # 基准测试不修改控制机的防火墙，按未检测到防火墙处理
+    deployer.firewall_manager.firewall_type = "unknown"
+    
+    error = ""
+    start = time.perf_counter()
+    try:
+        deployer.run()
+        succeeded = True
+    except SystemExit as e:
+        succeeded = e.code in (0, None)
+        error = "" if succeeded else f"部署退出，退出码：{e.code}"
+    except Exception as e:
+        succeeded = False
+        error = str(e)
+    seconds = time.perf_counter() - start
+    
+    graph = getattr(deployer, "task_graph", None)
+    conn.send({
+        "succeeded": succeeded,
+        "error": error,
+        "seconds": seconds,
+        "ssh": deployer.remote_executor.get_pool_stats(),
+        "facts": dict(deployer.facts.stats),
+        "failed_tasks": graph.failed_tasks() if graph is not None else [],
+        "cpu_seconds": sum(getattr(resource.getrusage(resource.RUSAGE_SELF), field) for field in ("ru_utime", "ru_stime")),
+        # Linux上ru_maxrss的单位为KB
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    })
+
+class BenchmarkHarness:
+    """
+    部署器基准测试
+    
+    对每个集群规模：在独立进程中启动模拟节点（bench.sim_node.SimulatedCluster），生成指向这些节点的
+    集群配置文件，再在另一个独立进程中以集群模式运行Deployer.run()，记录部署耗时、SSH握手次数、
+    传输字节数和部署器进程的峰值内存。节点侧的延迟、带宽和命令耗时都可以注入，
+    core/remote.py和core/deployer.py的性能回退会直接体现在这些数字上。
+    """
+    
+    def __init__(self, work_dir=None, latency=0.0, bandwidth=0, mkfs_seconds=0.0, download_seconds=0.0, start_seconds=1.0,
+                 distribution="download", binary_size=64 * 1024 * 1024, buckets=2, drives=1, format_profile="default", drive_check_mb=0, network_check_seconds=0.0, server_port=19000, console_port=19001,
+                 log_level="DEBUG", log_mode="async", profile=False, keep=False, logger=None):
+        """
+        Args:
+            work_dir: 工作目录，为None时使用临时目录
+            latency: 每次网络往返注入的延迟（秒）
+            bandwidth: 每条传输流的带宽上限（字节/秒），0表示不限制
+            mkfs_seconds: 格式化磁盘的耗时（秒）
+            download_seconds: download模式下节点下载二进制的耗时（秒）
+            start_seconds: 服务从启动到变为active的耗时（秒）
+            distribution: 二进制分发方式，download或relay
+            binary_size: relay模式下分发的模拟二进制大小（字节）
+            buckets: 配置中的存储桶数量
+            drives: 每个节点的数据盘数量，大于1时按通配符配置多块磁盘（最多25块，/dev/sdb到/dev/sdz）
+            format_profile: 磁盘格式化配置，default或performance
+            drive_check_mb: 数据盘预检的测试文件大小（MiB），0表示不启用预检
+            network_check_seconds: 节点间网络预检中每条链路测试吞吐量的时长（秒），0表示不启用预检
+            server_port: 模拟的MinIO服务端口
+            console_port: 模拟的MinIO控制台端口
+            log_level: 部署器的日志级别
+            log_mode: 部署器的日志写入方式，async或sync
+            profile: 是否为每次部署输出耗时分析文件
+            keep: 是否保留成功运行的节点沙箱、配置和日志（失败的运行和启用耗时分析的运行总是保留）
+        """
+        self.logger = logger or Logger().get_logger()
+        self.work_dir = work_dir
+        if work_dir:
+            os.makedirs(work_dir, exist_ok=True)
+        self.simulation = {
+            "latency": latency,
+            "bandwidth": bandwidth,
+            "mkfs_seconds": mkfs_seconds,
+            "download_seconds": download_seconds,
+            "start_seconds": start_seconds,
+            "server_port": server_port,
+            "console_port": console_port,
+            "devices": tuple(f"/dev/sd{chr(ord('b') + index)}" for index in range(max(1, min(drives, 25))))
+        }
+        self.distribution = distribution
+        self.binary_size = binary_size
+        self.buckets = buckets
+        self.format_profile = format_profile
+        self.drive_check_mb = drive_check_mb
+        self.network_check_seconds = network_check_seconds
+        self.log_level = log_level
+        self.log_mode = log_mode
+        self.profile = profile
+        self.keep = keep
+        self._context = multiprocessing.get_context("spawn")
+    
+    def _write_key(self, directory):
+        """
+        生成控制机使用的SSH密钥对（模拟节点接受任意公钥，相当于已建立互信）
+        """
+        key_path = os.path.join(directory, "id_rsa")
+        key = paramiko.RSAKey.generate(2048)
+        key.write_private_key_file(key_path)
+        with open(f"{key_path}.pub", "w") as f:
+            f.write(f"{key.get_name()} {key.get_base64()} minio-bench\n")
+        return f"{key_path}.pub"
+    
+    def _write_binaries(self, directory):
+        """
+        生成relay模式下分发的模拟minio和mc：可执行的版本号脚本，用注释填充到指定大小
+        """
+        package_dir = os.path.join(directory, "packages")
+        os.makedirs(package_dir, exist_ok=True)
+        for binary in ("minio", "mc"):
+            path = os.path.join(package_dir, binary)
+            header = f'#!/bin/sh\necho "{binary} version RELEASE.2024-01-18T22-51-48Z (simulated)"\nexit 0\n'.encode()
+            with open(path, "wb") as f:
+                f.write(header)
+                remaining = max(0, self.binary_size - len(header))
+                block = (b"#" * 1023 + b"\n") * 1024
+                while remaining > 0:
+                    f.write(block[:remaining])
+                    remaining -= len(block)
+            os.chmod(path, 0o755)
+        return package_dir
+    
+    def _disk_config(self):
+        """
+        生成节点的磁盘配置：一块数据盘时挂载到/data/minio，多块时用通配符匹配所有数据盘
+        """
+        devices = self.simulation["devices"]
+        if len(devices) == 1:
+            disk = {"enabled": True, "device": devices[0], "mount_point": "/data/minio", "format_disk": True}
+        else:
+            disk = {"enabled": True, "devices": f"/dev/sd[b-{devices[-1][-1]}]", "mount_prefix": "/mnt/disk", "format_disk": True}
+        disk["format_profile"] = self.format_profile
+        return disk
+    
+    def build_config(self, nodes, directory, key_file):
+        """
+        生成指向模拟节点的集群配置
+        
+        Args:
+            nodes: 模拟节点列表，每个元素为{"host", "ip", "ssh_port"}
+            directory: 本次运行的工作目录
+            key_file: SSH公钥文件路径
+        
+        Returns:
+            dict: 配置字典
+        """
+        package_dir = self._write_binaries(directory) if self.distribution == "relay" else os.path.join(directory, "packages")
+        return {
+            "deployment_mode": "cluster",
+            "minio": {
+                "version": "RELEASE.2024-01-18T22-51-48Z",
+                "mc_version": "RELEASE.2024-01-18T22-51-48Z",
+                "local_package_dir": package_dir,
+                "mc_local_package_dir": package_dir,
+                "cache_enabled": False,
+                "distribution": {"mode": self.distribution, "fanout": 2, "fallback_direct": True}
+            },
+            "credentials": {"root_user": "minioadmin", "root_password": "minioadmin123"},
+            "cluster": {
+                "nodes": [
+                    {
+                        "host": node["host"],
+                        "ip": node["ip"],
+                        "data_dir": "/data/minio",
+                        "ssh_user": "root",
+                        "ssh_key": key_file,
+                        "ssh_port": node["ssh_port"],
+                        "ssh_password": "minio-bench",
+                        "disk": self._disk_config()
+                    }
+                    for node in nodes
+                ],
+                "server_port": self.simulation["server_port"],
+                "console_port": self.simulation["console_port"],
+                "region": "us-east-1",
+                "endpoint_address": "host",
+                "start_timeout": int(self.simulation["start_seconds"]) + 30,
+                "buckets": [
+                    {"name": f"bench-bucket-{index}", "policy": "public" if index % 2 else "private", "quota": index % 3}
+                    for index in range(1, self.buckets + 1)
+                ]
+            },
+            "advanced": {
+                "journal_file": os.path.join(directory, "deploy-journal.json"),
+                "inventory_file": os.path.join(directory, "inventory.json"),
+                "drive_check": {"enabled": self.drive_check_mb > 0, "size_mb": self.drive_check_mb, "random_ops": 200, "action": "warn"},
+                # 模拟节点的应答进程绑定各自的回环地址（127.1.x.y），链路测试走本机回环接口；
+                # 模拟的MinIO服务端口从一开始就在监听，应答进程改用另一个端口
+                "network_check": {"enabled": self.network_check_seconds > 0, "port": self.simulation["server_port"] + 10,
+                                  "seconds": self.network_check_seconds, "pings": 10,
+                                  "action": "warn", "report_file": os.path.join(directory, "network-mesh.json")},
+                "health_probe": {"deadline": int(self.simulation["start_seconds"]) + 30, "initial_delay": 0.2, "max_delay": 5, "timeout": 3}
+            }
+        }
+    
+    def run_one(self, node_count):
+        """
+        以node_count个模拟节点运行一次完整部署
+        
+        Returns:
+            dict: 本次运行的结果，包括部署器侧和模拟节点侧的统计
+        """
+        directory = tempfile.mkdtemp(prefix=f"minio-bench-{node_count}-", dir=self.work_dir)
+        log_file = os.path.join(directory, "deploy.log")
+        self.logger.info(f"开始基准测试：{node_count} 个节点，工作目录：{directory}")
+        
+        parent_conn, child_conn = self._context.Pipe()
+        simulator = self._context.Process(
+            target=_simulator_process, args=(child_conn, node_count, os.path.join(directory, "sim"), self.simulation, log_file), daemon=True
+        )
+        simulator.start()
+        # 关闭父进程中的子进程端，子进程异常退出时recv会收到EOFError而不是一直等待
+        child_conn.close()
+        profile_file = os.path.join(directory, "deploy-trace.json") if self.profile else None
+        try:
+            ready = parent_conn.recv()
+            if "error" in ready:
+                raise RuntimeError(ready["error"])
+            
+            config_file = os.path.join(directory, "cluster.yaml")
+            with open(config_file, "w", encoding="utf-8") as f:
+                yaml.safe_dump(self.build_config(ready["nodes"], directory, self._write_key(directory)), f, allow_unicode=True, sort_keys=False)
+            
+            result_conn, deployer_conn = self._context.Pipe()
+            deployer = self._context.Process(target=_deployer_process, args=(deployer_conn, config_file, log_file, self.log_level, self.log_mode, profile_file))
+            deployer.start()
+            deployer_conn.close()
+            try:
+                result = result_conn.recv()
+            except EOFError:
+                result = {"succeeded": False, "error": f"部署器进程异常退出，退出码：{deployer.exitcode}"}
+            deployer.join()
+            
+            parent_conn.send("stop")
+            simulation_stats = parent_conn.recv()
+        except EOFError:
+            result, simulation_stats = {"succeeded": False, "error": "模拟节点进程异常退出"}, {}
+        finally:
+            simulator.join(timeout=30)
+            if simulator.is_alive():
+                simulator.terminate()
+        
+        result.update({"nodes": node_count, "simulation": simulation_stats, "work_dir": directory})
+        if profile_file:
+            result["profile_file"] = profile_file
+        if not result.get("succeeded"):
+            self.logger.warning(f"{node_count} 个节点的部署失败：{result.get('error')}，失败任务：{result.get('failed_tasks')}，日志：{log_file}")
+        elif not self.keep and not self.profile:
+            shutil.rmtree(directory, ignore_errors=True)
+            result["work_dir"] = None
+        return result
+    
+    def run(self, sizes):
+        """
+        依次运行各集群规模的基准测试
+        
+        Args:
+            sizes: 节点数列表，如[5, 50, 200]
+        
+        Returns:
+            list: 每个规模的结果
+        """
+        return [self.run_one(size) for size in sizes]
+    
+    def report(self, results):
+        """
+        在日志中输出结果表格
+        """
+        self.logger.info(
+            f"{'节点数':>6}  {'结果':<4}  {'耗时(秒)':>9}  {'握手':>6}  {'连接':>6}  {'命令':>7}  {'SFTP请求':>8}  "
+            f"{'上行(MB)':>9}  {'下行(MB)':>9}  {'HTTP请求':>8}  {'峰值内存(MB)':>12}  {'部署器CPU(秒)':>13}  {'模拟节点CPU(秒)':>15}"
+        )
+        for result in results:
+            ssh = result.get("ssh", {})
+            simulation = result.get("simulation", {})
+            self.logger.info(
+                f"{result['nodes']:>6}  {'成功' if result.get('succeeded') else '失败':<4}  {result.get('seconds', 0):>9.2f}  "
+                f"{ssh.get('handshakes', 0):>6}  {simulation.get('connections', 0):>6}  {simulation.get('commands', 0):>7}  "
+                f"{simulation.get('sftp_ops', 0):>8}  {simulation.get('wire_bytes_received', 0) / 1024 ** 2:>9.2f}  "
+                f"{simulation.get('wire_bytes_sent', 0) / 1024 ** 2:>9.2f}  {simulation.get('http_requests', 0):>8}  "
+                f"{result.get('peak_rss_mb', 0):>12.1f}  {result.get('cpu_seconds', 0):>13.2f}  {simulation.get('cpu_seconds', 0):>15.2f}"
+            )
+    
+    def save(self, results, path):
+        """
+        把结果写入JSON文件，便于在不同版本之间比较
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"simulation": self.simulation, "distribution": self.distribution, "results": results}, f, indent=2, ensure_ascii=False)
+        self.logger.info(f"基准测试结果已写入：{path}")
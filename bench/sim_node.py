@@ -0,0 +1,699 @@
+import asyncio
+import json
+import os
+import re
+import resource
+import selectors
+import socket
+import stat
+import subprocess
+import threading
+import time
+from urllib.parse import parse_qs
+import paramiko
+from core.logger import Logger
+
+# 模拟节点上替代系统命令的脚本，放在沙箱PATH的最前面
+FAKE_COMMANDS = {
+    "systemctl": r"""#!/bin/sh
+# 模拟systemctl，minio服务的状态保存在$SIM_ROOT/run/minio.state
+state_file="$SIM_ROOT/run/minio.state"
+pid_file="$SIM_ROOT/run/minio.pid"
+unit_file="$SIM_ROOT/etc/systemd/system/minio.service"
+action=$1
+[ $# -gt 0 ] && shift
+unit=""
+for arg; do unit=$arg; done
+state=$(cat "$state_file" 2>/dev/null || echo inactive)
+case "$action" in
+  is-active)
+    [ "$unit" = minio ] || [ "$unit" = minio.service ] || state=inactive
+    case " $* " in *" --quiet "*|*" -q "*) ;; *) echo "$state" ;; esac
+    [ "$state" = active ]
+    ;;
+  start|restart)
+    [ -f "$unit_file" ] || { echo "Failed to $action minio.service: Unit minio.service not found." >&2; exit 5; }
+    echo activating > "$state_file"
+    date +%s%N > "$pid_file"
+    ( sleep "${SIM_START_SECONDS:-0}"; echo active > "$state_file" ) >/dev/null 2>&1 &
+    ;;
+  stop)
+    echo inactive > "$state_file"
+    ;;
+  show)
+    if [ "$state" = active ] || [ "$state" = activating ]; then cat "$pid_file"; else echo 0; fi
+    ;;
+  status)
+    echo "* minio.service - MinIO"
+    echo "     Active: $state"
+    [ "$state" = active ]
+    ;;
+  list-unit-files)
+    [ -f "$unit_file" ] && echo "minio.service enabled enabled"
+    true
+    ;;
+  *)
+    true
+    ;;
+esac
+""",
+    "lsblk": r"""#!/bin/sh
+# 模拟lsblk -b -p -P -o NAME,SIZE,TYPE,MOUNTPOINT：系统盘/dev/sda加上沙箱/dev中的数据盘
+echo 'NAME="/dev/sda" SIZE="107374182400" TYPE="disk" MOUNTPOINT=""'
+echo 'NAME="/dev/sda1" SIZE="107373133824" TYPE="part" MOUNTPOINT="/"'
+for dev in "$SIM_ROOT"/dev/*; do
+  [ -e "$dev" ] || continue
+  name=${dev#$SIM_ROOT}
+  mount_point=$(awk -v d="$name" '$1 == d {print $2; exit}' "$SIM_ROOT/proc/mounts")
+  echo "NAME=\"$name\" SIZE=\"4000787030016\" TYPE=\"disk\" MOUNTPOINT=\"$mount_point\""
+done
+""",
+    "mkfs": r"""#!/bin/sh
+# 模拟格式化磁盘，耗时由SIM_MKFS_SECONDS指定
+dev=""
+for arg; do case "$arg" in -*) ;; *) dev=$arg ;; esac; done
+[ -e "$dev" ] || { echo "mkfs: ${dev#$SIM_ROOT}: No such file or directory" >&2; exit 1; }
+sleep "${SIM_MKFS_SECONDS:-0}"
+echo "Creating filesystem on ${dev#$SIM_ROOT}"
+""",
+    "mount": r"""#!/bin/sh
+# 模拟挂载磁盘：把挂载记录追加到沙箱中的/proc/mounts
+[ $# -eq 0 ] && exec cat "$SIM_ROOT/proc/mounts"
+dev=""; mount_point=""; skip=0
+for arg; do
+  if [ $skip = 1 ]; then skip=0; continue; fi
+  case "$arg" in -o|-t) skip=1 ;; -*) ;; *) dev=$mount_point; mount_point=$arg ;; esac
+done
+[ -e "$dev" ] || { echo "mount: ${mount_point#$SIM_ROOT}: special device ${dev#$SIM_ROOT} does not exist." >&2; exit 32; }
+[ -d "$mount_point" ] || { echo "mount: ${mount_point#$SIM_ROOT}: mount point does not exist." >&2; exit 32; }
+echo "${dev#$SIM_ROOT} ${mount_point#$SIM_ROOT} ext4 rw,relatime 0 0" >> "$SIM_ROOT/proc/mounts"
+""",
+    "curl": r"""#!/bin/sh
+# 模拟从官网下载minio/mc：等待SIM_DOWNLOAD_SECONDS后写入一个输出版本号的脚本
+out=""
+while [ $# -gt 0 ]; do
+  case "$1" in -o|-O|--output) out=$2; shift ;; esac
+  shift
+done
+[ -n "$out" ] || { echo "curl: no output file" >&2; exit 2; }
+sleep "${SIM_DOWNLOAD_SECONDS:-0}"
+printf '#!/bin/sh\necho "%s version %s (simulated)"\n' "$(basename "$out")" "$SIM_VERSION" > "$out"
+""",
+    "scp": r"""#!/bin/sh
+# 模拟节点间的scp：-i指定的密钥必须已加入目标节点的authorized_keys，按SIM_BANDWIDTH限速后把文件复制到目标节点的沙箱中
+key=""
+while [ $# -gt 2 ]; do [ "$1" = -i ] && key=$2; shift; done
+src=$1; dst=$2
+host=${dst#*@}; host=${host%%:*}; path=${dst#*:}
+target="$SIM_NODES/$host"
+[ -d "$target" ] || { echo "ssh: connect to host $host port 22: Connection refused" >&2; exit 1; }
+pub=$(cut -d' ' -f2 "$key.pub" 2>/dev/null)
+[ -n "$pub" ] && grep -qF "$pub" "$target/root/.ssh/authorized_keys" 2>/dev/null || { echo "root@$host: Permission denied (publickey)." >&2; exit 1; }
+size=$(wc -c < "$src") || exit 1
+sleep "${SIM_LATENCY:-0}"
+[ "${SIM_BANDWIDTH:-0}" -gt 0 ] && sleep "$(awk -v s="$size" -v b="$SIM_BANDWIDTH" 'BEGIN {print s / b}')"
+mkdir -p "$(dirname "$target$path")" && cp "$src" "$target$path"
+""",
+    "blkid": r"""#!/bin/sh
+# 模拟blkid -s UUID -o value：按设备路径生成固定的文件系统UUID
+dev=""
+for arg; do dev=$arg; done
+[ -e "$dev" ] || exit 2
+printf '%s' "${dev#$SIM_ROOT}" | md5sum | sed 's/^\(.\{8\}\)\(.\{4\}\)\(.\{4\}\)\(.\{4\}\)\(.\{12\}\).*/\1-\2-\3-\4-\5/'
+""",
+    "ufw": """#!/bin/sh
+echo "Status: inactive"
+""",
+    "firewall-cmd": """#!/bin/sh
+exit 0
+"""
+}
+
+# 文件内容相同的别名
+FAKE_ALIASES = {"mkfs.ext4": "mkfs", "mkfs.xfs": "mkfs", "wget": "curl"}
+
+HTTP_REASONS = {200: "OK", 204: "No Content", 404: "Not Found", 409: "Conflict", 503: "Service Unavailable"}
+
+class _Counters:
+    """
+    线程安全的计数器
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.values = {}
+    
+    def add(self, name, value=1):
+        with self._lock:
+            self.values[name] = self.values.get(name, 0) + value
+    
+    def snapshot(self):
+        with self._lock:
+            return dict(self.values)
+
+class _CountingSocket:
+    """
+    统计SSH连接上实际收发字节数的套接字包装
+    """
+    
+    def __init__(self, sock, counters):
+        self._sock = sock
+        self._counters = counters
+    
+    def recv(self, size):
+        data = self._sock.recv(size)
+        self._counters.add("wire_bytes_received", len(data))
+        return data
+    
+    def send(self, data):
+        sent = self._sock.send(data)
+        self._counters.add("wire_bytes_sent", sent)
+        return sent
+    
+    def __getattr__(self, name):
+        return getattr(self._sock, name)
+
+class _NodeSSHServer(paramiko.ServerInterface):
+    """
+    模拟节点的SSH服务端：接受任意公钥和密码（视为已建立互信），每条命令在节点沙箱中执行
+    """
+    
+    def __init__(self, node):
+        self.node = node
+    
+    def get_allowed_auths(self, username):
+        return "publickey,password"
+    
+    def check_auth_publickey(self, username, key):
+        self.node.round_trip()
+        self.node.counters.add("auth_publickey")
+        return paramiko.AUTH_SUCCESSFUL
+    
+    def check_auth_password(self, username, password):
+        self.node.round_trip()
+        self.node.counters.add("auth_password")
+        return paramiko.AUTH_SUCCESSFUL
+    
+    def check_channel_request(self, kind, chanid):
+        if kind != "session":
+            return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+        return paramiko.OPEN_SUCCEEDED
+    
+    def check_channel_exec_request(self, channel, command):
+        threading.Thread(target=self.node.run_channel, args=(channel, command.decode("utf-8", "replace")), daemon=True).start()
+        return True
+
+class _SandboxSFTPHandle(paramiko.SFTPHandle):
+    """
+    按节点带宽限速的SFTP文件句柄
+    """
+    
+    def __init__(self, node, flags=0):
+        super().__init__(flags)
+        self.node = node
+    
+    def read(self, offset, length):
+        data = super().read(offset, length)
+        if isinstance(data, bytes):
+            self.node.transfer("sftp_bytes_read", len(data))
+        return data
+    
+    def write(self, offset, data):
+        self.node.transfer("sftp_bytes_written", len(data))
+        return super().write(offset, data)
+    
+    def stat(self):
+        try:
+            return paramiko.SFTPAttributes.from_stat(os.fstat(self.readfile.fileno()))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+    
+    def chattr(self, attr):
+        try:
+            if attr.st_mode is not None:
+                os.fchmod(self.readfile.fileno(), stat.S_IMODE(attr.st_mode))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        return paramiko.SFTP_OK
+
+class _SandboxSFTPServer(paramiko.SFTPServerInterface):
+    """
+    把所有路径映射到节点沙箱目录中的SFTP服务端，每个请求按节点延迟模拟一次往返
+    """
+    
+    def __init__(self, server, node, *args, **kwargs):
+        super().__init__(server, *args, **kwargs)
+        self.node = node
+    
+    def session_started(self):
+        self.node.counters.add("sftp_sessions")
+    
+    def _path(self, path):
+        self.node.round_trip()
+        self.node.counters.add("sftp_ops")
+        return self.node.local_path(path)
+    
+    def canonicalize(self, path):
+        return os.path.normpath(path if path.startswith("/") else f"/root/{path}")
+    
+    def open(self, path, flags, attr):
+        local_path = self._path(path)
+        try:
+            mode = getattr(attr, "st_mode", None) or 0o666
+            fd = os.open(local_path, flags, mode)
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        if flags & os.O_WRONLY:
+            file_mode = "ab" if flags & os.O_APPEND else "wb"
+        elif flags & os.O_RDWR:
+            file_mode = "a+b" if flags & os.O_APPEND else "r+b"
+        else:
+            file_mode = "rb"
+        handle = _SandboxSFTPHandle(self.node, flags)
+        handle.filename = local_path
+        handle.readfile = handle.writefile = os.fdopen(fd, file_mode)
+        return handle
+    
+    def stat(self, path):
+        try:
+            return paramiko.SFTPAttributes.from_stat(os.stat(self._path(path)))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+    
+    def lstat(self, path):
+        try:
+            return paramiko.SFTPAttributes.from_stat(os.lstat(self._path(path)))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+    
+    def remove(self, path):
+        try:
+            os.remove(self._path(path))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        return paramiko.SFTP_OK
+    
+    def rename(self, oldpath, newpath):
+        try:
+            if os.path.exists(self.node.local_path(newpath)):
+                return paramiko.SFTP_FAILURE
+            os.rename(self._path(oldpath), self.node.local_path(newpath))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        return paramiko.SFTP_OK
+    
+    def posix_rename(self, oldpath, newpath):
+        try:
+            os.replace(self._path(oldpath), self.node.local_path(newpath))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        return paramiko.SFTP_OK
+    
+    def mkdir(self, path, attr):
+        try:
+            os.mkdir(self._path(path))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        return paramiko.SFTP_OK
+    
+    def chattr(self, path, attr):
+        try:
+            if attr.st_mode is not None:
+                os.chmod(self._path(path), stat.S_IMODE(attr.st_mode))
+        except OSError as e:
+            return paramiko.SFTPServer.convert_errno(e.errno)
+        return paramiko.SFTP_OK
+
+class SimulatedNode:
+    """
+    一个模拟的集群节点
+    
+    节点的文件系统是一个沙箱目录：命令中的/etc、/usr/local、/dev、/data等绝对路径
+    和所有SFTP路径都被映射到沙箱中，输出中的沙箱路径再映射回来。命令由本机/bin/sh执行，
+    systemctl、lsblk、mkfs、mount、curl、scp等由FAKE_COMMANDS中的脚本替代。
+    """
+    
+    # 命令中需要映射到沙箱的绝对路径（/dev/null除外）
+    SANDBOX_PATTERN = re.compile(r"(?<![\w.:/~-])/(?:usr/local|etc|data|mnt|opt|var|run|tmp|root|proc/mounts|dev(?!/null\b))(?![\w.-])")
+    
+    # 操作系统所在的挂载记录
+    OS_MOUNTS = "/dev/sda1 / ext4 rw,relatime 0 0\n/dev/sda2 /boot ext4 rw,relatime 0 0\n"
+    
+    def __init__(self, cluster, index, ip, root, devices):
+        self.cluster = cluster
+        self.index = index
+        self.ip = ip
+        self.root = root
+        self.devices = list(devices)
+        self.counters = cluster.counters
+        self.ssh_port = None
+        self._prepare()
+        self.env = {
+            "PATH": f"{cluster.bin_dir}:/usr/bin:/bin",
+            "HOME": os.path.join(root, "root"),
+            "TMPDIR": os.path.join(root, "tmp"),
+            "LANG": "C.UTF-8",
+            "SIM_ROOT": root,
+            "SIM_NODES": cluster.nodes_dir,
+            "SIM_LATENCY": str(cluster.latency),
+            "SIM_BANDWIDTH": str(int(cluster.bandwidth)),
+            "SIM_MKFS_SECONDS": str(cluster.mkfs_seconds),
+            "SIM_DOWNLOAD_SECONDS": str(cluster.download_seconds),
+            "SIM_START_SECONDS": str(cluster.start_seconds),
+            "SIM_VERSION": cluster.version
+        }
+    
+    def _prepare(self):
+        """
+        创建沙箱目录结构、系统盘挂载记录和数据盘设备文件
+        """
+        for directory in ("usr/local/bin", "etc/systemd/system", "etc/default", "dev", "proc", "run/systemd/system",
+                          "root/.ssh", "tmp", "data", "mnt"):
+            os.makedirs(os.path.join(self.root, directory), exist_ok=True)
+        with open(os.path.join(self.root, "proc", "mounts"), "w") as f:
+            f.write(self.OS_MOUNTS)
+        for device in self.devices:
+            open(self.local_path(device), "a").close()
+    
+    @property
+    def host(self):
+        return f"sim-node-{self.index:03d}"
+    
+    def local_path(self, path):
+        """
+        把节点上的路径映射为沙箱中的本地路径（相对路径相对于/root）
+        """
+        path = os.path.normpath(path if path.startswith("/") else f"/root/{path}")
+        return self.root + path if path != "/" else self.root
+    
+    def sandbox_command(self, command):
+        return self.SANDBOX_PATTERN.sub(lambda match: self.root + match.group(0), command)
+    
+    def unsandbox(self, text):
+        return text.replace(self.root + "/", "/").replace(self.root, "/")
+    
+    def round_trip(self):
+        """
+        模拟一次网络往返的延迟
+        """
+        if self.cluster.latency:
+            time.sleep(self.cluster.latency)
+    
+    def transfer(self, counter, size):
+        """
+        按带宽限制模拟传输size字节的耗时
+        """
+        self.counters.add(counter, size)
+        if self.cluster.bandwidth:
+            time.sleep(size / self.cluster.bandwidth)
+    
+    def execute(self, command):
+        """
+        在节点沙箱中执行命令
+        
+        Returns:
+            tuple: (exit_code, stdout, stderr)
+        """
+        self.round_trip()
+        self.counters.add("commands")
+        result = subprocess.run(
+            ["/bin/sh", "-c", self.sandbox_command(command)], capture_output=True, env=self.env, cwd=self.env["HOME"]
+        )
+        stdout = self.unsandbox(result.stdout.decode("utf-8", "replace"))
+        stderr = self.unsandbox(result.stderr.decode("utf-8", "replace"))
+        return result.returncode, stdout, stderr
+    
+    def run_channel(self, channel, command):
+        """
+        在SSH通道上执行命令并返回输出和退出码
+        """
+        try:
+            exit_code, stdout, stderr = self.execute(command)
+            channel.sendall(stdout.encode("utf-8"))
+            channel.sendall_stderr(stderr.encode("utf-8"))
+            channel.send_exit_status(exit_code)
+        except Exception as e:
+            self.counters.add("channel_errors")
+            self.cluster.logger.debug(f"模拟节点 {self.ip} 执行命令失败：{e}")
+        finally:
+            channel.close()
+    
+    def service_active(self):
+        try:
+            with open(os.path.join(self.root, "run", "minio.state")) as f:
+                return f.read().strip() == "active"
+        except OSError:
+            return False
+    
+    def handle_http(self, method, target, body):
+        """
+        模拟MinIO的健康检查接口、S3存储桶接口和存储桶配额管理接口
+        
+        服务未启动（systemctl状态不是active）时所有请求返回503。存储桶状态在整个模拟集群中共享，
+        不校验签名。
+        
+        Returns:
+            tuple: (状态码, 响应体, Content-Type)
+        """
+        self.counters.add("http_requests")
+        path, _, query_string = target.partition("?")
+        query = parse_qs(query_string, keep_blank_values=True)
+        if not self.service_active():
+            return 503, b"", "text/plain"
+        if path.startswith("/minio/health/"):
+            return 200, b"", "text/plain"
+        
+        buckets = self.cluster.buckets
+        if path.startswith("/minio/admin/v3/"):
+            name = query.get("bucket", [""])[0]
+            if name not in buckets:
+                return 404, b'{"Code":"NoSuchBucket"}', "application/json"
+            if path.endswith("/set-bucket-quota"):
+                buckets[name]["quota"] = json.loads(body or b"{}")
+                return 200, b"", "application/json"
+            return 200, json.dumps(buckets[name]["quota"]).encode(), "application/json"
+        
+        name = path.strip("/")
+        if not name:
+            entries = "".join(f"<Bucket><Name>{bucket}</Name></Bucket>" for bucket in sorted(buckets))
+            payload = f'<?xml version="1.0" encoding="UTF-8"?><ListAllMyBucketsResult><Buckets>{entries}</Buckets></ListAllMyBucketsResult>'
+            return 200, payload.encode(), "application/xml"
+        
+        if "policy" in query:
+            if name not in buckets:
+                return 404, b"<Error><Code>NoSuchBucket</Code></Error>", "application/xml"
+            if method == "PUT":
+                buckets[name]["policy"] = json.loads(body or b"null")
+                return 204, b"", "application/xml"
+            if method == "DELETE":
+                buckets[name]["policy"] = None
+                return 204, b"", "application/xml"
+            if buckets[name]["policy"] is None:
+                return 404, b"<Error><Code>NoSuchBucketPolicy</Code></Error>", "application/xml"
+            return 200, json.dumps(buckets[name]["policy"]).encode(), "application/json"
+        
+        if method == "PUT":
+            if name in buckets:
+                return 409, b"<Error><Code>BucketAlreadyOwnedByYou</Code></Error>", "application/xml"
+            buckets[name] = {"policy": None, "quota": {}}
+            return 200, b"", "application/xml"
+        if method == "DELETE":
+            buckets.pop(name, None)
+            return 204, b"", "application/xml"
+        return (200, b"", "application/xml") if name in buckets else (404, b"<Error><Code>NoSuchBucket</Code></Error>", "application/xml")
+
+class SimulatedCluster:
+    """
+    在本机回环地址上模拟一组集群节点
+    
+    每个节点使用独立的回环地址（127.1.x.y），在该地址上监听SSH端口（进程内paramiko服务端）
+    以及MinIO的服务端口和控制台端口。所有节点共用一个接受连接的线程和一个处理HTTP请求的
+    事件循环，每个SSH连接一个paramiko传输线程。延迟、带宽和命令耗时都可以注入。
+    """
+    
+    def __init__(self, node_count, root_dir, latency=0.0, bandwidth=0, mkfs_seconds=0.0, download_seconds=0.0, start_seconds=0.0,
+                 server_port=19000, console_port=19001, devices=("/dev/sdb",), version="RELEASE.2024-01-18T22-51-48Z", logger=None):
+        """
+        Args:
+            node_count: 节点数
+            root_dir: 存放节点沙箱和模拟命令的目录
+            latency: 每次网络往返（认证、命令、SFTP请求）注入的延迟（秒）
+            bandwidth: 每条传输流的带宽上限（字节/秒），0表示不限制
+            mkfs_seconds: 格式化磁盘的耗时（秒）
+            download_seconds: 节点从官网下载二进制的耗时（秒）
+            start_seconds: 服务从启动到变为active的耗时（秒）
+            server_port: 模拟的MinIO服务端口
+            console_port: 模拟的MinIO控制台端口
+            devices: 每个节点上存在的数据盘设备
+            version: 模拟的MinIO版本号
+        """
+        self.logger = logger or Logger().get_logger()
+        self.node_count = node_count
+        self.root_dir = root_dir
+        self.bin_dir = os.path.join(root_dir, "bin")
+        self.nodes_dir = os.path.join(root_dir, "nodes")
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.mkfs_seconds = mkfs_seconds
+        self.download_seconds = download_seconds
+        self.start_seconds = start_seconds
+        self.server_port = server_port
+        self.console_port = console_port
+        self.devices = devices
+        self.version = version
+        self.counters = _Counters()
+        self.buckets = {}
+        self.nodes = []
+        self._host_key = None
+        self._selector = selectors.DefaultSelector()
+        self._listeners = []
+        self._transports = []
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._accept_thread = None
+        self._loop = None
+        self._loop_thread = None
+    
+    @staticmethod
+    def node_ip(index):
+        """
+        第index个节点（从1开始）的回环地址
+        """
+        return f"127.1.{index // 250}.{index % 250 + 1}"
+    
+    def _install_commands(self):
+        os.makedirs(self.bin_dir, exist_ok=True)
+        for name, content in list(FAKE_COMMANDS.items()) + [(alias, FAKE_COMMANDS[name]) for alias, name in FAKE_ALIASES.items()]:
+            path = os.path.join(self.bin_dir, name)
+            with open(path, "w") as f:
+                f.write(content)
+            os.chmod(path, 0o755)
+    
+    def start(self):
+        """
+        创建节点沙箱并启动所有模拟服务
+        
+        Returns:
+            list: 每个节点的{"host", "ip", "ssh_port", "root"}
+        """
+        self._install_commands()
+        self._host_key = paramiko.ECDSAKey.generate()
+        
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._loop.run_forever, name="sim-http", daemon=True)
+        self._loop_thread.start()
+        
+        for index in range(1, self.node_count + 1):
+            ip = self.node_ip(index)
+            node = SimulatedNode(self, index, ip, os.path.join(self.nodes_dir, ip), self.devices)
+            
+            listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            listener.bind((ip, 0))
+            listener.listen(128)
+            listener.setblocking(False)
+            node.ssh_port = listener.getsockname()[1]
+            self._selector.register(listener, selectors.EVENT_READ, node)
+            self._listeners.append(listener)
+            
+            for port in (self.server_port, self.console_port):
+                asyncio.run_coroutine_threadsafe(
+                    asyncio.start_server(lambda reader, writer, node=node: self._serve_http(node, reader, writer), ip, port),
+                    self._loop
+                ).result()
+            self.nodes.append(node)
+        
+        self._accept_thread = threading.Thread(target=self._accept_loop, name="sim-ssh-accept", daemon=True)
+        self._accept_thread.start()
+        self.logger.info(f"已启动 {self.node_count} 个模拟节点，沙箱目录：{self.nodes_dir}")
+        return [{"host": node.host, "ip": node.ip, "ssh_port": node.ssh_port, "root": node.root} for node in self.nodes]
+    
+    def _accept_loop(self):
+        while not self._stopping.is_set():
+            for key, _ in self._selector.select(timeout=0.2):
+                try:
+                    sock, _ = key.fileobj.accept()
+                except OSError:
+                    continue
+                sock.setblocking(True)
+                self._start_transport(sock, key.data)
+    
+    def _start_transport(self, sock, node):
+        """
+        在新连接上启动SSH服务端（握手在传输线程中进行，不阻塞接受连接）
+        """
+        self.counters.add("connections")
+        transport = paramiko.Transport(_CountingSocket(sock, self.counters))
+        transport.add_server_key(self._host_key)
+        transport.set_subsystem_handler("sftp", paramiko.SFTPServer, _SandboxSFTPServer, node)
+        try:
+            transport.start_server(threading.Event(), _NodeSSHServer(node))
+        except Exception as e:
+            self.logger.debug(f"模拟节点 {node.ip} 启动SSH会话失败：{e}")
+            return
+        with self._lock:
+            self._transports = [item for item in self._transports if item.is_active()]
+            self._transports.append(transport)
+    
+    async def _serve_http(self, node, reader, writer):
+        """
+        处理一个HTTP/1.1连接上的请求（支持keep-alive）
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length") or 0))
+                
+                method, target = request_line.decode("latin-1").split()[:2]
+                status, payload, content_type = node.handle_http(method, target, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {HTTP_REASONS.get(status, 'Unknown')}\r\nContent-Type: {content_type}\r\n"
+                    f"Content-Length: {len(payload)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + payload
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+    
+    def stats(self):
+        """
+        获取模拟节点侧的统计：连接数、认证次数、命令数、SFTP请求数和字节数、HTTP请求数
+        """
+        stats = self.counters.snapshot()
+        stats["buckets"] = len(self.buckets)
+        stats["active_services"] = sum(1 for node in self.nodes if node.service_active())
+        # 模拟节点进程（含执行命令的子进程）消耗的CPU时间，接近机器核数乘以耗时说明模拟节点本身已成为瓶颈
+        usage = [resource.getrusage(who) for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)]
+        stats["cpu_seconds"] = sum(item.ru_utime + item.ru_stime for item in usage)
+        return stats
+    
+    def stop(self):
+        """
+        关闭所有连接和监听端口
+        """
+        self._stopping.set()
+        if self._accept_thread is not None:
+            self._accept_thread.join()
+        for listener in self._listeners:
+            self._selector.unregister(listener)
+            listener.close()
+        with self._lock:
+            transports = list(self._transports)
+        for transport in transports:
+            transport.close()
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join()
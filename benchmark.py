@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+import argparse
+import sys
+from core.logger import Logger
+from bench.harness import BenchmarkHarness
+
+def main():
+    """
+    基准测试入口函数
+    """
+    parser = argparse.ArgumentParser(
+        description="MinIO部署工具基准测试：在本机模拟集群节点并运行完整的集群部署",
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    
+    # 规模组
+    scale_group = parser.add_argument_group('测试规模')
+    scale_group.add_argument("--nodes", "-n", type=int, nargs="+", default=[5, 50, 200],
+                             help="模拟的节点数，可指定多个，默认为5 50 200")
+    scale_group.add_argument("--distribution", choices=["download", "relay"], default="download",
+                             help="二进制分发方式：download（节点直接下载）或relay（控制机上传后节点间接力），默认为download")
+    scale_group.add_argument("--binary-size", type=float, default=64,
+                             help="relay模式下分发的模拟二进制大小（MB），默认为64")
+    scale_group.add_argument("--buckets", type=int, default=2,
+                             help="配置中的存储桶数量，默认为2")
+    scale_group.add_argument("--drives", type=int, default=1,
+                             help="每个节点的数据盘数量（1到25），大于1时按通配符配置多块磁盘并行格式化，默认为1")
+    scale_group.add_argument("--format-profile", choices=["default", "performance"], default="default",
+                             help="磁盘格式化配置，默认为default")
+    scale_group.add_argument("--drive-check-mb", type=int, default=0,
+                             help="在启动MinIO之前对每块数据盘做预检，指定测试文件大小（MiB），默认为0（不预检）")
+    scale_group.add_argument("--network-check-seconds", type=float, default=0.0,
+                             help="在启动MinIO之前测试模拟节点两两之间的延迟和吞吐量，指定每条链路的测试时长（秒），默认为0（不预检）")
+    
+    # 模拟节点组
+    sim_group = parser.add_argument_group('模拟节点')
+    sim_group.add_argument("--latency", type=float, default=0.0,
+                           help="每次网络往返注入的延迟（毫秒），默认为0")
+    sim_group.add_argument("--bandwidth", type=float, default=0,
+                           help="每条传输流的带宽上限（MB/秒），0表示不限制")
+    sim_group.add_argument("--mkfs-seconds", type=float, default=0.0,
+                           help="格式化磁盘的耗时（秒），默认为0")
+    sim_group.add_argument("--download-seconds", type=float, default=0.0,
+                           help="节点下载二进制的耗时（秒），默认为0")
+    sim_group.add_argument("--start-seconds", type=float, default=1.0,
+                           help="服务从启动到就绪的耗时（秒），默认为1")
+    sim_group.add_argument("--server-port", type=int, default=19000,
+                           help="模拟的MinIO服务端口，默认为19000")
+    sim_group.add_argument("--console-port", type=int, default=19001,
+                           help="模拟的MinIO控制台端口，默认为19001")
+    
+    # 输出组
+    output_group = parser.add_argument_group('输出选项')
+    output_group.add_argument("--output", "-o", default=None,
+                              help="把结果写入JSON文件，便于比较不同版本")
+    output_group.add_argument("--work-dir", default=None,
+                              help="存放节点沙箱、配置和部署日志的目录，默认为临时目录")
+    output_group.add_argument("--keep", action="store_true",
+                              help="保留成功运行的工作目录（失败的运行总是保留）")
+    output_group.add_argument("--profile", action="store_true",
+                              help="为每次部署在工作目录中输出Chrome Trace格式的耗时分析文件")
+    output_group.add_argument("--log-level", choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"], default="DEBUG",
+                              help="部署器写入日志文件的级别，默认为DEBUG（与deploy.py一致）")
+    output_group.add_argument("--log-mode", choices=["async", "sync"], default="async",
+                              help="部署器的日志写入方式，默认为async（与deploy.py一致）")
+    
+    parser.epilog = """
+使用示例:
+  默认规模: python benchmark.py
+  指定规模: python benchmark.py -n 5 20
+  注入延迟: python benchmark.py -n 50 --latency 20 --bandwidth 100
+  接力分发: python benchmark.py -n 50 --distribution relay --binary-size 100
+  多块磁盘: python benchmark.py -n 20 --drives 12 --mkfs-seconds 5
+  网络预检: python benchmark.py -n 5 --network-check-seconds 0.5
+  保存结果: python benchmark.py -o logs/benchmark.json
+    """
+    
+    args = parser.parse_args()
+    
+    logger = Logger(log_level="INFO").get_logger()
+    
+    harness = BenchmarkHarness(
+        work_dir=args.work_dir,
+        latency=args.latency / 1000,
+        bandwidth=int(args.bandwidth * 1024 * 1024),
+        mkfs_seconds=args.mkfs_seconds,
+        download_seconds=args.download_seconds,
+        start_seconds=args.start_seconds,
+        distribution=args.distribution,
+        binary_size=int(args.binary_size * 1024 * 1024),
+        buckets=args.buckets,
+        drives=args.drives,
+        format_profile=args.format_profile,
+        drive_check_mb=args.drive_check_mb,
+        network_check_seconds=args.network_check_seconds,
+        server_port=args.server_port,
+        console_port=args.console_port,
+        log_level=args.log_level,
+        log_mode=args.log_mode,
+        profile=args.profile,
+        keep=args.keep,
+        logger=logger
+    )
+    
+    try:
+        results = harness.run(args.nodes)
+    except KeyboardInterrupt:
+        logger.error("基准测试被用户中断")
+        sys.exit(1)
+    except Exception as e:
+        logger.error(f"基准测试执行失败：{e}", exc_info=True)
+        sys.exit(1)
+    
+    harness.report(results)
+    if args.output:
+        harness.save(results, args.output)
+    sys.exit(0 if all(result.get("succeeded") for result in results) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from core.logger import Logger
+
+class ArtifactCache:
+    """
+    本地内容寻址的安装包缓存
+    
+    安装包按sha256存放在objects/<前两位>/<sha256>下，index.json记录
+    (名称, 版本, 架构)到sha256的映射，因此按版本和架构查找是一次字典查询。
+    缓存文件首次被使用时会重新计算sha256校验完整性，总大小超过上限时按最近使用时间淘汰。
+    调用方可以提供verify函数（如检查安装包的--version输出），内容与版本不符的安装包
+    不会加入缓存，已有的缓存记录在首次命中时也会校验，不符时移除。
+    """
+    
+    INDEX_FILE = "index.json"
+    
+    def __init__(self, cache_dir="packages/cache", max_size_bytes=5 * 1024 ** 3, logger=None):
+        self.logger = logger or Logger().get_logger()
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.max_size_bytes = max_size_bytes
+        self._lock = threading.Lock()
+        self._verified = set()
+        # 本进程内已通过verify校验的缓存记录
+        self._version_checked = set()
+        self._index = None
+    
+    def _key(self, name, version, arch):
+        return f"{name}|{version}|{arch}"
+    
+    def _object_path(self, sha256):
+        return os.path.join(self.cache_dir, "objects", sha256[:2], sha256)
+    
+    def _load_index(self):
+        """
+        读取索引文件，索引损坏时视为空缓存
+        """
+        if self._index is not None:
+            return self._index
+        
+        index_path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                self._index = json.load(f).get("entries", {})
+        except FileNotFoundError:
+            self._index = {}
+        except Exception as e:
+            self.logger.warning(f"缓存索引文件损坏，忽略已有索引：{index_path}，错误：{e}")
+            self._index = {}
+        return self._index
+    
+    def _save_index(self):
+        """
+        原子写入索引文件
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        index_path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        temp_path = f"{index_path}.tmp-{uuid.uuid4().hex[:8]}"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({"entries": self._index}, f, indent=2, sort_keys=True)
+        os.replace(temp_path, index_path)
+    
+    @staticmethod
+    def file_sha256(path, chunk_size=1024 * 1024):
+        """
+        计算本地文件的sha256（分发器和升级器也使用）
+        
+        Args:
+            path: 文件路径
+            chunk_size: 每次读取的字节数
+        
+        Returns:
+            str: sha256十六进制摘要
+        """
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(chunk_size), b""):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    def _drop(self, key):
+        """
+        移除缓存记录，对象不再被其他记录引用时一并删除（调用方需持有锁）
+        """
+        entry = self._index.pop(key, None)
+        if entry and not any(other["sha256"] == entry["sha256"] for other in self._index.values()):
+            path = self._object_path(entry["sha256"])
+            if os.path.exists(path):
+                os.remove(path)
+            self._verified.discard(entry["sha256"])
+        self._save_index()
+    
+    def lookup(self, name, version, arch, verify=None):
+        """
+        按名称、版本和架构查找缓存的安装包
+        
+        Args:
+            name: 安装包名称，如minio、mc
+            version: 版本号
+            arch: 系统架构，如amd64、arm64
+            verify: 校验函数，接受缓存文件路径，返回False时视为未命中并移除该缓存记录
+        
+        Returns:
+            str: 缓存文件路径，未命中或校验失败时返回None
+        """
+        key = self._key(name, version, arch)
+        with self._lock:
+            entry = self._load_index().get(key)
+            if not entry:
+                return None
+            
+            path = self._object_path(entry["sha256"])
+            if not os.path.isfile(path) or os.path.getsize(path) != entry["size"]:
+                self.logger.warning(f"缓存文件缺失或大小不一致，移除缓存记录：{key}")
+                self._index.pop(key, None)
+                self._save_index()
+                return None
+            
+            # 每个进程内首次使用时重新计算sha256，之后只检查大小
+            if entry["sha256"] not in self._verified:
+                actual = self.file_sha256(path)
+                if actual != entry["sha256"]:
+                    self.logger.warning(f"缓存文件sha256校验失败，移除缓存记录：{key}，期望 {entry['sha256']}，实际 {actual}")
+                    self._index.pop(key, None)
+                    os.remove(path)
+                    self._save_index()
+                    return None
+                self._verified.add(entry["sha256"])
+            
+            # 每个进程内首次命中时校验内容与版本是否相符，早期按版本记录的缓存可能来自“最新版”下载地址
+            if verify is not None and key not in self._version_checked:
+                if not verify(path):
+                    self.logger.warning(f"缓存的安装包与记录的版本不符，移除缓存记录：{key}")
+                    self._drop(key)
+                    return None
+                self._version_checked.add(key)
+            
+            entry["last_used"] = time.time()
+            self._save_index()
+        
+        self.logger.info(f"命中本地安装包缓存：{key} -> {path}")
+        return path
+    
+    def add(self, name, version, arch, src_path, source=None, sha256=None, verify=None):
+        """
+        把安装包加入缓存
+        
+        Args:
+            name: 安装包名称
+            version: 版本号
+            arch: 系统架构
+            src_path: 待缓存的文件路径
+            source: 来源说明（如下载URL），仅用于记录
+            sha256: 已知的sha256，提供时校验文件内容是否一致
+            verify: 校验函数，接受文件路径，返回False时拒绝加入缓存
+        
+        Returns:
+            str: 缓存文件路径，失败时返回None
+        """
+        key = self._key(name, version, arch)
+        try:
+            actual = self.file_sha256(src_path)
+            if sha256 and actual != sha256:
+                self.logger.error(f"安装包sha256与期望值不一致，拒绝加入缓存：{src_path}，期望 {sha256}，实际 {actual}")
+                return None
+            if verify is not None and not verify(src_path):
+                self.logger.error(f"安装包与版本不符，拒绝加入缓存：{src_path}（{key}）")
+                return None
+            
+            path = self._object_path(actual)
+            with self._lock:
+                if not os.path.isfile(path):
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    temp_path = f"{path}.tmp-{uuid.uuid4().hex[:8]}"
+                    shutil.copyfile(src_path, temp_path)
+                    os.chmod(temp_path, 0o755)
+                    os.replace(temp_path, path)
+                
+                self._load_index()[key] = {
+                    "sha256": actual,
+                    "size": os.path.getsize(path),
+                    "source": source or src_path,
+                    "added": time.time(),
+                    "last_used": time.time()
+                }
+                self._verified.add(actual)
+                if verify is not None:
+                    self._version_checked.add(key)
+                self._evict()
+                self._save_index()
+            
+            self.logger.info(f"安装包已加入缓存：{key}，sha256：{actual}")
+            return path
+        except Exception as e:
+            self.logger.error(f"安装包加入缓存失败：{key}，错误：{e}")
+            return None
+    
+    def fetch(self, name, version, arch, download, source=None, verify=None):
+        """
+        获取安装包：缓存命中时直接返回，未命中时调用download下载后加入缓存
+        
+        Args:
+            name: 安装包名称
+            version: 版本号
+            arch: 系统架构
+            download: 下载函数，接受目标文件路径参数，返回bool
+            source: 来源说明（如下载URL）
+            verify: 校验函数，命中的缓存和新下载的文件都需要通过校验
+        
+        Returns:
+            str: 缓存文件路径，下载失败或校验失败时返回None
+        """
+        path = self.lookup(name, version, arch, verify=verify)
+        if path:
+            return path
+        
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # 临时文件名固定，下载中断后再次获取时下载器可以从其.part文件续传
+        temp_path = os.path.join(self.cache_dir, f"{name}-{version}-{arch}.download")
+        try:
+            if not download(temp_path) or not os.path.isfile(temp_path):
+                return None
+            return self.add(name, version, arch, temp_path, source=source, verify=verify)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+    
+    def _evict(self):
+        """
+        总大小超过上限时按最近使用时间淘汰缓存对象（调用方需持有锁）
+        """
+        objects = {}
+        for key, entry in self._index.items():
+            info = objects.setdefault(entry["sha256"], {"size": entry["size"], "last_used": 0, "keys": []})
+            info["last_used"] = max(info["last_used"], entry["last_used"])
+            info["keys"].append(key)
+        
+        total = sum(info["size"] for info in objects.values())
+        for sha256, info in sorted(objects.items(), key=lambda item: item[1]["last_used"]):
+            if total <= self.max_size_bytes:
+                break
+            # 至少保留最近使用的一个对象
+            if len(objects) == 1:
+                break
+            path = self._object_path(sha256)
+            if os.path.exists(path):
+                os.remove(path)
+            for key in info["keys"]:
+                self._index.pop(key, None)
+                self._version_checked.discard(key)
+            self._verified.discard(sha256)
+            objects.pop(sha256)
+            total -= info["size"]
+            self.logger.info(f"缓存总大小超过上限，淘汰最久未使用的安装包：{', '.join(info['keys'])}")
+    
+    def get_stats(self):
+        """
+        获取缓存统计信息
+        
+        Returns:
+            dict: 包含entries、objects、total_bytes、max_size_bytes
+        """
+        with self._lock:
+            index = self._load_index()
+            sizes = {entry["sha256"]: entry["size"] for entry in index.values()}
+            return {
+                "entries": len(index),
+                "objects": len(sizes),
+                "total_bytes": sum(sizes.values()),
+                "max_size_bytes": self.max_size_bytes
+            }
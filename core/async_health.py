@@ -0,0 +1,158 @@
+import asyncio
+import random
+import ssl
+import time
+from core.logger import Logger
+from core.profiler import Profiler
+
+class AsyncHealthProber:
+    """
+    基于asyncio的并发健康探测器
+    
+    同时探测所有节点的服务端口、控制台端口和/minio/health/{live,ready,cluster}接口。
+    每项检查失败后按指数退避加随机抖动重试，全部检查共享一个全局截止时间，
+    所有检查都通过时立即返回，不再等待固定的重试间隔。
+    """
+    
+    ENDPOINTS = ("live", "ready", "cluster")
+    
+    def __init__(self, logger=None, deadline=120, initial_delay=0.2, max_delay=5.0, timeout=3, max_concurrency=256, profiler=None):
+        self.logger = logger or Logger().get_logger()
+        self.profiler = profiler or Profiler(logger=self.logger)
+        self.deadline = deadline
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+    
+    async def _check_port(self, host, port, timeout):
+        """
+        检查TCP端口是否可以连接
+        """
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        writer.close()
+        return True, "端口可以连接"
+    
+    async def _check_http(self, host, port, path, secure, timeout):
+        """
+        发送HTTP GET请求，状态码为200时视为通过
+        """
+        context = None
+        if secure:
+            # 与同步健康检查一致，不校验自签名证书
+            context = ssl.create_default_context()
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+        
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port, ssl=context), timeout)
+        try:
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nConnection: close\r\n\r\n".encode("ascii"))
+            await writer.drain()
+            status_line = await asyncio.wait_for(reader.readline(), timeout)
+        finally:
+            writer.close()
+        
+        fields = status_line.decode("latin-1").split()
+        status = int(fields[1]) if len(fields) >= 2 and fields[1].isdigit() else 0
+        return status == 200, f"HTTP {status}"
+    
+    async def _poll(self, check, deadline, semaphore):
+        """
+        按指数退避加随机抖动重试一项检查，直到通过或到达截止时间
+        
+        Returns:
+            dict: 包含ok、attempts、seconds、detail
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        attempts = 0
+        detail = ""
+        while True:
+            attempts += 1
+            remaining = deadline - loop.time()
+            try:
+                async with semaphore:
+                    ok, detail = await check(max(0.1, min(self.timeout, remaining)))
+            except Exception as e:
+                ok, detail = False, str(e) or type(e).__name__
+            
+            if ok:
+                return {"ok": True, "attempts": attempts, "seconds": loop.time() - start, "detail": detail}
+            
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return {"ok": False, "attempts": attempts, "seconds": loop.time() - start, "detail": detail}
+            
+            # 指数退避，在[delay/2, delay]之间随机抖动，避免所有检查同时重试
+            delay = min(self.max_delay, self.initial_delay * (2 ** (attempts - 1)))
+            await asyncio.sleep(min(remaining, random.uniform(delay / 2, delay)))
+    
+    async def probe_async(self, hosts, port, console_port=None, endpoints=ENDPOINTS, secure=False, deadline=None, check_ports=True):
+        """
+        异步并发探测所有节点
+        
+        Returns:
+            dict: 主机到检查结果的映射，检查结果为检查项名称（api_port、console_port、live、ready、cluster）到_poll结果的映射
+        """
+        loop = asyncio.get_running_loop()
+        deadline_at = loop.time() + (self.deadline if deadline is None else deadline)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        checks = []
+        for host in hosts:
+            if check_ports:
+                checks.append((host, "api_port", lambda timeout, host=host: self._check_port(host, port, timeout)))
+                if console_port:
+                    checks.append((host, "console_port", lambda timeout, host=host: self._check_port(host, console_port, timeout)))
+            for endpoint in endpoints:
+                checks.append((host, endpoint, lambda timeout, host=host, endpoint=endpoint: self._check_http(
+                    host, port, f"/minio/health/{endpoint}", secure, timeout
+                )))
+        
+        outcomes = await asyncio.gather(*(self._poll(check, deadline_at, semaphore) for _, _, check in checks))
+        
+        results = {host: {} for host in hosts}
+        for (host, name, _), outcome in zip(checks, outcomes):
+            results[host][name] = outcome
+        return results
+    
+    def probe(self, hosts, port, console_port=None, endpoints=ENDPOINTS, secure=False, deadline=None, check_ports=True):
+        """
+        并发探测所有节点的端口和健康检查接口
+        
+        Args:
+            hosts: 主机列表
+            port: 服务端口
+            console_port: 控制台端口，为None时不检查
+            endpoints: 健康检查接口列表，可选live、ready、cluster
+            secure: 是否使用HTTPS
+            deadline: 全局截止时间（秒），为None时使用默认值
+            check_ports: 是否检查端口
+        
+        Returns:
+            dict: 主机到检查结果的映射，检查结果为检查项名称到{"ok", "attempts", "seconds", "detail"}的映射
+        """
+        start = time.monotonic()
+        with self.profiler.span("health.probe", "health", hosts=len(hosts), endpoints=",".join(endpoints)):
+            results = asyncio.run(self.probe_async(hosts, port, console_port, endpoints, secure, deadline, check_ports))
+        
+        failed = []
+        for host, checks in results.items():
+            summary = "，".join(
+                f"{name} {'✓' if outcome['ok'] else '✗'}（{outcome['attempts']}次，{outcome['seconds']:.2f}秒）"
+                for name, outcome in checks.items()
+            )
+            self.logger.info(f"节点 {host} 健康探测：{summary}")
+            failed.extend(f"{host}/{name}：{outcome['detail']}" for name, outcome in checks.items() if not outcome["ok"])
+        
+        if failed:
+            self.logger.warning(f"健康探测未通过的检查项：{'；'.join(failed)}")
+        self.logger.info(f"健康探测完成：{len(results)} 个节点，失败 {len(failed)} 项，耗时 {time.monotonic() - start:.2f} 秒")
+        return results
+    
+    @staticmethod
+    def all_ok(checks):
+        """
+        判断一组检查结果是否全部通过
+        """
+        return all(outcome["ok"] for outcome in checks.values())
@@ -0,0 +1,215 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from core.logger import Logger
+from core.remote import RemoteExecutor
+
+class AsyncRemoteExecutor:
+    """
+    基于asyncio的远程命令执行引擎
+    
+    SSH握手和通道打开这类阻塞操作交给一个有界线程池完成，命令输出通过通道的
+    fileno()注册到事件循环上异步读取，因此等待命令执行的过程不占用线程。
+    结果沿用RemoteExecutor的(exit_code, stdout, stderr)约定。
+    """
+    
+    def __init__(self, remote_executor=None, logger=None, max_concurrency=64, per_host_limit=4, connect_workers=16):
+        self.logger = logger or Logger().get_logger()
+        self.remote_executor = remote_executor or RemoteExecutor(logger=self.logger)
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self.connect_workers = connect_workers
+    
+    async def execute_command(self, host, command, port=22, username='root', key_file=None, password=None, timeout=30,
+                              _global_sem=None, _host_sems=None, _pool=None):
+        """
+        异步执行远程命令
+        
+        Args:
+            host: 远程主机IP或主机名
+            command: 要执行的命令
+            port: SSH端口，默认为22
+            username: 用户名，默认为root
+            key_file: SSH私钥文件路径
+            password: 密码
+            timeout: 超时时间，默认为30秒
+        
+        Returns:
+            tuple: (exit_code, stdout, stderr)
+        """
+        loop = asyncio.get_running_loop()
+        global_sem = _global_sem or asyncio.Semaphore(self.max_concurrency)
+        host_sem = (_host_sems or {}).get((host, port)) or asyncio.Semaphore(self.per_host_limit)
+        
+        self.logger.debug("异步执行远程命令：%s@%s:%s，命令：%s", username, host, port, command)
+        
+        channel = None
+        async with global_sem, host_sem:
+            try:
+                # 握手（首次）和打开通道是阻塞操作，放到线程池中执行
+                with self.remote_executor.profiler.span("ssh.exec", "exec", asynchronous=True, host=host, command=command[:200]):
+                    channel = await loop.run_in_executor(
+                        _pool, self._open_channel, host, command, port, username, key_file, password, timeout
+                    )
+                    exit_code, stdout_str, stderr_str = await asyncio.wait_for(self._collect(channel, _pool, timeout), timeout)
+            except asyncio.TimeoutError:
+                self.logger.warning(f"命令执行超时：{username}@{host}:{port}，命令：{command}，超时：{timeout}秒")
+                return (1, "", f"命令执行超时（{timeout}秒）")
+            except asyncio.CancelledError:
+                self.logger.debug("命令已取消：%s@%s:%s，命令：%s", username, host, port, command)
+                raise
+            except Exception as e:
+                self.remote_executor._invalidate_client(host, port, username, key_file, password)
+                self.logger.error(f"执行远程命令失败：{username}@{host}:{port}，命令：{command}，错误：{e}")
+                return (1, "", str(e))
+            finally:
+                if channel is not None:
+                    channel.close()
+        
+        if exit_code == 0:
+            self.logger.debug("命令执行成功：%s，输出：%s", command, stdout_str)
+        else:
+            self.logger.warning(f"命令执行失败：{command}，退出码：{exit_code}，错误：{stderr_str}")
+        
+        return (exit_code, stdout_str, stderr_str)
+    
+    def _open_channel(self, host, command, port, username, key_file, password, timeout):
+        """
+        从连接池获取连接并打开exec通道（在线程池中执行）
+        """
+        client = self.remote_executor._get_client(host, port, username, key_file, password)
+        channel = client.get_transport().open_session(timeout=timeout)
+        channel.exec_command(command)
+        return channel
+    
+    async def _collect(self, channel, pool=None, timeout=30):
+        """
+        异步读取通道的stdout/stderr，直到命令结束
+        
+        Args:
+            channel: 已执行命令的exec通道
+            pool: 执行阻塞操作的线程池（与打开通道共用同一个有界线程池）
+            timeout: 等待退出码的超时时间（秒）
+        """
+        loop = asyncio.get_running_loop()
+        readable = asyncio.Event()
+        fd = channel.fileno()
+        loop.add_reader(fd, readable.set)
+        stdout_chunks = []
+        stderr_chunks = []
+        
+        try:
+            while True:
+                await readable.wait()
+                readable.clear()
+                
+                while channel.recv_ready():
+                    stdout_chunks.append(channel.recv(32768))
+                while channel.recv_stderr_ready():
+                    stderr_chunks.append(channel.recv_stderr(32768))
+                
+                if channel.eof_received or channel.closed:
+                    break
+        finally:
+            loop.remove_reader(fd)
+        
+        # 通道EOF之后退出码可能稍晚到达：在有界线程池中限时等待，通道挂起时线程也会在超时后释放
+        if not await loop.run_in_executor(pool, channel.status_event.wait, timeout):
+            raise asyncio.TimeoutError()
+        exit_code = channel.recv_exit_status()
+        
+        while channel.recv_ready():
+            stdout_chunks.append(channel.recv(32768))
+        while channel.recv_stderr_ready():
+            stderr_chunks.append(channel.recv_stderr(32768))
+        
+        return (
+            exit_code,
+            b"".join(stdout_chunks).decode('utf-8').strip(),
+            b"".join(stderr_chunks).decode('utf-8').strip()
+        )
+    
+    async def execute_parallel_async(self, tasks, fail_fast=False):
+        """
+        并行执行远程命令（协程版本）
+        
+        Args:
+            tasks: 任务列表，每个任务是一个字典，包含host, command, port, username, key_file, password, timeout等参数
+            fail_fast: 任一命令失败时是否取消其余未完成的命令，默认为False
+        
+        Returns:
+            list: 与tasks顺序一致的结果列表，每个结果是一个字典，包含task和result
+        """
+        global_sem = asyncio.Semaphore(self.max_concurrency)
+        host_sems = {}
+        for task in tasks:
+            host_sems.setdefault((task['host'], task.get('port', 22)), asyncio.Semaphore(self.per_host_limit))
+        
+        pool = ThreadPoolExecutor(max_workers=self.connect_workers)
+        # 任务集合只属于本次调用的事件循环，多个线程同时调用execute_parallel时互不影响
+        futures = []
+        try:
+            for task in tasks:
+                future = asyncio.ensure_future(self.execute_command(
+                    host=task['host'],
+                    command=task['command'],
+                    port=task.get('port', 22),
+                    username=task.get('username', 'root'),
+                    key_file=task.get('key_file'),
+                    password=task.get('password'),
+                    timeout=task.get('timeout', 30),
+                    _global_sem=global_sem,
+                    _host_sems=host_sems,
+                    _pool=pool
+                ))
+                futures.append(future)
+            
+            if fail_fast:
+                for finished in asyncio.as_completed(futures):
+                    try:
+                        result = await finished
+                    except asyncio.CancelledError:
+                        continue
+                    if result[0] != 0:
+                        self.logger.warning("检测到命令执行失败，取消其余未完成的命令")
+                        for future in futures:
+                            future.cancel()
+                        break
+            
+            outcomes = await asyncio.gather(*futures, return_exceptions=True)
+        finally:
+            pool.shutdown(wait=False)
+        
+        results = []
+        for task, outcome in zip(tasks, outcomes):
+            if isinstance(outcome, asyncio.CancelledError):
+                outcome = (1, "", "命令已取消")
+            elif isinstance(outcome, BaseException):
+                outcome = (1, "", str(outcome))
+            results.append({
+                'task': task,
+                'result': outcome
+            })
+        return results
+    
+    def execute_parallel(self, tasks, fail_fast=False):
+        """
+        并行执行远程命令
+        
+        Args:
+            tasks: 任务列表，每个任务是一个字典，包含host, command, port, username, key_file, password, timeout等参数
+            fail_fast: 任一命令失败时是否取消其余未完成的命令，默认为False
+        
+        Returns:
+            list: 任务执行结果列表，每个结果是一个字典，包含task和result
+        """
+        self.logger.info(
+            f"异步并行执行 {len(tasks)} 个远程命令，全局并发上限：{self.max_concurrency}，单主机并发上限：{self.per_host_limit}"
+        )
+        
+        start = time.monotonic()
+        results = asyncio.run(self.execute_parallel_async(tasks, fail_fast=fail_fast))
+        
+        failed = sum(1 for item in results if item['result'][0] != 0)
+        self.logger.info(f"异步并行执行完成，共 {len(results)} 个结果，失败 {failed} 个，耗时 {time.monotonic() - start:.2f} 秒")
+        return results
@@ -100,16 +100,16 @@ class ConfigParser:
         if not self.config.get('cluster'):
             self.logger.error("缺少集群配置：cluster")
             exit(1)
-            
+        
         cluster_config = self.config['cluster']
         if not cluster_config.get('server_port'):
             self.logger.error("缺少服务端口配置：cluster.server_port")
             exit(1)
-            
+        
         if not cluster_config.get('console_port'):
             self.logger.error("缺少控制台端口配置：cluster.console_port")
             exit(1)
-            
+        
         # 验证磁盘配置（必选项）
         if not standalone_config.get('disk'):
             self.logger.error("缺少磁盘配置：standalone.disk")
@@ -122,13 +122,13 @@ class ConfigParser:
             self.logger.error("必须启用磁盘管理：standalone.disk.enabled = true")
             exit(1)
         
-        # 必须指定设备路径
-        if not disk_config.get('device'):
-            self.logger.error("缺少磁盘设备路径：standalone.disk.device")
+        # 必须指定设备路径（单块磁盘为device，多块磁盘为devices）
+        if not disk_config.get('device') and not disk_config.get('devices'):
+            self.logger.error("缺少磁盘设备路径：standalone.disk.device或standalone.disk.devices")
             exit(1)
         
-        # 必须指定挂载点
-        if not disk_config.get('mount_point'):
+        # 单块磁盘必须指定挂载点（多块磁盘挂载到mount_prefix加序号）
+        if not disk_config.get('devices') and not disk_config.get('mount_point'):
             self.logger.error("缺少磁盘挂载点：standalone.disk.mount_point")
             exit(1)
     
@@ -177,13 +177,13 @@ class ConfigParser:
                 self.logger.error(f"节点 {i+1}（{node['ip']}）必须启用磁盘管理：disk.enabled = true")
                 exit(1)
             
-            # 必须指定设备路径
-            if not disk_config.get('device'):
-                self.logger.error(f"节点 {i+1}（{node['ip']}）缺少磁盘设备路径：disk.device")
+            # 必须指定设备路径（单块磁盘为device，多块磁盘为devices）
+            if not disk_config.get('device') and not disk_config.get('devices'):
+                self.logger.error(f"节点 {i+1}（{node['ip']}）缺少磁盘设备路径：disk.device或disk.devices")
                 exit(1)
             
-            # 必须指定挂载点
-            if not disk_config.get('mount_point'):
+            # 单块磁盘必须指定挂载点（多块磁盘挂载到mount_prefix加序号）
+            if not disk_config.get('devices') and not disk_config.get('mount_point'):
                 self.logger.error(f"节点 {i+1}（{node['ip']}）缺少磁盘挂载点：disk.mount_point")
                 exit(1)
         
@@ -209,7 +209,7 @@ class ConfigParser:
                 self.validate_config()
         
         return self.config
-        
+    
     def validate_config(self, mode=None):
         """
         验证配置的有效性
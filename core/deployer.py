@@ -1,30 +1,74 @@
 import os
-import subprocess
 from concurrent.futures import ThreadPoolExecutor
 from core.logger import Logger
 from core.system_check import SystemCheck
 from core.config_parser import ConfigParser
 from core.remote import RemoteExecutor
+from core.async_remote import AsyncRemoteExecutor
+from core.distributor import BinaryDistributor
+from core.artifact_cache import ArtifactCache
+from core.scheduler import TaskGraph
+from core.journal import DeploymentJournal
+from core.facts import FactGatherer
+from core.upgrader import RollingUpgrader
 from core.disk import DiskManager
+from core.drive_check import DriveBenchmark
+from core.network_check import NetworkMeshTest
+from core.tuning import SystemTuner
 from core.firewall import FirewallManager
 from core.minio_installer import MinioInstaller
 from core.service import ServiceManager
 from core.health import HealthChecker
+from core.profiler import Profiler
 
 class Deployer:
-    def __init__(self, config_file, dry_run=False, logger=None, mode=None):
+    # 各阶段任务指纹包含的配置项，配置项变化时对应任务（及其下游任务）在--resume时重新执行
+    PHASE_INPUTS = {
+        "ssh_trust": [],
+        "os_partitions": [],
+        "minio_exists": ["cluster.nodes"],
+        "firewall": ["cluster.server_port", "cluster.console_port"],
+        "tuning": ["advanced.tuning"],
+        "install": ["minio"],
+        "configure": ["credentials", "cluster", "advanced.performance"],
+        "start_cluster": ["cluster"],
+        "drive_check": ["cluster.nodes", "advanced.drive_check"],
+        "network_check": ["cluster.nodes", "cluster.server_port", "advanced.network_check"],
+        "health": ["credentials", "cluster.server_port", "cluster.console_port"],
+        "buckets": ["credentials", "cluster.server_port", "cluster.region", "cluster.buckets"]
+    }
+    
+    def __init__(self, config_file, dry_run=False, logger=None, mode=None, resume=False, profile_file=None):
         self.config_file = config_file
         self.dry_run = dry_run
         self.logger = logger or Logger().get_logger()
         self.mode = mode
+        self.resume = resume
+        # 耗时分析文件路径，为None时不记录
+        self.profile_file = profile_file
+        self.profiler = Profiler(enabled=profile_file is not None, logger=self.logger)
         self.config_parser = ConfigParser(config_file, logger=self.logger)
         self.system_check = SystemCheck(logger=self.logger)
-        self.remote_executor = RemoteExecutor(logger=self.logger)
+        self.remote_executor = RemoteExecutor(logger=self.logger, profiler=self.profiler)
+        self.async_executor = AsyncRemoteExecutor(self.remote_executor, logger=self.logger)
+        self.distributor = BinaryDistributor(self.remote_executor, self.async_executor, logger=self.logger)
         self.disk_manager = DiskManager(logger=self.logger)
+        self.drive_check = DriveBenchmark(self.async_executor, logger=self.logger, profiler=self.profiler)
+        self.network_check = NetworkMeshTest(self.async_executor, logger=self.logger, profiler=self.profiler)
         self.firewall_manager = FirewallManager(logger=self.logger)
-        self.minio_installer = MinioInstaller(logger=self.logger)
+        self.tuner = SystemTuner(logger=self.logger)
+        self.minio_installer = MinioInstaller(logger=self.logger, profiler=self.profiler)
         self.service_manager = ServiceManager(logger=self.logger)
         self.health_checker = HealthChecker(logger=self.logger)
+        self.health_checker.prober.profiler = self.profiler
+        self.journal = DeploymentJournal(logger=self.logger)
+        self.facts = FactGatherer(self.remote_executor, logger=self.logger)
+        self.inventory_file = "logs/inventory.json"
+        self.health_probe_results = {}
+        self.upgrader = RollingUpgrader(
+            self.remote_executor, self.async_executor, self.distributor, self.facts, self.health_checker, logger=self.logger
+        )
+        self.task_graph = None
         self.config = None
     
     def run_system_checks(self):
@@ -50,8 +94,8 @@ class Deployer:
         # 先获取配置，不验证
         self.config = self.config_parser.get_config(validate=False)
         
-        # 使用命令行传入的模式验证配置
-        if self.mode:
+        # 使用命令行传入的模式验证配置（升级模式沿用配置文件中的部署模式）
+        if self.mode and self.mode != "upgrade":
             self.logger.info(f"使用命令行指定的部署模式：**{self.mode}**")
             self.config_parser.validate_config(self.mode)
             # 将命令行指定的模式更新到配置中
@@ -60,6 +104,88 @@ class Deployer:
             # 没有指定模式，使用配置文件中的模式
             self.config_parser.validate_config()
         
+        # SSH连接池配置
+        ssh_pool_config = self.config.get("advanced", {}).get("ssh", {})
+        self.remote_executor.keepalive_interval = ssh_pool_config.get("keepalive_interval", self.remote_executor.keepalive_interval)
+        self.remote_executor.idle_timeout = ssh_pool_config.get("idle_timeout", self.remote_executor.idle_timeout)
+        self.remote_executor.sftp_window_size = ssh_pool_config.get("sftp_window_size", self.remote_executor.sftp_window_size)
+        self.remote_executor.transfer_chunk_size = ssh_pool_config.get("transfer_chunk_size", self.remote_executor.transfer_chunk_size)
+        
+        # 集群并发配置
+        concurrency_config = self.config.get("advanced", {}).get("concurrency", {})
+        self.async_executor.max_concurrency = concurrency_config.get("max_parallel_nodes", self.async_executor.max_concurrency)
+        self.async_executor.per_host_limit = concurrency_config.get("per_host_sessions", self.async_executor.per_host_limit)
+        self.health_checker.s3_concurrency = concurrency_config.get("bucket_workers", self.health_checker.s3_concurrency)
+        
+        # 存储桶请求的签名区域需要与MinIO的站点区域一致
+        self.health_checker.region = self.config.get("cluster", {}).get("region") or self.health_checker.region
+        
+        # 本地安装包缓存配置
+        minio_config = self.config.get("minio", {})
+        if minio_config.get("cache_enabled", True):
+            self.minio_installer.artifact_cache = ArtifactCache(
+                minio_config.get("cache_dir", "packages/cache"),
+                int(float(minio_config.get("cache_max_size_gb", 5)) * 1024 ** 3),
+                logger=self.logger
+            )
+        
+        # 安装包下载配置
+        self.minio_installer.download_segments = max(1, minio_config.get("download_segments", self.minio_installer.download_segments))
+        self.minio_installer.download_chunk_size = minio_config.get("download_chunk_size", self.minio_installer.download_chunk_size)
+        
+        # 检查点日志配置
+        self.journal.path = self.config.get("advanced", {}).get("journal_file", self.journal.path)
+        
+        # 主机信息快照文件
+        self.inventory_file = self.config.get("advanced", {}).get("inventory_file", self.inventory_file)
+        
+        # 并发健康探测配置
+        probe_config = self.config.get("advanced", {}).get("health_probe", {})
+        prober = self.health_checker.prober
+        prober.deadline = probe_config.get("deadline", prober.deadline)
+        prober.initial_delay = probe_config.get("initial_delay", prober.initial_delay)
+        prober.max_delay = probe_config.get("max_delay", prober.max_delay)
+        prober.timeout = probe_config.get("timeout", prober.timeout)
+        
+        # 滚动升级配置
+        upgrade_config = self.config.get("upgrade", {})
+        self.upgrader.server_port = self.config.get("cluster", {}).get("server_port", self.upgrader.server_port)
+        self.upgrader.restart_timeout = upgrade_config.get("restart_timeout", self.upgrader.restart_timeout)
+        self.upgrader.rollback = upgrade_config.get("rollback_on_failure", self.upgrader.rollback)
+        
+        # 集群二进制分发配置
+        distribution_config = minio_config.get("distribution", {})
+        self.distributor.fanout = max(1, distribution_config.get("fanout", self.distributor.fanout))
+        self.distributor.fallback_direct = distribution_config.get("fallback_direct", self.distributor.fallback_direct)
+        
+        # 应用数据盘预检配置
+        drive_check_config = self.config.get("advanced", {}).get("drive_check", {})
+        self.drive_check.enabled = drive_check_config.get("enabled", self.drive_check.enabled)
+        self.drive_check.size_mb = drive_check_config.get("size_mb", self.drive_check.size_mb)
+        self.drive_check.random_ops = drive_check_config.get("random_ops", self.drive_check.random_ops)
+        self.drive_check.min_ratio = drive_check_config.get("min_ratio", self.drive_check.min_ratio)
+        self.drive_check.action = drive_check_config.get("action", self.drive_check.action)
+        self.drive_check.timeout = drive_check_config.get("timeout", self.drive_check.timeout)
+        
+        # 应用节点间网络预检配置
+        network_check_config = self.config.get("advanced", {}).get("network_check", {})
+        self.network_check.enabled = network_check_config.get("enabled", self.network_check.enabled)
+        self.network_check.port = network_check_config.get("port", self.network_check.port)
+        self.network_check.pings = network_check_config.get("pings", self.network_check.pings)
+        self.network_check.seconds = network_check_config.get("seconds", self.network_check.seconds)
+        self.network_check.min_ratio = network_check_config.get("min_ratio", self.network_check.min_ratio)
+        self.network_check.max_asymmetry = network_check_config.get("max_asymmetry", self.network_check.max_asymmetry)
+        self.network_check.action = network_check_config.get("action", self.network_check.action)
+        self.network_check.report_file = network_check_config.get("report_file", self.network_check.report_file)
+        
+        # 应用系统调优配置
+        tuning_config = self.config.get("advanced", {}).get("tuning", {})
+        self.tuner.enabled = tuning_config.get("enabled", self.tuner.enabled)
+        self.tuner.sysctl = dict(tuning_config.get("sysctl") or {})
+        self.tuner.transparent_hugepage = tuning_config.get("transparent_hugepage", self.tuner.transparent_hugepage)
+        self.tuner.io_scheduler = tuning_config.get("io_scheduler", self.tuner.io_scheduler)
+        self.tuner.cpu_governor = tuning_config.get("cpu_governor", self.tuner.cpu_governor)
+        
         self.logger.info("配置文件加载完成")
         self.logger.info("-" * 60)
     
@@ -69,7 +195,7 @@ class Deployer:
         
         Args:
             node_config: 集群节点配置（仅集群模式使用）
-            
+        
         Returns:
             dict: 包含host, port, username, ssh_key, password的SSH连接参数
         """
@@ -100,6 +226,307 @@ class Deployer:
             "password": password
         }
     
+    def _build_task(self, ssh_params, command, **extra):
+        """
+        根据SSH连接参数构造execute_parallel使用的任务字典
+        
+        Args:
+            ssh_params: get_ssh_params返回的SSH连接参数
+            command: 要执行的命令
+            extra: 附加到任务字典中的其他字段
+        
+        Returns:
+            dict: 任务字典
+        """
+        task = {
+            "host": ssh_params["host"],
+            "port": ssh_params["port"],
+            "username": ssh_params["username"],
+            "key_file": ssh_params["ssh_key"],
+            "password": ssh_params["password"],
+            "command": command
+        }
+        task.update(extra)
+        return task
+    
+    def _run_steps_or_exit(self, ssh_params, steps, timeout=600):
+        """
+        通过一次远程调用批量执行多个步骤，任一步骤失败时输出该步骤的错误信息并退出
+        
+        Args:
+            ssh_params: get_ssh_params返回的SSH连接参数
+            steps: 步骤列表，每个步骤为(名称, 命令, 失败时的错误信息)
+            timeout: 整个脚本的超时时间，默认为600秒
+        """
+        if not steps:
+            return
+        
+        results = self.remote_executor.execute_script(
+            ssh_params["host"], [(name, command) for name, command, _ in steps],
+            ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"], ssh_params["password"],
+            timeout=timeout
+        )
+        
+        for (name, command, error_message), result in zip(steps, results):
+            if not result["skipped"] and result["exit_code"] != 0:
+                self.logger.error(f"{error_message}：{result['stderr']}")
+                exit(1)
+    
+    def _node_fanout(self, nodes):
+        """
+        计算按节点并行时的并发数：节点数与全局并发上限中的较小值
+        """
+        return max(1, min(len(nodes), self.async_executor.max_concurrency))
+    
+    def _gather_facts(self, ssh_params, node_config=None):
+        """
+        获取节点的主机信息（一次远程调用收集，之后读取缓存），收集失败时退出
+        
+        Args:
+            ssh_params: get_ssh_params返回的SSH连接参数
+            node_config: 节点配置（单机模式为standalone配置），其中启用的磁盘设备会一并探测
+        
+        Returns:
+            HostFacts: 主机信息
+        """
+        if node_config is None:
+            node_config = self.config.get("standalone", {}) if self.config.get("deployment_mode") == "standalone" else {}
+        disk_config = node_config.get("disk") or {}
+        paths = []
+        if disk_config.get("enabled", False):
+            # 通配符按lsblk列出的磁盘匹配，只探测明确指定的设备路径
+            devices = disk_config.get("devices") or [disk_config.get("device")]
+            paths = [device for device in ([devices] if isinstance(devices, str) else devices) if device and not self.disk_manager.has_glob(device)]
+        
+        facts = self.facts.gather(ssh_params, paths)
+        if facts is None:
+            self.logger.error(f"无法连接到节点 {ssh_params['host']} 收集主机信息，退出部署")
+            exit(1)
+        return facts
+    
+    def _node_disks(self, node, facts=None, local=False):
+        """
+        获取节点启用磁盘管理时要准备的磁盘列表
+        
+        disk.device为单块磁盘，挂载到disk.mount_point；disk.devices为多块磁盘（列表或通配符，如/dev/sd[b-m]），
+        第N块磁盘挂载到{disk.mount_prefix}N（默认为/mnt/diskN）。远程节点的通配符按主机信息中lsblk列出的磁盘匹配。
+        
+        Args:
+            node: 节点配置（单机模式为standalone配置）
+            facts: 节点的主机信息，为None且需要匹配通配符时收集
+            local: 是否为本机，本机的通配符直接匹配设备文件
+        
+        Returns:
+            list: 每个元素为(设备路径, 挂载点)，未启用磁盘管理时为空列表
+        """
+        disk_config = node.get("disk") or {}
+        if not disk_config.get("enabled", False):
+            return []
+        
+        devices = disk_config.get("devices")
+        if not devices:
+            device = disk_config.get("device")
+            return [(device, disk_config.get("mount_point", node.get("data_dir", "/data/minio")))] if device else []
+        
+        available = None
+        if self.disk_manager.has_glob(devices) and not local:
+            facts = facts or self._gather_facts(self.get_ssh_params(node), node)
+            available = [device["name"] for device in facts.block_devices if device.get("type") == "disk"]
+        
+        mount_prefix = disk_config.get("mount_prefix", "/mnt/disk")
+        return [(device, f"{mount_prefix}{index}") for index, device in enumerate(self.disk_manager.expand_devices(devices, available), 1)]
+    
+    def _check_node_disks(self, node, facts, label):
+        """
+        检查节点配置的磁盘是否都存在且都不是操作系统分区，不满足时退出
+        
+        Args:
+            node: 节点配置
+            facts: 节点的主机信息
+            label: 日志中的节点描述，如"节点 node1"
+        """
+        disks = self._node_disks(node, facts)
+        if not disks:
+            self.logger.error(f"{label} 的磁盘配置没有匹配到任何磁盘设备")
+            exit(1)
+        
+        for device, _ in disks:
+            # 通配符匹配到的设备来自lsblk，一定存在；明确指定的设备按探测结果判断
+            if device in facts.paths and not facts.path_exists(device):
+                self.logger.error(f"{label} 指定的设备 {device} 不存在")
+                exit(1)
+            if facts.is_os_device(device):
+                self.logger.error(f"{label} 检测到设备 {device} 是操作系统分区，不能用于MinIO存储")
+                exit(1)
+        self.logger.info(f"{label} 的 {len(disks)} 块磁盘（{'、'.join(device for device, _ in disks)}）存在且不是操作系统分区，可以安全使用")
+    
+    def _disk_prepare_steps(self, disks, disk_config, label):
+        """
+        生成在远程节点上准备磁盘的批量脚本步骤
+        
+        所有磁盘的mkfs在一个步骤中并行执行，挂载完成后一次写入/etc/fstab。
+        
+        Args:
+            disks: 需要准备的磁盘，每个元素为(设备路径, 挂载点)
+            disk_config: 磁盘配置
+            label: 错误信息中的节点描述，如"集群节点 node1"
+        
+        Returns:
+            list: 步骤列表，每个步骤为(名称, 命令, 失败时的错误信息)
+        """
+        if not disks:
+            return []
+        
+        filesystem, profile, options = self._disk_format(disk_config)
+        format_disk = disk_config.get("format_disk", False)
+        devices = [device for device, _ in disks]
+        mount_points = [mount_point for _, mount_point in disks]
+        
+        steps = []
+        if format_disk:
+            steps.append(("mkfs", self.disk_manager.parallel_mkfs_command(disks, filesystem, profile), f"格式化{label}的磁盘 {'、'.join(devices)} 失败"))
+        steps.append(("mkdir_mount_point", f"mkdir -p {' '.join(mount_points)}", f"在{label}上创建挂载点 {'、'.join(mount_points)} 失败"))
+        steps.append(("mount", self.disk_manager.mount_command(disks, filesystem, options), f"在{label}上挂载磁盘失败"))
+        steps.append((
+            "fstab", self.disk_manager.fstab_update_command(disks, filesystem, options, by_uuid=format_disk and profile == "performance"),
+            f"更新{label}的/etc/fstab失败"
+        ))
+        return steps
+    
+    def _disk_format(self, disk_config):
+        """
+        获取磁盘的文件系统、格式化配置和挂载选项
+        
+        format_profile为performance时文件系统默认为xfs，挂载选项默认为对象存储优化的选项；
+        为default（默认）时与之前一样使用ext4和mkfs的默认参数。
+        
+        Returns:
+            tuple: (文件系统, 格式化配置, 挂载选项)
+        """
+        profile = disk_config.get("format_profile", "default")
+        if profile not in self.disk_manager.FORMAT_PROFILES:
+            self.logger.error(f"不支持的磁盘格式化配置：{profile}，可选值：{'、'.join(self.disk_manager.FORMAT_PROFILES)}")
+            exit(1)
+        filesystem = disk_config.get("filesystem", "xfs" if profile == "performance" else "ext4")
+        return filesystem, profile, self.disk_manager.mount_options(filesystem, profile, disk_config.get("mount_options"))
+    
+    def _unmounted_disks(self, disks, facts, label):
+        """
+        过滤掉已经挂载到对应挂载点的磁盘，重复部署（或--resume）不会清空已有数据
+        """
+        pending = []
+        for device, mount_point in disks:
+            if any(mount["mount_point"] == mount_point and mount["device"] in (device, facts.paths.get(device)) for mount in facts.mounts):
+                self.logger.info(f"{label} 的磁盘 {device} 已挂载到 {mount_point}，跳过格式化和挂载")
+            else:
+                pending.append((device, mount_point))
+        return pending
+    
+    def _binary_source(self, minio_config, binary):
+        """
+        获取二进制文件配置的版本、下载地址和本地安装包目录
+        
+        Returns:
+            tuple: (版本号, 下载地址, 本地安装包目录)
+        """
+        if binary == "minio":
+            return (
+                minio_config.get("version", "RELEASE.2024-01-18T22-51-48Z"),
+                minio_config.get("download_url"),
+                minio_config.get("local_package_dir", "packages")
+            )
+        return (
+            minio_config.get("mc_version", "RELEASE.2024-01-18T22-51-48Z"),
+            minio_config.get("mc_download_url"),
+            minio_config.get("mc_local_package_dir", "packages")
+        )
+    
+    def _binary_url(self, binary, facts):
+        """
+        获取节点直接下载二进制文件使用的地址（按配置的版本和节点架构选择）
+        """
+        version, url_template, _ = self._binary_source(self.config.get("minio", {}), binary)
+        return self.minio_installer.download_url(binary, version, facts.url_arch, url_template)
+    
+    def _firewall_command(self, facts, ports):
+        """
+        根据节点的防火墙类型构造开放端口的命令
+        
+        Returns:
+            str: 开放端口的命令，节点未启用防火墙时返回None
+        """
+        if facts.firewall == "firewalld":
+            return " && ".join([f"firewall-cmd --add-port={port}/tcp --permanent" for port in ports] + ["firewall-cmd --reload"])
+        if facts.firewall == "ufw":
+            return " && ".join(f"ufw allow {port}/tcp" for port in ports)
+        return None
+    
+    def _prepare_local_binary(self, minio_config, binary, arch=None):
+        """
+        在控制机上准备待分发的二进制文件：优先使用本地缓存，其次使用本地packages目录中的文件，都没有时从官网下载到该目录
+        
+        本地文件和下载的文件都要与配置的版本一致，避免把其他版本当作目标版本分发
+        
+        Args:
+            minio_config: MinIO配置字典
+            binary: 二进制名称，minio或mc
+            arch: 目标节点的架构（amd64、arm64），默认为控制机架构
+        
+        Returns:
+            str: 本地文件路径，准备失败或版本不符时返回None
+        """
+        arch = arch or self.minio_installer.system_arch
+        version, url_template, package_dir = self._binary_source(minio_config, binary)
+        
+        # 启用缓存时按版本和架构从缓存获取，未命中时下载到缓存
+        cached_path = self.minio_installer.obtain_artifact(binary, version, arch, url_template)
+        if cached_path:
+            return cached_path
+        
+        # 本地安装包按版本和架构命名；不带版本号的packages/<binary>只用于与控制机架构相同的节点
+        local_path = os.path.join(package_dir, self.minio_installer.package_name(binary, version, arch))
+        candidates = [local_path] + ([os.path.join(package_dir, binary)] if arch == self.minio_installer.system_arch else [])
+        for path in candidates:
+            if os.path.isfile(path) and self.minio_installer.verify_version(binary, path, version):
+                self.logger.info(f"使用本地安装包进行分发：{path}")
+                return path
+        
+        os.makedirs(package_dir, exist_ok=True)
+        url = self.minio_installer.download_url(binary, version, arch, url_template)
+        if self.minio_installer.download_file(url, local_path):
+            if self.minio_installer.verify_version(binary, local_path, version):
+                return local_path
+            self.logger.error(f"从 {url} 下载的{binary}不是配置的版本 {version}，请检查下载地址")
+            return None
+        
+        self.logger.error(f"无法准备待分发的{binary}安装包（{version}，linux-{arch}）：本地没有该版本的安装包且下载失败")
+        return None
+    
+    def _distribute_binaries(self, minio_config, install_tasks):
+        """
+        以树形接力方式把缺失的二进制文件分发到各节点（不同架构的节点分组分发各自架构的文件）
+        
+        Args:
+            minio_config: MinIO配置字典
+            install_tasks: 需要安装的任务列表，每个任务包含binary、arch和ssh_params
+        
+        Returns:
+            list: 每个任务的(task, 是否成功, 错误信息)
+        """
+        results = []
+        groups = sorted({(task["binary"], task["arch"]) for task in install_tasks}, key=lambda group: (group[0] != "minio", group[1]))
+        for binary, arch in groups:
+            tasks = [task for task in install_tasks if (task["binary"], task["arch"]) == (binary, arch)]
+            
+            local_path = self._prepare_local_binary(minio_config, binary, arch)
+            if not local_path:
+                results.extend((task, False, f"控制机上没有可分发的linux-{arch}安装包") for task in tasks)
+                continue
+            
+            outcome = self.distributor.distribute(local_path, f"/usr/local/bin/{binary}", [task["ssh_params"] for task in tasks])
+            results.extend((task, outcome.get(task["host"], False), "分发失败") for task in tasks)
+        return results
+    
     def check_os_partitions(self):
         """
         检查所有指定的磁盘是否为操作系统分区
@@ -112,15 +539,19 @@ class Deployer:
             standalone_config = self.config.get("standalone", {})
             host = standalone_config.get("host", "localhost")
             disk_config = standalone_config.get("disk", {})
-            if disk_config.get("enabled", False):
-                device = disk_config.get("device")
-                if device:
-                    if self.dry_run:
-                        self.logger.info(f"[DRY RUN] 检查设备 {device} 是否存在")
-                        self.logger.info(f"[DRY RUN] 检查设备 {device} 是否为操作系统分区")
-                    else:
-                        if host in ["localhost", "127.0.0.1", "127.0.1.1"]:
-                            # 本地主机，直接检查
+            if disk_config.get("enabled", False) and (disk_config.get("device") or disk_config.get("devices")):
+                if self.dry_run:
+                    devices = disk_config.get("devices") or disk_config.get("device")
+                    self.logger.info(f"[DRY RUN] 检查设备 {devices} 是否存在")
+                    self.logger.info(f"[DRY RUN] 检查设备 {devices} 是否为操作系统分区")
+                else:
+                    if host in ["localhost", "127.0.0.1", "127.0.1.1"]:
+                        # 本地主机，直接检查
+                        disks = self._node_disks(standalone_config, local=True)
+                        if not disks:
+                            self.logger.error(f"磁盘配置没有匹配到任何磁盘设备：{disk_config.get('devices')}")
+                            exit(1)
+                        for device, _ in disks:
                             # 检查分区是否存在
                             if not self.disk_manager.check_partition_exists(device):
                                 self.logger.error(f"指定的设备 {device} 不存在")
@@ -129,73 +560,54 @@ class Deployer:
                             if not self.disk_manager.check_os_partition(device):
                                 self.logger.error("操作系统分区检测失败，退出部署")
                                 exit(1)
-                        else:
-                            # 远程主机，通过SSH检查
-                            ssh_params = self.get_ssh_params()
-                            
-                            # 检查分区是否存在
-                            cmd = f"test -e {device} && echo 'exists' || echo 'not exists'"
-                            result = self.remote_executor.execute_command(ssh_params["host"], cmd, ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"], ssh_params["password"])
-                            if result[0] != 0 or "not exists" in result[1]:
-                                self.logger.error(f"指定的设备 {device} 不存在")
-                                exit(1)
-                            
-                            # 检查是否为操作系统分区
-                            cmd = f"df -h | grep -E '{device}' | grep -E '/$' || echo 'not os partition'"
-                            result = self.remote_executor.execute_command(ssh_params["host"], cmd, ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"], ssh_params["password"])
-                            if result[0] != 0 or "not os partition" in result[1]:
-                                self.logger.error("操作系统分区检测失败，退出部署")
-                                exit(1)
+                    else:
+                        # 远程主机，通过SSH检查
+                        ssh_params = self.get_ssh_params()
+                        
+                        # 设备是否存在和挂载信息都来自主机信息快照，不再单独访问节点
+                        facts = self._gather_facts(ssh_params, standalone_config)
+                        self._check_node_disks(standalone_config, facts, f"远程主机 {host}")
         
         elif deployment_mode == "cluster":
             cluster_config = self.config.get("cluster", {})
             nodes = cluster_config.get("nodes", [])
             for node in nodes:
-                self.logger.info(f"检查节点 {node.get('host')} 的磁盘配置")
-                
-                # 检查节点是否配置了磁盘设备
-                if node.get("disk") and node["disk"].get("enabled", False):
-                    device = node["disk"].get("device")
-                    if device:
-                        # 获取节点SSH配置
-                        ssh_params = self.get_ssh_params(node)
-                        
-                        # 检查SSH连接
-                        if not self.remote_executor.check_ssh_connection(ssh_params["host"], ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"], ssh_params["password"]):
-                            self.logger.error(f"无法连接到节点 {node.get('host')}，退出部署")
-                            exit(1)
-                        
-                        # 在远程节点上检查分区是否存在
-                        check_exists_cmd = f"test -e {device} && echo 'exists' || echo 'not exists'"
-                        exit_code, stdout, stderr = self.remote_executor.execute_command(ssh_params["host"], check_exists_cmd, ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"], ssh_params["password"])
-                        if stdout.strip() != "exists":
-                            self.logger.error(f"节点 {node.get('host')} 指定的设备 {device} 不存在")
-                            exit(1)
-                        self.logger.info(f"节点 {node.get('host')} 的设备 {device} 存在")
-                        
-                        # 在远程节点上检查是否为操作系统分区
-                        check_os_cmd = f"grep -E '^({device}|/dev/sda|/dev/vda)' /proc/mounts | grep -E '(/|/boot|/boot/efi)'"
-                        exit_code, stdout, stderr = self.remote_executor.execute_command(ssh_params["host"], check_os_cmd, ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"], ssh_params["password"])
-                        if exit_code == 0:
-                            self.logger.error(f"节点 {node.get('host')} 检测到设备 {device} 是操作系统分区，不能用于MinIO存储")
-                            exit(1)
-                        self.logger.info(f"节点 {node.get('host')} 的设备 {device} 不是操作系统分区，可以安全使用")
-                else:
-                    self.logger.info(f"节点 {node.get('host')} 未配置磁盘设备或未启用磁盘管理")
+                self._check_os_partition_node(node)
         
         self.logger.info("操作系统分区检测完成")
         self.logger.info("-" * 60)
-
+    
+    def _check_os_partition_node(self, node):
+        """
+        检查单个集群节点配置的磁盘设备是否存在且不是操作系统分区
+        
+        Args:
+            node: 集群节点配置
+        """
+        self.logger.info(f"检查节点 {node.get('host')} 的磁盘配置")
+        
+        # 检查节点是否配置了磁盘设备
+        if node.get("disk") and node["disk"].get("enabled", False):
+            if node["disk"].get("device") or node["disk"].get("devices"):
+                # 获取节点SSH配置
+                ssh_params = self.get_ssh_params(node)
+                
+                # 设备是否存在和挂载信息都来自主机信息快照（收集失败时退出）
+                facts = self._gather_facts(ssh_params, node)
+                self._check_node_disks(node, facts, f"节点 {node.get('host')}")
+        else:
+            self.logger.info(f"节点 {node.get('host')} 未配置磁盘设备或未启用磁盘管理")
+    
     def check_ssh_trust(self):
         """ 检查并配置SSH互信 """
         self.logger.info("## 检查并配置SSH互信")
-
+        
         deployment_mode = self.config.get("deployment_mode")
-
+        
         if deployment_mode == "standalone":
             standalone_config = self.config.get("standalone", {})
             host = standalone_config.get("host", "localhost")
-
+            
             # 检查是否为本地主机
             if host in ["localhost", "127.0.0.1", "127.0.1.1"]:
                 self.logger.info("单机模式，本地主机部署，无需建立SSH互信")
@@ -225,27 +637,36 @@ class Deployer:
             nodes = cluster_config.get("nodes", [])
             
             for node in nodes:
-                ssh_params = self.get_ssh_params(node)
-
-                # 检查SSH互信
-                if self.remote_executor.check_ssh_trust(ssh_params["host"], ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"], ssh_params["password"]):
-                    continue
-                
-                # 如果未建立互信，尝试建立
-                if ssh_params["password"]:
-                    if self.dry_run:
-                        self.logger.info(f"[DRY RUN] 尝试为节点 {ssh_params['host']} 建立SSH互信")
-                    else:
-                        if not self.remote_executor.setup_ssh_trust(ssh_params["host"], ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"], ssh_params["password"]):
-                            self.logger.error(f"为节点 {ssh_params['host']} 建立SSH互信失败")
-                            exit(1)
-                else:
-                    self.logger.error(f"节点 {ssh_params['host']} 未配置密码，无法建立SSH互信")
-                    exit(1)
+                self._ensure_ssh_trust_node(node)
         
         self.logger.info("SSH互信检查和配置完成")
         self.logger.info("-" * 60)
     
+    def _ensure_ssh_trust_node(self, node):
+        """
+        检查并配置单个集群节点的SSH互信
+        
+        Args:
+            node: 集群节点配置
+        """
+        ssh_params = self.get_ssh_params(node)
+        
+        # 检查SSH互信
+        if self.remote_executor.check_ssh_trust(ssh_params["host"], ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"], ssh_params["password"]):
+            return
+        
+        # 如果未建立互信，尝试建立
+        if ssh_params["password"]:
+            if self.dry_run:
+                self.logger.info(f"[DRY RUN] 尝试为节点 {ssh_params['host']} 建立SSH互信")
+            else:
+                if not self.remote_executor.setup_ssh_trust(ssh_params["host"], ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"], ssh_params["password"]):
+                    self.logger.error(f"为节点 {ssh_params['host']} 建立SSH互信失败")
+                    exit(1)
+        else:
+            self.logger.error(f"节点 {ssh_params['host']} 未配置密码，无法建立SSH互信")
+            exit(1)
+    
     def configure_firewall(self):
         """
         配置防火墙
@@ -273,40 +694,135 @@ class Deployer:
                     # 远程主机，通过SSH配置防火墙
                     ssh_params = self.get_ssh_params()
                     
-                    # 构造防火墙配置命令
-                    cmd = f"firewall-cmd --add-port={ports[0]}/tcp --permanent && firewall-cmd --add-port={ports[1]}/tcp --permanent && firewall-cmd --reload"
-                    self.logger.info(f"通过SSH为远程主机 {host} 配置防火墙")
-                    result = self.remote_executor.execute_command(ssh_params["host"], cmd, ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"], ssh_params["password"])
-                    if result[0] != 0:
-                        self.logger.error(f"为远程主机 {host} 配置防火墙失败：{result[2]}")
-                        exit(1)
+                    # 按主机信息快照中的防火墙类型构造防火墙配置命令
+                    cmd = self._firewall_command(self._gather_facts(ssh_params, standalone_config), ports)
+                    if cmd is None:
+                        self.logger.info(f"远程主机 {host} 未启用防火墙，无需开放端口")
+                    else:
+                        self.logger.info(f"通过SSH为远程主机 {host} 配置防火墙")
+                        result = self.remote_executor.execute_command(ssh_params["host"], cmd, ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"], ssh_params["password"])
+                        if result[0] != 0:
+                            self.logger.error(f"为远程主机 {host} 配置防火墙失败：{result[2]}")
+                            exit(1)
         
         elif deployment_mode == "cluster":
             cluster_config = self.config.get("cluster", {})
-            ports.append(cluster_config.get("server_port", 9000))
-            ports.append(cluster_config.get("console_port", 9001))
+            ports.extend(self._cluster_ports())
             
             # 配置本地防火墙
-            if self.dry_run:
-                self.logger.info(f"[DRY RUN] 准备开放本地端口：{ports}")
-            else:
-                self.firewall_manager.configure_firewall(ports)
+            self._configure_local_firewall(ports)
             
             # 配置远程节点防火墙
             nodes = cluster_config.get("nodes", [])
             for node in nodes:
-                ssh_params = self.get_ssh_params(node)
-
-                if self.dry_run:
-                    self.logger.info(f"[DRY RUN] 准备为节点 {ssh_params['host']} 开放端口：{ports}")
-                else:
-                    # 在远程节点上配置防火墙
-                    cmd = f"firewall-cmd --add-port={ports[0]}/tcp --permanent && firewall-cmd --add-port={ports[1]}/tcp --permanent && firewall-cmd --reload"  # noqa
-                    self.remote_executor.execute_command(ssh_params["host"], cmd, ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"])
+                self._configure_firewall_node(node, ports)
         
         self.logger.info("防火墙配置完成")
         self.logger.info("-" * 60)
     
+    def _configure_local_firewall(self, ports):
+        """
+        为控制机开放端口
+        
+        Args:
+            ports: 需要开放的端口列表
+        """
+        if self.dry_run:
+            self.logger.info(f"[DRY RUN] 准备开放本地端口：{ports}")
+        else:
+            self.firewall_manager.configure_firewall(ports)
+    
+    def _cluster_ports(self):
+        """
+        获取集群需要开放的端口列表（服务端口和控制台端口）
+        """
+        cluster_config = self.config.get("cluster", {})
+        return [cluster_config.get("server_port", 9000), cluster_config.get("console_port", 9001)]
+    
+    def _configure_firewall_node(self, node, ports):
+        """
+        为单个集群节点开放端口
+        
+        Args:
+            node: 集群节点配置
+            ports: 需要开放的端口列表
+        """
+        ssh_params = self.get_ssh_params(node)
+        
+        if self.dry_run:
+            self.logger.info(f"[DRY RUN] 准备为节点 {ssh_params['host']} 开放端口：{ports}")
+        else:
+            # 按主机信息快照中的防火墙类型在远程节点上配置防火墙
+            cmd = self._firewall_command(self._gather_facts(ssh_params, node), ports)
+            if cmd is None:
+                self.logger.info(f"节点 {ssh_params['host']} 未启用防火墙，无需开放端口")
+            else:
+                self.remote_executor.execute_command(ssh_params["host"], cmd, ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"])
+    
+    def tune_system(self):
+        """
+        按MinIO推荐的配置调优内核参数、透明大页、数据盘I/O调度器和CPU频率调节器
+        """
+        self.logger.info("## 系统调优")
+        
+        if not self.tuner.enabled:
+            self.logger.info("未启用系统调优（advanced.tuning.enabled），跳过")
+            return
+        
+        deployment_mode = self.config.get("deployment_mode")
+        
+        if deployment_mode == "standalone":
+            standalone_config = self.config.get("standalone", {})
+            host = standalone_config.get("host", "localhost")
+            
+            if self.dry_run:
+                self.logger.info(f"[DRY RUN] 准备调优主机 {host} 的系统参数")
+            elif host in ["localhost", "127.0.0.1", "127.0.1.1"]:
+                # 本地主机，直接调优
+                if not self.tuner.apply_local(self._tuning_targets(standalone_config, local=True)):
+                    exit(1)
+            elif not self._tune_node(standalone_config):
+                exit(1)
+        
+        elif deployment_mode == "cluster":
+            nodes = self.config.get("cluster", {}).get("nodes", [])
+            with ThreadPoolExecutor(max_workers=self._node_fanout(nodes)) as executor:
+                if not all(executor.map(self._tune_node, nodes)):
+                    exit(1)
+        
+        self.logger.info("系统调优完成")
+        self.logger.info("-" * 60)
+    
+    def _tuning_targets(self, node, facts=None, local=False):
+        """
+        获取节点上需要调整I/O调度器的数据盘设备，未启用磁盘管理时为数据目录（由调优脚本换算为所在的磁盘）
+        """
+        disks = self._node_disks(node, facts, local)
+        return [device for device, _ in disks] or [node.get("data_dir", "/data/minio")]
+    
+    def _tune_node(self, node):
+        """
+        在单个远程节点上执行调优脚本并输出与当前值的差异
+        
+        Args:
+            node: 节点配置（单机模式为standalone配置）
+        
+        Returns:
+            bool: True表示调优脚本执行成功
+        """
+        ssh_params = self.get_ssh_params(node)
+        host = node.get("host", ssh_params["host"])
+        
+        if self.dry_run:
+            self.logger.info(f"[DRY RUN] 准备调优节点 {host} 的系统参数")
+            return True
+        
+        devices = self._tuning_targets(node, self._gather_facts(ssh_params, node))
+        result = self.remote_executor.execute_command(
+            ssh_params["host"], self.tuner.command(devices), ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"], ssh_params["password"]
+        )
+        return self.tuner.report(host, *result)
+    
     def install_minio(self):
         """
         安装MinIO
@@ -340,83 +856,100 @@ class Deployer:
                     
                     self.logger.info(f"通过SSH在远程主机 {host} 上安装MinIO")
                     
+                    # 是否已安装和节点架构都来自主机信息快照
+                    facts = self._gather_facts(ssh_params, standalone_config)
+                    
                     # 检查MinIO是否已安装
-                    check_cmd = "which minio || command -v minio || [ -f /usr/local/bin/minio ]"
-                    result = self.remote_executor.execute_command(ssh_params["host"], check_cmd, ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"], ssh_params["password"])
-                    if result[0] == 0:
+                    if facts.has_binary("minio"):
                         self.logger.info(f"MinIO已在远程主机 {host} 上安装，跳过安装步骤")
                     else:
                         # 安装MinIO二进制文件
-                        cmd = f"curl -sSL https://dl.min.io/server/minio/release/linux-amd64/minio -o /usr/local/bin/minio && chmod +x /usr/local/bin/minio"
+                        cmd = f"curl -fsSL {self._binary_url('minio', facts)} -o /usr/local/bin/minio && chmod +x /usr/local/bin/minio"
                         result = self.remote_executor.execute_command(ssh_params["host"], cmd, ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"], ssh_params["password"])
                         if result[0] != 0:
                             self.logger.error(f"在远程主机 {host} 上安装MinIO失败：{result[2]}")
                             exit(1)
                     
                     # 检查mc是否已安装
-                    check_cmd = "which mc || command -v mc || [ -f /usr/local/bin/mc ]"
-                    result = self.remote_executor.execute_command(ssh_params["host"], check_cmd, ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"], ssh_params["password"])
-                    if result[0] == 0:
+                    if facts.has_binary("mc"):
                         self.logger.info(f"mc已在远程主机 {host} 上安装，跳过安装步骤")
                     else:
                         # 安装mc客户端
-                        cmd = f"curl -sSL https://dl.min.io/client/mc/release/linux-amd64/mc -o /usr/local/bin/mc && chmod +x /usr/local/bin/mc"
+                        cmd = f"curl -fsSL {self._binary_url('mc', facts)} -o /usr/local/bin/mc && chmod +x /usr/local/bin/mc"
                         result = self.remote_executor.execute_command(ssh_params["host"], cmd, ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"], ssh_params["password"])
                         if result[0] != 0:
                             self.logger.warning(f"在远程主机 {host} 上安装mc客户端失败：{result[2]}")
                             # 安装mc失败不影响MinIO主功能，继续执行
+                    
+                    # 安装改变了节点上的二进制文件，主机信息需要重新收集
+                    if not (facts.has_binary("minio") and facts.has_binary("mc")):
+                        self.facts.invalidate(ssh_params)
         
         elif deployment_mode == "cluster":
             cluster_config = self.config.get("cluster", {})
             nodes = cluster_config.get("nodes", [])
             
-            # 并行安装MinIO到所有节点
-            def install_on_node(node):
+            self._install_minio_nodes(nodes, minio_config)
+        
+        self.logger.info("=" * 60)
+        self.logger.info("MinIO安装完成")
+        self.logger.info("=" * 60)
+    
+    def _install_minio_nodes(self, nodes, minio_config):
+        """
+        在一组集群节点上安装minio和mc，任一节点安装MinIO失败时退出
+        
+        Args:
+            nodes: 集群节点配置列表
+            minio_config: MinIO配置字典
+        """
+        if self.dry_run:
+            for node in nodes:
                 ssh_params = self.get_ssh_params(node)
-                
+                self.logger.info(f"[DRY RUN] 准备在节点 {ssh_params['host']} 上安装MinIO")
+        else:
+            # 第一轮：并发获取所有节点的主机信息（缓存命中时不访问节点），判断minio和mc是否已安装
+            # download模式下由各节点按自身架构直接从官网下载；relay模式下由控制机上传到种子节点，再在节点间树形接力
+            distribution_mode = minio_config.get("distribution", {}).get("mode", "download")
+            node_params = [self.get_ssh_params(node) for node in nodes]
+            with ThreadPoolExecutor(max_workers=self._node_fanout(nodes)) as executor:
+                node_facts = list(executor.map(self._gather_facts, node_params, nodes))
+            
+            # 第二轮：只在缺少二进制文件的节点上安装
+            install_tasks = []
+            for ssh_params, facts in zip(node_params, node_facts):
                 self.logger.info(f"开始在节点 {ssh_params['host']} 上安装MinIO")
-                
-                if self.dry_run:
-                    self.logger.info(f"[DRY RUN] 准备在节点 {ssh_params['host']} 上安装MinIO")
-                    return True
-                else:
-                    # 检查MinIO是否已安装
-                    check_cmd = "which minio || command -v minio || [ -f /usr/local/bin/minio ]"
-                    result = self.remote_executor.execute_command(ssh_params["host"], check_cmd, ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"])
-                    if result[0] == 0:
-                        self.logger.info(f"MinIO已在节点 {ssh_params['host']} 上安装，跳过安装步骤")
-                    else:
-                        # 在远程节点上安装MinIO
-                        # 这里简化处理，实际可能需要更复杂的逻辑，如上传二进制文件等
-                        # 暂时假设远程节点可以直接访问互联网下载MinIO
-                        cmd = f"curl -sSL https://dl.min.io/server/minio/release/linux-amd64/minio -o /usr/local/bin/minio && chmod +x /usr/local/bin/minio"  # noqa
-                        result = self.remote_executor.execute_command(ssh_params["host"], cmd, ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"])
-                        if result[0] != 0:
-                            self.logger.error(f"在节点 {ssh_params['host']} 上安装MinIO失败：{result[2]}")
-                            return False
-                    
-                    # 检查mc是否已安装
-                    check_cmd = "which mc || command -v mc || [ -f /usr/local/bin/mc ]"
-                    result = self.remote_executor.execute_command(ssh_params["host"], check_cmd, ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"])
-                    if result[0] != 0:
-                        # 安装mc
-                        cmd = f"curl -sSL https://dl.min.io/client/mc/release/linux-amd64/mc -o /usr/local/bin/mc && chmod +x /usr/local/bin/mc"  # noqa
-                        self.remote_executor.execute_command(ssh_params["host"], cmd, ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"])
-                    else:
-                        self.logger.info(f"mc已在节点 {ssh_params['host']} 上安装，跳过安装步骤")
-                    
-                    return True
+                for binary in ("minio", "mc"):
+                    if facts.has_binary(binary):
+                        self.logger.info(f"{'MinIO' if binary == 'minio' else 'mc'}已在节点 {ssh_params['host']} 上安装（{facts.binaries[binary]['version'] or '版本未知'}），跳过安装步骤")
+                        continue
+                    command = f"curl -fsSL {self._binary_url(binary, facts)} -o /usr/local/bin/{binary} && chmod +x /usr/local/bin/{binary}"
+                    install_tasks.append(dict(self._build_task(ssh_params, command, binary=binary, timeout=600), ssh_params=ssh_params, arch=facts.url_arch))
             
-            with ThreadPoolExecutor(max_workers=5) as executor:
-                results = list(executor.map(install_on_node, nodes))
+            if distribution_mode == "relay":
+                install_results = self._distribute_binaries(minio_config, install_tasks)
+            else:
+                install_results = [
+                    (item["task"], item["result"][0] == 0, item["result"][2])
+                    for item in self.async_executor.execute_parallel(install_tasks)
+                ]
             
-            if not all(results):
+            # 安装改变了节点上的二进制文件，这些节点的主机信息需要重新收集
+            for task in install_tasks:
+                self.facts.invalidate(task["ssh_params"])
+            
+            failed = False
+            for task, ok, error in install_results:
+                if not ok and task["binary"] == "minio":
+                    self.logger.error(f"在节点 {task['host']} 上安装MinIO失败：{error}")
+                    failed = True
+                elif not ok:
+                    # 安装mc失败不影响MinIO主功能，继续执行
+                    self.logger.warning(f"在节点 {task['host']} 上安装mc客户端失败：{error}")
+            
+            if failed:
                 self.logger.error("在某些节点上安装MinIO失败")
                 exit(1)
-        
-        self.logger.info("=" * 60)
-        self.logger.info("MinIO安装完成")
-        self.logger.info("=" * 60)
     
     def configure_minio_service(self):
         """
@@ -447,16 +980,12 @@ class Deployer:
                 # 远程主机，通过SSH检查
                 ssh_params = self.get_ssh_params()
                 
-                # 构造检查命令
-                check_cmd = "systemctl list-unit-files --type service | grep -q minio || [ -f /etc/systemd/system/minio.service ]"
-                exit_code, stdout, stderr = self.remote_executor.execute_command(ssh_params["host"], check_cmd, ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"], ssh_params["password"])
+                # 服务文件和服务状态来自主机信息快照
+                facts = self._gather_facts(ssh_params, standalone_config)
                 
-                if exit_code == 0:
+                if facts.minio_service_exists:
                     # 检查服务是否正在运行
-                    check_cmd = "systemctl status minio"
-                    status_exit_code, status_stdout, status_stderr = self.remote_executor.execute_command(ssh_params["host"], check_cmd, ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"], ssh_params["password"])
-                    
-                    if status_exit_code == 0 and "active (running)" in status_stdout:
+                    if facts.minio_service_running:
                         self.logger.error(f"检测到远程主机 {host} 已存在并正在运行MinIO服务！为避免覆盖现有环境，操作已终止。")
                         exit(1)
                     else:
@@ -467,22 +996,7 @@ class Deployer:
             nodes = cluster_config.get("nodes", [])
             
             for node in nodes:
-                ssh_params = self.get_ssh_params(node)
-                
-                # 构造检查命令
-                check_cmd = "systemctl list-unit-files --type service | grep -q minio || [ -f /etc/systemd/system/minio.service ]"
-                exit_code, stdout, stderr = self.remote_executor.execute_command(ssh_params["host"], check_cmd, ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"], ssh_params["password"])
-                
-                if exit_code == 0:
-                    # 检查服务是否正在运行
-                    check_cmd = "systemctl status minio"
-                    status_exit_code, status_stdout, status_stderr = self.remote_executor.execute_command(ssh_params["host"], check_cmd, ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"], ssh_params["password"])
-                    
-                    if status_exit_code == 0 and "active (running)" in status_stdout:
-                        self.logger.error(f"检测到集群节点 {ssh_params['host']} 已存在并正在运行MinIO服务！为避免覆盖现有环境，操作已终止。")
-                        exit(1)
-                    else:
-                        self.logger.warning(f"检测到集群节点 {ssh_params['host']} 存在MinIO服务文件，但服务未运行，可以继续部署。")
+                self._ensure_minio_not_running_node(node)
         
         credentials = self.config.get("credentials", {})
         
@@ -493,33 +1007,49 @@ class Deployer:
             cluster_config = self.config.get("cluster", {})
             listen_port = cluster_config.get("server_port", 9000)
             console_port = cluster_config.get("console_port", 9001)
+            performance = self.config.get("advanced", {}).get("performance", {})
             
             # 检查是否为本地主机
             if host in ["localhost", "127.0.0.1", "127.0.1.1"]:
                 # 本地主机，直接配置
                 disk_config = standalone_config.get("disk", {})
-                if disk_config.get("enabled", False):
-                    device = disk_config.get("device")
-                    mount_point = disk_config.get("mount_point", data_dir)
-                    filesystem = disk_config.get("filesystem", "ext4")
+                disks = self._node_disks(standalone_config, local=True)
+                if disks:
+                    filesystem, profile, mount_options = self._disk_format(disk_config)
                     format_disk = disk_config.get("format_disk", False)
                     
                     if self.dry_run:
-                        self.logger.info(f"[DRY RUN] 准备格式化和挂载磁盘 {device} 到 {mount_point}")
+                        for device, mount_point in disks:
+                            self.logger.info(f"[DRY RUN] 准备格式化和挂载磁盘 {device} 到 {mount_point}")
                     else:
-                        # 准备磁盘
-                        if not self.disk_manager.prepare_disk(device, mount_point, filesystem, format_disk):
+                        # 准备磁盘（多块磁盘时并行格式化）
+                        if len(disks) == 1:
+                            prepared = self.disk_manager.prepare_disk(
+                                disks[0][0], disks[0][1], filesystem, format_disk, profile=profile, mount_options=mount_options
+                            )
+                        else:
+                            prepared = self.disk_manager.prepare_disks(disks, filesystem, format_disk, profile=profile, mount_options=mount_options)
+                        if not prepared:
                             self.logger.error("磁盘准备失败")
                             exit(1)
                     
-                    data_dir = mount_point
+                    data_dir = self._standalone_volumes(disks)
                 
                 if self.dry_run:
                     self.logger.info(f"[DRY RUN] 准备创建MinIO服务文件，数据目录：{data_dir}")
                 else:
+                    # 启动MinIO之前测试数据盘的性能（如果启用）
+                    if self.drive_check.enabled:
+                        data_paths = [mount_point for _, mount_point in disks] or [data_dir]
+                        for path in data_paths:
+                            os.makedirs(path, exist_ok=True)
+                        if not self.drive_check.evaluate(self.drive_check.run_local(data_paths)):
+                            exit(1)
+                    
                     # 配置MinIO服务
                     if not self.service_manager.configure_service(
-                        data_dir, listen_port, console_port, credentials
+                        data_dir, listen_port, console_port, credentials,
+                        limit_nofile=performance.get("ulimit_nofile", 65536), limit_nproc=performance.get("ulimit_nproc", 16384)
                     ):
                         self.logger.error("MinIO服务配置失败")
                         exit(1)
@@ -527,44 +1057,25 @@ class Deployer:
                 # 远程主机，通过SSH配置
                 ssh_params = self.get_ssh_params()
                 
+                # 磁盘准备和数据目录创建合并为一个脚本，一次远程调用完成
+                # 每个步骤为(名称, 命令, 失败时的错误信息)
+                prepare_steps = []
+                disks = []
+                
                 disk_config = standalone_config.get("disk", {})
                 if disk_config.get("enabled", False):
-                    device = disk_config.get("device")
-                    mount_point = disk_config.get("mount_point", data_dir)
-                    filesystem = disk_config.get("filesystem", "ext4")
-                    format_disk = disk_config.get("format_disk", False)
-                    
                     if self.dry_run:
-                        self.logger.info(f"[DRY RUN] 准备格式化和挂载远程主机 {host} 的磁盘 {device} 到 {mount_point}")
+                        devices = disk_config.get("devices") or disk_config.get("device")
+                        self.logger.info(f"[DRY RUN] 准备格式化和挂载远程主机 {host} 的磁盘 {devices}")
                     else:
-                        self.logger.info(f"通过SSH准备远程主机 {host} 的磁盘 {device}")
-                        
-                        # 格式化磁盘（如果需要）
-                        if format_disk:
-                            cmd = f"yes | mkfs.{filesystem} {device}"
-                            result = self.remote_executor.execute_command(ssh_params["host"], cmd, ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"], ssh_params["password"])
-                            if result[0] != 0:
-                                self.logger.error(f"格式化远程主机 {host} 的磁盘 {device} 失败：{result[2]}")
-                                exit(1)
-                        
-                        # 创建挂载点
-                        cmd = f"mkdir -p {mount_point}"
-                        result = self.remote_executor.execute_command(ssh_params["host"], cmd, ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"], ssh_params["password"])
-                        if result[0] != 0:
-                            self.logger.error(f"在远程主机 {host} 上创建挂载点 {mount_point} 失败：{result[2]}")
-                            exit(1)
-                        
-                        # 挂载磁盘
-                        cmd = f"mount {device} {mount_point}"
-                        result = self.remote_executor.execute_command(ssh_params["host"], cmd, ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"], ssh_params["password"])
-                        if result[0] != 0:
-                            self.logger.error(f"在远程主机 {host} 上挂载磁盘 {device} 到 {mount_point} 失败：{result[2]}")
-                            exit(1)
+                        facts = self._gather_facts(ssh_params, standalone_config)
+                        disks = self._node_disks(standalone_config, facts)
+                        self.logger.info(f"通过SSH准备远程主机 {host} 的磁盘 {'、'.join(device for device, _ in disks)}")
                         
-                        # 更新fstab（可选）
-                        # 这里简化处理，实际可能需要更复杂的逻辑
+                        # 并行格式化（如果需要）、创建挂载点、挂载磁盘并一次写入fstab
+                        prepare_steps.extend(self._disk_prepare_steps(self._unmounted_disks(disks, facts, f"远程主机 {host}"), disk_config, f"远程主机 {host}"))
                         
-                        data_dir = mount_point
+                        data_dir = self._standalone_volumes(disks)
                 
                 if self.dry_run:
                     self.logger.info(f"[DRY RUN] 准备通过SSH创建远程主机 {host} 的MinIO服务文件")
@@ -572,11 +1083,14 @@ class Deployer:
                     # 通过SSH配置MinIO服务
                     self.logger.info(f"通过SSH配置远程主机 {host} 的MinIO服务")
                     
-                    # 创建数据目录
-                    cmd = f"mkdir -p {data_dir}"
-                    result = self.remote_executor.execute_command(ssh_params["host"], cmd, ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"], ssh_params["password"])
-                    if result[0] != 0:
-                        self.logger.error(f"在远程主机 {host} 上创建数据目录 {data_dir} 失败：{result[2]}")
+                    # 创建数据目录（多块磁盘时为各挂载点）
+                    data_paths = [mount_point for _, mount_point in disks] or [data_dir]
+                    prepare_steps.append(("mkdir_data_dir", f"mkdir -p {' '.join(data_paths)}", f"在远程主机 {host} 上创建数据目录 {data_dir} 失败"))
+                    
+                    self._run_steps_or_exit(ssh_params, prepare_steps)
+                    
+                    # 启动MinIO之前测试数据盘的性能（如果启用）
+                    if self.drive_check.enabled and not self.drive_check.evaluate(self.drive_check.run([(ssh_params, data_paths)])):
                         exit(1)
                     
                     # 创建服务文件
@@ -605,10 +1119,10 @@ class Deployer:
                     service_content += f"Restart=always\n"
                     service_content += f"\n"
                     service_content += f"# Specifies the maximum file descriptor number that can be opened by this process\n"
-                    service_content += f"LimitNOFILE=65536\n"
+                    service_content += f"LimitNOFILE={performance.get('ulimit_nofile', 65536)}\n"
                     service_content += f"\n"
                     service_content += f"# Specifies the maximum number of processes that can be created by this process\n"
-                    service_content += f"LimitNPROC=16384\n"
+                    service_content += f"LimitNPROC={performance.get('ulimit_nproc', 16384)}\n"
                     service_content += f"\n"
                     service_content += f"# Time to wait before forcefully killing the process\n"
                     service_content += f"TimeoutStopSec=5\n"
@@ -624,35 +1138,23 @@ class Deployer:
                     env_content += f"MINIO_VOLUMES=\"{data_dir}\"\n"
                     env_content += f"MINIO_OPTS=\"--address :{listen_port} --console-address :{console_port}\"\n"
                     
-                    # 上传服务文件
-                    service_file_path = f"/tmp/minio.service"
-                    with open(service_file_path, 'w') as f:
-                        f.write(service_content)
-                    
-                    # 通过SCP上传服务文件
-                    scp_command = f"scp -P {ssh_params['port']} {service_file_path} {ssh_params['username']}@{ssh_params['host']}:/etc/systemd/system/minio.service"
-                    result = subprocess.run(scp_command, shell=True, check=False, capture_output=True, text=True)
-                    if result.returncode != 0:
-                        self.logger.error(f"上传服务文件到远程主机 {host} 失败：{result.stderr}")
+                    # 通过SFTP直接写入服务文件和环境变量文件（复用已认证的SSH连接）
+                    if not self.remote_executor.put_content(
+                        service_content, "/etc/systemd/system/minio.service",
+                        ssh_params["host"], ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"], ssh_params["password"]
+                    ):
+                        self.logger.error(f"上传服务文件到远程主机 {host} 失败")
                         exit(1)
                     
-                    # 删除临时文件
-                    os.remove(service_file_path)
-                    
-                    # 上传环境变量文件
-                    env_file_path = f"/tmp/minio.env"
-                    with open(env_file_path, 'w') as f:
-                        f.write(env_content)
-                    
-                    scp_command = f"scp -P {ssh_params['port']} {env_file_path} {ssh_params['username']}@{ssh_params['host']}:/etc/default/minio"
-                    result = subprocess.run(scp_command, shell=True, check=False, capture_output=True, text=True)
-                    if result.returncode != 0:
-                        self.logger.error(f"上传环境变量文件到远程主机 {host} 失败：{result.stderr}")
+                    # 环境变量文件包含root密码，仅允许root读取
+                    if not self.remote_executor.put_content(
+                        env_content, "/etc/default/minio",
+                        ssh_params["host"], ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"], ssh_params["password"],
+                        mode=0o600
+                    ):
+                        self.logger.error(f"上传环境变量文件到远程主机 {host} 失败")
                         exit(1)
                     
-                    # 删除临时文件
-                    os.remove(env_file_path)
-                    
                     # 重新加载systemd配置并启动服务
                     cmd = f"systemctl daemon-reload && systemctl enable minio && systemctl start minio"
                     result = self.remote_executor.execute_command(ssh_params["host"], cmd, ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"], ssh_params["password"])
@@ -660,23 +1162,280 @@ class Deployer:
                         self.logger.error(f"在远程主机 {host} 上配置MinIO服务失败：{result[2]}")
                         exit(1)
                     
+                    # 挂载磁盘和启动服务改变了节点状态，主机信息需要重新收集
+                    self.facts.invalidate(ssh_params)
+                    
                     self.logger.info(f"远程主机 {host} 的MinIO服务配置成功")
         
         elif deployment_mode == "cluster":
             cluster_config = self.config.get("cluster", {})
             nodes = cluster_config.get("nodes", [])
-            server_port = cluster_config.get("server_port", 9000)
-            console_port = cluster_config.get("console_port", 9001)
-            erasure_coding = cluster_config.get("erasure_coding")
             
-            # 集群模式下的服务配置比较复杂，需要生成集群启动命令
-            # 这里简化处理，实际需要更复杂的逻辑
-            self.logger.info("集群模式下的服务配置需要手动完成，请参考MinIO官方文档")
+            # 所有节点使用同一个分布式MINIO_VOLUMES，并行推送配置后在很短的时间窗口内同时启动
+            volumes = self._cluster_volumes()
+            storage_class = self._cluster_storage_class()
+            with ThreadPoolExecutor(max_workers=self._node_fanout(nodes)) as executor:
+                list(executor.map(lambda node: self._configure_cluster_node(node, volumes, storage_class), nodes))
+            
+            if not self._start_cluster(nodes):
+                self.logger.error("启动MinIO集群失败")
+                exit(1)
         
         self.logger.info("=" * 60)
         self.logger.info("MinIO服务配置完成")
         self.logger.info("=" * 60)
     
+    def _ensure_minio_not_running_node(self, node):
+        """
+        配置服务前再次确认集群节点上没有正在运行的MinIO服务，存在时退出
+        
+        Args:
+            node: 集群节点配置
+        """
+        ssh_params = self.get_ssh_params(node)
+        
+        # 服务文件和服务状态来自主机信息快照
+        facts = self._gather_facts(ssh_params, node)
+        
+        if facts.minio_service_exists:
+            # 检查服务是否正在运行
+            if facts.minio_service_running:
+                self.logger.error(f"检测到集群节点 {ssh_params['host']} 已存在并正在运行MinIO服务！为避免覆盖现有环境，操作已终止。")
+                exit(1)
+            else:
+                self.logger.warning(f"检测到集群节点 {ssh_params['host']} 存在MinIO服务文件，但服务未运行，可以继续部署。")
+    
+    def _node_data_paths(self, node):
+        """
+        获取集群节点的数据目录列表（启用磁盘管理时为各磁盘的挂载点）
+        """
+        disks = self._node_disks(node)
+        if disks:
+            return [mount_point for _, mount_point in disks]
+        return [node.get("data_dir", "/data/minio")]
+    
+    def _standalone_volumes(self, disks):
+        """
+        生成单机模式的数据目录参数，多块磁盘时使用省略号写法，如/mnt/disk{1...12}
+        """
+        mount_points = [mount_point for _, mount_point in disks]
+        return self.service_manager.expand_sequence(mount_points) or " ".join(mount_points)
+    
+    def _cluster_volumes(self):
+        """
+        根据cluster.nodes生成分布式模式的MINIO_VOLUMES
+        
+        Returns:
+            str: MINIO_VOLUMES的值，如http://node{1...4}:9000/data/minio
+        """
+        cluster_config = self.config.get("cluster", {})
+        nodes = cluster_config.get("nodes", [])
+        # 节点之间通过主机名（或IP）互相访问，所有节点上的MINIO_VOLUMES必须完全一致
+        address_field = cluster_config.get("endpoint_address", "host")
+        endpoints = [
+            (node.get(address_field) or node.get("host") or node.get("ip"), self._node_data_paths(node))
+            for node in nodes
+        ]
+        return self.service_manager.build_cluster_volumes(endpoints, cluster_config.get("server_port", 9000))
+    
+    def _cluster_storage_class(self):
+        """
+        获取标准存储类别的纠删码配置，校验位超过驱动器总数一半时不设置（使用MinIO默认值）
+        """
+        cluster_config = self.config.get("cluster", {})
+        erasure_coding = cluster_config.get("erasure_coding")
+        standard = erasure_coding.get("standard") if isinstance(erasure_coding, dict) else None
+        if not standard:
+            return None
+        
+        drives = sum(len(self._node_data_paths(node)) for node in cluster_config.get("nodes", []))
+        try:
+            parity = int(str(standard).split(":")[-1])
+        except ValueError:
+            self.logger.warning(f"纠删码配置无效，使用MinIO默认值：{standard}")
+            return None
+        if parity > drives // 2:
+            self.logger.warning(f"纠删码配置 {standard} 的校验位超过驱动器总数（{drives}）的一半，使用MinIO默认值")
+            return None
+        return standard
+    
+    def _configure_cluster_node(self, node, volumes, storage_class=None):
+        """
+        在单个集群节点上准备磁盘并写入分布式模式的服务文件和环境变量文件（只设置开机自启，不启动服务）
+        
+        Args:
+            node: 集群节点配置
+            volumes: 分布式模式的MINIO_VOLUMES
+            storage_class: 标准存储类别的纠删码配置
+        """
+        cluster_config = self.config.get("cluster", {})
+        performance = self.config.get("advanced", {}).get("performance", {})
+        ssh_params = self.get_ssh_params(node)
+        host = ssh_params["host"]
+        
+        env_content = self.service_manager.render_environment(
+            self.config.get("credentials", {}), volumes,
+            cluster_config.get("server_port", 9000), cluster_config.get("console_port", 9001),
+            storage_class=storage_class, region=cluster_config.get("region")
+        )
+        service_content = self.service_manager.render_distributed_service(
+            performance.get("ulimit_nofile", 65536), performance.get("ulimit_nproc", 16384)
+        )
+        
+        if self.dry_run:
+            self.logger.info(f"[DRY RUN] 准备为集群节点 {host} 写入MinIO服务文件，MINIO_VOLUMES={volumes}")
+            return
+        
+        facts = self._gather_facts(ssh_params, node)
+        
+        # 磁盘准备和数据目录创建合并为一个脚本，一次远程调用完成
+        # 已挂载到挂载点的磁盘跳过格式化和挂载，其余磁盘并行格式化后挂载，并一次写入fstab
+        disks = self._unmounted_disks(self._node_disks(node, facts), facts, f"集群节点 {host}")
+        prepare_steps = self._disk_prepare_steps(disks, node.get("disk") or {}, f"集群节点 {host}")
+        
+        data_paths = self._node_data_paths(node)
+        prepare_steps.append(("mkdir_data_dir", f"mkdir -p {' '.join(data_paths)}", f"在集群节点 {host} 上创建数据目录 {'、'.join(data_paths)} 失败"))
+        
+        self._run_steps_or_exit(ssh_params, prepare_steps)
+        
+        # 通过SFTP直接写入服务文件和环境变量文件（环境变量文件包含root密码，仅允许root读取）
+        if not self.remote_executor.put_content(
+            service_content, "/etc/systemd/system/minio.service",
+            host, ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"], ssh_params["password"]
+        ):
+            self.logger.error(f"上传服务文件到集群节点 {host} 失败")
+            exit(1)
+        if not self.remote_executor.put_content(
+            env_content, "/etc/default/minio",
+            host, ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"], ssh_params["password"],
+            mode=0o600
+        ):
+            self.logger.error(f"上传环境变量文件到集群节点 {host} 失败")
+            exit(1)
+        
+        result = self.remote_executor.execute_command(
+            host, "systemctl daemon-reload && systemctl enable minio",
+            ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"], ssh_params["password"]
+        )
+        if result[0] != 0:
+            self.logger.error(f"在集群节点 {host} 上配置MinIO服务失败：{result[2]}")
+            exit(1)
+        
+        # 挂载磁盘和写入服务文件改变了节点状态，主机信息需要重新收集
+        self.facts.invalidate(ssh_params)
+        self.logger.info(f"集群节点 {host} 的MinIO服务配置完成")
+    
+    def _check_cluster_drives(self, nodes):
+        """
+        在所有集群节点上并行运行数据盘预检，在启动MinIO之前找出慢盘或故障盘
+        
+        Args:
+            nodes: 集群节点配置列表
+        
+        Returns:
+            bool: True表示没有被拒绝的磁盘
+        """
+        if self.dry_run:
+            self.logger.info(f"[DRY RUN] 准备在 {len(nodes)} 个集群节点上测试数据盘性能")
+            return True
+        
+        results = self.drive_check.run([(self.get_ssh_params(node), self._node_data_paths(node)) for node in nodes])
+        # 测试结果按节点IP返回，报告中使用节点名称
+        names = {self.get_ssh_params(node)["host"]: node.get("host") for node in nodes}
+        return self.drive_check.evaluate({names.get(host, host): drives for host, drives in results.items()})
+    
+    def _check_cluster_network(self, nodes):
+        """
+        在启动MinIO之前测试所有集群节点两两之间的RTT和吞吐量，找出慢链路和不对称链路
+        
+        应答进程监听节点IP上的MinIO服务端口：此时MinIO尚未启动，端口空闲且已在防火墙中放行，
+        测到的也正是MinIO节点间通信所走的路径。
+        
+        Args:
+            nodes: 集群节点配置列表
+        
+        Returns:
+            bool: True表示没有被拒绝的链路
+        """
+        if self.dry_run:
+            self.logger.info(f"[DRY RUN] 准备测试 {len(nodes)} 个集群节点之间的网络延迟和吞吐量")
+            return True
+        
+        names = [node.get("host") for node in nodes]
+        node_params = [self.get_ssh_params(node) for node in nodes]
+        # 其他节点通过节点IP访问应答进程
+        targets = [(name, ssh_params, ssh_params["host"]) for name, ssh_params in zip(names, node_params)]
+        links = self.network_check.run(targets, self.config.get("cluster", {}).get("server_port", 9000))
+        return self.network_check.evaluate(names, links)
+    
+    def _start_cluster(self, nodes):
+        """
+        在所有集群节点上同时启动MinIO服务，并等待各节点完成启动
+        
+        启动命令不等待服务就绪（--no-block），所有节点的启动请求在很短的时间窗口内发出，
+        集群可以尽快达到法定数量，而不是在其他节点尚未启动时反复重启。
+        
+        Args:
+            nodes: 集群节点配置列表
+        
+        Returns:
+            bool: True表示所有节点的服务都已启动
+        """
+        cluster_config = self.config.get("cluster", {})
+        start_timeout = cluster_config.get("start_timeout", 120)
+        
+        if self.dry_run:
+            self.logger.info(f"[DRY RUN] 准备在 {len(nodes)} 个集群节点上同时启动MinIO服务")
+            return True
+        
+        node_params = [self.get_ssh_params(node) for node in nodes]
+        
+        # 输出各节点收到启动请求的时间，用于统计启动时间窗口
+        start_results = self.async_executor.execute_parallel([
+            self._build_task(ssh_params, "date +%s.%N && systemctl start --no-block minio", timeout=30)
+            for ssh_params in node_params
+        ])
+        
+        failed = []
+        started_at = []
+        for item in start_results:
+            exit_code, stdout, stderr = item["result"]
+            if exit_code != 0:
+                self.logger.error(f"在集群节点 {item['task']['host']} 上启动MinIO服务失败：{stderr}")
+                failed.append(item["task"]["host"])
+                continue
+            try:
+                started_at.append(float(stdout.splitlines()[0]))
+            except (IndexError, ValueError):
+                pass
+        
+        if started_at:
+            self.logger.info(f"已向 {len(started_at)} 个集群节点发出启动请求，启动时间窗口 {(max(started_at) - min(started_at)) * 1000:.0f} 毫秒（按节点时钟）")
+        
+        # 服务类型为notify，集群达到法定数量并完成初始化后服务才会变为active
+        wait_command = (
+            f"for i in $(seq {int(start_timeout)}); do systemctl is-active --quiet minio && exit 0; sleep 1; done; "
+            f"systemctl status minio --no-pager -n 20; exit 1"
+        )
+        wait_results = self.async_executor.execute_parallel([
+            self._build_task(ssh_params, wait_command, timeout=start_timeout + 30)
+            for ssh_params in node_params if ssh_params["host"] not in failed
+        ])
+        for item in wait_results:
+            exit_code, stdout, stderr = item["result"]
+            if exit_code != 0:
+                self.logger.error(f"集群节点 {item['task']['host']} 的MinIO服务在 {start_timeout} 秒内未完成启动：\n{stdout or stderr}")
+                failed.append(item["task"]["host"])
+        
+        # 启动服务改变了节点状态，主机信息需要重新收集
+        for ssh_params in node_params:
+            self.facts.invalidate(ssh_params)
+        
+        if failed:
+            return False
+        self.logger.info(f"MinIO集群已启动，共 {len(nodes)} 个节点")
+        return True
+    
     def run_health_checks(self):
         """
         运行健康检查
@@ -711,35 +1470,112 @@ class Deployer:
         
         elif deployment_mode == "cluster":
             nodes = cluster_config.get("nodes", [])
-            server_port = cluster_config.get("server_port", 9000)
-            console_port = cluster_config.get("console_port", 9001)
-            
-            # 并行运行健康检查
-            def check_node_health(node):
-                host = node.get("ip", node.get("host"))
-                self.logger.info(f"开始检查节点 {host} 的健康状态")
-                
-                if self.dry_run:
-                    self.logger.info(f"[DRY RUN] 准备检查节点 {host} 的健康状态")
-                    self.logger.info(f"[DRY RUN] 将在节点 {host} 创建以下存储桶：{[bucket['name'] for bucket in buckets]}")
-                    return True
-                else:
-                    results = self.health_checker.run_comprehensive_check(
-                        host, server_port, console_port, credentials=credentials, buckets=buckets
-                    )
-                    return results["overall_status"]
             
-            with ThreadPoolExecutor(max_workers=5) as executor:
-                results = list(executor.map(check_node_health, nodes))
+            # 并发探测所有节点，再并行运行各节点的健康检查
+            self._probe_cluster_health(nodes)
+            with ThreadPoolExecutor(max_workers=self._node_fanout(nodes)) as executor:
+                results = list(executor.map(self._check_node_health, nodes))
             
             if not all(results):
                 self.logger.error("某些节点的健康检查失败")
                 exit(1)
+            
+            if not self._provision_cluster_buckets(nodes):
+                exit(1)
         
         self.logger.info("=" * 60)
         self.logger.info("健康检查完成")
         self.logger.info("=" * 60)
     
+    def _probe_cluster_health(self, nodes):
+        """
+        并发探测所有集群节点的端口和健康检查接口，结果供各节点的健康检查使用
+        
+        Args:
+            nodes: 集群节点配置列表
+        
+        Returns:
+            bool: 探测本身不判定成败，总是返回True
+        """
+        cluster_config = self.config.get("cluster", {})
+        hosts = [node.get("ip", node.get("host")) for node in nodes]
+        
+        if self.dry_run:
+            self.logger.info(f"[DRY RUN] 准备并发探测以下节点的健康状态：{', '.join(hosts)}")
+            return True
+        
+        self.health_probe_results = self.health_checker.prober.probe(
+            hosts, cluster_config.get("server_port", 9000), cluster_config.get("console_port", 9001)
+        )
+        return True
+    
+    def _provision_cluster_buckets(self, nodes):
+        """
+        在集群级别创建存储桶并设置策略和配额（只执行一次）
+        
+        先读取一次集群的当前状态，再只执行与cluster.buckets不一致的变更，
+        请求发送到健康探测全部通过的第一个节点。
+        
+        Args:
+            nodes: 集群节点配置列表
+        
+        Returns:
+            bool: True表示存储桶与配置一致
+        """
+        credentials = self.config.get("credentials", {})
+        cluster_config = self.config.get("cluster", {})
+        buckets = cluster_config.get("buckets", [])
+        hosts = [node.get("ip", node.get("host")) for node in nodes]
+        
+        if not buckets:
+            self.logger.info("没有需要创建的存储桶配置")
+            return True
+        
+        if self.dry_run:
+            self.logger.info(f"[DRY RUN] 将在集群中创建以下存储桶：{[bucket['name'] for bucket in buckets]}")
+            return True
+        
+        prober = self.health_checker.prober
+        healthy = [host for host in hosts if host in self.health_probe_results and prober.all_ok(self.health_probe_results[host])]
+        host = healthy[0] if healthy else hosts[0]
+        self.logger.info(f"通过节点 {host} 在集群中创建存储桶")
+        
+        status, message = self.health_checker.create_buckets(
+            host, cluster_config.get("server_port", 9000), credentials=credentials, buckets=buckets
+        )
+        if not status:
+            self.logger.error(f"集群存储桶创建失败：{message}")
+        return status
+    
+    def _check_node_health(self, node):
+        """
+        检查单个集群节点的健康状态（只读检查，存储桶由集群级任务统一创建）
+        
+        Args:
+            node: 集群节点配置
+        
+        Returns:
+            bool: True表示健康，False表示不健康
+        """
+        credentials = self.config.get("credentials", {})
+        cluster_config = self.config.get("cluster", {})
+        server_port = cluster_config.get("server_port", 9000)
+        console_port = cluster_config.get("console_port", 9001)
+        host = node.get("ip", node.get("host"))
+        self.logger.info(f"开始检查节点 {host} 的健康状态")
+        
+        if self.dry_run:
+            self.logger.info(f"[DRY RUN] 准备检查节点 {host} 的健康状态")
+            return True
+        else:
+            # 服务状态在节点上查询，而不是在控制机上
+            facts = self.facts.gather(self.get_ssh_params(node), refresh=True)
+            results = self.health_checker.run_comprehensive_check(
+                host, server_port, console_port, credentials=credentials, read_only=True,
+                probe=self.health_probe_results.get(host), service_running=facts is not None and facts.minio_service_running
+            )
+            return results["overall_status"]
+    
     def check_minio_exists(self):
         """
         检查所有节点上是否已存在MinIO服务
@@ -764,12 +1600,11 @@ class Deployer:
                 # 远程主机，通过SSH检查
                 ssh_params = self.get_ssh_params()
                 
-                # 构造检查命令
-                check_cmd = "systemctl list-unit-files --type service | grep -q minio || [ -f /etc/systemd/system/minio.service ]"
-                exit_code, stdout, stderr = self.remote_executor.execute_command(ssh_params["host"], check_cmd, ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"], ssh_params["password"])
+                # 服务文件和服务状态来自主机信息快照
+                facts = self._gather_facts(ssh_params, standalone_config)
                 
-                if exit_code == 0:
-                    nodes_with_minio.append({"host": host, "type": "远程主机"})
+                if facts.minio_service_exists:
+                    nodes_with_minio.append({"host": host, "type": "远程主机", "running": facts.minio_service_running})
                 else:
                     nodes_without_minio.append({"host": host, "type": "远程主机"})
         
@@ -778,17 +1613,38 @@ class Deployer:
             nodes = cluster_config.get("nodes", [])
             
             for node in nodes:
-                ssh_params = self.get_ssh_params(node)
-                
-                # 构造检查命令
-                check_cmd = "systemctl list-unit-files --type service | grep -q minio || [ -f /etc/systemd/system/minio.service ]"
-                exit_code, stdout, stderr = self.remote_executor.execute_command(ssh_params["host"], check_cmd, ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"], ssh_params["password"])
-                
-                if exit_code == 0:
-                    nodes_with_minio.append({"host": ssh_params["host"], "type": "集群节点"})
-                else:
-                    nodes_without_minio.append({"host": ssh_params["host"], "type": "集群节点"})
+                record = self._probe_minio_node(node)
+                (nodes_with_minio if "running" in record else nodes_without_minio).append(record)
         
+        self._evaluate_minio_exists(nodes_with_minio, nodes_without_minio)
+    
+    def _probe_minio_node(self, node):
+        """
+        检查单个集群节点上是否已存在MinIO服务
+        
+        Args:
+            node: 集群节点配置
+        
+        Returns:
+            dict: 节点检查记录，已存在MinIO服务时包含running（服务是否正在运行）
+        """
+        ssh_params = self.get_ssh_params(node)
+        
+        # 服务文件和服务状态来自主机信息快照
+        facts = self._gather_facts(ssh_params, node)
+        
+        if facts.minio_service_exists:
+            return {"host": ssh_params["host"], "type": "集群节点", "running": facts.minio_service_running}
+        return {"host": ssh_params["host"], "type": "集群节点"}
+    
+    def _evaluate_minio_exists(self, nodes_with_minio, nodes_without_minio):
+        """
+        汇总各节点的MinIO服务检查结果，并决定是否继续部署
+        
+        Args:
+            nodes_with_minio: 已存在MinIO服务的节点记录列表
+            nodes_without_minio: 未安装MinIO的节点记录列表
+        """
         # 显示检查结果
         total_nodes = len(nodes_with_minio) + len(nodes_without_minio)
         self.logger.info(f"\n检查结果：")
@@ -826,12 +1682,8 @@ class Deployer:
                     else:
                         self.logger.info(f"  - {host} ({node_type})：服务存在且可用")
                 else:
-                    # 远程主机或集群节点，通过SSH检查服务状态
-                    ssh_params = self.get_ssh_params(node if node_type == "集群节点" else None)
-                    check_cmd = "systemctl status minio"
-                    exit_code, stdout, stderr = self.remote_executor.execute_command(ssh_params["host"], check_cmd, ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"], ssh_params["password"])
-                    
-                    if exit_code != 0 or "active (running)" not in stdout:
+                    # 远程主机或集群节点，使用主机信息快照中的服务状态
+                    if not node["running"]:
                         self.logger.warning(f"  - {host} ({node_type})：服务存在但不可用")
                         nodes_with_unavailable_service.append(node)
                     else:
@@ -860,6 +1712,7 @@ class Deployer:
                             if not self.service_manager.remove_service():
                                 self.logger.error("卸载现有MinIO服务失败，部署将终止")
                                 exit(1)
+                            self.facts.invalidate()
                             self.logger.info("继续部署流程...")
                             self.logger.info("-" * 60)
                             return  # 继续部署流程
@@ -878,41 +1731,305 @@ class Deployer:
         self.logger.info("所有节点均未安装MinIO，继续部署流程")
         self.logger.info("-" * 60)
     
-    def run(self):
+    def _task_fingerprint(self, phase, node=None):
         """
-        运行完整的部署流程
+        计算任务输入的指纹：节点配置（单机模式为standalone配置）加上该阶段依赖的配置项
+        
+        Args:
+            phase: 阶段名称，对应PHASE_INPUTS中的键
+            node: 集群节点配置（全局任务为None）
+        
+        Returns:
+            str: 任务输入的指纹
         """
-        if self.dry_run:
-            self.logger.info("## 预演模式（DRY RUN）已启用")
-            self.logger.info("不会执行实际操作，仅显示执行计划")
-            self.logger.info("-" * 60)
+        inputs = {}
+        for path in self.PHASE_INPUTS.get(phase, []):
+            value = self.config
+            for key in path.split("."):
+                value = value.get(key) if isinstance(value, dict) else None
+            inputs[path] = value
+        
+        if node is None and self.config.get("deployment_mode") != "cluster":
+            node = self.config.get("standalone", {})
+        
+        return DeploymentJournal.fingerprint({"phase": phase, "node": node, "inputs": inputs})
+    
+    def build_task_graph(self):
+        """
+        构建部署任务图
+        
+        单机模式下各阶段依次执行。集群模式下每个节点有独立的任务链：
+        SSH互信 -> 分区检查 -> MinIO服务检查 -> 安装，防火墙在互信之后与其并行，系统调优（如果启用）在分区检查之后与其并行；
+        只有汇总MinIO服务检查结果、启动集群和创建存储桶是同步所有节点的全局屏障。
+        除只读的MinIO服务探测和健康探测外，每个任务都带有输入指纹，用于--resume时跳过已完成的任务。
+        
+        Returns:
+            TaskGraph: 部署任务图
+        """
+        deployment_mode = self.config.get("deployment_mode")
+        journal = None if self.dry_run else self.journal
+        
+        if deployment_mode != "cluster":
+            graph = TaskGraph(logger=self.logger, max_workers=1, journal=journal, profiler=self.profiler)
+            previous = []
+            for name, func in [
+                ("ssh_trust", self.check_ssh_trust),
+                ("os_partitions", self.check_os_partitions),
+                ("minio_exists", self.check_minio_exists),
+                ("firewall", self.configure_firewall),
+                ("tuning", self.tune_system),
+                ("install", self.install_minio),
+                ("configure", self.configure_minio_service),
+                ("health", self.run_health_checks)
+            ]:
+                previous = [graph.add_task(name, func, deps=previous, fingerprint=self._task_fingerprint(name))]
+            return graph
+        
+        cluster_config = self.config.get("cluster", {})
+        nodes = cluster_config.get("nodes", [])
+        minio_config = self.config.get("minio", {})
+        relay = minio_config.get("distribution", {}).get("mode", "download") == "relay"
+        ports = self._cluster_ports()
+        graph = TaskGraph(logger=self.logger, max_workers=max(4, min(len(nodes) * 2, self.async_executor.max_concurrency)), journal=journal,
+                          profiler=self.profiler)
+        
+        probe_records = {}
+        
+        def probe(node):
+            probe_records[node.get("host")] = self._probe_minio_node(node)
+        
+        volumes = self._cluster_volumes()
+        storage_class = self._cluster_storage_class()
+        
+        def configure(node):
+            self._ensure_minio_not_running_node(node)
+            self._configure_cluster_node(node, volumes, storage_class)
+        
+        def evaluate_minio_exists():
+            records = [probe_records[node.get("host")] for node in nodes]
+            self._evaluate_minio_exists(
+                [record for record in records if "running" in record],
+                [record for record in records if "running" not in record]
+            )
+        
+        # 只有只读的ssh_trust、os_partitions和minio_probe可以先于minio_exists屏障运行，
+        # 修改节点的任务都依赖该屏障：已有MinIO服务时在任何修改之前中止，屏障询问用户时也没有其他任务在运行
+        graph.add_task("firewall@local", lambda: self._configure_local_firewall(ports), deps=["minio_exists"], phase="firewall",
+                       fingerprint=self._task_fingerprint("firewall"))
+        
+        for node in nodes:
+            host = node.get("host")
+            graph.add_task(f"ssh_trust@{host}", lambda node=node: self._ensure_ssh_trust_node(node), node=host, phase="ssh_trust",
+                           fingerprint=self._task_fingerprint("ssh_trust", node))
+            graph.add_task(f"os_partitions@{host}", lambda node=node: self._check_os_partition_node(node),
+                           deps=[f"ssh_trust@{host}"], node=host, phase="os_partitions",
+                           fingerprint=self._task_fingerprint("os_partitions", node))
+            graph.add_task(f"minio_probe@{host}", lambda node=node: probe(node),
+                           deps=[f"os_partitions@{host}"], node=host, phase="minio_exists")
+            graph.add_task(f"firewall@{host}", lambda node=node: self._configure_firewall_node(node, ports),
+                           deps=[f"ssh_trust@{host}", "minio_exists"], node=host, phase="firewall",
+                           fingerprint=self._task_fingerprint("firewall", node))
+            if self.tuner.enabled:
+                graph.add_task(f"tuning@{host}", lambda node=node: self._tune_node(node),
+                               deps=[f"os_partitions@{host}", "minio_exists"], node=host, phase="tuning",
+                               fingerprint=self._task_fingerprint("tuning", node))
+            if not relay:
+                graph.add_task(f"install@{host}", lambda node=node: self._install_minio_nodes([node], minio_config),
+                               deps=[f"minio_probe@{host}", "minio_exists"], node=host, phase="install",
+                               fingerprint=self._task_fingerprint("install", node))
+        
+        # 已有MinIO服务时需要所有节点的检查结果才能决定是否继续，因此是全局屏障
+        graph.add_task("minio_exists", evaluate_minio_exists,
+                       deps=[f"minio_probe@{node.get('host')}" for node in nodes], phase="minio_exists", barrier=True,
+                       fingerprint=self._task_fingerprint("minio_exists"))
+        
+        # 树形接力分发需要所有节点都就绪后一起进行
+        if relay:
+            graph.add_task("install", lambda: self._install_minio_nodes(nodes, minio_config),
+                           deps=[f"minio_probe@{node.get('host')}" for node in nodes] + ["minio_exists"], phase="install", barrier=True,
+                           fingerprint=self._task_fingerprint("install"))
+        
+        for node in nodes:
+            host = node.get("host")
+            graph.add_task(f"configure@{host}", lambda node=node: configure(node),
+                           deps=["install" if relay else f"install@{host}", f"firewall@{host}", "minio_exists"]
+                           + ([f"tuning@{host}"] if self.tuner.enabled else []),
+                           node=host, phase="configure", fingerprint=self._task_fingerprint("configure", node))
+        
+        # 数据盘预检需要所有节点的结果才能决定是否启动，因此是全局屏障
+        start_deps = ["firewall@local"] + [f"configure@{node.get('host')}" for node in nodes]
+        if self.drive_check.enabled:
+            graph.add_task("drive_check", lambda: self._check_cluster_drives(nodes),
+                           deps=[f"configure@{node.get('host')}" for node in nodes], phase="drive_check", barrier=True,
+                           fingerprint=self._task_fingerprint("drive_check"))
+            start_deps.append("drive_check")
+        
+        # 网络预检需要防火墙已放行服务端口，并确认所有节点上都没有运行中的MinIO（占用服务端口）
+        if self.network_check.enabled and len(nodes) > 1:
+            graph.add_task("network_check", lambda: self._check_cluster_network(nodes),
+                           deps=[f"firewall@{node.get('host')}" for node in nodes] + ["minio_exists"], phase="network_check",
+                           barrier=True, fingerprint=self._task_fingerprint("network_check"))
+            start_deps.append("network_check")
+        
+        # 分布式MinIO需要所有节点在很短的时间窗口内同时启动
+        graph.add_task("start_cluster", lambda: self._start_cluster(nodes),
+                       deps=start_deps, phase="configure", barrier=True,
+                       fingerprint=self._task_fingerprint("start_cluster"))
+        
+        # 所有节点的端口和健康检查接口一起并发探测，全部通过时立即进入各节点的健康检查
+        graph.add_task("health_probe", lambda: self._probe_cluster_health(nodes), deps=["start_cluster"], phase="health")
+        
+        for node in nodes:
+            host = node.get("host")
+            # 健康检查失败只标记该节点的任务失败，其余节点的健康检查继续执行
+            graph.add_task(f"health@{host}", lambda node=node: self._check_node_health(node), deps=["start_cluster", "health_probe"],
+                           node=host, phase="health", fingerprint=self._task_fingerprint("health", node))
+        
+        # 存储桶在集群级别只创建一次，各节点的健康检查都是只读的
+        graph.add_task("buckets", lambda: self._provision_cluster_buckets(nodes),
+                       deps=[f"health@{node.get('host')}" for node in nodes], phase="health", barrier=True,
+                       fingerprint=self._task_fingerprint("buckets"))
+        
+        return graph
+    
+    def _erasure_parity(self):
+        """
+        获取标准存储类别的校验位，未配置或配置无效时返回None（使用MinIO默认值）
+        """
+        standard = self._cluster_storage_class() if self.config.get("deployment_mode") == "cluster" else None
+        return int(str(standard).split(":")[-1]) if standard else None
+    
+    def run_upgrade(self):
+        """
+        把已部署的MinIO滚动升级到minio.version指定的版本
+        
+        集群模式下先并行暂存新版本，再按纠删码校验位分批重启，每一批都以集群健康检查
+        满足写法定数量为前提；单机模式下替换二进制后重启服务。
+        """
+        self.logger.info("=" * 60)
+        self.logger.info("滚动升级MinIO")
+        self.logger.info("=" * 60)
         
-        # 1. 运行系统检查
-        self.run_system_checks()
+        deployment_mode = self.config.get("deployment_mode")
+        minio_config = self.config.get("minio", {})
+        max_wave = self.config.get("upgrade", {}).get("max_wave_size") or None
+        
+        if deployment_mode == "cluster":
+            nodes = self.config.get("cluster", {}).get("nodes", [])
+            targets = [
+                {
+                    "ssh_params": self.get_ssh_params(node),
+                    "address": node.get("ip", node.get("host")),
+                    "drives": len(self._node_data_paths(node))
+                }
+                for node in nodes
+            ]
+        else:
+            standalone_config = self.config.get("standalone", {})
+            host = standalone_config.get("host", "localhost")
+            targets = [] if host in ["localhost", "127.0.0.1", "127.0.1.1"] else [
+                {"ssh_params": self.get_ssh_params(), "address": host, "drives": 1}
+            ]
         
-        # 2. 加载配置
-        self.load_config()
+        if self.dry_run:
+            if targets:
+                size = self.upgrader.wave_size([target["drives"] for target in targets], self._erasure_parity(), max_wave)
+                self.logger.info(f"[DRY RUN] 准备把 {len(targets)} 个节点升级到 {minio_config.get('version')}，每批重启 {size} 个节点")
+            else:
+                self.logger.info(f"[DRY RUN] 准备把本机MinIO升级到 {minio_config.get('version')}")
+            return
         
-        # 3. 检查和配置SSH互信
-        self.check_ssh_trust()
+        # 按节点架构准备新版本安装包，安装包必须是minio.version指定的版本
+        local_paths = {}
+        for arch in sorted({self._gather_facts(target["ssh_params"]).url_arch for target in targets} or {None}, key=str):
+            local_paths[arch] = self._prepare_local_binary(minio_config, "minio", arch)
+            if not local_paths[arch]:
+                self.logger.error(f"无法准备 {minio_config.get('version')} 版本的MinIO安装包，升级终止")
+                exit(1)
+        for target in targets:
+            target["local_path"] = local_paths[self._gather_facts(target["ssh_params"]).url_arch]
         
-        # 4. 检查操作系统分区
-        self.check_os_partitions()
+        if not targets:
+            self._upgrade_local(local_paths[None])
+        elif not self.upgrader.upgrade(targets, parity=self._erasure_parity(), max_wave=max_wave):
+            self.logger.error("MinIO滚动升级失败")
+            exit(1)
         
-        # 5. 检查MinIO服务是否存在
-        self.check_minio_exists()
+        self.logger.info("=" * 60)
+        self.logger.info("MinIO升级完成")
+        self.logger.info("=" * 60)
+    
+    def _upgrade_local(self, local_path):
+        """
+        升级本机的MinIO：替换二进制、重启服务并等待健康检查通过
         
-        # 6. 配置防火墙
-        self.configure_firewall()
+        Args:
+            local_path: 新版本二进制的路径
+        """
+        port = self.config.get("cluster", {}).get("server_port", 9000)
+        if not self.minio_installer.replace_binary(local_path, RollingUpgrader.BINARY_PATH):
+            self.logger.error("替换本机MinIO二进制失败")
+            exit(1)
         
-        # 7. 安装MinIO
-        self.install_minio()
+        if not self.service_manager.restart_service():
+            self.logger.error("重启本机MinIO服务失败")
+            exit(1)
         
-        # 8. 配置MinIO服务
-        self.configure_minio_service()
+        prober = self.health_checker.prober
+        results = prober.probe(["localhost"], port, endpoints=("live",), deadline=self.upgrader.restart_timeout, check_ports=False)
+        if not prober.all_ok(results["localhost"]):
+            self.logger.error(f"升级后本机MinIO健康检查失败，上一版本保留在 {RollingUpgrader.BINARY_PATH}.prev")
+            exit(1)
+    
+    def run(self):
+        """
+        运行完整的部署流程
+        """
+        if self.dry_run:
+            self.logger.info("## 预演模式（DRY RUN）已启用")
+            self.logger.info("不会执行实际操作，仅显示执行计划")
+            self.logger.info("-" * 60)
         
-        # 9. 运行健康检查
-        self.run_health_checks()
+        try:
+            # 1. 运行系统检查
+            with self.profiler.span("system_checks", "phase"):
+                self.run_system_checks()
+            
+            # 2. 加载配置（任务图依赖配置中的节点列表）
+            with self.profiler.span("load_config", "phase"):
+                self.load_config()
+            
+            # 升级模式只执行滚动升级
+            if self.mode == "upgrade":
+                with self.profiler.span("upgrade", "phase"):
+                    self.run_upgrade()
+                return
+            
+            # 3. 打开检查点日志（预演模式不记录），--resume时跳过已完成且输入未变化的任务
+            if not self.dry_run:
+                self.journal.open(
+                    {"config": os.path.abspath(self.config_file), "mode": self.config.get("deployment_mode")},
+                    resume=self.resume
+                )
+            
+            # 4. 按依赖关系调度其余阶段，集群模式下各节点的任务链互不等待
+            self.task_graph = self.build_task_graph()
+            with self.profiler.span("task_graph", "phase", tasks=len(self.task_graph.tasks)):
+                succeeded = self.task_graph.run()
+            if not succeeded:
+                self.logger.error(f"以下部署任务执行失败：{', '.join(self.task_graph.failed_tasks())}")
+                exit(1)
+        finally:
+            # 保存主机信息快照，便于部署后排查各节点的环境
+            if not self.dry_run:
+                self.facts.save(self.inventory_file)
+            
+            # 部署结束（包括异常退出）时关闭SSH连接池
+            self.remote_executor.close_all()
+            
+            # 输出耗时分析文件和最慢区间汇总
+            self.profiler.save(self.profile_file)
+            self.profiler.log_summary()
         
         self.logger.info("=" * 60)
         self.logger.info("MinIO部署完成")
@@ -1,9 +1,29 @@
+import fnmatch
+import glob
 import os
 import re
+import shlex
 import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from core.logger import Logger
 
 class DiskManager:
+    # 设备路径中出现这些字符时按通配符展开，如/dev/sd[b-m]
+    GLOB_CHARS = "*?["
+    
+    # 格式化配置：default使用mkfs的默认参数；performance面向对象存储数据盘，默认使用XFS，
+    # 每块磁盘写入卷标，新盘跳过discard，ext4延迟初始化inode表和日志且不为root保留块
+    FORMAT_PROFILES = ("default", "performance")
+    
+    # 各格式化配置下每种文件系统的默认挂载选项，未列出的使用defaults
+    MOUNT_OPTIONS = {
+        "performance": {
+            "xfs": "defaults,noatime,nodiratime,allocsize=64m",
+            "ext4": "defaults,noatime,nodiratime"
+        }
+    }
+    
     def __init__(self, logger=None):
         self.logger = logger or Logger().get_logger()
     
@@ -32,7 +52,7 @@ class DiskManager:
             
             self.logger.info(f"操作系统关键分区：{os_partitions}")
             return os_partitions
-            
+        
         except Exception as e:
             self.logger.error(f"获取操作系统分区失败：{e}")
             return []
@@ -138,18 +158,61 @@ class DiskManager:
                 self.logger.error(f"磁盘空间不足：{available_space_gb:.2f}GB < {min_space_gb}GB")
                 print(f"错误：路径 {path} 的磁盘空间不足，可用空间：{available_space_gb:.2f}GB，需要至少 {min_space_gb}GB")
                 return False
-                
+        
         except Exception as e:
             self.logger.error(f"检查磁盘空间失败：{e}")
             return False
     
-    def format_disk(self, device, filesystem='ext4'):
+    def mkfs_command(self, device, filesystem='ext4', profile='default', label=None):
+        """
+        生成格式化磁盘的命令
+        
+        Args:
+            device: 设备路径（如 /dev/sdb）
+            filesystem: 文件系统类型，默认为ext4
+            profile: 格式化配置，default或performance
+            label: 卷标，performance配置下写入文件系统，便于识别磁盘（fstab按UUID挂载，不依赖卷标唯一）
+        
+        Returns:
+            str: shell命令
+        """
+        device = shlex.quote(device)
+        if profile != "performance":
+            # 通过yes命令自动确认已存在的文件系统
+            return f"yes | mkfs.{filesystem} {device}"
+        
+        label_option = f" -L {shlex.quote(label)}" if label else ""
+        if filesystem == "xfs":
+            # -K：新盘不需要discard，跳过整盘TRIM；-f：覆盖已有的文件系统签名
+            return f"mkfs.xfs -f -K{label_option} {device}"
+        if filesystem == "ext4":
+            # inode表和日志由内核在挂载后后台初始化，16TB的磁盘也能在几秒内完成格式化
+            return f"mkfs.ext4 -F -m 0 -E lazy_itable_init=1,lazy_journal_init=1,nodiscard{label_option} {device}"
+        return f"yes | mkfs.{filesystem}{label_option} {device}"
+    
+    def mount_options(self, filesystem='ext4', profile='default', options=None):
+        """
+        获取挂载选项：配置中指定的选项优先，否则使用格式化配置的默认值
+        """
+        return options or self.MOUNT_OPTIONS.get(profile, {}).get(filesystem, "defaults")
+    
+    def drive_label(self, mount_point):
+        """
+        根据挂载点生成卷标，如/mnt/disk3为DISK3（XFS卷标最多12个字符）
+        
+        截断后的卷标可能重复（如/data1/minio和/data2/minio都是MINIO），只用于识别，不用于挂载
+        """
+        return (os.path.basename(mount_point.rstrip('/')) or "MINIO").upper()[:12]
+    
+    def format_disk(self, device, filesystem='ext4', profile='default', label=None):
         """
         格式化磁盘
         
         Args:
             device: 设备路径（如 /dev/sdb1）
             filesystem: 文件系统类型，默认为ext4
+            profile: 格式化配置，default或performance
+            label: 卷标（仅performance配置使用）
         
         Returns:
             bool: True表示格式化成功，False表示失败
@@ -200,9 +263,9 @@ class DiskManager:
                 self.logger.debug(f"命令标准输出：{result.stdout}")
                 self.logger.debug(f"命令标准错误：{result.stderr}")
                 self.logger.info(f"已清除设备 {device} 的文件系统签名")
-                
-            # 使用mkfs格式化磁盘，通过yes命令自动确认已存在的文件系统
-            cmd = f"yes | mkfs.{filesystem} {device}"
+            
+            # 使用mkfs格式化磁盘，参数由格式化配置决定
+            cmd = self.mkfs_command(device, filesystem, profile, label)
             self.logger.debug(f"执行格式化命令：{cmd}")
             result = subprocess.run(cmd, shell=True, check=True, capture_output=True, text=True)
             self.logger.debug(f"格式化命令返回码：{result.returncode}")
@@ -211,7 +274,7 @@ class DiskManager:
             
             self.logger.info(f"设备 {device} 格式化成功")
             return True
-            
+        
         except subprocess.CalledProcessError as e:
             self.logger.error(f"设备 {device} 格式化失败，命令：{e.cmd}")
             self.logger.error(f"返回码：{e.returncode}")
@@ -222,7 +285,7 @@ class DiskManager:
             self.logger.error(f"设备 {device} 格式化失败，错误：{e}")
             return False
     
-    def mount_disk(self, device, mount_point, filesystem='ext4'):
+    def mount_disk(self, device, mount_point, filesystem='ext4', options='defaults'):
         """
         挂载磁盘
         
@@ -230,6 +293,7 @@ class DiskManager:
             device: 设备路径（如 /dev/sdb1）
             mount_point: 挂载点路径（如 /data/minio）
             filesystem: 文件系统类型，默认为ext4
+            options: 挂载选项，默认为defaults
         
         Returns:
             bool: True表示挂载成功，False表示失败
@@ -263,7 +327,7 @@ class DiskManager:
                         return True
             
             # 执行挂载命令，指定文件系统类型
-            cmd = f"mount -t {filesystem} {device} {mount_point}"
+            cmd = f"mount -t {filesystem} -o {options} {device} {mount_point}"
             self.logger.debug(f"执行挂载命令：{cmd}")
             result = subprocess.run(cmd, shell=True, check=True, capture_output=True, text=True)
             self.logger.debug(f"挂载命令返回码：{result.returncode}")
@@ -272,7 +336,7 @@ class DiskManager:
             
             self.logger.info(f"设备 {device} 挂载成功")
             return True
-            
+        
         except subprocess.CalledProcessError as e:
             self.logger.error(f"设备 {device} 挂载失败")
             self.logger.error(f"命令：{e.cmd}")
@@ -299,7 +363,7 @@ class DiskManager:
                 self.logger.debug(f"lsblk 命令标准错误：{lsblk_result.stderr}")
             except Exception as debug_e:
                 self.logger.debug(f"获取调试信息失败：{debug_e}")
-                
+            
             return False
         except Exception as e:
             self.logger.error(f"设备 {device} 挂载失败，错误：{e}")
@@ -345,11 +409,71 @@ class DiskManager:
             
             self.logger.info(f"设备 {device} 的挂载配置已添加到fstab")
             return True
-            
+        
         except Exception as e:
             self.logger.error(f"将设备 {device} 的挂载配置添加到fstab失败，错误：{e}")
             return False
     
+    def filesystem_uuid(self, device):
+        """
+        获取设备上文件系统的UUID
+        
+        Returns:
+            str: UUID，获取失败时返回None
+        """
+        result = subprocess.run(["blkid", "-s", "UUID", "-o", "value", device], capture_output=True, text=True)
+        uuid = result.stdout.strip()
+        if result.returncode != 0 or not uuid:
+            self.logger.error(f"获取设备 {device} 的文件系统UUID失败：{result.stderr.strip()}")
+            return None
+        return uuid
+    
+    def update_fstab(self, disks, filesystem='ext4', options='defaults', by_uuid=False):
+        """
+        一次写入多块磁盘的挂载配置：先写临时文件，再重命名替换/etc/fstab，
+        中途失败不会留下只写了一部分的fstab
+        
+        Args:
+            disks: 列表，每个元素为(设备路径, 挂载点)
+            filesystem: 文件系统类型，默认为ext4
+            options: 挂载选项，默认为defaults
+            by_uuid: 是否按文件系统UUID（UUID=）挂载，磁盘重新排序后仍能挂载到原来的挂载点
+        
+        Returns:
+            bool: True表示写入成功，False表示失败
+        """
+        self.logger.info(f"将 {len(disks)} 块磁盘的挂载配置写入fstab")
+        
+        mount_points = {mount_point for _, mount_point in disks}
+        sources = {}
+        for device, _ in disks:
+            uuid = self.filesystem_uuid(device) if by_uuid else None
+            if by_uuid and not uuid:
+                return False
+            sources[device] = f"UUID={uuid}" if uuid else device
+        try:
+            with open('/etc/fstab', 'r') as f:
+                # 同一挂载点原有的配置被新配置替换
+                lines = [line for line in f if len(line.split()) < 2 or line.lstrip().startswith('#') or line.split()[1] not in mount_points]
+            lines.extend(f"{sources[device]} {mount_point} {filesystem} {options} 0 2\n" for device, mount_point in disks)
+            
+            fd, temp_path = tempfile.mkstemp(prefix='fstab.', dir='/etc')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    f.writelines(lines)
+                os.chmod(temp_path, 0o644)
+                os.replace(temp_path, '/etc/fstab')
+            except Exception:
+                os.unlink(temp_path)
+                raise
+            
+            self.logger.info("fstab更新成功")
+            return True
+        
+        except Exception as e:
+            self.logger.error(f"更新fstab失败，错误：{e}")
+            return False
+    
     def set_permissions(self, path, user='root', group='root', mode='0755'):
         """
         设置路径权限
@@ -376,7 +500,7 @@ class DiskManager:
             
             self.logger.info(f"路径 {path} 的权限设置成功")
             return True
-            
+        
         except subprocess.CalledProcessError as e:
             self.logger.error(f"设置路径 {path} 的权限失败，错误：{e.stderr}")
             return False
@@ -408,7 +532,7 @@ class DiskManager:
             
             self.logger.info(f"设备 {device} 可用，信息：{result.stdout}")
             return True
-            
+        
         except subprocess.CalledProcessError as e:
             self.logger.error(f"设备 {device} 不可用，错误：{e.stderr}")
             return False
@@ -416,7 +540,7 @@ class DiskManager:
             self.logger.error(f"设备 {device} 检查失败，错误：{e}")
             return False
     
-    def prepare_disk(self, device, mount_point, filesystem='ext4', format_disk=False, min_space_gb=10):
+    def prepare_disk(self, device, mount_point, filesystem='ext4', format_disk=False, min_space_gb=10, profile='default', mount_options=None):
         """
         准备磁盘：检查、格式化、挂载、设置权限
         
@@ -426,10 +550,14 @@ class DiskManager:
             filesystem: 文件系统类型，默认为ext4
             format_disk: 是否格式化磁盘，默认为False
             min_space_gb: 最小可用空间（GB），默认为10GB
+            profile: 格式化配置，default或performance
+            mount_options: 挂载选项，为None时使用格式化配置的默认值
         
         Returns:
             bool: True表示准备成功，False表示失败
         """
+        options = self.mount_options(filesystem, profile, mount_options)
+        by_uuid = format_disk and profile == "performance"
         self.logger.info(f"准备磁盘：设备 {device}，挂载点 {mount_point}")
         self.logger.debug(f"文件系统：{filesystem}，是否格式化：{format_disk}，最小空间：{min_space_gb}GB")
         
@@ -450,7 +578,7 @@ class DiskManager:
         # 格式化磁盘（如果需要）
         if format_disk:
             self.logger.debug("步骤3：格式化磁盘")
-            if not self.format_disk(device, filesystem):
+            if not self.format_disk(device, filesystem, profile, self.drive_label(mount_point)):
                 self.logger.debug("磁盘格式化失败")
                 return False
             self.logger.debug("磁盘格式化成功")
@@ -459,14 +587,21 @@ class DiskManager:
         
         # 挂载磁盘
         self.logger.debug("步骤4：挂载磁盘")
-        if not self.mount_disk(device, mount_point, filesystem):
+        if not self.mount_disk(device, mount_point, filesystem, options):
             self.logger.debug("磁盘挂载失败")
             return False
         self.logger.debug("磁盘挂载成功")
         
         # 添加到fstab
         self.logger.debug("步骤5：添加到fstab")
-        if not self.add_to_fstab(device, mount_point, filesystem):
+        source = device
+        if by_uuid:
+            # 与prepare_disks一致，按文件系统UUID挂载
+            uuid = self.filesystem_uuid(device)
+            if not uuid:
+                return False
+            source = f"UUID={uuid}"
+        if not self.add_to_fstab(source, mount_point, filesystem, options):
             self.logger.debug("添加到fstab失败")
             return False
         self.logger.debug("添加到fstab成功")
@@ -487,3 +622,149 @@ class DiskManager:
         
         self.logger.info(f"磁盘 {device} 准备成功，已挂载到 {mount_point}")
         return True
+    
+    def prepare_disks(self, disks, filesystem='ext4', format_disk=False, min_space_gb=10, profile='default', mount_options=None):
+        """
+        准备多块磁盘（JBOD）：检查后并行格式化，依次挂载，一次写入fstab，最后检查空间和设置权限
+        
+        并行格式化时总耗时取决于最慢的一块磁盘，而不是所有磁盘耗时之和。
+        
+        Args:
+            disks: 列表，每个元素为(设备路径, 挂载点)
+            filesystem: 文件系统类型，默认为ext4
+            format_disk: 是否格式化磁盘，默认为False
+            min_space_gb: 每块磁盘的最小可用空间（GB），默认为10GB
+            profile: 格式化配置，default或performance
+            mount_options: 挂载选项，为None时使用格式化配置的默认值
+        
+        Returns:
+            bool: True表示全部准备成功，False表示有磁盘失败
+        """
+        options = self.mount_options(filesystem, profile, mount_options)
+        self.logger.info(f"准备 {len(disks)} 块磁盘：{'、'.join(device for device, _ in disks)}")
+        
+        for device, _ in disks:
+            if not self.check_os_partition(device) or not self.check_disk(device):
+                return False
+        
+        if format_disk:
+            with ThreadPoolExecutor(max_workers=len(disks)) as executor:
+                results = list(executor.map(lambda disk: self.format_disk(disk[0], filesystem, profile, self.drive_label(disk[1])), disks))
+            if not all(results):
+                return False
+        
+        for device, mount_point in disks:
+            if not self.mount_disk(device, mount_point, filesystem, options):
+                return False
+        
+        if not self.update_fstab(disks, filesystem, options, by_uuid=format_disk and profile == "performance"):
+            return False
+        
+        for _, mount_point in disks:
+            if not self.check_disk_space(mount_point, min_space_gb) or not self.set_permissions(mount_point):
+                return False
+        
+        self.logger.info(f"{len(disks)} 块磁盘准备成功，挂载点：{'、'.join(mount_point for _, mount_point in disks)}")
+        return True
+    
+    def has_glob(self, devices):
+        """
+        判断设备配置中是否包含通配符
+        """
+        if isinstance(devices, str):
+            devices = [devices]
+        return any(char in device for device in devices or [] for char in self.GLOB_CHARS)
+    
+    def expand_devices(self, devices, available=None):
+        """
+        展开磁盘设备配置中的通配符
+        
+        Args:
+            devices: 设备路径列表或单个路径，可以包含通配符（如/dev/sd[b-m]）
+            available: 节点上的磁盘设备路径列表，用于匹配通配符；为None时匹配本机的设备文件
+        
+        Returns:
+            list: 去重后的设备路径列表，通配符匹配到的设备按名称长度和字母顺序排列（sdb……sdz、sdaa）
+        """
+        if isinstance(devices, str):
+            devices = [devices]
+        expanded = []
+        for pattern in devices or []:
+            if not self.has_glob(pattern):
+                matches = [pattern]
+            elif available is None:
+                matches = glob.glob(pattern)
+            else:
+                matches = fnmatch.filter(available, pattern)
+            for device in sorted(matches, key=lambda name: (len(name), name)):
+                if device not in expanded:
+                    expanded.append(device)
+        return expanded
+    
+    def parallel_mkfs_command(self, disks, filesystem='ext4', profile='default'):
+        """
+        生成在远程节点上并行格式化多块磁盘的shell命令
+        
+        每块磁盘的mkfs在后台执行，输出写入临时目录，全部结束后输出失败磁盘的mkfs输出，
+        任一磁盘失败时命令返回非零退出码。
+        
+        Args:
+            disks: 列表，每个元素为(设备路径, 挂载点)，挂载点用于生成卷标
+            filesystem: 文件系统类型，默认为ext4
+            profile: 格式化配置，default或performance
+        
+        Returns:
+            str: shell命令
+        """
+        lines = ['__mkfs_dir=$(mktemp -d) || exit 1']
+        for index, (device, mount_point) in enumerate(disks):
+            command = self.mkfs_command(device, filesystem, profile, self.drive_label(mount_point))
+            lines.append(f'( {command} ) > "$__mkfs_dir/{index}.log" 2>&1 & __mkfs_{index}=$!')
+        lines.append('__mkfs_rc=0')
+        for index, (device, _) in enumerate(disks):
+            lines.append(
+                f'wait $__mkfs_{index} || {{ __mkfs_rc=1; echo {shlex.quote(f"格式化磁盘 {device} 失败：")} >&2; cat "$__mkfs_dir/{index}.log" >&2; }}'
+            )
+        lines.append('rm -rf "$__mkfs_dir"')
+        lines.append('exit $__mkfs_rc')
+        return "\n".join(lines)
+    
+    def mount_command(self, disks, filesystem='ext4', options='defaults'):
+        """
+        生成在远程节点上依次挂载多块磁盘的shell命令
+        """
+        option = "" if options == "defaults" else f"-t {filesystem} -o {shlex.quote(options)} "
+        return " && ".join(f"mount {option}{shlex.quote(device)} {shlex.quote(mount_point)}" for device, mount_point in disks)
+    
+    def fstab_update_command(self, disks, filesystem='ext4', options='defaults', by_uuid=False):
+        """
+        生成在远程节点上一次写入多块磁盘挂载配置的shell命令（临时文件加重命名替换/etc/fstab）
+        
+        Args:
+            disks: 列表，每个元素为(设备路径, 挂载点)
+            filesystem: 文件系统类型，默认为ext4
+            options: 挂载选项，默认为defaults
+            by_uuid: 是否按文件系统UUID（UUID=）挂载，UUID在节点上通过blkid获取，获取失败时命令失败
+        
+        Returns:
+            str: shell命令
+        """
+        mount_points = " ".join(mount_point for _, mount_point in disks)
+        lookups = []
+        entries = []
+        for index, (device, mount_point) in enumerate(disks):
+            if by_uuid:
+                lookups.append(
+                    f'__uuid_{index}=$(blkid -s UUID -o value {shlex.quote(device)}) && [ -n "$__uuid_{index}" ] || '
+                    f'{{ echo {shlex.quote(f"获取设备 {device} 的文件系统UUID失败")} >&2; exit 1; }}'
+                )
+                entries.append(f'"UUID=$__uuid_{index}"{shlex.quote(f" {mount_point} {filesystem} {options} 0 2")}')
+            else:
+                entries.append(shlex.quote(f"{device} {mount_point} {filesystem} {options} 0 2"))
+        # 同一挂载点原有的配置被新配置替换，注释行原样保留
+        keep = "BEGIN { n = split(mps, a, \" \"); for (i = 1; i <= n; i++) m[a[i]] = 1 } /^[[:space:]]*#/ || !($2 in m)"
+        return "\n".join(lookups + [(
+            '__fstab_tmp=$(mktemp /etc/fstab.XXXXXX) && '
+            f'{{ awk -v mps={shlex.quote(mount_points)} {shlex.quote(keep)} /etc/fstab 2>/dev/null; printf \'%s\\n\' {" ".join(entries)}; }} > "$__fstab_tmp" && '
+            'chmod 644 "$__fstab_tmp" && mv -f "$__fstab_tmp" /etc/fstab'
+        )])
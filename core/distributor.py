@@ -0,0 +1,270 @@
+import shlex
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from core.artifact_cache import ArtifactCache
+from core.logger import Logger
+from core.remote import RemoteExecutor
+
+class BinaryDistributor:
+    """
+    集群二进制文件分发器（树形接力）
+    
+    控制机只把文件上传到少量种子节点，之后每一轮由已持有文件的节点通过节点间的scp
+    把文件转发给尚未持有的节点，持有者数量逐轮翻倍。控制机的出口流量为O(种子数)，
+    总耗时约为O(log N)次传输。每一跳都在目标节点上校验sha256，接力失败的节点回退为
+    由控制机直接上传。
+    
+    节点间的scp使用一次性密钥：分发开始前每个节点生成本次分发专用的密钥对，公钥加入所有
+    节点的authorized_keys，分发结束后删除密钥和这些公钥。节点之间需要能够访问彼此的SSH端口。
+    """
+    
+    # 控制机直接上传的并发数上限（未使用异步执行引擎时）
+    MAX_UPLOAD_WORKERS = 16
+    
+    def __init__(self, remote_executor=None, async_executor=None, logger=None, fanout=2, fallback_direct=True, relay_timeout=600):
+        self.logger = logger or Logger().get_logger()
+        self.remote_executor = remote_executor or RemoteExecutor(logger=self.logger)
+        self.async_executor = async_executor
+        self.fanout = max(1, fanout)
+        self.fallback_direct = fallback_direct
+        self.relay_timeout = relay_timeout
+        self.last_stats = {}
+    
+    def _upload(self, local_path, remote_path, node, checksum, mode):
+        """
+        由控制机直接上传文件到节点（上传后校验sha256）
+        """
+        return self.remote_executor.upload_file(
+            local_path, remote_path, node["host"], node["port"], node["username"], node["ssh_key"], node["password"],
+            checksum=checksum, mode=mode
+        )
+    
+    def _upload_many(self, local_path, remote_path, nodes, checksum, mode):
+        """
+        由控制机并发上传文件到多个节点
+        
+        Returns:
+            list: 与nodes顺序一致的上传结果
+        """
+        if not nodes:
+            return []
+        limit = self.async_executor.max_concurrency if self.async_executor is not None else self.MAX_UPLOAD_WORKERS
+        with ThreadPoolExecutor(max_workers=min(len(nodes), limit)) as executor:
+            return list(executor.map(lambda node: self._upload(local_path, remote_path, node, checksum, mode), nodes))
+    
+    def _run_parallel(self, tasks):
+        """
+        并行执行远程命令，优先使用异步执行引擎
+        """
+        if self.async_executor is not None:
+            return self.async_executor.execute_parallel(tasks)
+        return self.remote_executor.execute_parallel(tasks)
+    
+    def _key_file(self, token):
+        return f'"$HOME/.ssh/minio-relay-{token}"'
+    
+    def _keygen_command(self, token):
+        """
+        构造在节点上生成本次分发专用密钥对的命令，输出公钥
+        """
+        key_file = self._key_file(token)
+        return (
+            f'umask 077 && mkdir -p "$HOME/.ssh" && rm -f {key_file} {key_file}.pub && '
+            f"ssh-keygen -q -t ed25519 -N '' -C minio-deploy-relay-{token} -f {key_file} && cat {key_file}.pub"
+        )
+    
+    def _authorize_command(self, public_keys):
+        """
+        构造把所有节点的一次性公钥加入authorized_keys的命令
+        """
+        lines = "".join(f"{key}\n" for key in public_keys)
+        return f'umask 077 && printf {shlex.quote(lines)} >> "$HOME/.ssh/authorized_keys"'
+    
+    def _revoke_command(self, token):
+        """
+        构造删除一次性密钥和对应公钥的命令
+        """
+        key_file = self._key_file(token)
+        return (
+            f'rm -f {key_file} {key_file}.pub; '
+            f'if [ -f "$HOME/.ssh/authorized_keys" ]; then sed -i "/ minio-deploy-relay-{token}$/d" "$HOME/.ssh/authorized_keys"; fi; exit 0'
+        )
+    
+    def _setup_trust(self, token, nodes):
+        """
+        为节点间接力建立一次性的SSH互信
+        
+        Returns:
+            set: 密钥生成和公钥授权都成功的节点主机集合
+        """
+        public_keys = {}
+        for item in self._run_parallel([self._task(node, self._keygen_command(token), target=node) for node in nodes]):
+            public_key = item["result"][1].strip()
+            if item["result"][0] == 0 and public_key.endswith(f"minio-deploy-relay-{token}"):
+                public_keys[item["task"]["target"]["host"]] = public_key
+            else:
+                self.logger.warning(f"节点 {item['task']['host']} 生成接力密钥失败：{item['result'][2]}")
+        if not public_keys:
+            return set()
+        
+        trusted = set()
+        command = self._authorize_command(list(public_keys.values()))
+        for item in self._run_parallel([self._task(node, command, target=node) for node in nodes if node["host"] in public_keys]):
+            if item["result"][0] == 0:
+                trusted.add(item["task"]["target"]["host"])
+            else:
+                self.logger.warning(f"节点 {item['task']['host']} 授权接力密钥失败：{item['result'][2]}")
+        return trusted
+    
+    def _relay_command(self, remote_path, target, token):
+        """
+        构造在持有者节点上执行的scp接力命令（非交互，使用本次分发的一次性密钥）
+        """
+        return (
+            f"scp -q -i {self._key_file(token)} -o IdentitiesOnly=yes -o BatchMode=yes -o StrictHostKeyChecking=no "
+            f"-o UserKnownHostsFile=/dev/null -o ConnectTimeout=10 -P {int(target['port'])} "
+            f"{shlex.quote(remote_path)} {shlex.quote(target['username'] + '@' + target['host'] + ':' + remote_path + '.part')}"
+        )
+    
+    def _verify_command(self, remote_path, checksum, mode):
+        """
+        构造在目标节点上执行的校验命令：sha256一致时设置权限并原子替换目标文件，否则删除临时文件
+        """
+        part_path = shlex.quote(f"{remote_path}.part")
+        return (
+            f"if echo {shlex.quote(checksum + '  ' + remote_path + '.part')} | sha256sum -c --status; then "
+            f"chmod {mode:o} {part_path} && mv -f {part_path} {shlex.quote(remote_path)}; "
+            f"else rm -f {part_path}; echo 'sha256校验失败' >&2; exit 1; fi"
+        )
+    
+    def _task(self, node, command, **extra):
+        """
+        根据节点SSH参数构造并行执行任务
+        """
+        task = {
+            "host": node["host"],
+            "port": node["port"],
+            "username": node["username"],
+            "key_file": node["ssh_key"],
+            "password": node["password"],
+            "command": command,
+            "timeout": self.relay_timeout
+        }
+        task.update(extra)
+        return task
+    
+    def distribute(self, local_path, remote_path, nodes, mode=0o755):
+        """
+        把本地文件分发到所有节点
+        
+        Args:
+            local_path: 控制机上的本地文件路径
+            remote_path: 节点上的目标路径
+            nodes: 节点SSH参数列表，每个元素为get_ssh_params返回的字典
+            mode: 目标文件权限，默认为0o755
+        
+        Returns:
+            dict: 主机到分发结果(bool)的映射
+        """
+        results = {}
+        if not nodes:
+            return results
+        
+        start = time.monotonic()
+        checksum = ArtifactCache.file_sha256(local_path)
+        self.logger.info(f"开始树形分发文件 {local_path} -> {remote_path}，节点数：{len(nodes)}，种子数：{min(self.fanout, len(nodes))}，sha256：{checksum}")
+        
+        # 节点间接力使用的一次性密钥，未能建立互信的节点不参与接力
+        token = uuid.uuid4().hex[:12]
+        trusted = self._setup_trust(token, nodes) if len(nodes) > self.fanout else set()
+        try:
+            # 第0轮：控制机上传到种子节点
+            seeds = nodes[:self.fanout]
+            pending = [node for node in nodes[self.fanout:] if node["host"] in trusted]
+            relay_failed = [node for node in nodes[self.fanout:] if node["host"] not in trusted]
+            holders = []
+            direct_uploads = len(seeds)
+            for node, ok in zip(seeds, self._upload_many(local_path, remote_path, seeds, checksum, mode)):
+                results[node["host"]] = ok
+                if ok and node["host"] in trusted:
+                    holders.append(node)
+                elif not ok:
+                    self.logger.warning(f"种子节点 {node['host']} 上传失败")
+            
+            # 后续每一轮：每个持有者向一个待分发节点接力，持有者数量逐轮翻倍
+            rounds = 0
+            relayed = 0
+            attempted = len(pending)
+            while pending and holders:
+                rounds += 1
+                pairs = list(zip(holders, pending))
+                pending = pending[len(pairs):]
+                self.logger.info(f"第 {rounds} 轮接力分发：{len(pairs)} 个节点，剩余 {len(pending)} 个")
+                
+                relay_results = self._run_parallel([
+                    self._task(source, self._relay_command(remote_path, target, token), target=target)
+                    for source, target in pairs
+                ])
+                
+                copied = []
+                for item in relay_results:
+                    target = item["task"]["target"]
+                    if item["result"][0] == 0:
+                        copied.append(target)
+                    else:
+                        self.logger.warning(f"节点 {item['task']['host']} 向节点 {target['host']} 接力失败：{item['result'][2]}")
+                        relay_failed.append(target)
+                
+                # 每一跳都在目标节点上校验sha256
+                verify_results = self._run_parallel([
+                    self._task(target, self._verify_command(remote_path, checksum, mode), target=target)
+                    for target in copied
+                ]) if copied else []
+                
+                for item in verify_results:
+                    target = item["task"]["target"]
+                    if item["result"][0] == 0:
+                        results[target["host"]] = True
+                        holders.append(target)
+                        relayed += 1
+                    else:
+                        self.logger.warning(f"节点 {target['host']} 接力文件校验失败：{item['result'][2]}")
+                        relay_failed.append(target)
+        finally:
+            if trusted:
+                self._run_parallel([self._task(node, self._revoke_command(token)) for node in nodes if node["host"] in trusted])
+        
+        # 一个节点都没有接力成功时大声报错，说明原因，而不是静默地全部回退为直接上传
+        if len(nodes) > self.fanout and not any(results.get(node["host"]) for node in nodes[self.fanout:]):
+            if not trusted:
+                self.logger.error("无法在节点上建立接力使用的一次性SSH密钥（需要ssh-keygen），节点间接力未能进行")
+            elif rounds:
+                self.logger.error(f"节点间接力全部失败：节点之间需要能够通过SSH端口互相访问（scp），共 {attempted} 个节点未能接力")
+        
+        # 种子全部失败时剩余节点无法接力，与接力失败的节点一起回退为直接上传
+        relay_failed.extend(pending)
+        if relay_failed:
+            if self.fallback_direct:
+                self.logger.info(f"{len(relay_failed)} 个节点接力失败，回退为由控制机直接上传")
+                direct_uploads += len(relay_failed)
+                for node, ok in zip(relay_failed, self._upload_many(local_path, remote_path, relay_failed, checksum, mode)):
+                    results[node["host"]] = ok
+            else:
+                for node in relay_failed:
+                    results[node["host"]] = False
+        
+        failed = [host for host, ok in results.items() if not ok]
+        self.last_stats = {
+            "nodes": len(nodes),
+            "rounds": rounds,
+            "direct_uploads": direct_uploads,
+            "relayed": relayed,
+            "failed": len(failed),
+            "seconds": time.monotonic() - start
+        }
+        self.logger.info(
+            f"树形分发完成：{remote_path}，接力 {rounds} 轮，控制机直接上传 {direct_uploads} 次，"
+            f"节点间接力 {self.last_stats['relayed']} 次，失败 {len(failed)} 个，耗时 {self.last_stats['seconds']:.2f} 秒"
+        )
+        return results
@@ -0,0 +1,247 @@
+import json
+import shlex
+import statistics
+import subprocess
+import sys
+import time
+from core.logger import Logger
+from core.profiler import Profiler
+
+class DriveBenchmark:
+    """
+    数据盘预检
+    
+    在MinIO启动前对每个数据目录做一次简短的读写测试：1MiB块的顺序写和顺序读吞吐量，
+    以及4KiB块的随机读写IOPS和p99延迟。测试使用O_DIRECT和按页对齐的缓冲区，绕过页缓存，
+    测到的是磁盘本身的性能。同一节点的所有磁盘同时测试，所有节点并行测试。
+    
+    纠删集中一块慢盘会拖慢整个集合，因此每块磁盘与本节点所有磁盘的中位数比较，
+    低于中位数min_ratio倍（延迟高于中位数1/min_ratio倍）的磁盘被标记；action为reject时拒绝启动MinIO。
+    """
+    
+    # 在节点上执行的测试脚本：参数依次为测试文件大小（MiB）、随机读写次数和数据目录列表，输出JSON
+    SCRIPT = r"""
+import json, mmap, os, random, sys, threading, time
+size_mb, random_ops, paths = int(sys.argv[1]), int(sys.argv[2]), sys.argv[3:]
+MB, BLOCK = 1 << 20, 4096
+
+def p99(latencies):
+    latencies.sort()
+    return latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+
+def random_io(fd, buffer, blocks, write):
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(random_ops):
+        offset = random.randrange(blocks) * BLOCK
+        began = time.perf_counter()
+        if write:
+            os.pwritev(fd, [buffer], offset)
+        else:
+            os.preadv(fd, [buffer], offset)
+        latencies.append(time.perf_counter() - began)
+    return random_ops / (time.perf_counter() - start), p99(latencies)
+
+def check(path, result):
+    name = os.path.join(path, ".minio-deploy-drive-check")
+    # mmap分配的缓冲区按页对齐，满足O_DIRECT的对齐要求；写入随机数据避免被压缩或去重
+    buffer = mmap.mmap(-1, MB)
+    buffer.write(os.urandom(MB))
+    small = mmap.mmap(-1, BLOCK)
+    small.write(os.urandom(BLOCK))
+    try:
+        fd = os.open(name, os.O_CREAT | os.O_WRONLY | os.O_TRUNC | os.O_DIRECT, 0o600)
+        try:
+            start = time.perf_counter()
+            for _ in range(size_mb):
+                os.write(fd, buffer)
+            os.fsync(fd)
+            result["seq_write"] = size_mb / (time.perf_counter() - start)
+        finally:
+            os.close(fd)
+        
+        fd = os.open(name, os.O_RDONLY | os.O_DIRECT)
+        try:
+            start = time.perf_counter()
+            while os.readv(fd, [buffer]) == MB:
+                pass
+            result["seq_read"] = size_mb / (time.perf_counter() - start)
+            result["rand_read"], result["rand_read_p99"] = random_io(fd, small, size_mb * MB // BLOCK, False)
+        finally:
+            os.close(fd)
+        
+        fd = os.open(name, os.O_WRONLY | os.O_DIRECT | os.O_DSYNC)
+        try:
+            result["rand_write"], result["rand_write_p99"] = random_io(fd, small, size_mb * MB // BLOCK, True)
+        finally:
+            os.close(fd)
+    except OSError as e:
+        result["error"] = e.strerror or str(e)
+    finally:
+        try:
+            os.unlink(name)
+        except OSError:
+            pass
+
+results = [{"path": path} for path in paths]
+threads = [threading.Thread(target=check, args=(path, result)) for path, result in zip(paths, results)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+print(json.dumps(results))
+"""
+    
+    # 吞吐量类指标（越大越好）和延迟类指标（越小越好），以及报告中的列名
+    THROUGHPUT_METRICS = (("seq_write", "顺序写MB/s"), ("seq_read", "顺序读MB/s"), ("rand_read", "随机读IOPS"), ("rand_write", "随机写IOPS"))
+    LATENCY_METRICS = (("rand_read_p99", "读p99(ms)"), ("rand_write_p99", "写p99(ms)"))
+    
+    def __init__(self, async_executor=None, logger=None, enabled=False, size_mb=256, random_ops=2000, min_ratio=0.5, action="warn",
+                 timeout=600, profiler=None):
+        """
+        Args:
+            async_executor: 异步远程执行器
+            logger: 日志记录器
+            enabled: 是否启用数据盘预检
+            size_mb: 每块磁盘的测试文件大小（MiB）
+            random_ops: 随机读和随机写各自的次数
+            min_ratio: 低于本节点中位数的多少倍时标记该磁盘
+            action: 有磁盘被标记时的处理方式，warn（只输出警告）或reject（拒绝启动MinIO）
+            timeout: 每个节点测试的超时时间（秒）
+            profiler: 耗时分析器
+        """
+        self.async_executor = async_executor
+        self.logger = logger or Logger().get_logger()
+        self.profiler = profiler or Profiler(logger=self.logger)
+        self.enabled = enabled
+        self.size_mb = size_mb
+        self.random_ops = random_ops
+        self.min_ratio = min_ratio
+        self.action = action
+        self.timeout = timeout
+    
+    def command(self, paths, python="python3"):
+        """
+        生成在节点上测试指定数据目录的命令
+        """
+        return f"{python} -c {shlex.quote(self.SCRIPT)} {self.size_mb} {self.random_ops} {' '.join(shlex.quote(path) for path in paths)}"
+    
+    def _parse(self, paths, exit_code, stdout, stderr):
+        """
+        解析测试脚本的输出，脚本执行失败时每块磁盘都记录同一个错误
+        """
+        if exit_code == 0:
+            try:
+                return json.loads(stdout.strip().splitlines()[-1])
+            except (ValueError, IndexError):
+                stderr = f"无法解析测试结果：{stdout.strip()[:200]}"
+        if exit_code == 127:
+            stderr = "节点上没有python3，无法测试"
+        return [{"path": path, "error": stderr.strip() or f"退出码 {exit_code}"} for path in paths]
+    
+    def run(self, targets):
+        """
+        并行测试所有节点的数据目录
+        
+        Args:
+            targets: 列表，每个元素为(SSH连接参数, 数据目录列表)，SSH连接参数包含host, port, username, ssh_key, password
+        
+        Returns:
+            dict: 主机到测试结果列表的映射，每个结果包含path和各项指标，失败时包含error
+        """
+        tasks = [
+            {
+                "host": ssh_params["host"],
+                "port": ssh_params["port"],
+                "username": ssh_params["username"],
+                "key_file": ssh_params["ssh_key"],
+                "password": ssh_params["password"],
+                "command": self.command(paths),
+                "timeout": self.timeout
+            }
+            for ssh_params, paths in targets
+        ]
+        
+        start = time.monotonic()
+        with self.profiler.span("drive_check", "exec", hosts=len(targets)):
+            outcomes = self.async_executor.execute_parallel(tasks)
+        
+        results = {}
+        for (ssh_params, paths), outcome in zip(targets, outcomes):
+            exit_code, stdout, stderr = outcome["result"]
+            results[ssh_params["host"]] = self._parse(paths, exit_code, stdout, stderr)
+        self.logger.info(f"数据盘预检完成：{len(targets)} 个节点，耗时 {time.monotonic() - start:.2f} 秒")
+        return results
+    
+    def run_local(self, paths):
+        """
+        测试本机的数据目录（使用当前的Python解释器）
+        
+        Returns:
+            dict: {"localhost": 测试结果列表}
+        """
+        try:
+            result = subprocess.run(
+                [sys.executable, "-c", self.SCRIPT, str(self.size_mb), str(self.random_ops)] + list(paths),
+                capture_output=True, text=True, timeout=self.timeout
+            )
+            return {"localhost": self._parse(paths, result.returncode, result.stdout, result.stderr)}
+        except subprocess.TimeoutExpired:
+            return {"localhost": [{"path": path, "error": f"测试超时（{self.timeout}秒）"} for path in paths]}
+    
+    def evaluate(self, results):
+        """
+        与本节点的中位数比较标记慢盘，并输出每块磁盘的测试结果表
+        
+        Args:
+            results: run或run_local的返回值
+        
+        Returns:
+            bool: True表示没有被拒绝的磁盘（action为warn时总是True）
+        """
+        flagged = []
+        rows = []
+        for host, drives in results.items():
+            measured = [drive for drive in drives if "error" not in drive]
+            medians = {
+                metric: statistics.median(drive[metric] for drive in measured)
+                for metric, _ in self.THROUGHPUT_METRICS + self.LATENCY_METRICS
+            } if measured else {}
+            
+            for drive in drives:
+                if "error" in drive:
+                    reasons = [f"测试失败：{drive['error']}"]
+                else:
+                    reasons = [
+                        f"{title} {drive[metric]:.0f}，低于中位数 {medians[metric]:.0f} 的 {self.min_ratio:g} 倍"
+                        for metric, title in self.THROUGHPUT_METRICS if drive[metric] < medians[metric] * self.min_ratio
+                    ] + [
+                        f"{title} {drive[metric]:.2f}，高于中位数 {medians[metric]:.2f} 的 {1 / self.min_ratio:g} 倍"
+                        for metric, title in self.LATENCY_METRICS if self.min_ratio > 0 and drive[metric] > medians[metric] / self.min_ratio
+                    ]
+                rows.append((host, drive, reasons))
+                if reasons:
+                    flagged.append((host, drive["path"], reasons))
+        
+        columns = self.THROUGHPUT_METRICS + self.LATENCY_METRICS
+        self.logger.info("数据盘预检结果：")
+        self.logger.info(f"  {'节点':<20}  {'数据目录':<20}  " + "  ".join(f"{title:>12}" for _, title in columns) + "  状态")
+        for host, drive, reasons in rows:
+            values = "  ".join(f"{drive[metric]:>12.1f}" if metric in drive else f"{'-':>12}" for metric, _ in columns)
+            self.logger.info(f"  {host:<20}  {drive['path']:<20}  {values}  {'异常' if reasons else '正常'}")
+        
+        if not flagged:
+            self.logger.info("所有数据盘的性能都在本节点中位数的正常范围内")
+            return True
+        
+        for host, path, reasons in flagged:
+            message = f"节点 {host} 的数据目录 {path} 性能异常：{'；'.join(reasons)}"
+            if self.action == "reject":
+                self.logger.error(message)
+            else:
+                self.logger.warning(message)
+        
+        if self.action == "reject":
+            self.logger.error(f"{len(flagged)} 块数据盘未通过预检，拒绝启动MinIO（advanced.drive_check.action为reject）")
+            return False
+        return True
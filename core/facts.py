@@ -0,0 +1,284 @@
+import json
+import os
+import shlex
+import threading
+import time
+from core.logger import Logger
+from core.remote import RemoteExecutor
+
+class HostFacts:
+    """
+    单个节点的主机信息快照
+    
+    由一次远程脚本调用收集，包括系统架构、内核版本、块设备、挂载点、防火墙类型、
+    systemd状态以及minio/mc的路径、版本和sha256。后续各阶段只读取该对象，
+    修改节点状态的步骤完成后需要调用FactGatherer.invalidate使其失效。
+    """
+    
+    # 操作系统所在的挂载点
+    OS_MOUNT_POINTS = ("/", "/boot", "/boot/efi")
+    
+    def __init__(self, host, port=22):
+        self.host = host
+        self.port = port
+        self.arch = ""
+        self.kernel = ""
+        # 块设备列表，每个元素为{"name", "size", "type", "mountpoint"}，name为完整设备路径
+        self.block_devices = []
+        # 挂载列表，每个元素为{"device", "mount_point", "filesystem"}
+        self.mounts = []
+        # 防火墙类型：firewalld、ufw、iptables或none
+        self.firewall = "none"
+        self.systemd = False
+        self.minio_service_exists = False
+        self.minio_service_state = "unknown"
+        # 二进制信息，键为minio、mc，值为{"path", "version", "sha256"}，未安装时没有对应的键
+        self.binaries = {}
+        # 探测的路径到其真实路径的映射，路径不存在时值为None
+        self.paths = {}
+        self.gathered_at = 0.0
+        self.seconds = 0.0
+    
+    @property
+    def url_arch(self):
+        """
+        MinIO下载地址中使用的架构名称，如amd64、arm64
+        """
+        return {"x86_64": "amd64", "aarch64": "arm64"}.get(self.arch, self.arch or "amd64")
+    
+    @property
+    def minio_service_running(self):
+        return self.minio_service_state == "active"
+    
+    def has_binary(self, name):
+        """
+        判断节点上是否已安装指定的二进制文件
+        """
+        return name in self.binaries
+    
+    def path_exists(self, path):
+        """
+        判断节点上的路径是否存在（路径需在收集时探测过）
+        """
+        return self.paths.get(path) is not None
+    
+    def is_os_device(self, device):
+        """
+        判断设备（或其分区）是否挂载在操作系统所在的挂载点上
+        
+        Args:
+            device: 设备路径，如/dev/sdb
+        
+        Returns:
+            bool: True表示是操作系统分区
+        """
+        candidates = {device, self.paths.get(device) or device}
+        for mount in self.mounts:
+            if mount["mount_point"] not in self.OS_MOUNT_POINTS:
+                continue
+            for candidate in candidates:
+                if mount["device"] == candidate or (mount["device"].startswith(candidate) and mount["device"][len(candidate):].lstrip("p").isdigit()):
+                    return True
+        return False
+    
+    def to_dict(self):
+        """
+        转换为可JSON序列化的字典
+        """
+        return dict(self.__dict__)
+
+class FactGatherer:
+    """
+    节点主机信息收集器
+    
+    每个节点只通过一次远程脚本调用收集全部信息，结果按host:port缓存。
+    同一节点的并发请求只会触发一次收集，修改节点状态后通过invalidate使缓存失效。
+    """
+    
+    # 收集脚本的输出按"@@段名"分段
+    SECTION_MARKER = "@@"
+    
+    SCRIPT = """
+echo '@@arch'; uname -m
+echo '@@kernel'; uname -r
+echo '@@block'; lsblk -b -p -P -o NAME,SIZE,TYPE,MOUNTPOINT 2>/dev/null
+echo '@@mounts'; cat /proc/mounts
+echo '@@firewall'
+if command -v firewall-cmd >/dev/null 2>&1 && systemctl is-active --quiet firewalld 2>/dev/null; then echo firewalld
+elif command -v ufw >/dev/null 2>&1 && ufw status 2>/dev/null | grep -q 'Status: active'; then echo ufw
+elif command -v iptables >/dev/null 2>&1; then echo iptables
+else echo none; fi
+echo '@@systemd'; [ -d /run/systemd/system ] && echo yes || echo no
+echo '@@minio_unit'; { systemctl list-unit-files --type service 2>/dev/null | grep -q minio || [ -f /etc/systemd/system/minio.service ]; } && echo yes || echo no
+echo '@@minio_state'; systemctl is-active minio 2>/dev/null || true
+for b in minio mc; do
+  echo "@@bin_$b"
+  p=$(command -v $b 2>/dev/null || { [ -f /usr/local/bin/$b ] && echo /usr/local/bin/$b; })
+  if [ -n "$p" ]; then echo "$p"; sha256sum "$p" 2>/dev/null | cut -d' ' -f1; "$p" --version 2>/dev/null | head -n 1; fi
+done
+echo '@@paths'
+for p in {paths}; do r=$(readlink -f "$p" 2>/dev/null); if [ -e "$p" ]; then echo "$p $r"; fi; done
+"""
+    
+    def __init__(self, remote_executor=None, logger=None, timeout=60):
+        self.logger = logger or Logger().get_logger()
+        self.remote_executor = remote_executor or RemoteExecutor(logger=self.logger)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._facts = {}
+        self.stats = {"gathered": 0, "hits": 0, "invalidated": 0}
+    
+    def _key(self, ssh_params):
+        return f"{ssh_params['host']}:{ssh_params['port']}"
+    
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+    
+    def gather(self, ssh_params, paths=(), refresh=False):
+        """
+        获取节点的主机信息，缓存命中时不访问节点
+        
+        Args:
+            ssh_params: SSH连接参数，包含host, port, username, ssh_key, password
+            paths: 需要额外探测是否存在的路径（如磁盘设备），缓存中未探测过时重新收集
+            refresh: 是否忽略缓存重新收集
+        
+        Returns:
+            HostFacts: 主机信息，收集失败时返回None
+        """
+        key = self._key(ssh_params)
+        paths = [path for path in paths if path]
+        with self._key_lock(key):
+            facts = self._facts.get(key)
+            if facts is not None and not refresh and all(path in facts.paths for path in paths):
+                self.stats["hits"] += 1
+                return facts
+            
+            # 重新收集时保留之前探测过的路径
+            probe_paths = sorted(set(paths) | set(facts.paths if facts is not None else []))
+            facts = self._collect(ssh_params, probe_paths)
+            if facts is not None:
+                self._facts[key] = facts
+            return facts
+    
+    def invalidate(self, ssh_params=None):
+        """
+        使节点的缓存失效，在修改节点状态的步骤（安装、挂载磁盘、配置服务等）之后调用
+        
+        Args:
+            ssh_params: SSH连接参数，为None时使全部缓存失效
+        """
+        with self._lock:
+            if ssh_params is None:
+                self.stats["invalidated"] += len(self._facts)
+                self._facts.clear()
+            elif self._facts.pop(self._key(ssh_params), None) is not None:
+                self.stats["invalidated"] += 1
+    
+    def _collect(self, ssh_params, paths):
+        """
+        通过一次远程调用执行收集脚本并解析结果
+        """
+        start = time.monotonic()
+        script = self.SCRIPT.replace("{paths}", " ".join(shlex.quote(path) for path in paths) or "''")
+        exit_code, stdout, stderr = self.remote_executor.execute_command(
+            ssh_params["host"], script, ssh_params["port"], ssh_params["username"], ssh_params["ssh_key"], ssh_params["password"],
+            timeout=self.timeout
+        )
+        if "@@arch" not in stdout:
+            self.logger.error(f"收集节点 {ssh_params['host']} 的主机信息失败：{stderr}")
+            return None
+        
+        facts = self._parse(ssh_params, stdout, paths)
+        facts.gathered_at = time.time()
+        facts.seconds = time.monotonic() - start
+        self.stats["gathered"] += 1
+        self.logger.info(
+            f"节点 {facts.host} 主机信息：架构 {facts.arch}，内核 {facts.kernel}，防火墙 {facts.firewall}，"
+            f"MinIO {facts.binaries.get('minio', {}).get('version') or '未安装'}，服务状态 {facts.minio_service_state}，"
+            f"耗时 {facts.seconds:.2f} 秒"
+        )
+        return facts
+    
+    def _parse(self, ssh_params, output, paths):
+        """
+        解析收集脚本的分段输出
+        """
+        sections = {}
+        current = None
+        for line in output.splitlines():
+            if line.startswith(self.SECTION_MARKER):
+                current = line[len(self.SECTION_MARKER):].strip()
+                sections[current] = []
+            elif current is not None:
+                sections[current].append(line.rstrip())
+        
+        def first(name):
+            lines = [line for line in sections.get(name, []) if line.strip()]
+            return lines[0].strip() if lines else ""
+        
+        facts = HostFacts(ssh_params["host"], ssh_params["port"])
+        facts.arch = first("arch")
+        facts.kernel = first("kernel")
+        
+        for line in sections.get("block", []):
+            fields = dict(item.split("=", 1) for item in shlex.split(line) if "=" in item)
+            if fields.get("NAME"):
+                facts.block_devices.append({
+                    "name": fields["NAME"],
+                    "size": int(fields["SIZE"]) if fields.get("SIZE", "").isdigit() else 0,
+                    "type": fields.get("TYPE", ""),
+                    "mountpoint": fields.get("MOUNTPOINT", "")
+                })
+        
+        for line in sections.get("mounts", []):
+            fields = line.split()
+            if len(fields) >= 3:
+                facts.mounts.append({"device": fields[0], "mount_point": fields[1], "filesystem": fields[2]})
+        
+        facts.firewall = first("firewall") or "none"
+        facts.systemd = first("systemd") == "yes"
+        facts.minio_service_exists = first("minio_unit") == "yes"
+        facts.minio_service_state = first("minio_state") or "unknown"
+        
+        for name in ("minio", "mc"):
+            lines = [line.strip() for line in sections.get(f"bin_{name}", []) if line.strip()]
+            if lines:
+                facts.binaries[name] = {
+                    "path": lines[0],
+                    "sha256": lines[1] if len(lines) > 1 else "",
+                    "version": lines[2] if len(lines) > 2 else ""
+                }
+        
+        facts.paths = {path: None for path in paths}
+        for line in sections.get("paths", []):
+            path, _, real_path = line.strip().partition(" ")
+            if path in facts.paths:
+                facts.paths[path] = real_path or path
+        
+        return facts
+    
+    def save(self, path):
+        """
+        把已收集的主机信息快照写入JSON文件
+        
+        Args:
+            path: 快照文件路径
+        """
+        with self._lock:
+            snapshot = {key: facts.to_dict() for key, facts in self._facts.items()}
+        if not snapshot:
+            return
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temp_path = f"{path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, indent=2, ensure_ascii=False)
+            os.replace(temp_path, path)
+            self.logger.debug(f"主机信息快照已写入：{path}")
+        except Exception as e:
+            self.logger.warning(f"写入主机信息快照失败：{path}，错误：{e}")
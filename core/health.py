@@ -1,49 +1,40 @@
 import subprocess
-import requests
-import socket
+import time
 from core.logger import Logger
+from core.async_health import AsyncHealthProber
+from core.s3_client import S3AdminClient
 
 class HealthChecker:
     def __init__(self, logger=None):
         self.logger = logger or Logger().get_logger()
+        self.prober = AsyncHealthProber(logger=self.logger)
+        # 存储桶操作使用的S3区域和并发数
+        self.region = "us-east-1"
+        self.s3_concurrency = 8
     
     def check_port_listening(self, host, port, timeout=5, retry_count=5, retry_delay=5):
         """
-        检查指定端口是否监听（带重试机制）
+        检查指定端口是否监听（失败后按指数退避重试）
         
         Args:
             host: 主机IP或域名
             port: 端口号
             timeout: 超时时间，默认为5秒
-            retry_count: 重试次数，默认为3次
-            retry_delay: 重试间隔时间，默认为2秒
+            retry_count: 重试次数，默认为5次
+            retry_delay: 重试间隔时间，默认为5秒，与重试次数一起决定最长等待时间
         
         Returns:
             bool: True表示端口正在监听，False表示未监听
         """
-        import time
+        deadline = timeout + (retry_count - 1) * retry_delay
+        self.logger.info(f"检查端口 {host}:{port} 是否监听（最长等待 {deadline} 秒）...")
         
-        for attempt in range(retry_count):
-            self.logger.info(f"检查端口 {host}:{port} 是否监听（第 {attempt + 1}/{retry_count} 次）...")
-            
-            try:
-                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                    s.settimeout(timeout)
-                    result = s.connect_ex((host, port))
-                    if result == 0:
-                        self.logger.info(f"端口 {host}:{port} 正在监听")
-                        return True
-                    else:
-                        self.logger.warning(f"端口 {host}:{port} 未监听（第 {attempt + 1}/{retry_count} 次）")
-            except Exception as e:
-                self.logger.error(f"检查端口 {host}:{port} 失败（第 {attempt + 1}/{retry_count} 次）：{e}")
-            
-            # 如果不是最后一次尝试，等待一段时间后重试
-            if attempt < retry_count - 1:
-                self.logger.info(f"等待 {retry_delay} 秒后重试...")
-                time.sleep(retry_delay)
+        outcome = self.prober.probe([host], port, endpoints=(), deadline=deadline)[host]["api_port"]
+        if outcome["ok"]:
+            self.logger.info(f"端口 {host}:{port} 正在监听")
+            return True
         
-        self.logger.warning(f"端口 {host}:{port} 未监听（已重试 {retry_count} 次）")
+        self.logger.warning(f"端口 {host}:{port} 未监听（已尝试 {outcome['attempts']} 次）：{outcome['detail']}")
         return False
     
     def check_service_running(self, service_name="minio"):
@@ -74,9 +65,9 @@ class HealthChecker:
             self.logger.error(f"检查服务 {service_name} 状态失败：{e}")
             return False
     
-    def check_health_api(self, host, port=9000, secure=False, credentials=None, timeout=5, retry_count=5, retry_delay=5):
+    def check_health_api(self, host, port=9000, secure=False, credentials=None, timeout=5, retry_count=5, retry_delay=5, endpoint="live"):
         """
-        调用MinIO健康检查API（带重试机制）
+        调用MinIO健康检查API（失败后按指数退避重试）
         
         Args:
             host: 主机IP或域名
@@ -85,39 +76,25 @@ class HealthChecker:
             credentials: 认证信息（可选，健康检查API通常不需要认证）
             timeout: 超时时间，默认为5秒
             retry_count: 重试次数，默认为5次
-            retry_delay: 重试间隔时间，默认为5秒
+            retry_delay: 重试间隔时间，默认为5秒，与重试次数一起决定最长等待时间
+            endpoint: 健康检查接口，live（节点存活）、ready（节点就绪）或cluster（集群满足写法定数量），默认为live
         
         Returns:
-            tuple: (status, response)，status为True表示健康检查通过，response为响应内容
+            tuple: (status, response)，status为True表示健康检查通过，response为响应状态
         """
-        import time
-        
         protocol = "https" if secure else "http"
-        url = f"{protocol}://{host}:{port}/minio/health/live"
-        
-        for attempt in range(retry_count):
-            self.logger.info(f"调用健康检查API：{url}（第 {attempt + 1}/{retry_count} 次）")
-            
-            try:
-                # 健康检查API通常不需要认证，移除认证参数
-                response = requests.get(url, timeout=timeout, verify=False)  # verify=False用于自签名证书
-                
-                if response.status_code == 200:
-                    self.logger.info(f"健康检查API调用成功，状态码：{response.status_code}")
-                    return (True, response.text)
-                else:
-                    self.logger.warning(f"健康检查API调用失败（第 {attempt + 1}/{retry_count} 次），状态码：{response.status_code}，响应：{response.text}")
-                    
-            except Exception as e:
-                self.logger.error(f"健康检查API调用失败（第 {attempt + 1}/{retry_count} 次）：{e}")
-            
-            # 如果不是最后一次尝试，等待一段时间后重试
-            if attempt < retry_count - 1:
-                self.logger.info(f"等待 {retry_delay} 秒后重试...")
-                time.sleep(retry_delay)
-        
-        self.logger.error(f"健康检查API调用失败（已重试 {retry_count} 次）")
-        return (False, "健康检查API调用失败")
+        url = f"{protocol}://{host}:{port}/minio/health/{endpoint}"
+        deadline = timeout + (retry_count - 1) * retry_delay
+        self.logger.info(f"调用健康检查API：{url}（最长等待 {deadline} 秒）")
+        
+        # 健康检查API通常不需要认证
+        outcome = self.prober.probe([host], port, endpoints=(endpoint,), secure=secure, deadline=deadline, check_ports=False)[host][endpoint]
+        if outcome["ok"]:
+            self.logger.info(f"健康检查API调用成功，{outcome['detail']}")
+            return (True, outcome["detail"])
+        
+        self.logger.error(f"健康检查API调用失败（已尝试 {outcome['attempts']} 次）：{outcome['detail']}")
+        return (False, f"健康检查API调用失败：{outcome['detail']}")
     
     def check_mc_command(self):
         """
@@ -139,7 +116,17 @@ class HealthChecker:
             self.logger.warning(f"mc命令不可用：{e}")
             return False
     
-    def check_bucket_access(self, host, port=9000, secure=False, credentials=None, bucket_name="test-bucket"):
+    def _s3_client(self, host, port=9000, secure=False, credentials=None):
+        """
+        创建连接到指定MinIO服务的S3管理客户端
+        """
+        protocol = "https" if secure else "http"
+        return S3AdminClient(
+            f"{protocol}://{host}:{port}", credentials['root_user'], credentials['root_password'],
+            region=self.region, max_workers=self.s3_concurrency, logger=self.logger
+        )
+    
+    def check_bucket_access(self, host, port=9000, secure=False, credentials=None, bucket_name="test-bucket", write_test=True):
         """
         测试存储桶访问
         
@@ -149,61 +136,51 @@ class HealthChecker:
             secure: 是否使用HTTPS，默认为False
             credentials: 认证信息，包含root_user和root_password
             bucket_name: 测试存储桶名称，默认为test-bucket
+            write_test: 是否创建和删除测试存储桶，为False时只列出存储桶（只读检查）
         
         Returns:
             tuple: (status, message)，status为True表示存储桶访问成功，message为详细信息
         """
         self.logger.info(f"测试存储桶访问：{bucket_name}")
         
-        # 检查mc命令是否可用
-        if not self.check_mc_command():
-            return (False, "mc命令不可用，无法测试存储桶访问")
-        
+        client = self._s3_client(host, port, secure, credentials)
         try:
-            protocol = "https" if secure else "http"
-            endpoint = f"{protocol}://{host}:{port}"
-            
-            # 配置mc别名
-            alias_name = "minio-local"
-            cmd = [
-                "mc", "alias", "set", alias_name, endpoint,
-                credentials['root_user'], credentials['root_password']
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            self.logger.info(f"配置mc别名成功：{alias_name}")
-            
             # 测试列出存储桶
-            cmd = ["mc", "ls", alias_name]
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            self.logger.info(f"列出存储桶成功，输出：{result.stdout.strip()}")
+            status, names = client.list_buckets()
+            if not status:
+                self.logger.error(f"存储桶访问测试失败：{names}")
+                return (False, f"存储桶访问测试失败：{names}")
+            self.logger.info(f"列出存储桶成功：{', '.join(names) or '(空)'}")
             
-            # 尝试创建和删除测试存储桶（可选）
-            try:
-                # 创建测试存储桶
-                cmd = ["mc", "mb", f"{alias_name}/{bucket_name}"]
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                if result.returncode == 0:
+            # 尝试创建和删除测试存储桶（可选，只读检查时跳过）
+            if write_test and bucket_name in names:
+                self.logger.warning(f"测试存储桶 {bucket_name} 已存在，跳过创建和删除")
+            elif write_test:
+                status, message = client.make_bucket(bucket_name)
+                if status:
                     self.logger.info(f"创建测试存储桶 {bucket_name} 成功")
-                    
-                    # 删除测试存储桶
-                    cmd = ["mc", "rb", f"{alias_name}/{bucket_name}", "--force"]
-                    result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-                    self.logger.info(f"删除测试存储桶 {bucket_name} 成功")
+                    status, message = client.delete_bucket(bucket_name)
+                    if status:
+                        self.logger.info(f"删除测试存储桶 {bucket_name} 成功")
+                    else:
+                        self.logger.warning(f"删除测试存储桶 {bucket_name} 失败：{message}")
                 else:
-                    self.logger.warning(f"创建测试存储桶 {bucket_name} 失败，可能已存在：{result.stderr.strip()}")
-            except Exception as e:
-                self.logger.warning(f"测试存储桶操作失败：{e}")
+                    self.logger.warning(f"创建测试存储桶 {bucket_name} 失败：{message}")
             
             return (True, "存储桶访问测试成功")
-            
+        
         except Exception as e:
             self.logger.error(f"存储桶访问测试失败：{e}")
             return (False, f"存储桶访问测试失败：{e}")
+        finally:
+            client.close()
     
     def create_buckets(self, host, port=9000, secure=False, credentials=None, buckets=None):
         """
         根据配置创建存储桶并设置策略和配额
         
+        所有请求复用同一个S3管理客户端的连接池，多个存储桶并发处理。
+        
         Args:
             host: 主机IP或域名
             port: 端口号，默认为9000
@@ -216,102 +193,49 @@ class HealthChecker:
         """
         self.logger.info("开始创建存储桶")
         
-        # 检查mc命令是否可用
-        if not self.check_mc_command():
-            return (False, "mc命令不可用，无法创建存储桶")
-        
         if not buckets:
             self.logger.info("没有需要创建的存储桶配置")
             return (True, "没有需要创建的存储桶配置")
         
+        for bucket in buckets:
+            if not bucket.get("name"):
+                self.logger.warning("跳过无效的存储桶配置：缺少name字段")
+        
+        client = self._s3_client(host, port, secure, credentials)
         try:
-            protocol = "https" if secure else "http"
-            endpoint = f"{protocol}://{host}:{port}"
+            # 先读取一次当前状态，只执行与配置不一致的变更，重复执行时不会产生写操作
+            start = time.monotonic()
+            changes = client.plan(buckets)
+            unchanged = [name for name, steps in changes.items() if not steps]
+            if unchanged:
+                self.logger.info(f"以下存储桶已与配置一致，无需变更：{', '.join(unchanged)}")
             
-            # 配置mc别名
-            alias_name = "minio-local"
-            cmd = [
-                "mc", "alias", "set", alias_name, endpoint,
-                credentials['root_user'], credentials['root_password']
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            self.logger.info(f"配置mc别名成功：{alias_name}")
+            outcomes = client.apply(changes)
             
-            for bucket in buckets:
-                bucket_name = bucket.get("name")
-                policy = bucket.get("policy", "private")
-                quota = bucket.get("quota", 0)
-                
-                if not bucket_name:
-                    self.logger.warning("跳过无效的存储桶配置：缺少name字段")
-                    continue
-                
-                self.logger.info(f"处理存储桶：{bucket_name}")
-                
-                # 创建存储桶
-                self.logger.info(f"创建存储桶：{bucket_name}")
-                cmd = ["mc", "mb", f"{alias_name}/{bucket_name}"]
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                if result.returncode == 0:
-                    self.logger.info(f"存储桶 {bucket_name} 创建成功")
-                else:
-                    self.logger.warning(f"存储桶 {bucket_name} 可能已存在或创建失败：{result.stderr.strip()}")
-                
-                # 设置存储桶策略
-                self.logger.info(f"设置存储桶 {bucket_name} 的策略为：{policy}")
-                if policy == "public":
-                    cmd = ["mc", "policy", "set", "public", f"{alias_name}/{bucket_name}"]
+            failed = []
+            for bucket_name, (status, message) in outcomes.items():
+                if status:
+                    self.logger.info(f"存储桶 {bucket_name}：{message}")
                 else:
-                    cmd = ["mc", "policy", "set", "private", f"{alias_name}/{bucket_name}"]
-                result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-                self.logger.info(f"存储桶 {bucket_name} 策略设置成功")
-                
-                # 设置存储桶配额
-                if quota > 0:
-                    self.logger.info(f"设置存储桶 {bucket_name} 的配额为：{quota}GB")
-                    try:
-                        # 使用友好的单位格式（如"100G"）和正确的--size参数
-                        cmd = ["mc", "quota", "set", f"{alias_name}/{bucket_name}", "--size", f"{quota}G"]
-                        result = subprocess.run(cmd, capture_output=True, text=True, check=False)  # 不使用check=True，自己处理返回码
-                        
-                        cmd_str = " ".join(cmd)
-                        stdout = result.stdout.strip() if result.stdout else "(空)"
-                        stderr = result.stderr.strip() if result.stderr else "(空)"
-                        
-                        # 检查返回码和输出信息
-                        if result.returncode == 0:
-                            self.logger.info(f"存储桶 {bucket_name} 配额设置成功")
-                        else:
-                            # 特殊处理：如果输出包含"mc: Please use 'mc anonymous'"，可能是误报的警告
-                            if "mc: Please use 'mc anonymous'" in stdout:
-                                self.logger.warning(f"存储桶 {bucket_name} 配额设置可能已成功，但收到警告信息")
-                                self.logger.warning(f"执行的命令：{cmd_str}")
-                                self.logger.warning(f"命令输出：{stdout}")
-                                # 继续执行，不中断流程
-                            else:
-                                # 其他错误情况
-                                self.logger.warning(f"存储桶 {bucket_name} 配额设置失败：返回码：{result.returncode}")
-                                self.logger.warning(f"执行的命令：{cmd_str}")
-                                self.logger.warning(f"命令输出：{stdout}")
-                                self.logger.warning(f"错误信息：{stderr}")
-                                self.logger.warning("可能的原因：磁盘空间不足、单位格式不正确或权限问题")
-                                # 不中断流程，继续执行
-                    except Exception as e:
-                        # 捕获其他可能的异常
-                        cmd_str = " ".join(cmd)
-                        self.logger.warning(f"存储桶 {bucket_name} 配额设置时发生异常：{str(e)}")
-                        self.logger.warning(f"执行的命令：{cmd_str}")
-                        # 不中断流程，继续执行
-                else:
-                    self.logger.info(f"存储桶 {bucket_name} 不设置配额（配额为0或未指定）")
+                    self.logger.error(f"存储桶 {bucket_name} {message}")
+                    failed.append(bucket_name)
             
+            self.logger.info(
+                f"处理 {len(changes)} 个存储桶，变更 {len(outcomes)} 个，共 {client.stats['requests']} 个请求，"
+                f"耗时 {time.monotonic() - start:.2f} 秒"
+            )
+            if failed:
+                return (False, f"以下存储桶创建或配置失败：{', '.join(failed)}")
             return (True, "所有存储桶创建和配置完成")
-            
+        
         except Exception as e:
             self.logger.error(f"存储桶创建失败：{e}")
             return (False, f"存储桶创建失败：{e}")
+        finally:
+            client.close()
     
-    def run_comprehensive_check(self, host, port=9000, console_port=9001, secure=False, credentials=None, buckets=None):
+    def run_comprehensive_check(self, host, port=9000, console_port=9001, secure=False, credentials=None, buckets=None,
+                                probe=None, service_running=None, read_only=False):
         """
         运行综合健康检查
         
@@ -322,6 +246,9 @@ class HealthChecker:
             secure: 是否使用HTTPS，默认为False
             credentials: 认证信息，包含root_user和root_password
             buckets: 存储桶配置列表（可选）
+            probe: 该节点已有的并发探测结果（AsyncHealthProber.probe返回值中该主机的部分），为None时重新探测
+            service_running: 服务是否运行（远程节点由调用方提供），为None时检查本机服务
+            read_only: 是否只做只读检查（不创建测试存储桶），集群节点的存储桶由集群级任务统一创建
         
         Returns:
             dict: 健康检查结果，包含各个检查项的状态和详细信息
@@ -337,6 +264,10 @@ class HealthChecker:
             "console_port_listening_detail": "",
             "health_api": False,
             "health_api_detail": "",
+            "health_ready": False,
+            "health_ready_detail": "",
+            "health_cluster": False,
+            "health_cluster_detail": "",
             "mc_available": False,
             "mc_available_detail": "",
             "bucket_access": False,
@@ -345,36 +276,38 @@ class HealthChecker:
         }
         
         # 1. 检查服务是否运行
-        results["service_running"] = self.check_service_running()
+        results["service_running"] = self.check_service_running() if service_running is None else service_running
         results["service_running_detail"] = "服务正在运行" if results["service_running"] else "服务未运行"
         
-        # 2. 检查服务端口是否监听
-        results["port_listening"] = self.check_port_listening(host, port)
+        # 2. 并发探测服务端口、控制台端口和健康检查API，全部通过时立即返回
+        if probe is None:
+            probe = self.prober.probe([host], port, console_port, secure=secure)[host]
+        
+        results["port_listening"] = probe["api_port"]["ok"]
         results["port_listening_detail"] = f"端口 {host}:{port} 正在监听" if results["port_listening"] else f"端口 {host}:{port} 未监听"
         
-        # 3. 检查控制台端口是否监听
-        results["console_port_listening"] = self.check_port_listening(host, console_port)
+        results["console_port_listening"] = probe["console_port"]["ok"]
         results["console_port_listening_detail"] = f"控制台端口 {host}:{console_port} 正在监听" if results["console_port_listening"] else f"控制台端口 {host}:{console_port} 未监听"
         
-        # 4. 调用健康检查API
-        health_status, health_response = self.check_health_api(host, port, secure, credentials)
-        results["health_api"] = health_status
-        results["health_api_detail"] = f"健康检查API调用成功，响应：{health_response}" if health_status else f"健康检查API调用失败，响应：{health_response}"
+        for key, endpoint in (("health_api", "live"), ("health_ready", "ready"), ("health_cluster", "cluster")):
+            outcome = probe[endpoint]
+            results[key] = outcome["ok"]
+            results[f"{key}_detail"] = f"/minio/health/{endpoint} {'调用成功' if outcome['ok'] else '调用失败'}，{outcome['detail']}"
         
-        # 5. 检查mc命令是否可用
+        # 3. 检查mc命令是否可用
         results["mc_available"] = self.check_mc_command()
         results["mc_available_detail"] = "mc命令可用" if results["mc_available"] else "mc命令不可用"
         
-        # 6. 测试存储桶访问（如果mc可用且健康检查API通过）
-        if results["mc_available"] and results["health_api"]:
-            bucket_status, bucket_message = self.check_bucket_access(host, port, secure, credentials)
+        # 4. 测试存储桶访问（如果健康检查API通过）
+        if results["health_api"]:
+            bucket_status, bucket_message = self.check_bucket_access(host, port, secure, credentials, write_test=not read_only)
             results["bucket_access"] = bucket_status
             results["bucket_access_detail"] = bucket_message
         else:
             results["bucket_access"] = False
-            results["bucket_access_detail"] = "mc命令不可用或健康检查API未通过，跳过存储桶访问测试"
+            results["bucket_access_detail"] = "健康检查API未通过，跳过存储桶访问测试"
         
-        # 7. 计算总体状态（至少服务运行、端口监听和健康检查API通过）
+        # 5. 计算总体状态（至少服务运行、端口监听和健康检查API通过）
         results["overall_status"] = (
             results["service_running"] and 
             results["port_listening"] and 
@@ -389,7 +322,7 @@ class HealthChecker:
             if "detail" not in key:
                 self.logger.info(f"  {key}: {'✓' if value else '✗'} {results.get(f'{key}_detail', '')}")
         
-        # 8. 如果健康检查通过且有存储桶配置，则创建实际存储桶
+        # 6. 如果健康检查通过且有存储桶配置，则创建实际存储桶
         if results["overall_status"] and buckets:
             self.logger.info("\n开始创建配置的实际存储桶...")
             bucket_create_status, bucket_create_message = self.create_buckets(host, port, secure, credentials, buckets)
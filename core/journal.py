@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from core.logger import Logger
+
+class DeploymentJournal:
+    """
+    部署检查点日志
+    
+    记录已完成的任务（节点+步骤）及其输入指纹，部署中断后以--resume方式重新运行时，
+    输入未变化的已完成任务直接跳过。每次记录都原子写入磁盘，进程在任意时刻退出都不会损坏日志。
+    """
+    
+    VERSION = 1
+    
+    def __init__(self, path="logs/deploy-journal.json", logger=None):
+        self.logger = logger or Logger().get_logger()
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._scope = None
+    
+    @staticmethod
+    def fingerprint(payload):
+        """
+        计算任务输入的指纹
+        
+        Args:
+            payload: 可JSON序列化的任务输入
+        
+        Returns:
+            str: sha256指纹
+        """
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+    
+    def open(self, scope, resume=False):
+        """
+        打开日志
+        
+        Args:
+            scope: 日志作用域（如配置文件路径和部署模式），与已有日志不一致时不续传
+            resume: 是否续传已有日志中的记录，为False时清空已有记录
+        """
+        self._scope = scope
+        self._entries = {}
+        
+        if resume:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get("version") != self.VERSION or data.get("scope") != scope:
+                    self.logger.warning(f"检查点日志与本次部署不匹配，忽略已有记录：{self.path}")
+                else:
+                    self._entries = self._valid_entries(data.get("entries"))
+                    self.logger.info(f"从检查点日志续传，已完成 {len(self._entries)} 个任务：{self.path}")
+            except FileNotFoundError:
+                self.logger.info(f"检查点日志不存在，从头开始部署：{self.path}")
+            except Exception as e:
+                self.logger.warning(f"读取检查点日志失败，从头开始部署：{self.path}，错误：{e}")
+        
+        with self._lock:
+            self._save()
+    
+    def _valid_entries(self, entries):
+        """
+        过滤已有日志中损坏的记录，损坏的记录视为未完成，续传时重新执行对应任务
+        
+        Args:
+            entries: 日志文件中的entries字段
+        
+        Returns:
+            dict: 任务名称到记录的映射
+        """
+        if not isinstance(entries, dict):
+            self.logger.warning(f"检查点日志中的记录格式无效，忽略已有记录：{self.path}")
+            return {}
+        
+        valid = {name: entry for name, entry in entries.items()
+                 if isinstance(entry, dict) and isinstance(entry.get("fingerprint"), str)}
+        for name in entries.keys() - valid.keys():
+            self.logger.warning(f"检查点日志中的记录已损坏，重新执行任务：{name}")
+        return valid
+    
+    def _save(self):
+        """
+        原子写入日志文件（调用方需持有锁）
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": self.VERSION, "scope": self._scope, "entries": self._entries}, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+    
+    def is_done(self, name, fingerprint):
+        """
+        判断任务是否已完成且输入未变化
+        
+        Args:
+            name: 任务名称
+            fingerprint: 本次任务输入的指纹
+        
+        Returns:
+            bool: True表示可以跳过
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+        return entry is not None and entry.get("fingerprint") == fingerprint
+    
+    def mark_done(self, name, fingerprint, seconds=0.0):
+        """
+        记录任务已完成
+        
+        Args:
+            name: 任务名称
+            fingerprint: 任务输入的指纹
+            seconds: 任务耗时
+        """
+        with self._lock:
+            self._entries[name] = {
+                "fingerprint": fingerprint,
+                "finished_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "seconds": round(seconds, 3)
+            }
+            self._save()
+    
+    def completed(self):
+        """
+        获取已完成的任务名称列表
+        """
+        with self._lock:
+            return list(self._entries)
@@ -1,7 +1,10 @@
+import atexit
 import logging
 import os
+import queue
+import threading
 import time
-from logging.handlers import TimedRotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 
 class CustomFormatter(logging.Formatter):
     """
@@ -18,10 +21,80 @@ class CustomFormatter(logging.Formatter):
             # 使用默认格式
             return super().formatTime(record, datefmt)
 
+class BoundedQueueHandler(QueueHandler):
+    """
+    把日志记录放入有界队列的处理器
+    
+    调用线程只合并%参数并入队，时间格式化、文件和控制台写入都在QueueListener的后台线程中完成。
+    队列满时按overflow处理：block表示调用线程等待队列有空位（背压）；
+    drop表示直接丢弃WARNING以下的日志并计数，WARNING及以上的日志仍然等待，保证错误不会丢失。
+    """
+    
+    def __init__(self, log_queue, overflow="block"):
+        super().__init__(log_queue)
+        self.overflow = overflow
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+    
+    def handle(self, record):
+        # 队列本身是线程安全的，不需要持有处理器锁，避免工作线程在锁上排队
+        rv = self.filter(record)
+        if rv:
+            self.emit(record)
+        return rv
+    
+    def prepare(self, record):
+        # 只在调用线程中合并%参数和渲染异常堆栈（参数对象和异常之后可能被修改），其余格式化交给后台线程
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+    
+    def enqueue(self, record):
+        if self.overflow == "drop" and record.levelno < logging.WARNING:
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                with self._dropped_lock:
+                    self.dropped += 1
+            return
+        self.queue.put(record)
+
 class Logger:
-    def __init__(self, log_file="logs/minio-deploy.log", log_level=logging.DEBUG):
+    """
+    部署工具日志
+    
+    同步模式下文件和控制台处理器直接挂在logger上；异步模式下logger只挂一个有界队列处理器，
+    由后台线程写文件和控制台，SSH工作线程不再等待日志I/O。
+    """
+    
+    # 当前生效的后台日志线程和队列处理器，重新初始化日志时先停止旧的线程
+    _listener = None
+    _queue_handler = None
+    _lock = threading.Lock()
+    _atexit_registered = False
+    
+    def __init__(self, log_file="logs/minio-deploy.log", log_level=logging.DEBUG, async_mode=False,
+                 queue_size=10000, overflow="block", console_level=None):
+        """
+        Args:
+            log_file: 日志文件路径
+            log_level: 日志级别
+            async_mode: 是否启用异步日志（队列加后台线程）
+            queue_size: 异步日志队列的容量
+            overflow: 队列满时的策略，block（等待）或drop（丢弃WARNING以下的日志）
+            console_level: 控制台处理器的级别，默认与log_level相同
+        """
+        if overflow not in ("block", "drop"):
+            raise ValueError(f"不支持的日志队列溢出策略：{overflow}，可选值：block、drop")
         self.log_file = log_file
         self.log_level = log_level
+        self.async_mode = async_mode
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.console_level = console_level or log_level
         self.logger = logging.getLogger("minio-deploy")
         self.logger.setLevel(log_level)
         self._setup_logger()
@@ -29,13 +102,14 @@ class Logger:
     def _setup_logger(self):
         # 确保日志目录存在
         log_dir = os.path.dirname(self.log_file)
-        if not os.path.exists(log_dir):
-            os.makedirs(log_dir)
+        if log_dir and not os.path.exists(log_dir):
+            os.makedirs(log_dir, exist_ok=True)
         
-        # 清除已有的处理器
-        if self.logger.handlers:
-            for handler in self.logger.handlers:
-                self.logger.removeHandler(handler)
+        # 清除已有的处理器，异步模式下先停止旧的后台线程，把队列中剩余的日志写完
+        Logger.stop()
+        for handler in list(self.logger.handlers):
+            self.logger.removeHandler(handler)
+            handler.close()
         
         # 定义日志格式：[年-月-日 时:分:秒,毫秒]-[日志级别]-[xx.py:行号] 具体日志内容
         formatter = CustomFormatter(
@@ -57,11 +131,53 @@ class Logger:
         # 控制台处理器
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(formatter)
-        console_handler.setLevel(self.log_level)
+        console_handler.setLevel(self.console_level)
+        
+        if not self.async_mode:
+            # 添加处理器
+            self.logger.addHandler(file_handler)
+            self.logger.addHandler(console_handler)
+            return
+        
+        # 异步模式：logger只挂队列处理器，后台线程按各处理器自己的级别写文件和控制台
+        queue_handler = BoundedQueueHandler(queue.Queue(maxsize=self.queue_size), self.overflow)
+        listener = QueueListener(queue_handler.queue, file_handler, console_handler, respect_handler_level=True)
+        listener.start()
+        with Logger._lock:
+            Logger._listener = listener
+            Logger._queue_handler = queue_handler
+            if not Logger._atexit_registered:
+                atexit.register(Logger.stop)
+                Logger._atexit_registered = True
+        self.logger.addHandler(queue_handler)
+    
+    @classmethod
+    def stop(cls):
+        """
+        停止异步日志的后台线程：等待队列中的日志全部写出，并报告因队列满被丢弃的日志条数。
+        同步模式下不做任何事，可以重复调用。
+        """
+        with cls._lock:
+            listener, queue_handler = cls._listener, cls._queue_handler
+            cls._listener = None
+            cls._queue_handler = None
+        if listener is None:
+            return
         
-        # 添加处理器
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+        listener.stop()
+        logger = logging.getLogger("minio-deploy")
+        logger.removeHandler(queue_handler)
+        if queue_handler.dropped:
+            # 后台线程已停止，直接交给文件和控制台处理器写出
+            record = logger.makeRecord(
+                logger.name, logging.WARNING, __file__, 0,
+                "日志队列已满，共丢弃 %d 条WARNING以下的日志", (queue_handler.dropped,), None
+            )
+            for handler in listener.handlers:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+        for handler in listener.handlers:
+            handler.close()
     
     def get_logger(self):
         return self.logger
@@ -69,5 +185,8 @@ class Logger:
     def set_level(self, level):
         self.log_level = level
         self.logger.setLevel(level)
-        for handler in self.logger.handlers:
+        handlers = list(self.logger.handlers)
+        if Logger._listener is not None:
+            handlers.extend(Logger._listener.handlers)
+        for handler in handlers:
             handler.setLevel(level)
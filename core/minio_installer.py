@@ -1,12 +1,31 @@
+import hashlib
+import json
 import os
 import platform
+import re
+import shutil
 import subprocess
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from core.logger import Logger
+from core.profiler import Profiler
 
 class MinioInstaller:
-    def __init__(self, logger=None):
+    # 按版本和架构下载安装包的默认地址（官网archive目录下的文件名带版本号，latest地址总是最新版）
+    DOWNLOAD_URLS = {
+        "minio": "https://dl.min.io/server/minio/release/linux-{arch}/archive/minio.{version}",
+        "mc": "https://dl.min.io/client/mc/release/linux-{arch}/archive/mc.{version}"
+    }
+    
+    def __init__(self, logger=None, artifact_cache=None, download_segments=4, download_chunk_size=4 * 1024 * 1024, profiler=None):
         self.logger = logger or Logger().get_logger()
+        self.profiler = profiler or Profiler(logger=self.logger)
         self.system_arch = self._get_system_arch()
+        self.artifact_cache = artifact_cache
+        self.download_segments = download_segments
+        self.download_chunk_size = download_chunk_size
     
     def check_minio_installed(self):
         """
@@ -67,6 +86,9 @@ class MinioInstaller:
         """
         从指定URL下载文件
         
+        优先使用内置的分段并行下载器（支持断点续传并在下载过程中计算sha256），
+        失败时依次回退到curl和wget。
+        
         Args:
             url: 下载URL
             dest_path: 目标文件路径
@@ -76,26 +98,368 @@ class MinioInstaller:
         """
         self.logger.info(f"从 {url} 下载文件到 {dest_path}")
         
-        # 尝试使用curl下载
+        expected = self._fetch_published_checksum(url)
+        if expected is None:
+            self.logger.warning(f"未找到 {url} 的官方sha256文件，下载后不做校验")
+        
+        # 尝试使用内置下载器下载
         try:
-            cmd = f"curl -sSL {url} -o {dest_path}"
-            result = subprocess.run(cmd, shell=True, check=True, capture_output=True, text=True)
-            self.logger.info(f"使用curl下载成功：{url}")
+            with self.profiler.span("http.download", "download", url=url, downloader="native"):
+                self._download_native(url, dest_path, expected)
             return True
+        except Exception as e:
+            self.logger.error(f"使用内置下载器下载失败：{url}，错误：{e}")
+        
+        # 尝试使用curl下载
+        try:
+            with self.profiler.span("http.download", "download", url=url, downloader="curl"):
+                subprocess.run(["curl", "-sSL", "-f", url, "-o", dest_path], check=True, capture_output=True, text=True)
+            if self._verify_file_checksum(dest_path, expected):
+                self.logger.info(f"使用curl下载成功：{url}")
+                return True
         except Exception as e:
             self.logger.error(f"使用curl下载失败：{url}，错误：{e}")
         
         # 尝试使用wget下载
         try:
-            cmd = f"wget -q {url} -O {dest_path}"
-            result = subprocess.run(cmd, shell=True, check=True, capture_output=True, text=True)
-            self.logger.info(f"使用wget下载成功：{url}")
-            return True
+            with self.profiler.span("http.download", "download", url=url, downloader="wget"):
+                subprocess.run(["wget", "-q", url, "-O", dest_path], check=True, capture_output=True, text=True)
+            if self._verify_file_checksum(dest_path, expected):
+                self.logger.info(f"使用wget下载成功：{url}")
+                return True
         except Exception as e:
             self.logger.error(f"使用wget下载失败：{url}，错误：{e}")
         
         return False
     
+    def _http_open(self, url, method="GET", headers=None, timeout=30):
+        request = urllib.request.Request(url, method=method, headers=headers or {})
+        return urllib.request.urlopen(request, timeout=timeout)
+    
+    def _fetch_published_checksum(self, url):
+        """
+        获取与安装包一同发布的sha256（依次尝试url.sha256sum和url.sha256）
+        
+        Returns:
+            str: sha256值，获取不到时返回None
+        """
+        for suffix in (".sha256sum", ".sha256"):
+            try:
+                with self._http_open(url + suffix, timeout=10) as response:
+                    content = response.read(4096).decode("utf-8", "replace").strip()
+            except Exception:
+                continue
+            token = content.split()[0].lower() if content else ""
+            if re.fullmatch(r"[0-9a-f]{64}", token):
+                self.logger.info(f"获取到官方sha256：{url + suffix} -> {token}")
+                return token
+        return None
+    
+    def _verify_file_checksum(self, path, expected):
+        """
+        校验已下载文件的sha256（仅用于curl/wget回退路径），不一致时删除文件
+        """
+        if not expected:
+            return True
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        if digest.hexdigest() != expected:
+            self.logger.error(f"文件sha256校验失败：{path}，期望 {expected}，实际 {digest.hexdigest()}")
+            os.remove(path)
+            return False
+        return True
+    
+    def _fetch_range(self, url, start, end, retries=3):
+        """
+        以HTTP Range请求下载[start, end]区间的数据，失败时重试
+        """
+        for attempt in range(1, retries + 1):
+            try:
+                with self._http_open(url, headers={"Range": f"bytes={start}-{end}"}) as response:
+                    if response.status != 206:
+                        raise IOError(f"服务器未按Range返回数据，状态码：{response.status}")
+                    data = response.read()
+                if len(data) != end - start + 1:
+                    raise IOError(f"分段长度不一致：期望 {end - start + 1} 字节，实际 {len(data)} 字节")
+                return data
+            except Exception as e:
+                if attempt == retries:
+                    raise
+                self.logger.warning(f"下载分段 {start}-{end} 失败（第 {attempt} 次），重试：{e}")
+                time.sleep(attempt)
+    
+    def _download_native(self, url, dest_path, expected=None):
+        """
+        内置下载器：服务器支持Range时按分块并行下载，否则单连接流式下载
+        
+        每个分块下载后立即写入.part文件的对应位置，主线程按分块顺序对内存中的数据计算sha256，
+        因此不需要下载完成后再读一遍文件。并行下载的分块数量受窗口限制，内存占用有上界。
+        已写入的分块记录在.part.json中，中断后再次下载时只重新读取这些分块用于计算sha256。
+        """
+        part_path = f"{dest_path}.part"
+        state_path = f"{dest_path}.part.json"
+        
+        with self._http_open(url, method="HEAD") as response:
+            total = int(response.headers.get("Content-Length") or 0)
+            accept_ranges = response.headers.get("Accept-Ranges", "").lower() == "bytes"
+            validator = response.headers.get("ETag") or response.headers.get("Last-Modified") or ""
+        
+        digest = hashlib.sha256()
+        start_time = time.monotonic()
+        
+        if not accept_ranges or total <= 0:
+            self.logger.info(f"服务器不支持分段下载，使用单连接下载：{url}")
+            with self._http_open(url) as response, open(part_path, 'wb') as f:
+                for block in iter(lambda: response.read(1024 * 1024), b""):
+                    digest.update(block)
+                    f.write(block)
+            downloaded = os.path.getsize(part_path)
+        else:
+            chunk_size = self.download_chunk_size
+            count = (total + chunk_size - 1) // chunk_size
+            
+            # 读取续传状态，URL、大小、校验标识或分块大小任一变化都重新下载
+            written = set()
+            signature = {"url": url, "size": total, "validator": validator, "chunk_size": chunk_size}
+            if os.path.exists(part_path) and os.path.exists(state_path):
+                try:
+                    with open(state_path, 'r', encoding='utf-8') as f:
+                        state = json.load(f)
+                    if all(state.get(key) == value for key, value in signature.items()):
+                        written = set(state.get("written", []))
+                except Exception:
+                    written = set()
+            if written:
+                self.logger.info(f"从断点续传：已完成 {len(written)}/{count} 个分块")
+            else:
+                with open(part_path, 'wb') as f:
+                    f.truncate(total)
+            resumed = set(written)
+            
+            condition = threading.Condition()
+            buffers = {}
+            window = max(2, self.download_segments * 2)
+            progress = {"next": 0, "hashed": 0, "error": None}
+            
+            def save_state():
+                with condition:
+                    snapshot = dict(signature, written=sorted(written))
+                with open(state_path, 'w', encoding='utf-8') as f:
+                    json.dump(snapshot, f)
+            
+            def worker():
+                with open(part_path, 'r+b') as f:
+                    while True:
+                        with condition:
+                            while (progress["next"] < count and progress["next"] >= progress["hashed"] + window
+                                   and progress["error"] is None):
+                                condition.wait()
+                            if progress["error"] is not None or progress["next"] >= count:
+                                return
+                            index = progress["next"]
+                            progress["next"] += 1
+                        
+                        start = index * chunk_size
+                        end = min(total, start + chunk_size) - 1
+                        try:
+                            if index in resumed:
+                                f.seek(start)
+                                data = f.read(end - start + 1)
+                            else:
+                                data = self._fetch_range(url, start, end)
+                                f.seek(start)
+                                f.write(data)
+                                f.flush()
+                        except Exception as e:
+                            with condition:
+                                progress["error"] = e
+                                condition.notify_all()
+                            return
+                        
+                        with condition:
+                            buffers[index] = data
+                            written.add(index)
+                            condition.notify_all()
+            
+            workers = min(self.download_segments, count)
+            self.logger.info(f"分段并行下载：{url}，大小 {total} 字节，{count} 个分块，{workers} 个连接")
+            
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(worker) for _ in range(workers)]
+                last_logged = 0
+                try:
+                    # 主线程按顺序对分块计算sha256
+                    while progress["hashed"] < count:
+                        with condition:
+                            while progress["hashed"] not in buffers and progress["error"] is None:
+                                condition.wait()
+                            if progress["error"] is not None:
+                                break
+                            data = buffers.pop(progress["hashed"])
+                        
+                        digest.update(data)
+                        
+                        with condition:
+                            progress["hashed"] += 1
+                            condition.notify_all()
+                        
+                        percent = progress["hashed"] * 100 // count
+                        if percent >= last_logged + 10:
+                            last_logged = percent - percent % 10
+                            save_state()
+                            self.logger.info(f"下载进度：{percent}%（{min(progress['hashed'] * chunk_size, total)}/{total} 字节）")
+                finally:
+                    with condition:
+                        if progress["hashed"] < count and progress["error"] is None:
+                            progress["error"] = IOError("下载被中断")
+                        condition.notify_all()
+                    for future in futures:
+                        future.result()
+                    save_state()
+            
+            if progress["hashed"] < count:
+                raise progress["error"]
+            downloaded = sum(min(total, (index + 1) * chunk_size) - index * chunk_size for index in written - resumed)
+        
+        actual = digest.hexdigest()
+        if expected and actual != expected:
+            for path in (part_path, state_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            raise IOError(f"sha256校验失败：期望 {expected}，实际 {actual}")
+        
+        os.replace(part_path, dest_path)
+        if os.path.exists(state_path):
+            os.remove(state_path)
+        
+        elapsed = time.monotonic() - start_time
+        throughput = downloaded / elapsed / (1024 * 1024) if elapsed > 0 else 0.0
+        self.logger.info(f"下载完成：{url}，sha256：{actual}，本次下载 {downloaded} 字节，耗时 {elapsed:.2f} 秒，吞吐量 {throughput:.2f} MB/s")
+    
+    def download_url(self, name, version, arch=None, template=None):
+        """
+        获取指定版本和架构的安装包下载地址
+        
+        Args:
+            name: 安装包名称，minio或mc
+            version: 版本号
+            arch: 目标架构，默认为当前系统架构
+            template: 配置中的下载地址，可以包含{version}和{arch}占位符，默认使用官网archive地址
+        
+        Returns:
+            str: 下载地址
+        """
+        template = template or self.DOWNLOAD_URLS[name]
+        return template.replace("{version}", version).replace("{arch}", arch or self.system_arch)
+    
+    def _file_contains(self, path, needle):
+        """
+        在文件内容中查找字节串（按块读取，块边界处保留重叠部分）
+        """
+        tail = b""
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                if needle in tail + block:
+                    return True
+                tail = block[-(len(needle) - 1):]
+        return False
+    
+    def verify_version(self, name, path, version):
+        """
+        检查安装包是否为指定版本
+        
+        优先运行`<path> --version`比较输出；安装包是其他架构或没有执行权限、不能在控制机上运行时，
+        在文件内容中查找版本号（官方二进制文件内嵌了发布版本号）
+        
+        Args:
+            name: 安装包名称，minio或mc
+            path: 安装包路径
+            version: 期望的版本号
+        
+        Returns:
+            bool: True表示版本一致，False表示不一致
+        """
+        output = ""
+        try:
+            result = subprocess.run([os.path.abspath(path), "--version"], capture_output=True, text=True, timeout=30)
+            output = (result.stdout + result.stderr).strip()
+            if result.returncode == 0 and version in output:
+                return True
+        except (OSError, subprocess.TimeoutExpired):
+            output = ""
+        
+        try:
+            if not output and self._file_contains(path, version.encode()):
+                self.logger.info(f"{name}安装包 {path} 不能在控制机上运行，已在文件内容中找到版本号 {version}")
+                return True
+        except OSError as e:
+            self.logger.error(f"读取{name}安装包失败：{path}，错误：{e}")
+            return False
+        
+        actual = output.splitlines()[0] if output else "未知"
+        self.logger.error(f"{name}安装包 {path} 的版本与配置不一致：期望 {version}，实际 {actual}")
+        return False
+    
+    def obtain_artifact(self, name, version, arch=None, url_template=None):
+        """
+        从本地缓存获取安装包，未命中时下载到缓存
+        
+        缓存命中和新下载的安装包都要通过版本校验，避免以配置的版本号缓存其他版本的文件
+        
+        Args:
+            name: 安装包名称，如minio、mc
+            version: 版本号
+            arch: 目标架构，默认为当前系统架构
+            url_template: 配置中的下载地址
+        
+        Returns:
+            str: 缓存文件路径，未启用缓存、下载失败或版本不符时返回None
+        """
+        if self.artifact_cache is None:
+            return None
+        arch = arch or self.system_arch
+        url = self.download_url(name, version, arch, url_template)
+        return self.artifact_cache.fetch(
+            name, version, arch, lambda dest_path: self.download_file(url, dest_path), source=url,
+            verify=lambda path: self.verify_version(name, path, version)
+        )
+    
+    def _install_binary(self, src_path, dest_path):
+        """
+        复制安装包到安装目录并设置执行权限（先写临时文件再重命名）
+        
+        Returns:
+            bool: True表示成功，False表示失败
+        """
+        temp_path = f"{dest_path}.tmp"
+        try:
+            shutil.copyfile(src_path, temp_path)
+            os.chmod(temp_path, 0o755)
+            os.replace(temp_path, dest_path)
+            return True
+        except Exception as e:
+            self.logger.error(f"复制安装包失败：{src_path} -> {dest_path}，错误：{e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return False
+    
+    def replace_binary(self, src_path, dest_path):
+        """
+        替换已安装的二进制文件（升级使用），原文件保留为.prev以便回滚
+        
+        Returns:
+            bool: True表示成功，False表示失败
+        """
+        if os.path.isfile(dest_path):
+            try:
+                shutil.copy2(dest_path, f"{dest_path}.prev")
+            except Exception as e:
+                self.logger.error(f"备份当前版本失败：{dest_path}，错误：{e}")
+                return False
+        return self._install_binary(src_path, dest_path)
+    
     def check_file_compatibility(self, file_path):
         """
         检查本地文件与当前操作系统的兼容性
@@ -155,11 +519,40 @@ class MinioInstaller:
             
             self.logger.error(f"文件 {file_path} 与当前系统架构 {self.system_arch} 不兼容，file输出：{file_output}")
             return False
-            
+        
         except Exception as e:
             self.logger.error(f"检查文件兼容性失败：{file_path}，错误：{e}")
             return False
     
+    def package_name(self, name, version, arch=None):
+        """
+        本地安装包的文件名，按版本和架构命名，如minio.RELEASE.2024-01-18T22-51-48Z.linux-amd64
+        """
+        return f"{name}.{version}.linux-{arch or self.system_arch}"
+    
+    def _install_local_package(self, name, version, package_dir, dest_path):
+        """
+        从本地安装包目录安装指定版本的安装包：文件按package_name查找，版本和架构都校验通过才安装，
+        安装后加入缓存
+        
+        Returns:
+            bool: True表示安装成功，False表示没有可用的本地安装包或安装失败
+        """
+        local_file = os.path.join(package_dir, self.package_name(name, version))
+        self.logger.info(f"官网下载失败，尝试从本地安装包安装：{local_file}")
+        if not os.path.isfile(local_file):
+            self.logger.error(f"本地安装包不存在：{local_file}")
+            return False
+        if not self.check_file_compatibility(local_file) or not self.verify_version(name, local_file, version):
+            self.logger.error(f"本地安装包 {local_file} 与当前系统架构或配置的版本 {version} 不符，不安装")
+            return False
+        if not self._install_binary(local_file, dest_path):
+            return False
+        # 已校验版本的本地包加入缓存，下次按版本和架构直接命中
+        if self.artifact_cache is not None:
+            self.artifact_cache.add(name, version, self.system_arch, local_file, source=local_file)
+        return True
+    
     def install_minio(self, minio_config, install_dir="/usr/local/bin"):
         """
         安装MinIO服务器
@@ -174,7 +567,7 @@ class MinioInstaller:
         # 检查是否已安装MinIO
         if self.check_minio_installed():
             return True
-            
+        
         self.logger.info("开始安装MinIO服务器...")
         
         # 创建安装目录
@@ -187,13 +580,19 @@ class MinioInstaller:
                 return False
         
         minio_version = minio_config.get("version", "RELEASE.2024-01-18T22-51-48Z")
-        minio_url = minio_config.get("download_url", f"https://dl.min.io/server/minio/release/linux-{self.system_arch}/minio")
+        minio_url = self.download_url("minio", minio_version, template=minio_config.get("download_url"))
         local_package_dir = minio_config.get("local_package_dir", "packages")
         
         minio_dest = os.path.join(install_dir, "minio")
         
-        # 优先从官网下载
-        if self.download_file(minio_url, minio_dest):
+        # 启用缓存时按版本和架构直接查找缓存，未命中才从官网下载到缓存
+        cached_path = self.obtain_artifact("minio", minio_version, url_template=minio_config.get("download_url"))
+        if cached_path and self._install_binary(cached_path, minio_dest):
+            self.logger.info(f"MinIO服务器从缓存安装成功：{minio_dest}")
+            return True
+        
+        # 未启用缓存时从官网下载
+        if self.artifact_cache is None and self.download_file(minio_url, minio_dest):
             # 设置执行权限
             try:
                 os.chmod(minio_dest, 0o755)
@@ -205,45 +604,12 @@ class MinioInstaller:
             self.logger.info(f"MinIO服务器安装成功：{minio_dest}")
             return True
         
-        # 官网下载失败，尝试从本地packages目录安装
-        self.logger.info("官网下载失败，尝试从本地packages目录安装")
-        
-        # 查找本地MinIO安装包
-        local_minio_files = []
-        if os.path.exists(local_package_dir):
-            for file in os.listdir(local_package_dir):
-                if "minio" in file.lower() and not file.endswith(".md5") and not file.endswith(".sha256"):
-                    local_minio_files.append(os.path.join(local_package_dir, file))
-        
-        if not local_minio_files:
-            self.logger.error(f"本地packages目录中未找到MinIO安装包：{local_package_dir}")
-            return False
-        
-        # 尝试安装每个本地包，直到找到兼容的
-        for local_file in local_minio_files:
-            self.logger.info(f"尝试安装本地MinIO包：{local_file}")
-            
-            # 检查文件兼容性
-            if not self.check_file_compatibility(local_file):
-                self.logger.warning(f"本地包 {local_file} 与当前系统不兼容，跳过")
-                continue
-            
-            # 复制文件到安装目录
-            try:
-                subprocess.run(
-                    ["cp", local_file, minio_dest],
-                    check=True, capture_output=True, text=True
-                )
-                # 设置执行权限
-                os.chmod(minio_dest, 0o755)
-                self.logger.info(f"MinIO服务器从本地包安装成功：{minio_dest}")
-                return True
-            except Exception as e:
-                self.logger.error(f"安装本地MinIO包失败：{local_file}，错误：{e}")
-                continue
+        # 官网下载失败，从本地packages目录安装与配置版本和当前架构对应的安装包
+        if self._install_local_package("minio", minio_version, local_package_dir, minio_dest):
+            self.logger.info(f"MinIO服务器从本地包安装成功：{minio_dest}")
+            return True
         
-        self.logger.error("所有本地MinIO包均不兼容当前系统")
-        print("错误：无法从官网下载MinIO，且所有本地MinIO包均不兼容当前系统")
+        print(f"错误：无法从官网下载MinIO，且本地没有可用的 {minio_version} 版本安装包")
         return False
     
     def install_mc(self, minio_config, install_dir="/usr/local/bin"):
@@ -260,7 +626,7 @@ class MinioInstaller:
         # 检查是否已安装mc
         if self.check_mc_installed():
             return True
-            
+        
         self.logger.info("开始安装MinIO客户端(mc)...")
         
         # 创建安装目录
@@ -273,13 +639,19 @@ class MinioInstaller:
                 return False
         
         mc_version = minio_config.get("mc_version", "RELEASE.2024-01-18T22-51-48Z")
-        mc_url = minio_config.get("mc_download_url", f"https://dl.min.io/client/mc/release/linux-{self.system_arch}/mc")
+        mc_url = self.download_url("mc", mc_version, template=minio_config.get("mc_download_url"))
         mc_local_package_dir = minio_config.get("mc_local_package_dir", "packages")
         
         mc_dest = os.path.join(install_dir, "mc")
         
-        # 优先从官网下载
-        if self.download_file(mc_url, mc_dest):
+        # 启用缓存时按版本和架构直接查找缓存，未命中才从官网下载到缓存
+        cached_path = self.obtain_artifact("mc", mc_version, url_template=minio_config.get("mc_download_url"))
+        if cached_path and self._install_binary(cached_path, mc_dest):
+            self.logger.info(f"MinIO客户端(mc)从缓存安装成功：{mc_dest}")
+            return True
+        
+        # 未启用缓存时从官网下载
+        if self.artifact_cache is None and self.download_file(mc_url, mc_dest):
             # 设置执行权限
             try:
                 os.chmod(mc_dest, 0o755)
@@ -291,44 +663,12 @@ class MinioInstaller:
             self.logger.info(f"MinIO客户端(mc)安装成功：{mc_dest}")
             return True
         
-        # 官网下载失败，尝试从本地packages目录安装
-        self.logger.info("官网下载失败，尝试从本地packages目录安装mc")
-        
-        # 查找本地mc安装包
-        local_mc_files = []
-        if os.path.exists(mc_local_package_dir):
-            for file in os.listdir(mc_local_package_dir):
-                if "mc" in file.lower() and not file.endswith(".md5") and not file.endswith(".sha256"):
-                    local_mc_files.append(os.path.join(mc_local_package_dir, file))
-        
-        if not local_mc_files:
-            self.logger.error(f"本地packages目录中未找到mc安装包：{mc_local_package_dir}")
-            return False
-        
-        # 尝试安装每个本地包，直到找到兼容的
-        for local_file in local_mc_files:
-            self.logger.info(f"尝试安装本地mc包：{local_file}")
-            
-            # 检查文件兼容性
-            if not self.check_file_compatibility(local_file):
-                self.logger.warning(f"本地包 {local_file} 与当前系统不兼容，跳过")
-                continue
-            
-            # 复制文件到安装目录
-            try:
-                subprocess.run(
-                    ["cp", local_file, mc_dest],
-                    check=True, capture_output=True, text=True
-                )
-                # 设置执行权限
-                os.chmod(mc_dest, 0o755)
-                self.logger.info(f"MinIO客户端(mc)从本地包安装成功：{mc_dest}")
-                return True
-            except Exception as e:
-                self.logger.error(f"安装本地mc包失败：{local_file}，错误：{e}")
-                continue
+        # 官网下载失败，从本地packages目录安装与配置版本和当前架构对应的安装包
+        if self._install_local_package("mc", mc_version, mc_local_package_dir, mc_dest):
+            self.logger.info(f"MinIO客户端(mc)从本地包安装成功：{mc_dest}")
+            return True
         
-        self.logger.warning("所有本地mc包均不兼容当前系统，跳过mc安装")
+        self.logger.warning("没有可用的本地mc安装包，跳过mc安装")
         return True  # mc安装失败不影响主程序
     
     def verify_installation(self):
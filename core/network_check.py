@@ -0,0 +1,358 @@
+import json
+import os
+import shlex
+import statistics
+import time
+from core.logger import Logger
+from core.profiler import Profiler
+
+class NetworkMeshTest:
+    """
+    节点间网络预检
+    
+    在MinIO启动之前，通过SSH在每个节点上启动一个轻量的应答进程（绑定节点地址上的MinIO服务端口，
+    此时端口空闲且防火墙已放行），然后测试所有节点对之间的往返延迟（RTT）和单连接的批量吞吐量。
+    节点对按循环赛方式分轮：每一批中每个节点只参与一项测试，同一条链路不会被同时测试两次，
+    各方向的测试互不干扰。结果汇总为矩阵，低于所有链路中位数min_ratio倍的慢链路和两个方向
+    吞吐量相差超过max_asymmetry的不对称链路会被标记。
+    """
+    
+    # 在节点上执行的脚本：serve模式为应答进程，probe模式测试到另一个节点的RTT和吞吐量并输出JSON
+    SCRIPT = r"""
+import json, os, socket, statistics, sys, threading, time
+MB = 1 << 20
+
+def serve(address, port, lifetime):
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    try:
+        server.bind((address, port))
+    except OSError as e:
+        sys.exit(f"无法监听 {address}:{port}：{e.strerror or e}")
+    server.listen(64)
+    server.settimeout(0.5)
+    # 监听成功后转入后台：父进程输出子进程的PID后退出，子进程关闭标准输入输出，SSH命令随即返回
+    pid = os.fork()
+    if pid:
+        print(pid)
+        sys.stdout.flush()
+        os._exit(0)
+    os.setsid()
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    
+    def handle(conn):
+        with conn:
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            kind = conn.recv(1)
+            if kind == b"P":
+                # 回显模式：原样返回收到的数据
+                while True:
+                    data = conn.recv(64)
+                    if not data:
+                        break
+                    conn.sendall(data)
+            elif kind == b"S":
+                # 接收模式：读到对端关闭写方向后返回收到的字节数
+                total = 0
+                while True:
+                    data = conn.recv(MB)
+                    if not data:
+                        break
+                    total += len(data)
+                conn.sendall(str(total).encode())
+    
+    deadline = time.time() + lifetime
+    while time.time() < deadline:
+        try:
+            conn, _ = server.accept()
+        except socket.timeout:
+            continue
+        threading.Thread(target=handle, args=(conn,), daemon=True).start()
+
+def connect(address, port):
+    # 应答进程可能刚启动，连接失败时在5秒内重试
+    deadline = time.time() + 5
+    while True:
+        try:
+            sock = socket.create_connection((address, port), timeout=10)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            return sock
+        except OSError:
+            if time.time() > deadline:
+                raise
+            time.sleep(0.2)
+
+def probe(address, port, pings, seconds):
+    result = {}
+    try:
+        with connect(address, port) as sock:
+            sock.sendall(b"P")
+            payload = b"x" * 32
+            latencies = []
+            for _ in range(pings):
+                start = time.perf_counter()
+                sock.sendall(payload)
+                received = 0
+                while received < len(payload):
+                    data = sock.recv(64)
+                    if not data:
+                        raise OSError("应答进程关闭了连接")
+                    received += len(data)
+                latencies.append(time.perf_counter() - start)
+            result["rtt_ms"] = statistics.median(latencies) * 1000
+        
+        with connect(address, port) as sock:
+            sock.sendall(b"S")
+            buffer = bytes(MB)
+            start = time.perf_counter()
+            while time.perf_counter() - start < seconds:
+                sock.sendall(buffer)
+            sock.shutdown(socket.SHUT_WR)
+            total = int(sock.recv(64) or b"0")
+            result["mbps"] = total / MB / (time.perf_counter() - start)
+    except (OSError, ValueError) as e:
+        result["error"] = str(e)
+    print(json.dumps(result))
+
+if sys.argv[1] == "serve":
+    serve(sys.argv[2], int(sys.argv[3]), float(sys.argv[4]))
+else:
+    probe(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]), float(sys.argv[5]))
+"""
+    
+    # RTT与中位数相差不超过该值（毫秒）时不标记，避免局域网内亚毫秒级的抖动被当成慢链路
+    RTT_TOLERANCE_MS = 0.5
+    
+    def __init__(self, async_executor=None, logger=None, enabled=False, port=None, pings=20, seconds=1.0, min_ratio=0.5,
+                 max_asymmetry=0.3, action="warn", report_file="logs/network-mesh.json", matrix_limit=16, profiler=None):
+        """
+        Args:
+            async_executor: 异步远程执行器
+            logger: 日志记录器
+            enabled: 是否启用网络预检
+            port: 应答进程监听的端口，为None时使用MinIO服务端口
+            pings: 每条链路测试RTT的往返次数
+            seconds: 每条链路测试吞吐量的时长（秒）
+            min_ratio: 吞吐量低于所有链路中位数的多少倍（RTT高于中位数的倒数倍）时标记为慢链路
+            max_asymmetry: 两个方向的吞吐量相差超过较大值的多少比例时标记为不对称链路
+            action: 有链路被标记时的处理方式，warn（只输出警告）或reject（拒绝启动MinIO）
+            report_file: 测试结果矩阵的JSON文件路径
+            matrix_limit: 节点数不超过该值时在日志中输出完整矩阵
+            profiler: 耗时分析器
+        """
+        self.async_executor = async_executor
+        self.logger = logger or Logger().get_logger()
+        self.profiler = profiler or Profiler(logger=self.logger)
+        self.enabled = enabled
+        self.port = port
+        self.pings = pings
+        self.seconds = seconds
+        self.min_ratio = min_ratio
+        self.max_asymmetry = max_asymmetry
+        self.action = action
+        self.report_file = report_file
+        self.matrix_limit = matrix_limit
+    
+    @staticmethod
+    def schedule(names):
+        """
+        按循环赛（圆桌法）把所有节点对分成若干轮，每轮中每个节点最多出现在一个节点对中
+        
+        Args:
+            names: 节点名称列表
+        
+        Returns:
+            list: 每轮为一个节点对列表，所有轮次合起来恰好覆盖每个无序节点对一次
+        """
+        players = list(names)
+        if len(players) % 2:
+            players.append(None)
+        rounds = []
+        for _ in range(len(players) - 1):
+            half = len(players) // 2
+            pairs = [(players[i], players[-1 - i]) for i in range(half) if players[i] is not None and players[-1 - i] is not None]
+            if pairs:
+                rounds.append(pairs)
+            # 固定第一个位置，其余位置轮转
+            players = [players[0], players[-1]] + players[1:-1]
+        return rounds
+    
+    def _task(self, ssh_params, command, timeout):
+        return {
+            "host": ssh_params["host"],
+            "port": ssh_params["port"],
+            "username": ssh_params["username"],
+            "key_file": ssh_params["ssh_key"],
+            "password": ssh_params["password"],
+            "command": command,
+            "timeout": timeout
+        }
+    
+    def _script(self, *args):
+        return f"python3 -c {shlex.quote(self.SCRIPT)} {' '.join(shlex.quote(str(arg)) for arg in args)}"
+    
+    def run(self, targets, port):
+        """
+        启动各节点的应答进程，分轮测试所有节点对的两个方向，最后停止应答进程
+        
+        Args:
+            targets: 列表，每个元素为(节点名称, SSH连接参数, 其他节点访问该节点使用的地址)
+            port: 应答进程监听的端口（self.port未设置时使用）
+        
+        Returns:
+            dict: (源节点, 目标节点)到测试结果的映射，结果包含rtt_ms和mbps，失败时包含error
+        """
+        port = self.port or port
+        by_name = {name: (ssh_params, address) for name, ssh_params, address in targets}
+        rounds = self.schedule([name for name, _, _ in targets])
+        # 每批测试的耗时为RTT测试加吞吐量测试，应答进程在预计的总耗时加余量后自动退出
+        batch_timeout = self.seconds + 30
+        lifetime = len(rounds) * 2 * batch_timeout + 60
+        
+        start = time.monotonic()
+        with self.profiler.span("network_check.start", "exec", hosts=len(targets)):
+            started = self.async_executor.execute_parallel([
+                self._task(ssh_params, self._script("serve", address, port, lifetime), 30)
+                for _, ssh_params, address in targets
+            ])
+        pids = {}
+        links = {}
+        for (name, _, _), outcome in zip(targets, started):
+            exit_code, stdout, stderr = outcome["result"]
+            if exit_code == 0 and stdout.strip().isdigit():
+                pids[name] = stdout.strip()
+            else:
+                self.logger.warning(f"节点 {name} 上的网络测试应答进程启动失败：{stderr.strip() or stdout.strip()}")
+        
+        try:
+            for index, pairs in enumerate(rounds, 1):
+                # 同一轮先测试一个方向，再测试反方向，每批中每个节点只参与一项测试
+                for batch in (pairs, [(target, source) for source, target in pairs]):
+                    runnable = [(source, target) for source, target in batch if source in pids and target in pids]
+                    for source, target in batch:
+                        if (source, target) not in runnable:
+                            links[(source, target)] = {"error": "应答进程未启动"}
+                    if not runnable:
+                        continue
+                    with self.profiler.span(f"network_check.round{index}", "exec", links=len(runnable)):
+                        outcomes = self.async_executor.execute_parallel([
+                            self._task(by_name[source][0], self._script("probe", by_name[target][1], port, self.pings, self.seconds), batch_timeout)
+                            for source, target in runnable
+                        ])
+                    for (source, target), outcome in zip(runnable, outcomes):
+                        exit_code, stdout, stderr = outcome["result"]
+                        try:
+                            links[(source, target)] = json.loads(stdout.strip().splitlines()[-1])
+                        except (ValueError, IndexError):
+                            links[(source, target)] = {"error": "节点上没有python3" if exit_code == 127 else (stderr.strip() or f"退出码 {exit_code}")}
+        finally:
+            if pids:
+                self.async_executor.execute_parallel([
+                    self._task(by_name[name][0], f"kill {pid} 2>/dev/null; true", 30) for name, pid in pids.items()
+                ])
+        
+        self.logger.info(f"网络预检完成：{len(targets)} 个节点，{len(links)} 个方向的链路，耗时 {time.monotonic() - start:.2f} 秒")
+        return links
+    
+    def evaluate(self, names, links):
+        """
+        标记慢链路和不对称链路，输出矩阵并写入报告文件
+        
+        Args:
+            names: 节点名称列表（矩阵的行列顺序）
+            links: run的返回值
+        
+        Returns:
+            bool: True表示没有被拒绝的链路（action为warn时总是True）
+        """
+        measured = [link for link in links.values() if "error" not in link]
+        median_mbps = statistics.median(link["mbps"] for link in measured) if measured else 0
+        median_rtt = statistics.median(link["rtt_ms"] for link in measured) if measured else 0
+        
+        flagged = {}
+        for (source, target), link in links.items():
+            reasons = []
+            if "error" in link:
+                reasons.append(f"测试失败：{link['error']}")
+            else:
+                if link["mbps"] < median_mbps * self.min_ratio:
+                    reasons.append(f"吞吐量 {link['mbps']:.0f} MB/s，低于中位数 {median_mbps:.0f} MB/s 的 {self.min_ratio:g} 倍")
+                if self.min_ratio > 0 and link["rtt_ms"] > max(median_rtt / self.min_ratio, median_rtt + self.RTT_TOLERANCE_MS):
+                    reasons.append(f"RTT {link['rtt_ms']:.2f} ms，高于中位数 {median_rtt:.2f} ms 的 {1 / self.min_ratio:g} 倍")
+                reverse = links.get((target, source), {})
+                if "mbps" in reverse:
+                    fastest = max(link["mbps"], reverse["mbps"])
+                    if fastest > 0 and abs(link["mbps"] - reverse["mbps"]) / fastest > self.max_asymmetry:
+                        reasons.append(f"与反方向不对称：{link['mbps']:.0f} MB/s，反方向 {reverse['mbps']:.0f} MB/s")
+            if reasons:
+                flagged[(source, target)] = reasons
+        
+        self.logger.info(f"网络预检结果：链路吞吐量中位数 {median_mbps:.0f} MB/s，RTT中位数 {median_rtt:.2f} ms")
+        if len(names) <= self.matrix_limit:
+            self._log_matrix(names, links, flagged)
+        self._save(names, links, flagged, median_mbps, median_rtt)
+        
+        if not flagged:
+            self.logger.info("所有节点间链路的吞吐量和延迟都在正常范围内")
+            return True
+        
+        for (source, target), reasons in flagged.items():
+            message = f"链路 {source} -> {target} 异常：{'；'.join(reasons)}"
+            if self.action == "reject":
+                self.logger.error(message)
+            else:
+                self.logger.warning(message)
+        
+        if self.action == "reject":
+            self.logger.error(f"{len(flagged)} 个方向的链路未通过网络预检，拒绝启动MinIO（advanced.network_check.action为reject）")
+            return False
+        return True
+    
+    def _log_matrix(self, names, links, flagged):
+        """
+        在日志中输出吞吐量矩阵（MB/s/RTT毫秒），行为源节点，列为目标节点，异常链路带*号
+        """
+        width = max([12] + [len(name) for name in names])
+        self.logger.info("节点间链路矩阵（吞吐量MB/s/RTT毫秒，行为源节点，列为目标节点，*表示异常）：")
+        self.logger.info(f"  {'':<{width}}  " + "  ".join(f"{name:>{width}}" for name in names))
+        for source in names:
+            cells = []
+            for target in names:
+                link = links.get((source, target))
+                if source == target or link is None:
+                    cell = "-"
+                elif "error" in link:
+                    cell = "失败"
+                else:
+                    cell = f"{link['mbps']:.0f}/{link['rtt_ms']:.2f}"
+                if (source, target) in flagged:
+                    cell += "*"
+                cells.append(f"{cell:>{width}}")
+            self.logger.info(f"  {source:<{width}}  " + "  ".join(cells))
+    
+    def _save(self, names, links, flagged, median_mbps, median_rtt):
+        """
+        把测试结果矩阵写入JSON文件
+        """
+        if not self.report_file:
+            return
+        report = {
+            "nodes": list(names),
+            "median_mbps": median_mbps,
+            "median_rtt_ms": median_rtt,
+            "links": [
+                dict(link, source=source, target=target, flagged=flagged.get((source, target), []))
+                for (source, target), link in sorted(links.items())
+            ]
+        }
+        try:
+            directory = os.path.dirname(self.report_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.report_file, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            self.logger.info(f"网络预检结果已写入：{self.report_file}")
+        except Exception as e:
+            self.logger.warning(f"写入网络预检结果失败：{self.report_file}，错误：{e}")
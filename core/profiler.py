@@ -0,0 +1,149 @@
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from core.logger import Logger
+
+class Profiler:
+    """
+    部署耗时分析器
+    
+    记录部署阶段、节点任务和每次远程调用（连接、认证、执行、传输）的耗时区间，
+    部署结束后输出Chrome Trace格式的JSON文件（可在chrome://tracing或Perfetto中打开），
+    并在日志中汇总最慢的区间。未启用时span只有一次判断的开销。
+    """
+    
+    def __init__(self, enabled=False, logger=None):
+        self.enabled = enabled
+        self.logger = logger or Logger().get_logger()
+        self._events = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+        self._threads = {}
+        self._async_ids = itertools.count(1)
+    
+    def _tid(self):
+        ident = threading.get_ident()
+        with self._lock:
+            if ident not in self._threads:
+                self._threads[ident] = (len(self._threads) + 1, threading.current_thread().name)
+            return self._threads[ident][0]
+    
+    def record(self, name, category, start, end, asynchronous=False, **args):
+        """
+        记录一个已经结束的区间
+        
+        Args:
+            name: 区间名称
+            category: 区间类别，如phase、connect、auth、exec、transfer、download、health
+            start: 开始时间（time.perf_counter()）
+            end: 结束时间（time.perf_counter()）
+            asynchronous: 是否为协程中的区间，同一线程上可能相互重叠，按异步事件输出
+            args: 附加信息，如主机、命令、字节数
+        """
+        if not self.enabled:
+            return
+        event = {
+            "name": name,
+            "cat": category,
+            "ts": (start - self._origin) * 1e6,
+            "dur": (end - start) * 1e6,
+            "tid": self._tid(),
+            "args": args,
+            "async": asynchronous
+        }
+        with self._lock:
+            self._events.append(event)
+    
+    @contextmanager
+    def span(self, name, category, asynchronous=False, **args):
+        """
+        记录with语句块的耗时
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, category, start, time.perf_counter(), asynchronous, **args)
+    
+    def trace_events(self):
+        """
+        转换为Chrome Trace事件列表
+        """
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+        
+        trace = [{"name": "process_name", "ph": "M", "pid": self._pid, "args": {"name": "minio-deploy"}}]
+        for tid, thread_name in threads.values():
+            trace.append({"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": thread_name}})
+        
+        for event in events:
+            common = {"name": event["name"], "cat": event["cat"], "pid": self._pid, "tid": event["tid"]}
+            if event["async"]:
+                async_id = next(self._async_ids)
+                trace.append(dict(common, ph="b", id=async_id, ts=event["ts"], args=event["args"]))
+                trace.append(dict(common, ph="e", id=async_id, ts=event["ts"] + event["dur"]))
+            else:
+                trace.append(dict(common, ph="X", ts=event["ts"], dur=event["dur"], args=event["args"]))
+        return trace
+    
+    def save(self, path):
+        """
+        把记录的区间写入Chrome Trace格式的JSON文件
+        
+        Args:
+            path: 输出文件路径
+        """
+        if not self.enabled:
+            return
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+            self.logger.info(f"耗时分析文件已写入：{path}（可在chrome://tracing或https://ui.perfetto.dev中打开）")
+        except Exception as e:
+            self.logger.warning(f"写入耗时分析文件失败：{path}，错误：{e}")
+    
+    def category_totals(self):
+        """
+        按类别汇总区间数和累计耗时
+        
+        Returns:
+            dict: 类别到(区间数, 累计秒数)的映射
+        """
+        totals = {}
+        with self._lock:
+            for event in self._events:
+                count, seconds = totals.get(event["cat"], (0, 0.0))
+                totals[event["cat"]] = (count + 1, seconds + event["dur"] / 1e6)
+        return totals
+    
+    def log_summary(self, top_n=20):
+        """
+        在日志中输出最慢的top_n个区间和各类别的累计耗时
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            events = sorted(self._events, key=lambda event: event["dur"], reverse=True)[:top_n]
+        if not events:
+            return
+        
+        self.logger.info(f"耗时最长的 {len(events)} 个区间：")
+        self.logger.info(f"  {'耗时(秒)':>10}  {'类别':<10}  {'名称':<30}  详情")
+        for event in events:
+            detail = "，".join(f"{key}={value}" for key, value in event["args"].items())
+            self.logger.info(f"  {event['dur'] / 1e6:>10.3f}  {event['cat']:<10}  {event['name']:<30}  {detail[:120]}")
+        
+        self.logger.info("各类别累计耗时（并发区间会重复计算）：")
+        for category, (count, seconds) in sorted(self.category_totals().items(), key=lambda item: item[1][1], reverse=True):
+            self.logger.info(f"  {category:<10}  {count:>6} 个区间  {seconds:>10.3f} 秒")
@@ -1,15 +1,255 @@
+import io
 import paramiko
 import os
+import select
+import shlex
 import subprocess
 import socket
+import threading
+import time
 import traceback
+import uuid
 from core.logger import Logger
-from concurrent.futures import ThreadPoolExecutor
+from core.profiler import Profiler
 
 class RemoteExecutor:
-    def __init__(self, logger=None):
+    # OpenSSH服务端MaxSessions的默认值
+    DEFAULT_MAX_SESSIONS = 10
+    
+    def __init__(self, logger=None, keepalive_interval=30, idle_timeout=300, max_sessions=DEFAULT_MAX_SESSIONS,
+                 sftp_window_size=None, transfer_chunk_size=1024 * 1024, profiler=None):
         self.logger = logger or Logger().get_logger()
+        self.profiler = profiler or Profiler(logger=self.logger)
+        # SSH连接池：键为(host, port, username, 认证方式)，值为{"client", "last_used"}
         self.ssh_clients = {}
+        self.keepalive_interval = keepalive_interval
+        self.idle_timeout = idle_timeout
+        self._pool_lock = threading.Lock()
+        self._key_locks = {}
+        self.max_sessions = max_sessions
+        # 每个连接探测到的服务端MaxSessions上限
+        self._session_limits = {}
+        # SFTP传输窗口大小（字节），为None时使用paramiko默认值；高延迟链路上调大可提升吞吐量
+        self.sftp_window_size = sftp_window_size
+        self.transfer_chunk_size = transfer_chunk_size
+        self.last_transfer = None
+        self.stats = {
+            "handshakes": 0,
+            "reuses": 0,
+            "idle_closed": 0,
+            "broken_closed": 0,
+            "bytes_sent": 0,
+            "bytes_received": 0
+        }
+    
+    def _resolve_private_key(self, key_file):
+        """
+        处理密钥文件路径（如果提供的是公钥文件，自动转换为私钥文件）
+        
+        Args:
+            key_file: SSH密钥文件路径，可以是公钥或私钥
+        
+        Returns:
+            str: 私钥文件路径，未提供时返回None
+        """
+        if not key_file:
+            return None
+        
+        private_key_file = os.path.expanduser(key_file)
+        if private_key_file.endswith('.pub'):
+            temp_private = private_key_file[:-4]  # 移除.pub后缀
+            self.logger.debug(f"将公钥文件路径转换为私钥文件路径：{private_key_file} -> {temp_private}")
+            private_key_file = temp_private
+        return private_key_file
+    
+    def _pool_key(self, host, port, username, key_file, password):
+        """
+        生成连接池键：(host, port, username, 认证方式)
+        
+        认证方式只记录密钥路径和是否使用密码，不把密码本身放入键中
+        """
+        private_key_file = self._resolve_private_key(key_file)
+        if private_key_file and password:
+            auth_method = f"key:{private_key_file}+password"
+        elif password:
+            auth_method = "password"
+        elif private_key_file:
+            auth_method = f"key:{private_key_file}"
+        else:
+            auth_method = "default"
+        return (host, int(port), username, auth_method)
+    
+    def _connect_client(self, host, port, username, key_file, password):
+        """
+        建立新的SSH连接并完成认证
+        
+        Returns:
+            paramiko.SSHClient: 已认证的SSH客户端
+        """
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        
+        private_key_file = self._resolve_private_key(key_file)
+        
+        # paramiko的connect包含TCP连接、密钥交换和认证，启用耗时分析时单独记录认证阶段
+        if self.profiler.enabled and hasattr(client, "_auth"):
+            auth = client._auth
+            
+            def timed_auth(*args, **kwargs):
+                with self.profiler.span("ssh.auth", "auth", host=host, username=username):
+                    return auth(*args, **kwargs)
+            
+            client._auth = timed_auth
+        
+        with self.profiler.span("ssh.connect", "connect", host=host, port=port):
+            # 优先尝试使用SSH密钥连接（如果已建立互信）
+            if (private_key_file or password) and not password:
+                if private_key_file:
+                    client.connect(host, port, username, key_filename=private_key_file, timeout=5)
+                else:
+                    client.connect(host, port, username, timeout=5)
+            # 同时提供了密码和密钥，先尝试密钥连接
+            elif private_key_file and password:
+                try:
+                    client.connect(host, port, username, key_filename=private_key_file, timeout=5, look_for_keys=False, allow_agent=False)
+                    self.logger.debug(f"优先使用SSH密钥连接成功")
+                except paramiko.ssh_exception.AuthenticationException:
+                    self.logger.debug(f"SSH密钥连接失败，尝试使用密码连接")
+                    client.connect(host, port, username, password, timeout=5)
+            # 只提供了密码或都没提供
+            else:
+                if password:
+                    client.connect(host, port, username, password, timeout=5)
+                elif private_key_file:
+                    client.connect(host, port, username, key_filename=private_key_file, timeout=5)
+                else:
+                    client.connect(host, port, username, timeout=5)
+        
+        # 开启keepalive，避免长时间空闲的连接被中间设备断开
+        transport = client.get_transport()
+        if transport is not None and self.keepalive_interval:
+            transport.set_keepalive(self.keepalive_interval)
+        
+        return client
+    
+    def _get_client(self, host, port=22, username='root', key_file=None, password=None):
+        """
+        从连接池获取已认证的SSH客户端，不存在或已失效时重新建立连接
+        
+        Returns:
+            paramiko.SSHClient: 已认证的SSH客户端
+        """
+        key = self._pool_key(host, port, username, key_file, password)
+        
+        with self._pool_lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        
+        # 同一个键的连接建立串行化，避免并发时重复握手
+        with key_lock:
+            with self._pool_lock:
+                entry = self.ssh_clients.get(key)
+            
+            if entry is not None:
+                transport = entry["client"].get_transport()
+                idle = time.monotonic() - entry["last_used"]
+                if transport is None or not transport.is_active():
+                    self.logger.debug("连接池中的SSH连接已失效，重新连接：%s@%s:%s", username, host, port)
+                    self._discard_client(key, reason="broken_closed")
+                elif self.idle_timeout and idle > self.idle_timeout:
+                    self.logger.debug("连接池中的SSH连接空闲 %.0f 秒，超过 %s 秒，重新连接：%s@%s:%s", idle, self.idle_timeout, username, host, port)
+                    self._discard_client(key, reason="idle_closed")
+                else:
+                    with self._pool_lock:
+                        entry["last_used"] = time.monotonic()
+                        self.stats["reuses"] += 1
+                    return entry["client"]
+            
+            self.logger.debug("建立新的SSH连接：%s@%s:%s", username, host, port)
+            client = self._connect_client(host, port, username, key_file, password)
+            with self._pool_lock:
+                self.ssh_clients[key] = {"client": client, "last_used": time.monotonic()}
+                self.stats["handshakes"] += 1
+            return client
+    
+    def _discard_client(self, key, reason="broken_closed"):
+        """
+        从连接池移除并关闭指定连接
+        """
+        with self._pool_lock:
+            entry = self.ssh_clients.pop(key, None)
+            if entry is not None and reason in self.stats:
+                self.stats[reason] += 1
+        
+        if entry is not None:
+            try:
+                entry["client"].close()
+            except Exception as e:
+                self.logger.debug("关闭SSH连接时出错：%s", e)
+    
+    def _invalidate_client(self, host, port=22, username='root', key_file=None, password=None):
+        """
+        命令执行出错后，如果连接已断开则将其移出连接池
+        """
+        key = self._pool_key(host, port, username, key_file, password)
+        with self._pool_lock:
+            entry = self.ssh_clients.get(key)
+        if entry is None:
+            return
+        
+        transport = entry["client"].get_transport()
+        if transport is None or not transport.is_active():
+            self._discard_client(key, reason="broken_closed")
+    
+    def close_idle_connections(self, idle_timeout=None):
+        """
+        关闭空闲时间超过阈值的连接
+        
+        Args:
+            idle_timeout: 空闲超时时间（秒），默认使用构造时的idle_timeout
+        
+        Returns:
+            int: 关闭的连接数
+        """
+        idle_timeout = self.idle_timeout if idle_timeout is None else idle_timeout
+        now = time.monotonic()
+        
+        with self._pool_lock:
+            idle_keys = [key for key, entry in self.ssh_clients.items() if now - entry["last_used"] > idle_timeout]
+        
+        for key in idle_keys:
+            self._discard_client(key, reason="idle_closed")
+        
+        if idle_keys:
+            self.logger.debug("关闭 %d 个空闲SSH连接", len(idle_keys))
+        return len(idle_keys)
+    
+    def close_all(self):
+        """
+        关闭连接池中的所有SSH连接，并输出连接池统计信息
+        """
+        with self._pool_lock:
+            keys = list(self.ssh_clients.keys())
+        
+        for key in keys:
+            self._discard_client(key, reason=None)
+        
+        stats = self.get_pool_stats()
+        self.logger.info(
+            f"SSH连接池已关闭，共握手 {stats['handshakes']} 次，复用连接 {stats['reuses']} 次（节省握手 {stats['handshakes_saved']} 次）"
+        )
+    
+    def get_pool_stats(self):
+        """
+        获取连接池统计信息
+        
+        Returns:
+            dict: 包含handshakes, reuses, handshakes_saved, idle_closed, broken_closed, open_connections
+        """
+        with self._pool_lock:
+            stats = dict(self.stats)
+            stats["open_connections"] = len(self.ssh_clients)
+        stats["handshakes_saved"] = stats["reuses"]
+        return stats
     
     def check_ssh_connection(self, host, port=22, username='root', key_file=None, password=None, timeout=5):
         """
@@ -211,7 +451,7 @@ class RemoteExecutor:
             # 4. 如果所有连接尝试都失败或无法确认互信
             self.logger.info(f"SSH互信未建立：{username}@{host}:{port}")
             return False
-            
+        
         except paramiko.ssh_exception.AuthenticationException as e:
             self.logger.debug(f"认证失败详情：{e}")
             self.logger.info(f"SSH互信未建立：{username}@{host}:{port}")
@@ -354,7 +594,7 @@ class RemoteExecutor:
             client.close()
             self.logger.info(f"SSH互信建立成功：{username}@{host}:{port}")
             return True
-            
+        
         except paramiko.ssh_exception.AuthenticationException as e:
             self.logger.debug(f"认证失败详情：{e}")
             self.logger.error(f"建立SSH互信失败，认证错误：{e}")
@@ -388,67 +628,361 @@ class RemoteExecutor:
         Returns:
             tuple: (exit_code, stdout, stderr)
         """
-        self.logger.debug(f"执行远程命令：{username}@{host}:{port}，命令：{command}")
+        self.logger.debug("执行远程命令：%s@%s:%s，命令：%s", username, host, port, command)
         
         try:
-            client = paramiko.SSHClient()
-            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            
-            # 处理密钥文件路径（如果提供的是公钥文件，自动转换为私钥文件）
-            private_key_file = None
-            if key_file:
-                private_key_file = os.path.expanduser(key_file)
-                if private_key_file.endswith('.pub'):
-                    temp_private = private_key_file[:-4]  # 移除.pub后缀
-                    self.logger.debug(f"将公钥文件路径转换为私钥文件路径：{private_key_file} -> {temp_private}")
-                    private_key_file = temp_private
-            
-            # 优先尝试使用SSH密钥连接（如果已建立互信）
-            if (private_key_file or password) and not password:
-                if private_key_file:
-                    client.connect(host, port, username, key_filename=private_key_file, timeout=5)
-                else:
-                    client.connect(host, port, username, timeout=5)
-            # 同时提供了密码和密钥，先尝试密钥连接
-            elif private_key_file and password:
-                try:
-                    client.connect(host, port, username, key_filename=private_key_file, timeout=5, look_for_keys=False, allow_agent=False)
-                    self.logger.debug(f"优先使用SSH密钥连接成功")
-                except paramiko.ssh_exception.AuthenticationException:
-                    self.logger.debug(f"SSH密钥连接失败，尝试使用密码连接")
-                    client.connect(host, port, username, password, timeout=5)
-            # 只提供了密码或都没提供
-            else:
-                if password:
-                    client.connect(host, port, username, password, timeout=5)
-                elif private_key_file:
-                    client.connect(host, port, username, key_filename=private_key_file, timeout=5)
-                else:
-                    client.connect(host, port, username, timeout=5)
-            
-            stdin, stdout, stderr = client.exec_command(command, timeout=timeout)
-            exit_code = stdout.channel.recv_exit_status()
-            
-            stdout_str = stdout.read().decode('utf-8').strip()
-            stderr_str = stderr.read().decode('utf-8').strip()
+            client = self._get_client(host, port, username, key_file, password)
             
-            client.close()
+            with self.profiler.span("ssh.exec", "exec", host=host, command=command[:200]):
+                stdin, stdout, stderr = client.exec_command(command, timeout=timeout)
+                exit_code = stdout.channel.recv_exit_status()
+                
+                stdout_str = stdout.read().decode('utf-8').strip()
+                stderr_str = stderr.read().decode('utf-8').strip()
             
             if exit_code == 0:
-                self.logger.debug(f"命令执行成功：{command}，输出：{stdout_str}")
+                self.logger.debug("命令执行成功：%s，输出：%s", command, stdout_str)
             else:
                 self.logger.warning(f"命令执行失败：{command}，退出码：{exit_code}，错误：{stderr_str}")
             
             return (exit_code, stdout_str, stderr_str)
         
         except Exception as e:
+            self._invalidate_client(host, port, username, key_file, password)
             self.logger.error(f"执行远程命令失败：{username}@{host}:{port}，命令：{command}，错误：{e}")
             return (1, "", str(e))
     
-    def upload_file(self, local_path, remote_path, host, port=22, username='root', key_file=None, password=None):
+    def run_many(self, host, commands, port=22, username='root', key_file=None, password=None, timeout=30, max_sessions=None):
+        """
+        在同一个SSH连接上并发打开多个通道执行多条相互独立的命令
+        
+        Args:
+            host: 远程主机IP或主机名
+            commands: 命令列表
+            port: SSH端口，默认为22
+            username: 用户名，默认为root
+            key_file: SSH私钥文件路径
+            password: 密码
+            timeout: 每条命令的超时时间，默认为30秒
+            max_sessions: 同时打开的最大通道数，默认使用服务端MaxSessions（OpenSSH默认为10）
+        
+        Returns:
+            list: 与commands顺序一致的结果列表，每个结果为(exit_code, stdout, stderr)
+        """
+        commands = list(commands)
+        if not commands:
+            return []
+        
+        self.logger.debug("并发执行远程命令：%s@%s:%s，命令数：%d", username, host, port, len(commands))
+        
+        key = self._pool_key(host, port, username, key_file, password)
+        limit = max_sessions or self._session_limits.get(key, self.max_sessions)
+        
+        try:
+            client = self._get_client(host, port, username, key_file, password)
+            with self.profiler.span("ssh.run_many", "exec", host=host, commands=len(commands)):
+                results = self._run_channels(client.get_transport(), key, commands, limit, timeout)
+        except Exception as e:
+            self._invalidate_client(host, port, username, key_file, password)
+            self.logger.error(f"并发执行远程命令失败：{username}@{host}:{port}，错误：{e}")
+            return [(1, "", str(e))] * len(commands)
+        
+        for command, (exit_code, stdout_str, stderr_str) in zip(commands, results):
+            if exit_code == 0:
+                self.logger.debug("命令执行成功：%s，输出：%s", command, stdout_str)
+            else:
+                self.logger.debug("命令执行失败：%s，退出码：%s，错误：%s", command, exit_code, stderr_str)
+        
+        return results
+    
+    def _run_channels(self, transport, key, commands, limit, timeout):
+        """
+        在单个transport上驱动多个exec通道，直到所有命令完成
+        
+        服务端拒绝打开新通道（超过MaxSessions）时，将上限降为当前已打开的通道数，
+        被拒绝的命令重新排队，并记住该上限供后续调用使用。
+        """
+        results = [None] * len(commands)
+        pending = list(range(len(commands)))
+        active = {}  # channel -> [index, stdout_chunks, stderr_chunks, deadline]
+        
+        while pending or active:
+            # 在上限范围内打开新通道
+            while pending and len(active) < limit:
+                index = pending[0]
+                try:
+                    channel = transport.open_session(timeout=timeout)
+                except paramiko.ssh_exception.ChannelException as e:
+                    if not active:
+                        raise
+                    limit = len(active)
+                    self._session_limits[key] = limit
+                    self.logger.debug("服务端拒绝打开新通道（%s），将并发通道上限调整为 %s", e, limit)
+                    break
+                pending.pop(0)
+                channel.exec_command(commands[index])
+                active[channel] = [index, [], [], time.monotonic() + timeout]
+            
+            readable, _, _ = select.select(list(active), [], [], 0.1)
+            now = time.monotonic()
+            
+            for channel in list(active):
+                state = active[channel]
+                if channel in readable or channel.recv_ready() or channel.recv_stderr_ready():
+                    while channel.recv_ready():
+                        state[1].append(channel.recv(32768))
+                    while channel.recv_stderr_ready():
+                        state[2].append(channel.recv_stderr(32768))
+                
+                if channel.exit_status_ready() and not channel.recv_ready() and not channel.recv_stderr_ready():
+                    # 退出码就绪后读取剩余输出
+                    while True:
+                        chunk = channel.recv(32768)
+                        if not chunk:
+                            break
+                        state[1].append(chunk)
+                    while channel.recv_stderr_ready():
+                        state[2].append(channel.recv_stderr(32768))
+                    results[state[0]] = (
+                        channel.recv_exit_status(),
+                        b"".join(state[1]).decode('utf-8').strip(),
+                        b"".join(state[2]).decode('utf-8').strip()
+                    )
+                    channel.close()
+                    del active[channel]
+                elif now > state[3]:
+                    results[state[0]] = (1, b"".join(state[1]).decode('utf-8').strip(), f"命令执行超时（{timeout}秒）")
+                    channel.close()
+                    del active[channel]
+        
+        return results
+    
+    def execute_script(self, host, steps, port=22, username='root', key_file=None, password=None, timeout=300, stop_on_error=True):
+        """
+        将多个有序步骤合并为一个shell脚本，在一次远程调用中执行
+        
+        每个步骤的stdout/stderr前后都会输出带随机标记的分隔行，据此拆分出每个步骤的
+        退出码和输出，调用方仍可以按步骤给出错误信息。
+        
+        Args:
+            host: 远程主机IP或主机名
+            steps: 步骤列表，每个步骤是包含name和command的字典，或(name, command)元组
+            port: SSH端口，默认为22
+            username: 用户名，默认为root
+            key_file: SSH私钥文件路径
+            password: 密码
+            timeout: 整个脚本的超时时间，默认为300秒
+            stop_on_error: 某个步骤失败后是否停止执行后续步骤，默认为True
+        
+        Returns:
+            list: 每个步骤的执行结果字典，包含name, command, exit_code, stdout, stderr, skipped
+        """
+        steps = [step if isinstance(step, dict) else {"name": step[0], "command": step[1]} for step in steps]
+        if not steps:
+            return []
+        
+        marker = f"__MINIO_DEPLOY_{uuid.uuid4().hex}__"
+        script = self._build_script(steps, marker, stop_on_error)
+        self.logger.debug("批量执行远程脚本：%s@%s:%s，步骤：%s", username, host, port, [step['name'] for step in steps])
+        
+        try:
+            client = self._get_client(host, port, username, key_file, password)
+            key = self._pool_key(host, port, username, key_file, password)
+            with self.profiler.span("ssh.script", "exec", host=host, steps=",".join(step["name"] for step in steps)):
+                exit_code, stdout_str, stderr_str = self._run_channels(client.get_transport(), key, [script], 1, timeout)[0]
+        except Exception as e:
+            self._invalidate_client(host, port, username, key_file, password)
+            self.logger.error(f"批量执行远程脚本失败：{username}@{host}:{port}，错误：{e}")
+            exit_code, stdout_str, stderr_str = (1, "", str(e))
+        
+        stdout_steps = self._split_script_output(stdout_str, marker)
+        stderr_steps = self._split_script_output(stderr_str, marker)
+        
+        results = []
+        for index, step in enumerate(steps):
+            if index in stdout_steps:
+                step_exit_code, step_stdout = stdout_steps[index]
+                step_stderr = stderr_steps.get(index, (None, ""))[1]
+                skipped = False
+                if step_exit_code is None:
+                    # 有开始标记但没有结束标记，说明脚本在该步骤中途被中断（如超时）
+                    step_exit_code = exit_code if exit_code != 0 else 1
+                    step_stderr = step_stderr or stderr_str
+            elif index == 0 and exit_code != 0:
+                # 脚本在第一个步骤开始之前就失败（如连接失败），错误记在第一个步骤上
+                step_exit_code, step_stdout, step_stderr = exit_code, "", stderr_str
+                skipped = False
+            else:
+                # 前面的步骤失败后未执行的步骤
+                step_exit_code, step_stdout, step_stderr = None, "", ""
+                skipped = True
+            
+            results.append({
+                "name": step["name"],
+                "command": step["command"],
+                "exit_code": step_exit_code,
+                "stdout": step_stdout,
+                "stderr": step_stderr,
+                "skipped": skipped
+            })
+            
+            if not skipped and step_exit_code != 0:
+                self.logger.warning(f"脚本步骤执行失败：{step['name']}，退出码：{step_exit_code}，错误：{step_stderr}")
+        
+        return results
+    
+    def _build_script(self, steps, marker, stop_on_error):
+        """
+        生成带分隔标记的POSIX shell脚本
+        """
+        lines = [
+            f"__mds_mark='{marker}'",
+            "__mds_step() {",
+            "  printf '%s BEGIN %s\\n' \"$__mds_mark\" \"$1\"",
+            "  printf '%s BEGIN %s\\n' \"$__mds_mark\" \"$1\" >&2",
+            "  ( eval \"$2\" )",
+            "  __mds_rc=$?",
+            "  printf '\\n%s END %s %s\\n' \"$__mds_mark\" \"$1\" \"$__mds_rc\"",
+            "  printf '\\n%s END %s %s\\n' \"$__mds_mark\" \"$1\" \"$__mds_rc\" >&2",
+            "  return $__mds_rc",
+            "}"
+        ]
+        for index, step in enumerate(steps):
+            line = f"__mds_step {index} {shlex.quote(step['command'])}"
+            if stop_on_error:
+                line += " || exit $?"
+            lines.append(line)
+        return "\n".join(lines)
+    
+    def _split_script_output(self, output, marker):
+        """
+        按分隔标记拆分脚本输出
+        
+        Returns:
+            dict: 步骤序号 -> (exit_code, output)，exit_code为None表示步骤没有正常结束
+        """
+        sections = {}
+        current = None
+        buffer = []
+        
+        for line in output.split("\n"):
+            if line.startswith(marker):
+                parts = line[len(marker):].split()
+                if len(parts) >= 2 and parts[0] == "BEGIN":
+                    current = int(parts[1])
+                    buffer = []
+                    sections[current] = (None, "")
+                elif len(parts) >= 3 and parts[0] == "END" and current is not None:
+                    sections[current] = (int(parts[2]), "\n".join(buffer).strip())
+                    current = None
+                continue
+            if current is not None:
+                buffer.append(line)
+        
+        if current is not None:
+            sections[current] = (None, "\n".join(buffer).strip())
+        
+        return sections
+    
+    def put_content(self, content, remote_path, host, port=22, username='root', key_file=None, password=None, mode=0o644):
+        """
+        将内存中的内容通过SFTP原子写入远程文件（先写临时文件再重命名）
+        
+        Args:
+            content: 文件内容（str或bytes）
+            remote_path: 远程文件路径
+            host: 远程主机IP或主机名
+            port: SSH端口，默认为22
+            username: 用户名，默认为root
+            key_file: SSH私钥文件路径
+            password: 密码
+            mode: 远程文件权限，默认为0o644
+        
+        Returns:
+            bool: True表示写入成功，False表示失败
+        """
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        
+        self.logger.info(f"写入远程文件：{username}@{host}:{port}:{remote_path}（{len(content)} 字节）")
+        
+        temp_path = f"{remote_path}.tmp-{uuid.uuid4().hex[:8]}"
+        sftp = None
+        try:
+            client = self._get_client(host, port, username, key_file, password)
+            with self.profiler.span("sftp.put", "transfer", host=host, path=remote_path, bytes=len(content)):
+                sftp = client.open_sftp()
+                sftp.putfo(io.BytesIO(content), temp_path, file_size=len(content), confirm=True)
+                sftp.chmod(temp_path, mode)
+                self._sftp_replace(sftp, temp_path, remote_path)
+            
+            self.logger.info(f"远程文件写入成功：{username}@{host}:{port}:{remote_path}")
+            return True
+        
+        except Exception as e:
+            self._invalidate_client(host, port, username, key_file, password)
+            self.logger.error(f"远程文件写入失败：{username}@{host}:{port}:{remote_path}，错误：{e}")
+            if sftp is not None:
+                try:
+                    sftp.remove(temp_path)
+                except Exception:
+                    pass
+            return False
+        finally:
+            if sftp is not None:
+                sftp.close()
+    
+    def _sftp_replace(self, sftp, temp_path, remote_path):
+        """
+        用临时文件原子替换目标文件，服务端不支持posix-rename扩展时退回普通rename
+        """
+        try:
+            sftp.posix_rename(temp_path, remote_path)
+        except IOError:
+            # SFTPv3的rename在目标存在时会失败，先删除目标再重命名
+            try:
+                sftp.remove(remote_path)
+            except IOError:
+                pass
+            sftp.rename(temp_path, remote_path)
+    
+    def _open_sftp(self, client):
+        """
+        在已认证的连接上打开SFTP会话，使用配置的窗口大小以便流水线传输
+        """
+        if self.sftp_window_size:
+            return paramiko.SFTPClient.from_transport(client.get_transport(), window_size=self.sftp_window_size)
+        return client.open_sftp()
+    
+    def _record_transfer(self, direction, path, transferred, offset, total, elapsed):
+        """
+        记录并输出一次文件传输的吞吐量
+        """
+        throughput = transferred / elapsed / (1024 * 1024) if elapsed > 0 else 0.0
+        with self._pool_lock:
+            self.stats["bytes_sent" if direction == "upload" else "bytes_received"] += transferred
+        self.last_transfer = {
+            "direction": direction,
+            "path": path,
+            "bytes": transferred,
+            "resumed_from": offset,
+            "total": total,
+            "seconds": elapsed,
+            "mb_per_second": throughput
+        }
+        self.logger.info(
+            f"传输完成：{path}，本次传输 {transferred} 字节（断点位置 {offset}，总大小 {total}），"
+            f"耗时 {elapsed:.2f} 秒，吞吐量 {throughput:.2f} MB/s"
+        )
+    
+    def upload_file(self, local_path, remote_path, host, port=22, username='root', key_file=None, password=None,
+                    chunk_size=None, resume=True, checksum=None, mode=None):
         """
         上传文件到远程主机
         
+        以固定大小的分块从本地读入可复用缓冲区，通过流水线SFTP写入远程的.part文件，
+        传输完成后再重命名为目标文件。连接中断后再次调用会从.part文件的当前大小处续传。
+        
         Args:
             local_path: 本地文件路径
             remote_path: 远程文件路径
@@ -457,64 +991,90 @@ class RemoteExecutor:
             username: 用户名，默认为root
             key_file: SSH私钥文件路径
             password: 密码
+            chunk_size: 每次从本地读取的分块大小，默认使用transfer_chunk_size
+            resume: 是否从远程.part文件断点续传，默认为True
+            checksum: 期望的sha256值，提供时在重命名前校验远程文件
+            mode: 远程文件权限，默认与本地文件一致
         
         Returns:
             bool: True表示上传成功，False表示失败
         """
         self.logger.info(f"上传文件：{local_path} -> {username}@{host}:{port}:{remote_path}")
         
+        chunk_size = chunk_size or self.transfer_chunk_size
+        part_path = f"{remote_path}.part"
+        sftp = None
+        
         try:
-            client = paramiko.SSHClient()
-            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            
-            # 处理密钥文件路径（如果提供的是公钥文件，自动转换为私钥文件）
-            private_key_file = None
-            if key_file:
-                private_key_file = os.path.expanduser(key_file)
-                if private_key_file.endswith('.pub'):
-                    temp_private = private_key_file[:-4]  # 移除.pub后缀
-                    self.logger.debug(f"将公钥文件路径转换为私钥文件路径：{private_key_file} -> {temp_private}")
-                    private_key_file = temp_private
+            client = self._get_client(host, port, username, key_file, password)
+            sftp = self._open_sftp(client)
             
-            # 优先尝试使用SSH密钥连接（如果已建立互信）
-            if (private_key_file or password) and not password:
-                if private_key_file:
-                    client.connect(host, port, username, key_filename=private_key_file, timeout=5)
-                else:
-                    client.connect(host, port, username, timeout=5)
-            # 同时提供了密码和密钥，先尝试密钥连接
-            elif private_key_file and password:
+            total = os.path.getsize(local_path)
+            offset = 0
+            if resume:
                 try:
-                    client.connect(host, port, username, key_filename=private_key_file, timeout=5, look_for_keys=False, allow_agent=False)
-                    self.logger.debug(f"优先使用SSH密钥连接成功")
-                except paramiko.ssh_exception.AuthenticationException:
-                    self.logger.debug(f"SSH密钥连接失败，尝试使用密码连接")
-                    client.connect(host, port, username, password, timeout=5)
-            # 只提供了密码或都没提供
-            else:
-                if password:
-                    client.connect(host, port, username, password, timeout=5)
-                elif private_key_file:
-                    client.connect(host, port, username, key_filename=private_key_file, timeout=5)
-                else:
-                    client.connect(host, port, username, timeout=5)
+                    offset = sftp.stat(part_path).st_size
+                except IOError:
+                    offset = 0
+                if offset > total:
+                    self.logger.warning(f"远程临时文件 {part_path} 大于本地文件，重新上传")
+                    offset = 0
+                elif offset:
+                    self.logger.info(f"从断点 {offset}/{total} 字节处续传：{part_path}")
             
-            sftp = client.open_sftp()
-            sftp.put(local_path, remote_path)
-            sftp.close()
-            client.close()
+            start = time.monotonic()
+            buffer = bytearray(chunk_size)
+            view = memoryview(buffer)
+            
+            with self.profiler.span("sftp.upload", "transfer", host=host, path=remote_path, bytes=total - offset), \
+                    open(local_path, 'rb') as local_file, sftp.open(part_path, 'r+b' if offset else 'wb', bufsize=0) as remote_file:
+                remote_file.set_pipelined(True)
+                if offset:
+                    local_file.seek(offset)
+                    remote_file.seek(offset)
+                
+                while True:
+                    count = local_file.readinto(buffer)
+                    if not count:
+                        break
+                    remote_file.write(view[:count])
+            
+            elapsed = time.monotonic() - start
             
+            remote_size = sftp.stat(part_path).st_size
+            if remote_size != total:
+                raise IOError(f"上传后文件大小不一致：本地 {total} 字节，远程 {remote_size} 字节")
+            
+            if checksum:
+                exit_code, stdout_str, stderr_str = self.execute_command(host, f"sha256sum {shlex.quote(part_path)}", port, username, key_file, password)
+                remote_checksum = stdout_str.split()[0] if exit_code == 0 and stdout_str else ""
+                if remote_checksum != checksum:
+                    sftp.remove(part_path)
+                    raise IOError(f"sha256校验失败：期望 {checksum}，实际 {remote_checksum or stderr_str}")
+            
+            sftp.chmod(part_path, mode if mode is not None else os.stat(local_path).st_mode & 0o7777)
+            self._sftp_replace(sftp, part_path, remote_path)
+            
+            self._record_transfer("upload", remote_path, total - offset, offset, total, elapsed)
             self.logger.info(f"文件上传成功：{local_path} -> {username}@{host}:{port}:{remote_path}")
             return True
         
         except Exception as e:
+            self._invalidate_client(host, port, username, key_file, password)
             self.logger.error(f"文件上传失败：{local_path} -> {username}@{host}:{port}:{remote_path}，错误：{e}")
             return False
+        finally:
+            if sftp is not None:
+                sftp.close()
     
-    def download_file(self, remote_path, local_path, host, port=22, username='root', key_file=None, password=None):
+    def download_file(self, remote_path, local_path, host, port=22, username='root', key_file=None, password=None,
+                      chunk_size=None, resume=True):
         """
         从远程主机下载文件
         
+        使用SFTP预取（多个读请求同时在途）下载到本地的.part文件，完成后重命名为目标文件。
+        连接中断后再次调用会从本地.part文件的当前大小处续传。
+        
         Args:
             remote_path: 远程文件路径
             local_path: 本地文件路径
@@ -523,105 +1083,81 @@ class RemoteExecutor:
             username: 用户名，默认为root
             key_file: SSH私钥文件路径
             password: 密码
+            chunk_size: 每次读取的分块大小，默认使用transfer_chunk_size
+            resume: 是否从本地.part文件断点续传，默认为True
         
         Returns:
             bool: True表示下载成功，False表示失败
         """
         self.logger.info(f"下载文件：{username}@{host}:{port}:{remote_path} -> {local_path}")
         
+        chunk_size = chunk_size or self.transfer_chunk_size
+        part_path = f"{local_path}.part"
+        sftp = None
+        
         try:
-            client = paramiko.SSHClient()
-            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            client = self._get_client(host, port, username, key_file, password)
+            sftp = self._open_sftp(client)
             
-            # 处理密钥文件路径（如果提供的是公钥文件，自动转换为私钥文件）
-            private_key_file = None
-            if key_file:
-                private_key_file = os.path.expanduser(key_file)
-                if private_key_file.endswith('.pub'):
-                    temp_private = private_key_file[:-4]  # 移除.pub后缀
-                    self.logger.debug(f"将公钥文件路径转换为私钥文件路径：{private_key_file} -> {temp_private}")
-                    private_key_file = temp_private
+            total = sftp.stat(remote_path).st_size
+            offset = os.path.getsize(part_path) if resume and os.path.exists(part_path) else 0
+            if offset > total:
+                self.logger.warning(f"本地临时文件 {part_path} 大于远程文件，重新下载")
+                offset = 0
+            elif offset:
+                self.logger.info(f"从断点 {offset}/{total} 字节处续传：{part_path}")
             
-            # 优先尝试使用SSH密钥连接（如果已建立互信）
-            if (private_key_file or password) and not password:
-                if private_key_file:
-                    client.connect(host, port, username, key_filename=private_key_file, timeout=5)
-                else:
-                    client.connect(host, port, username, timeout=5)
-            # 同时提供了密码和密钥，先尝试密钥连接
-            elif private_key_file and password:
-                try:
-                    client.connect(host, port, username, key_filename=private_key_file, timeout=5, look_for_keys=False, allow_agent=False)
-                    self.logger.debug(f"优先使用SSH密钥连接成功")
-                except paramiko.ssh_exception.AuthenticationException:
-                    self.logger.debug(f"SSH密钥连接失败，尝试使用密码连接")
-                    client.connect(host, port, username, password, timeout=5)
-            # 只提供了密码或都没提供
-            else:
-                if password:
-                    client.connect(host, port, username, password, timeout=5)
-                elif private_key_file:
-                    client.connect(host, port, username, key_filename=private_key_file, timeout=5)
-                else:
-                    client.connect(host, port, username, timeout=5)
+            start = time.monotonic()
             
-            sftp = client.open_sftp()
-            sftp.get(remote_path, local_path)
-            sftp.close()
-            client.close()
+            with self.profiler.span("sftp.download", "transfer", host=host, path=remote_path, bytes=total - offset), \
+                    sftp.open(remote_path, 'rb') as remote_file, open(part_path, 'r+b' if offset else 'wb') as local_file:
+                if offset:
+                    remote_file.seek(offset)
+                    local_file.seek(offset)
+                remote_file.prefetch(total)
+                
+                while True:
+                    data = remote_file.read(chunk_size)
+                    if not data:
+                        break
+                    local_file.write(data)
             
+            elapsed = time.monotonic() - start
+            
+            local_size = os.path.getsize(part_path)
+            if local_size != total:
+                raise IOError(f"下载后文件大小不一致：远程 {total} 字节，本地 {local_size} 字节")
+            
+            os.replace(part_path, local_path)
+            
+            self._record_transfer("download", local_path, total - offset, offset, total, elapsed)
             self.logger.info(f"文件下载成功：{username}@{host}:{port}:{remote_path} -> {local_path}")
             return True
         
         except Exception as e:
+            self._invalidate_client(host, port, username, key_file, password)
             self.logger.error(f"文件下载失败：{username}@{host}:{port}:{remote_path} -> {local_path}，错误：{e}")
             return False
+        finally:
+            if sftp is not None:
+                sftp.close()
     
-    def execute_parallel(self, tasks, max_workers=5):
+    def execute_parallel(self, tasks, max_workers=5, per_host_limit=4, fail_fast=False):
         """
-        并行执行远程命令
+        并行执行远程命令（基于asyncio引擎）
         
         Args:
             tasks: 任务列表，每个任务是一个字典，包含host, command, port, username, key_file, password等参数
-            max_workers: 最大工作线程数，默认为5
+            max_workers: 全局最大并发命令数，默认为5
+            per_host_limit: 单个主机的最大并发命令数，默认为4
+            fail_fast: 任一命令失败时是否取消其余未完成的命令，默认为False
         
         Returns:
             list: 任务执行结果列表，每个结果是一个字典，包含task和result
         """
-        self.logger.info(f"并行执行 {len(tasks)} 个远程命令，最大工作线程数：{max_workers}")
-        
-        results = []
+        from core.async_remote import AsyncRemoteExecutor
         
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # 提交所有任务
-            future_to_task = {}
-            for task in tasks:
-                future = executor.submit(
-                    self.execute_command,
-                    host=task['host'],
-                    command=task['command'],
-                    port=task.get('port', 22),
-                    username=task.get('username', 'root'),
-                    key_file=task.get('key_file'),
-                    password=task.get('password'),
-                    timeout=task.get('timeout', 30)
-                )
-                future_to_task[future] = task
-            
-            # 获取结果
-            for future in future_to_task:
-                task = future_to_task[future]
-                try:
-                    result = future.result()
-                    results.append({
-                        'task': task,
-                        'result': result
-                    })
-                except Exception as e:
-                    results.append({
-                        'task': task,
-                        'result': (1, "", str(e))
-                    })
-        
-        self.logger.info(f"并行执行完成，共 {len(results)} 个结果")
-        return results
+        engine = AsyncRemoteExecutor(
+            self, logger=self.logger, max_concurrency=max_workers, per_host_limit=per_host_limit
+        )
+        return engine.execute_parallel(tasks, fail_fast=fail_fast)
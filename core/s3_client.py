@@ -0,0 +1,386 @@
+import datetime
+import hashlib
+import hmac
+import json
+import threading
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+import requests
+from requests.adapters import HTTPAdapter
+from core.logger import Logger
+
+class S3AdminClient:
+    """
+    进程内的S3/MinIO管理客户端
+    
+    使用AWS Signature V4签名请求，所有请求复用同一个requests会话（HTTP keep-alive连接池），
+    代替逐个操作调用mc命令：创建存储桶、设置存储桶策略和配额（MinIO管理API）都在同一组连接上完成，
+    多个存储桶之间并发处理。endpoint可以指向任何兼容S3的服务，便于在本地桩服务上测试。
+    """
+    
+    SERVICE = "s3"
+    ADMIN_PREFIX = "/minio/admin/v3"
+    EMPTY_SHA256 = hashlib.sha256(b"").hexdigest()
+    
+    # 与mc anonymous set public一致的匿名读写策略
+    PUBLIC_ACTIONS = {
+        "bucket": ["s3:GetBucketLocation", "s3:ListBucket", "s3:ListBucketMultipartUploads"],
+        "object": ["s3:AbortMultipartUpload", "s3:DeleteObject", "s3:GetObject", "s3:ListMultipartUploadParts", "s3:PutObject"]
+    }
+    
+    def __init__(self, endpoint, access_key, secret_key, region="us-east-1", verify=False, timeout=30, max_workers=8, logger=None):
+        self.logger = logger or Logger().get_logger()
+        self.endpoint = endpoint.rstrip("/")
+        self.host = self.endpoint.split("://", 1)[-1]
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region or "us-east-1"
+        self.verify = verify
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.session = requests.Session()
+        self.session.mount(self.endpoint, HTTPAdapter(pool_connections=1, pool_maxsize=max(1, max_workers)))
+        self._signing_keys = {}
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0}
+    
+    def close(self):
+        self.session.close()
+    
+    def _signing_key(self, date_stamp):
+        """
+        派生当天的签名密钥（同一天内缓存）
+        """
+        with self._lock:
+            key = self._signing_keys.get(date_stamp)
+            if key is None:
+                key = f"AWS4{self.secret_key}".encode("utf-8")
+                for item in (date_stamp, self.region, self.SERVICE, "aws4_request"):
+                    key = hmac.new(key, item.encode("utf-8"), hashlib.sha256).digest()
+                self._signing_keys = {date_stamp: key}
+            return key
+    
+    @staticmethod
+    def _canonical_query(query):
+        return "&".join(
+            f"{quote(str(key), safe='-_.~')}={quote(str(value), safe='-_.~')}" for key, value in sorted(query.items())
+        )
+    
+    def _sign(self, method, path, query, headers, payload_hash, now=None):
+        """
+        计算Signature V4签名并生成Authorization请求头
+        
+        Args:
+            method: HTTP方法
+            path: 请求路径（未编码）
+            query: 查询参数字典
+            headers: 参与签名的请求头（会补充host、x-amz-date、x-amz-content-sha256）
+            payload_hash: 请求体的sha256
+        
+        Returns:
+            dict: 包含签名的完整请求头
+        """
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        date_stamp = now.strftime("%Y%m%d")
+        
+        headers = dict(headers)
+        headers["host"] = self.host
+        headers["x-amz-date"] = amz_date
+        headers["x-amz-content-sha256"] = payload_hash
+        
+        canonical_headers = {name.lower(): " ".join(str(value).split()) for name, value in headers.items()}
+        signed_headers = ";".join(sorted(canonical_headers))
+        canonical_request = "\n".join([
+            method,
+            quote(path, safe="/-_.~"),
+            self._canonical_query(query),
+            "".join(f"{name}:{canonical_headers[name]}\n" for name in sorted(canonical_headers)),
+            signed_headers,
+            payload_hash
+        ])
+        
+        scope = f"{date_stamp}/{self.region}/{self.SERVICE}/aws4_request"
+        string_to_sign = "\n".join([
+            "AWS4-HMAC-SHA256", amz_date, scope, hashlib.sha256(canonical_request.encode("utf-8")).hexdigest()
+        ])
+        signature = hmac.new(self._signing_key(date_stamp), string_to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+        
+        headers["Authorization"] = (
+            f"AWS4-HMAC-SHA256 Credential={self.access_key}/{scope}, SignedHeaders={signed_headers}, Signature={signature}"
+        )
+        return headers
+    
+    def request(self, method, path, query=None, body=b"", headers=None):
+        """
+        发送签名请求
+        
+        Returns:
+            requests.Response: 响应对象
+        """
+        query = query or {}
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        signed = self._sign(method, path, query, headers or {}, hashlib.sha256(body).hexdigest() if body else self.EMPTY_SHA256)
+        # 查询字符串按签名时的编码方式拼接，保证与签名一致
+        url = f"{self.endpoint}{quote(path, safe='/-_.~')}"
+        if query:
+            url = f"{url}?{self._canonical_query(query)}"
+        with self._lock:
+            self.stats["requests"] += 1
+        return self.session.request(method, url, data=body or None, headers=signed, timeout=self.timeout, verify=self.verify)
+    
+    @staticmethod
+    def _error_code(response):
+        """
+        从S3错误响应（XML）或MinIO管理API错误响应（JSON）中解析错误码
+        """
+        try:
+            root = ET.fromstring(response.content)
+            code = root.find("Code")
+            return code.text if code is not None else ""
+        except ET.ParseError:
+            pass
+        try:
+            return json.loads(response.content).get("Code", "")
+        except (ValueError, AttributeError):
+            return ""
+    
+    def _fail(self, action, response):
+        code = self._error_code(response) or f"HTTP {response.status_code}"
+        return (False, f"{action}失败：{code}")
+    
+    def list_buckets(self):
+        """
+        列出所有存储桶
+        
+        Returns:
+            tuple: (status, names)，names为存储桶名称列表，失败时为错误信息
+        """
+        response = self.request("GET", "/")
+        if response.status_code != 200:
+            return self._fail("列出存储桶", response)
+        root = ET.fromstring(response.content)
+        names = [element.text for element in root.iter() if element.tag.rsplit("}", 1)[-1] == "Name"]
+        return (True, names)
+    
+    def make_bucket(self, name):
+        """
+        创建存储桶，存储桶已存在时视为成功
+        
+        Returns:
+            tuple: (status, message)
+        """
+        body = b""
+        if self.region != "us-east-1":
+            body = (
+                '<CreateBucketConfiguration xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+                f"<LocationConstraint>{self.region}</LocationConstraint></CreateBucketConfiguration>"
+            ).encode("utf-8")
+        response = self.request("PUT", f"/{name}", body=body)
+        if response.status_code == 200:
+            return (True, "创建成功")
+        if self._error_code(response) in ("BucketAlreadyOwnedByYou", "BucketAlreadyExists"):
+            return (True, "已存在")
+        return self._fail("创建存储桶", response)
+    
+    def delete_bucket(self, name):
+        response = self.request("DELETE", f"/{name}")
+        if response.status_code in (200, 204):
+            return (True, "删除成功")
+        return self._fail("删除存储桶", response)
+    
+    def public_policy(self, name):
+        """
+        生成存储桶的匿名读写策略
+        """
+        return {
+            "Version": "2012-10-17",
+            "Statement": [
+                {"Effect": "Allow", "Principal": {"AWS": ["*"]}, "Action": self.PUBLIC_ACTIONS["bucket"],
+                 "Resource": [f"arn:aws:s3:::{name}"]},
+                {"Effect": "Allow", "Principal": {"AWS": ["*"]}, "Action": self.PUBLIC_ACTIONS["object"],
+                 "Resource": [f"arn:aws:s3:::{name}/*"]}
+            ]
+        }
+    
+    def get_bucket_policy(self, name):
+        """
+        获取存储桶策略
+        
+        Returns:
+            tuple: (status, policy)，没有策略时policy为None
+        """
+        response = self.request("GET", f"/{name}", query={"policy": ""})
+        if response.status_code == 200:
+            return (True, json.loads(response.content or b"null"))
+        if self._error_code(response) == "NoSuchBucketPolicy" or response.status_code == 404:
+            return (True, None)
+        return self._fail("获取存储桶策略", response)
+    
+    def set_bucket_policy(self, name, policy):
+        """
+        设置存储桶策略
+        
+        Args:
+            name: 存储桶名称
+            policy: public（匿名读写）或private（删除匿名策略）
+        """
+        if policy == "public":
+            response = self.request("PUT", f"/{name}", query={"policy": ""}, body=json.dumps(self.public_policy(name)))
+            if response.status_code in (200, 204):
+                return (True, "策略已设置为public")
+            return self._fail("设置存储桶策略", response)
+        
+        response = self.request("DELETE", f"/{name}", query={"policy": ""})
+        if response.status_code in (200, 204) or self._error_code(response) == "NoSuchBucketPolicy":
+            return (True, "策略已设置为private")
+        return self._fail("设置存储桶策略", response)
+    
+    def get_bucket_quota(self, name):
+        """
+        获取存储桶配额（MinIO管理API）
+        
+        Returns:
+            tuple: (status, size)，size为配额字节数，未设置时为0
+        """
+        response = self.request("GET", f"{self.ADMIN_PREFIX}/get-bucket-quota", query={"bucket": name})
+        if response.status_code == 404:
+            return (True, 0)
+        if response.status_code != 200:
+            return self._fail("获取存储桶配额", response)
+        quota = json.loads(response.content or b"{}")
+        return (True, int(quota.get("size") or quota.get("quota") or 0))
+    
+    def set_bucket_quota(self, name, size):
+        """
+        设置存储桶硬配额（MinIO管理API），size为0时清除配额
+        
+        Args:
+            name: 存储桶名称
+            size: 配额字节数
+        """
+        quota = {"size": size, "quota": size, "quotatype": "hard"} if size else {}
+        response = self.request("PUT", f"{self.ADMIN_PREFIX}/set-bucket-quota", query={"bucket": name}, body=json.dumps(quota))
+        if response.status_code == 200:
+            return (True, f"配额已设置为 {size} 字节" if size else "配额已清除")
+        return self._fail("设置存储桶配额", response)
+    
+    def policy_kind(self, name, policy):
+        """
+        把存储桶策略归类为private（没有匿名策略）、public（包含全部匿名读写权限）或custom（其他策略）
+        """
+        if not policy:
+            return "private"
+        allowed = set()
+        for statement in policy.get("Statement", []):
+            principal = statement.get("Principal")
+            anonymous = principal == "*" or (isinstance(principal, dict) and "*" in (
+                principal.get("AWS") if isinstance(principal.get("AWS"), list) else [principal.get("AWS")]
+            ))
+            if statement.get("Effect") == "Allow" and anonymous:
+                actions = statement.get("Action", [])
+                allowed.update([actions] if isinstance(actions, str) else actions)
+        if "s3:*" in allowed or allowed >= set(self.PUBLIC_ACTIONS["bucket"] + self.PUBLIC_ACTIONS["object"]):
+            return "public"
+        return "custom"
+    
+    def current_state(self, names):
+        """
+        读取存储桶的当前状态：是否存在、策略类别和配额
+        
+        Args:
+            names: 存储桶名称列表
+        
+        Returns:
+            dict: 存储桶名称到{"exists", "policy", "quota"}的映射，读取失败时抛出RuntimeError
+        """
+        status, existing = self.list_buckets()
+        if not status:
+            raise RuntimeError(existing)
+        existing = set(existing)
+        
+        def read_one(name):
+            if name not in existing:
+                return {"exists": False, "policy": "private", "quota": 0}
+            status, policy = self.get_bucket_policy(name)
+            if not status:
+                raise RuntimeError(f"存储桶 {name} {policy}")
+            status, quota = self.get_bucket_quota(name)
+            if not status:
+                raise RuntimeError(f"存储桶 {name} {quota}")
+            return {"exists": True, "policy": self.policy_kind(name, policy), "quota": quota}
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(names)))) as executor:
+            return dict(zip(names, executor.map(read_one, names)))
+    
+    def plan(self, buckets):
+        """
+        对比存储桶配置和当前状态，计算需要执行的变更
+        
+        Args:
+            buckets: 存储桶配置列表，每个元素包含name、policy（默认private）、quota（GB，默认0表示不设置配额）
+        
+        Returns:
+            dict: 存储桶名称到变更列表的映射，变更为("create", None)、("policy", 策略)或("quota", 字节数)，
+                  没有变更的存储桶对应空列表
+        """
+        buckets = [bucket for bucket in buckets if bucket.get("name")]
+        state = self.current_state([bucket["name"] for bucket in buckets])
+        
+        changes = {}
+        for bucket in buckets:
+            name = bucket["name"]
+            current = state[name]
+            policy = "public" if bucket.get("policy", "private") == "public" else "private"
+            quota = int(bucket.get("quota", 0) or 0) * 1024 ** 3
+            
+            changes[name] = []
+            if not current["exists"]:
+                changes[name].append(("create", None))
+            if current["policy"] != policy:
+                changes[name].append(("policy", policy))
+            if current["quota"] != quota:
+                changes[name].append(("quota", quota))
+        return changes
+    
+    def apply(self, changes):
+        """
+        并发执行plan计算出的变更，同一存储桶内的变更按顺序执行
+        
+        Returns:
+            dict: 有变更的存储桶名称到(status, message)的映射
+        """
+        def apply_one(name, steps):
+            messages = []
+            for action, value in steps:
+                if action == "create":
+                    status, message = self.make_bucket(name)
+                    if status:
+                        message = f"存储桶{message}"
+                elif action == "policy":
+                    status, message = self.set_bucket_policy(name, value)
+                else:
+                    status, message = self.set_bucket_quota(name, value)
+                    if not status:
+                        # 与mc quota set的处理一致，配额设置失败不中断流程
+                        self.logger.warning(f"存储桶 {name} {message}")
+                        status = True
+                if not status:
+                    return (False, message)
+                messages.append(message)
+            return (True, "，".join(messages))
+        
+        pending = {name: steps for name, steps in changes.items() if steps}
+        if not pending:
+            return {}
+        
+        def apply_safely(item):
+            try:
+                return apply_one(*item)
+            except Exception as e:
+                return (False, str(e))
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending))) as executor:
+            return dict(zip(pending, executor.map(apply_safely, pending.items())))
@@ -0,0 +1,279 @@
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from core.logger import Logger
+from core.profiler import Profiler
+
+class Task:
+    """
+    任务图中的一个任务
+    """
+    
+    def __init__(self, name, func, deps=(), node=None, phase=None, barrier=False, fingerprint=None):
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+        self.node = node
+        self.phase = phase or name
+        self.barrier = barrier
+        self.fingerprint = fingerprint
+        self.status = "pending"
+        self.start = None
+        self.end = None
+        self.error = None
+    
+    @property
+    def duration(self):
+        if self.start is None or self.end is None:
+            return 0.0
+        return self.end - self.start
+
+class TaskGraph:
+    """
+    按依赖关系调度部署任务的有向无环图
+    
+    每个任务在其所有依赖完成后立即提交到线程池执行，不同节点的任务链互不等待，
+    只有显式声明为全局屏障（依赖所有节点任务）的任务才会同步所有节点。
+    任务抛出异常或调用exit时不再提交新任务，等待已提交的任务结束后重新抛出第一个异常，
+    与原先顺序执行时的失败行为一致；任务返回False时只跳过依赖它的任务，其他任务继续执行。
+    提供检查点日志时，带指纹的任务完成后写入日志，日志中已完成且指纹一致的任务直接跳过。
+    """
+    
+    def __init__(self, logger=None, max_workers=16, journal=None, profiler=None):
+        self.logger = logger or Logger().get_logger()
+        self.profiler = profiler or Profiler(logger=self.logger)
+        self.max_workers = max_workers
+        self.journal = journal
+        self.tasks = {}
+        self._origin = None
+    
+    def add_task(self, name, func, deps=(), node=None, phase=None, barrier=False, fingerprint=None):
+        """
+        添加任务
+        
+        Args:
+            name: 任务名称，在图中唯一
+            func: 无参数的可调用对象，返回False表示任务失败（只跳过依赖它的任务）
+            deps: 依赖的任务名称列表
+            node: 任务所属节点（全局任务为None）
+            phase: 任务所属阶段，用于汇总耗时
+            barrier: 是否为同步所有节点的全局屏障
+            fingerprint: 任务输入的指纹，为None时任务总是执行且不写入检查点日志
+        
+        Returns:
+            str: 任务名称
+        """
+        if name in self.tasks:
+            raise ValueError(f"任务名称重复：{name}")
+        self.tasks[name] = Task(name, func, deps, node, phase, barrier, fingerprint)
+        return name
+    
+    def _validate(self):
+        """
+        检查依赖是否存在以及图中是否有环
+        """
+        for task in self.tasks.values():
+            for dep in task.deps:
+                if dep not in self.tasks:
+                    raise ValueError(f"任务 {task.name} 依赖的任务 {dep} 不存在")
+        
+        indegree = {name: len(task.deps) for name, task in self.tasks.items()}
+        dependents = self._dependents()
+        queue = [name for name, count in indegree.items() if count == 0]
+        visited = 0
+        while queue:
+            name = queue.pop()
+            visited += 1
+            for dependent in dependents[name]:
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    queue.append(dependent)
+        if visited != len(self.tasks):
+            raise ValueError("任务依赖关系中存在环")
+    
+    def _dependents(self):
+        dependents = {name: [] for name in self.tasks}
+        for task in self.tasks.values():
+            for dep in task.deps:
+                dependents[dep].append(task.name)
+        return dependents
+    
+    def _chain_fingerprints(self, dependents):
+        """
+        把依赖任务的指纹合并到任务自身的指纹中，上游任务输入变化时下游任务也会重新执行
+        """
+        indegree = {name: len(task.deps) for name, task in self.tasks.items()}
+        queue = [name for name, count in indegree.items() if count == 0]
+        while queue:
+            task = self.tasks[queue.pop(0)]
+            if task.fingerprint:
+                upstream = sorted(self.tasks[dep].fingerprint for dep in task.deps if self.tasks[dep].fingerprint)
+                task.fingerprint = hashlib.sha256("|".join([task.fingerprint] + upstream).encode("utf-8")).hexdigest()
+            for dependent in dependents[task.name]:
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    queue.append(dependent)
+    
+    def run(self):
+        """
+        执行任务图
+        
+        Returns:
+            bool: True表示全部任务成功，False表示有任务返回False（失败的任务见failed_tasks）
+        """
+        self._validate()
+        dependents = self._dependents()
+        self._chain_fingerprints(dependents)
+        remaining = {name: set(task.deps) for name, task in self.tasks.items()}
+        ready = [name for name, deps in remaining.items() if not deps]
+        running = {}
+        first_error = None
+        aborted = False
+        
+        self._origin = time.monotonic()
+        self.logger.info(f"开始按依赖关系调度 {len(self.tasks)} 个任务，最大并发数：{self.max_workers}")
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while ready or running:
+                while ready and not aborted:
+                    task = self.tasks[ready.pop(0)]
+                    task.start = time.monotonic()
+                    
+                    # 检查点日志中已完成且输入未变化的任务直接跳过
+                    if self.journal is not None and task.fingerprint and self.journal.is_done(task.name, task.fingerprint):
+                        task.end = task.start
+                        task.status = "resumed"
+                        self.logger.info(f"任务已在之前的部署中完成，跳过：{task.name}")
+                        ready.extend(self._release(task, dependents, remaining))
+                        continue
+                    
+                    task.status = "running"
+                    self.logger.debug("任务开始：%s", task.name)
+                    running[executor.submit(self._run_task, task)] = task
+                
+                if not running:
+                    break
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    task.end = time.monotonic()
+                    error = future.exception()
+                    
+                    if error is not None:
+                        task.status = "failed"
+                        task.error = error
+                        aborted = True
+                        if first_error is None:
+                            first_error = error
+                        if not isinstance(error, SystemExit):
+                            self.logger.error(f"任务失败：{task.name}，耗时 {task.duration:.2f} 秒，错误：{error}")
+                        continue
+                    
+                    if future.result() is False:
+                        task.status = "failed"
+                        self.logger.error(f"任务失败：{task.name}，耗时 {task.duration:.2f} 秒")
+                        continue
+                    
+                    task.status = "done"
+                    self.logger.debug("任务完成：%s，耗时 %.2f 秒", task.name, task.duration)
+                    if self.journal is not None and task.fingerprint:
+                        self.journal.mark_done(task.name, task.fingerprint, task.duration)
+                    ready.extend(self._release(task, dependents, remaining))
+        
+        for task in self.tasks.values():
+            if task.status == "pending":
+                task.status = "skipped"
+        
+        self.log_report()
+        
+        if first_error is not None:
+            raise first_error
+        return not self.failed_tasks()
+    
+    def _run_task(self, task):
+        """
+        在线程池中执行任务，启用耗时分析时记录任务区间
+        """
+        with self.profiler.span(task.name, "task", phase=task.phase, node=task.node or "全局"):
+            return task.func()
+    
+    def failed_tasks(self):
+        """
+        获取执行失败的任务名称列表
+        """
+        return [task.name for task in self.tasks.values() if task.status == "failed"]
+    
+    def _release(self, task, dependents, remaining):
+        """
+        任务完成后解除其对后续任务的阻塞
+        
+        Returns:
+            list: 因此变为就绪的任务名称
+        """
+        released = []
+        for dependent in dependents[task.name]:
+            remaining[dependent].discard(task.name)
+            if not remaining[dependent]:
+                released.append(dependent)
+        return released
+    
+    def critical_path(self):
+        """
+        计算关键路径：从最后结束的任务出发，沿最晚结束的依赖向前回溯
+        
+        Returns:
+            list: 关键路径上的任务列表（按执行顺序）
+        """
+        finished = [task for task in self.tasks.values() if task.end is not None]
+        if not finished:
+            return []
+        
+        path = []
+        task = max(finished, key=lambda item: item.end)
+        while task is not None:
+            path.append(task)
+            deps = [self.tasks[dep] for dep in task.deps if self.tasks[dep].end is not None]
+            task = max(deps, key=lambda item: item.end) if deps else None
+        path.reverse()
+        return path
+    
+    def phase_durations(self):
+        """
+        按阶段汇总任务耗时
+        
+        Returns:
+            dict: 阶段名称到(任务数, 最长耗时, 总耗时)的映射
+        """
+        phases = {}
+        for task in self.tasks.values():
+            if task.end is None:
+                continue
+            count, longest, total = phases.get(task.phase, (0, 0.0, 0.0))
+            phases[task.phase] = (count + 1, max(longest, task.duration), total + task.duration)
+        return phases
+    
+    def log_report(self):
+        """
+        输出关键路径和各阶段耗时
+        """
+        path = self.critical_path()
+        if not path:
+            return
+        
+        elapsed = max(task.end for task in path) - self._origin
+        self.logger.info(f"任务调度完成，总耗时 {elapsed:.2f} 秒，关键路径：")
+        for task in path:
+            marker = "（全局屏障）" if task.barrier else ""
+            self.logger.info(f"  - {task.name}{marker}：{task.duration:.2f} 秒，状态：{task.status}")
+        
+        for phase, (count, longest, total) in self.phase_durations().items():
+            self.logger.debug(f"阶段 {phase}：{count} 个任务，最长 {longest:.2f} 秒，累计 {total:.2f} 秒")
+        
+        resumed = [task.name for task in self.tasks.values() if task.status == "resumed"]
+        if resumed:
+            self.logger.info(f"从检查点续传，跳过 {len(resumed)} 个已完成的任务")
+        
+        skipped = [task.name for task in self.tasks.values() if task.status == "skipped"]
+        if skipped:
+            self.logger.warning(f"因前序任务失败而未执行的任务：{', '.join(skipped)}")
@@ -1,4 +1,5 @@
 import os
+import re
 import subprocess
 from core.logger import Logger
 
@@ -8,7 +9,8 @@ class ServiceManager:
         self.service_name = "minio"
         self.service_file = f"/etc/systemd/system/{self.service_name}.service"
     
-    def create_service_file(self, data_dir, listen_port=9000, console_port=9001, credentials=None, erasure_coding=None):
+    def create_service_file(self, data_dir, listen_port=9000, console_port=9001, credentials=None, erasure_coding=None,
+                            limit_nofile=65536, limit_nproc=16384):
         """
         创建MinIO systemd服务文件
         
@@ -18,14 +20,16 @@ class ServiceManager:
             console_port: 控制台端口，默认为9001
             credentials: 认证信息，包含root_user和root_password
             erasure_coding: 纠删码配置
+            limit_nofile: 文件描述符限制
+            limit_nproc: 进程数限制
         
         Returns:
             bool: True表示创建成功，False表示失败
         """
         self.logger.info(f"创建MinIO systemd服务文件：{self.service_file}")
         
-        # 确保数据目录存在
-        if not os.path.exists(data_dir):
+        # 确保数据目录存在（多块磁盘使用省略号写法，挂载点已由磁盘准备步骤创建）
+        if "{" not in data_dir and not os.path.exists(data_dir):
             try:
                 os.makedirs(data_dir)
                 self.logger.info(f"创建数据目录：{data_dir}")
@@ -79,10 +83,10 @@ ExecStart=/usr/local/bin/minio server \
 Restart=always
 
 # Specifies the maximum file descriptor number that can be opened by this process
-LimitNOFILE=65536
+LimitNOFILE={limit_nofile}
 
 # Specifies the maximum number of processes that can be created by this process
-LimitNPROC=16384
+LimitNPROC={limit_nproc}
 
 # Time to wait before forcefully killing the process
 TimeoutStopSec=5
@@ -251,7 +255,7 @@ WantedBy=multi-user.target
             else:
                 self.logger.info(f"MinIO服务不存在：{self.service_name}")
                 return False
-                
+        
         except Exception as e:
             # 如果命令执行失败，可能是因为服务不存在
             self.logger.debug(f"检查MinIO服务是否存在时出错：{e}")
@@ -282,7 +286,7 @@ WantedBy=multi-user.target
             else:
                 self.logger.warning(f"MinIO服务未运行：{self.service_name}")
                 return (False, output)
-                
+        
         except Exception as e:
             self.logger.error(f"检查MinIO服务状态失败：{e}")
             return (False, str(e))
@@ -341,7 +345,7 @@ WantedBy=multi-user.target
             
             self.logger.info(f"MinIO服务移除成功：{self.service_name}")
             return True
-            
+        
         except Exception as e:
             self.logger.error(f"MinIO服务移除失败：{e}")
             return False
@@ -368,7 +372,8 @@ WantedBy=multi-user.target
             self.logger.error(f"获取MinIO服务日志失败：{e}")
             return str(e)
     
-    def configure_service(self, data_dir, listen_port=9000, console_port=9001, credentials=None, erasure_coding=None):
+    def configure_service(self, data_dir, listen_port=9000, console_port=9001, credentials=None, erasure_coding=None,
+                          limit_nofile=65536, limit_nproc=16384):
         """
         配置MinIO服务：创建服务文件、设置开机自启、启动服务
         
@@ -378,6 +383,8 @@ WantedBy=multi-user.target
             console_port: 控制台端口，默认为9001
             credentials: 认证信息
             erasure_coding: 纠删码配置
+            limit_nofile: 文件描述符限制
+            limit_nproc: 进程数限制
         
         Returns:
             bool: True表示配置成功，False表示失败
@@ -385,7 +392,7 @@ WantedBy=multi-user.target
         self.logger.info("开始配置MinIO服务")
         
         # 创建服务文件
-        if not self.create_service_file(data_dir, listen_port, console_port, credentials, erasure_coding):
+        if not self.create_service_file(data_dir, listen_port, console_port, credentials, erasure_coding, limit_nofile, limit_nproc):
             return False
         
         # 设置开机自启
@@ -406,3 +413,147 @@ WantedBy=multi-user.target
         
         self.logger.info("MinIO服务配置成功")
         return True
+    
+    def expand_sequence(self, values):
+        """
+        把只有一段数字不同且连续递增的字符串压缩为MinIO的省略号写法
+        
+        例如["node1", "node2", "node3"]压缩为"node{1...3}"，["/data01", "/data02"]压缩为"/data{01...02}"。
+        
+        Args:
+            values: 字符串列表
+        
+        Returns:
+            str: 压缩后的字符串（只有一个元素时返回该元素），无法压缩时返回None
+        """
+        if not values:
+            return None
+        if len(values) == 1:
+            return values[0]
+        
+        # 按数字分段后，奇数位置为数字段
+        parts = [re.split(r"(\d+)", value) for value in values]
+        if any(len(part) != len(parts[0]) for part in parts):
+            return None
+        differing = [i for i in range(len(parts[0])) if len({part[i] for part in parts}) > 1]
+        if len(differing) != 1 or differing[0] % 2 == 0:
+            return None
+        
+        index = differing[0]
+        numbers = [part[index] for part in parts]
+        start = int(numbers[0])
+        if [int(number) for number in numbers] != list(range(start, start + len(numbers))):
+            return None
+        
+        # 有前导零时所有数字等宽，否则不允许前导零
+        width = len(numbers[0]) if numbers[0].startswith("0") else 0
+        if any(number != str(start + i).zfill(width) for i, number in enumerate(numbers)):
+            return None
+        
+        return "".join(parts[0][:index]) + "{" + f"{numbers[0]}...{numbers[-1]}" + "}" + "".join(parts[0][index + 1:])
+    
+    def build_cluster_volumes(self, endpoints, listen_port=9000, scheme="http"):
+        """
+        生成分布式模式的MINIO_VOLUMES
+        
+        所有节点的数据目录相同且主机名和数据目录都能压缩时生成一个省略号写法的参数，
+        如http://node{1...4}:9000/data{1...4}；否则列出所有节点的每个数据目录
+        （MinIO要求所有参数要么都使用省略号写法，要么都不使用）。
+        
+        Args:
+            endpoints: 列表，每个元素为(主机名, 数据目录列表)，顺序即节点顺序
+            listen_port: 服务端口
+            scheme: http或https
+        
+        Returns:
+            str: MINIO_VOLUMES的值
+        """
+        hosts = [host for host, _ in endpoints]
+        path_lists = [tuple(paths) for _, paths in endpoints]
+        
+        if len(set(path_lists)) == 1:
+            host_pattern = self.expand_sequence(hosts)
+            path_pattern = self.expand_sequence(list(path_lists[0]))
+            if host_pattern and path_pattern:
+                return f"{scheme}://{host_pattern}:{listen_port}{path_pattern}"
+        
+        return " ".join(f"{scheme}://{host}:{listen_port}{path}" for host, paths in endpoints for path in paths)
+    
+    def render_environment(self, credentials, volumes, listen_port=9000, console_port=9001, storage_class=None, region=None):
+        """
+        生成/etc/default/minio环境变量文件的内容
+        
+        Args:
+            credentials: 认证信息，包含root_user和root_password
+            volumes: MINIO_VOLUMES的值
+            listen_port: 服务端口
+            console_port: 控制台端口
+            storage_class: 标准存储类别的纠删码配置，如EC:4
+            region: 站点区域
+        
+        Returns:
+            str: 环境变量文件内容
+        """
+        credentials = credentials or {}
+        env_content = "# MinIO environment variables\n"
+        env_content += f"MINIO_ROOT_USER={credentials.get('root_user', 'minioadmin')}\n"
+        env_content += f"MINIO_ROOT_PASSWORD={credentials.get('root_password', 'minioadmin123')}\n"
+        env_content += f"MINIO_VOLUMES=\"{volumes}\"\n"
+        env_content += f"MINIO_OPTS=\"--address :{listen_port} --console-address :{console_port}\"\n"
+        if storage_class:
+            env_content += f"MINIO_STORAGE_CLASS_STANDARD=\"{storage_class}\"\n"
+        if region:
+            env_content += f"MINIO_SITE_REGION=\"{region}\"\n"
+        return env_content
+    
+    def render_distributed_service(self, limit_nofile=65536, limit_nproc=16384):
+        """
+        生成分布式模式的systemd服务文件内容
+        
+        服务类型为notify：MinIO在集群达到法定数量并完成初始化后才通知systemd启动完成，
+        等待其他节点期间不会因为启动超时被systemd重启。
+        
+        Args:
+            limit_nofile: 文件描述符限制
+            limit_nproc: 进程数限制
+        
+        Returns:
+            str: 服务文件内容
+        """
+        return f"""[Unit]
+Description=MinIO Object Storage Service
+Documentation=https://docs.min.io
+Wants=network-online.target
+After=network-online.target
+AssertFileIsExecutable=/usr/local/bin/minio
+
+[Service]
+Type=notify
+WorkingDirectory=/usr/local/bin
+
+User=root
+Group=root
+
+EnvironmentFile=-/etc/default/minio
+ExecStartPre=/bin/bash -c "if [ -z \\"${{MINIO_VOLUMES}}\\" ]; then echo \\"Variable MINIO_VOLUMES not set in /etc/default/minio\\"; exit 1; fi"
+ExecStart=/usr/local/bin/minio server $MINIO_OPTS $MINIO_VOLUMES
+
+# Let systemd restart this service always
+Restart=always
+
+# Specifies the maximum file descriptor number that can be opened by this process
+LimitNOFILE={limit_nofile}
+
+# Specifies the maximum number of processes that can be created by this process
+LimitNPROC={limit_nproc}
+
+# Wait for the peers to come up instead of timing out the start job
+TimeoutStartSec=infinity
+
+# Time to wait before forcefully killing the process
+TimeoutStopSec=5
+SendSIGKILL=no
+
+[Install]
+WantedBy=multi-user.target
+"""
@@ -0,0 +1,218 @@
+import shlex
+import subprocess
+from core.logger import Logger
+
+class SystemTuner:
+    """
+    系统调优
+    
+    按MinIO推荐的配置调整节点的内核参数（sysctl）、透明大页、数据盘的I/O调度器和CPU频率调节器。
+    调优脚本在节点上先读取当前值，只修改与期望值不同的项，并输出每一项的差异；
+    配置同时写入/etc/sysctl.d、/etc/tmpfiles.d和/etc/udev/rules.d，重启后仍然生效。
+    文件内容未变化时不重写，重复执行不会产生任何修改。
+    """
+    
+    # MinIO推荐的内核参数
+    SYSCTL = {
+        # 尽量不使用交换分区，脏页尽早回写，避免突发的大量回写阻塞请求
+        "vm.swappiness": "0",
+        "vm.vfs_cache_pressure": "50",
+        "vm.dirty_background_ratio": "3",
+        "vm.dirty_ratio": "10",
+        "vm.max_map_count": "524288",
+        "fs.file-max": "4194303",
+        # 连接队列和TCP缓冲区，适应大量并发连接和高带宽节点间流量
+        "net.core.somaxconn": "16384",
+        "net.core.netdev_max_backlog": "250000",
+        "net.ipv4.tcp_max_syn_backlog": "16384",
+        "net.core.rmem_default": "4194304",
+        "net.core.wmem_default": "4194304",
+        "net.core.rmem_max": "4194304",
+        "net.core.wmem_max": "4194304",
+        "net.ipv4.tcp_rmem": "4096 87380 4194304",
+        "net.ipv4.tcp_wmem": "4096 65536 4194304",
+        "net.ipv4.tcp_slow_start_after_idle": "0",
+        "net.ipv4.tcp_mtu_probing": "1",
+        "net.ipv4.ip_local_port_range": "1024 65535"
+    }
+    
+    SYSCTL_FILE = "/etc/sysctl.d/60-minio.conf"
+    TMPFILES_FILE = "/etc/tmpfiles.d/60-minio.conf"
+    UDEV_FILE = "/etc/udev/rules.d/60-minio.rules"
+    THP_PATH = "/sys/kernel/mm/transparent_hugepage/enabled"
+    
+    # 在节点上执行的调优脚本的公共部分：每一项输出一行“状态|名称|当前值|期望值”，
+    # 状态为OK（已符合）、CHANGED（已修改）、FAILED（修改失败）或SKIP（节点不支持）
+    FUNCTIONS = r"""
+report() { printf '%s|%s|%s|%s\n' "$1" "$2" "$3" "$4"; }
+
+tune_sysctl() {
+    current=$(sysctl -n "$1" 2>/dev/null | tr -s ' \t' ' ')
+    if [ -z "$current" ]; then report SKIP "$1" "" "内核不支持该参数"; return; fi
+    if [ "$current" = "$2" ]; then report OK "$1" "$current" "$2"; return; fi
+    if sysctl -q -w "$1=$2" >/dev/null 2>&1; then report CHANGED "$1" "$current" "$2"; else report FAILED "$1" "$current" "$2"; fi
+}
+
+tune_sysfs() {
+    if [ ! -e "$2" ]; then report SKIP "$1" "" "$2 不存在"; return; fi
+    current=$(sed -n 's/.*\[\(.*\)\].*/\1/p' "$2")
+    [ -n "$current" ] || current=$(cat "$2")
+    if [ "$current" = "$3" ]; then report OK "$1" "$current" "$3"; return; fi
+    if echo "$3" > "$2" 2>/dev/null; then report CHANGED "$1" "$current" "$3"; else report FAILED "$1" "$current" "$3"; fi
+}
+
+persist() {
+    tmp=$(mktemp)
+    cat > "$tmp"
+    if cmp -s "$tmp" "$1"; then rm -f "$tmp"; report OK "$1" "" ""; return 1; fi
+    mkdir -p "$(dirname "$1")"
+    if mv "$tmp" "$1" && chmod 644 "$1"; then report CHANGED "$1" "" "已写入"; return 0; fi
+    rm -f "$tmp"
+    report FAILED "$1" "" "写入失败"
+    return 1
+}
+"""
+    
+    def __init__(self, logger=None, enabled=False, sysctl=None, transparent_hugepage="madvise", io_scheduler="auto", cpu_governor="performance"):
+        """
+        Args:
+            logger: 日志记录器
+            enabled: 是否在部署时调优节点
+            sysctl: 覆盖默认值的内核参数，值为None的参数不调整
+            transparent_hugepage: 透明大页模式，为None时不调整
+            io_scheduler: 数据盘的I/O调度器，auto表示SSD/NVMe使用none、机械盘使用mq-deadline，为None时不调整
+            cpu_governor: CPU频率调节器，为None时不调整
+        """
+        self.logger = logger or Logger().get_logger()
+        self.enabled = enabled
+        self.sysctl = dict(sysctl or {})
+        self.transparent_hugepage = transparent_hugepage
+        self.io_scheduler = io_scheduler
+        self.cpu_governor = cpu_governor
+    
+    def sysctl_settings(self):
+        """
+        合并默认值和配置中的覆盖值
+        
+        Returns:
+            dict: 需要调整的内核参数
+        """
+        settings = dict(self.SYSCTL)
+        settings.update(self.sysctl)
+        return {key: " ".join(str(value).split()) for key, value in settings.items() if value is not None}
+    
+    def command(self, devices):
+        """
+        生成在节点上调优的脚本
+        
+        Args:
+            devices: 数据盘设备或数据目录列表（分区和目录会换算为所在的磁盘），为空时不调整I/O调度器
+        
+        Returns:
+            str: 调优脚本
+        """
+        settings = self.sysctl_settings()
+        lines = [self.FUNCTIONS]
+        
+        # 内核参数：先逐项比较并应用，再写入sysctl.d
+        for key, value in settings.items():
+            lines.append(f"tune_sysctl {shlex.quote(key)} {shlex.quote(value)}")
+        if settings:
+            content = "".join(f"{key} = {value}\n" for key, value in settings.items())
+            lines.append(f"printf %s {shlex.quote('# 由MinIO部署工具生成' + chr(10) + content)} | persist {self.SYSCTL_FILE}")
+        
+        # 透明大页不是内核参数，通过tmpfiles.d在启动时写入
+        if self.transparent_hugepage:
+            lines.append(f"tune_sysfs transparent_hugepage {self.THP_PATH} {shlex.quote(self.transparent_hugepage)}")
+            lines.append(f"printf %s {shlex.quote('# 由MinIO部署工具生成' + chr(10) + f'w {self.THP_PATH} - - - - {self.transparent_hugepage}' + chr(10))} | persist {self.TMPFILES_FILE}")
+        
+        # I/O调度器和CPU频率调节器通过udev规则在设备出现时设置
+        lines.append("rules=''")
+        if self.io_scheduler and devices:
+            lines.append(f"for target in {' '.join(shlex.quote(device) for device in devices)}; do")
+            lines.append('    device=$target')
+            lines.append('    [ -b "$device" ] || device=$(findmnt -no SOURCE -T "$target" 2>/dev/null)')
+            lines.append('    if [ ! -b "$device" ]; then report SKIP "io_scheduler:$target" "" "找不到所在的块设备"; continue; fi')
+            lines.append('    disk=$(lsblk -ndo PKNAME "$device" 2>/dev/null | head -n 1)')
+            lines.append('    [ -n "$disk" ] || disk=$(basename "$(readlink -f "$device")")')
+            if self.io_scheduler == "auto":
+                lines.append('    if [ "$(cat /sys/block/$disk/queue/rotational 2>/dev/null)" = "1" ]; then scheduler=mq-deadline; else scheduler=none; fi')
+            else:
+                lines.append(f"    scheduler={shlex.quote(self.io_scheduler)}")
+            lines.append('    tune_sysfs "io_scheduler:$disk" "/sys/block/$disk/queue/scheduler" "$scheduler"')
+            lines.append('    rules="${rules}ACTION==\\"add|change\\", KERNEL==\\"$disk\\", ATTR{queue/scheduler}=\\"$scheduler\\"\\n"')
+            lines.append("done")
+        if self.cpu_governor:
+            governor = shlex.quote(self.cpu_governor)
+            lines.append("governors=$(ls /sys/devices/system/cpu/cpu[0-9]*/cpufreq/scaling_governor 2>/dev/null)")
+            lines.append('if [ -z "$governors" ]; then report SKIP cpu_governor "" "节点不支持CPU频率调节"; else')
+            lines.append("    current=$(cat $governors | sort -u | tr '\\n' ' ' | sed 's/ $//')")
+            lines.append(f'    if [ "$current" = {governor} ]; then report OK cpu_governor "$current" {governor}')
+            lines.append(f'    elif (for file in $governors; do echo {governor} > "$file" || exit 1; done) 2>/dev/null; then report CHANGED cpu_governor "$current" {governor}')
+            lines.append(f'    else report FAILED cpu_governor "$current" {governor}; fi')
+            lines.append(f'    rules="${{rules}}ACTION==\\"add\\", SUBSYSTEM==\\"cpu\\", KERNEL==\\"cpu[0-9]*\\", ATTR{{cpufreq/scaling_governor}}=\\"{self.cpu_governor}\\"\\n"')
+            lines.append("fi")
+        lines.append(f'if [ -n "$rules" ]; then printf "# 由MinIO部署工具生成\\n$rules" | persist {self.UDEV_FILE} && (udevadm control --reload-rules 2>/dev/null || true); fi')
+        lines.append("exit 0")
+        return "\n".join(lines)
+    
+    def parse(self, stdout):
+        """
+        解析调优脚本的输出
+        
+        Returns:
+            list: 每一项为(状态, 名称, 当前值, 期望值)
+        """
+        items = []
+        for line in stdout.splitlines():
+            parts = line.split("|")
+            if len(parts) == 4 and parts[0] in ("OK", "CHANGED", "FAILED", "SKIP"):
+                items.append(tuple(parts))
+        return items
+    
+    def report(self, host, exit_code, stdout, stderr):
+        """
+        输出节点的调优差异
+        
+        Args:
+            host: 节点名称
+            exit_code, stdout, stderr: 调优脚本的执行结果
+        
+        Returns:
+            bool: True表示调优脚本执行成功（个别项修改失败或不支持只输出警告）
+        """
+        if exit_code != 0:
+            self.logger.error(f"在 {host} 上执行系统调优失败：{stderr.strip() or f'退出码 {exit_code}'}")
+            return False
+        
+        items = self.parse(stdout)
+        counts = {status: sum(1 for item in items if item[0] == status) for status in ("OK", "CHANGED", "FAILED", "SKIP")}
+        for status, name, current, desired in items:
+            if status == "CHANGED":
+                self.logger.info(f"  {host} {name}：{current or '-'} -> {desired}")
+            elif status == "FAILED":
+                self.logger.warning(f"  {host} {name} 修改失败：当前值 {current or '-'}，期望值 {desired}")
+            elif status == "SKIP":
+                self.logger.debug(f"  {host} 跳过 {name}：{desired}")
+        self.logger.info(
+            f"{host} 系统调优完成：{counts['CHANGED']} 项已修改，{counts['OK']} 项已符合，"
+            f"{counts['SKIP']} 项不支持，{counts['FAILED']} 项修改失败"
+        )
+        return True
+    
+    def apply_local(self, devices):
+        """
+        在本机调优
+        
+        Args:
+            devices: 数据盘设备或数据目录列表
+        
+        Returns:
+            bool: True表示调优脚本执行成功
+        """
+        try:
+            result = subprocess.run(["bash", "-c", self.command(devices)], capture_output=True, text=True, timeout=120)
+            return self.report("本机", result.returncode, result.stdout, result.stderr)
+        except Exception as e:
+            self.logger.error(f"在本机执行系统调优失败：{e}")
+            return False
@@ -0,0 +1,268 @@
+import shlex
+import time
+from core.artifact_cache import ArtifactCache
+from core.logger import Logger
+from core.remote import RemoteExecutor
+from core.health import HealthChecker
+
+class RollingUpgrader:
+    """
+    MinIO二进制滚动升级器
+    
+    先把新版本二进制并行暂存到所有节点（minio.new），不影响正在运行的服务；
+    再按纠删码校验位允许同时离线的驱动器数把节点分批，逐批替换二进制并重启，
+    每一批都要等重启的节点就绪且集群健康检查接口报告写法定数量满足后才开始下一批。
+    某一批未能就绪时回滚该批节点并停止升级。
+    """
+    
+    BINARY_PATH = "/usr/local/bin/minio"
+    
+    def __init__(self, remote_executor=None, async_executor=None, distributor=None, fact_gatherer=None, health_checker=None,
+                 logger=None, server_port=9000, restart_timeout=300, rollback=True):
+        self.logger = logger or Logger().get_logger()
+        self.remote_executor = remote_executor or RemoteExecutor(logger=self.logger)
+        self.async_executor = async_executor
+        self.distributor = distributor
+        self.fact_gatherer = fact_gatherer
+        self.health_checker = health_checker or HealthChecker(logger=self.logger)
+        self.server_port = server_port
+        self.restart_timeout = restart_timeout
+        self.rollback = rollback
+        self.last_stats = {}
+    
+    @staticmethod
+    def erasure_set_size(total_drives):
+        """
+        估算单个纠删码集的驱动器数：2到16之间能整除驱动器总数的最大值
+        """
+        for size in range(16, 1, -1):
+            if total_drives % size == 0:
+                return size
+        return max(1, total_drives)
+    
+    @staticmethod
+    def default_parity(set_size):
+        """
+        MinIO未配置存储类别时标准存储类别的默认校验位
+        """
+        if set_size <= 1:
+            return 0
+        if set_size <= 3:
+            return 1
+        if set_size <= 5:
+            return 2
+        if set_size <= 7:
+            return 3
+        return 4
+    
+    def wave_size(self, drives_per_node, parity=None, max_wave=None):
+        """
+        计算每一批可以同时重启的节点数
+        
+        按最坏情况（同一批节点的驱动器都在同一个纠删码集中）计算：离线驱动器数不超过
+        集合大小减去写法定数量，即校验位（校验位等于数据位时写法定数量需要再加一）。
+        
+        Args:
+            drives_per_node: 每个节点的驱动器数列表
+            parity: 标准存储类别的校验位，为None时使用MinIO默认值
+            max_wave: 每一批的节点数上限，为None或0时不限制
+        
+        Returns:
+            int: 每一批的节点数（至少为1）
+        """
+        total_drives = sum(drives_per_node)
+        set_size = self.erasure_set_size(total_drives)
+        if parity is None:
+            parity = self.default_parity(set_size)
+        parity = min(parity, set_size // 2)
+        
+        # 写法定数量为数据位，校验位等于数据位时为数据位加一
+        tolerated = parity - 1 if parity * 2 == set_size else parity
+        
+        # 按驱动器最多的节点计算，保证任意节点组合都不会超过可离线的驱动器数
+        size = tolerated // max(drives_per_node) if drives_per_node else 0
+        if max_wave:
+            size = min(size, max_wave)
+        return max(1, size)
+    
+    def _task(self, node, command, timeout=60):
+        ssh_params = node["ssh_params"]
+        return {
+            "host": ssh_params["host"],
+            "port": ssh_params["port"],
+            "username": ssh_params["username"],
+            "key_file": ssh_params["ssh_key"],
+            "password": ssh_params["password"],
+            "command": command,
+            "timeout": timeout,
+            "node": node
+        }
+    
+    def _run_parallel(self, tasks):
+        """
+        并行执行远程命令，优先使用异步执行引擎
+        """
+        if not tasks:
+            return []
+        if self.async_executor is not None:
+            return self.async_executor.execute_parallel(tasks)
+        return self.remote_executor.execute_parallel(tasks, max_workers=len(tasks))
+    
+    def _swap_command(self):
+        """
+        构造替换二进制并重启服务的命令：保留上一版本为minio.prev，重启后等待新进程就绪
+        """
+        binary = shlex.quote(self.BINARY_PATH)
+        return (
+            f"old=$(systemctl show -p MainPID --value minio); "
+            f"cp -pf {binary} {binary}.prev && mv -f {binary}.new {binary} && systemctl restart --no-block minio || exit 1; "
+            f"for i in $(seq {int(self.restart_timeout)}); do "
+            f"new=$(systemctl show -p MainPID --value minio); "
+            f"if [ \"$new\" != \"$old\" ] && [ \"$new\" != 0 ] && systemctl is-active --quiet minio; then exit 0; fi; sleep 1; done; "
+            f"systemctl status minio --no-pager -n 20; exit 1"
+        )
+    
+    def _rollback_command(self):
+        binary = shlex.quote(self.BINARY_PATH)
+        return f"[ -f {binary}.prev ] && mv -f {binary}.prev {binary} && systemctl restart --no-block minio"
+    
+    def stage(self, local_path, nodes):
+        """
+        把新版本二进制并行暂存到节点的minio.new，并确认其可以执行
+        
+        Returns:
+            list: 暂存失败的节点主机列表
+        """
+        remote_path = f"{self.BINARY_PATH}.new"
+        outcome = self.distributor.distribute(local_path, remote_path, [node["ssh_params"] for node in nodes])
+        failed = [node["ssh_params"]["host"] for node in nodes if not outcome.get(node["ssh_params"]["host"], False)]
+        
+        staged = [node for node in nodes if node["ssh_params"]["host"] not in failed]
+        for item in self._run_parallel([self._task(node, f"{shlex.quote(remote_path)} --version") for node in staged]):
+            exit_code, stdout, stderr = item["result"]
+            if exit_code != 0:
+                self.logger.error(f"节点 {item['task']['host']} 上暂存的新版本无法执行：{stderr}")
+                failed.append(item["task"]["host"])
+            else:
+                self.logger.info(f"节点 {item['task']['host']} 已暂存新版本：{stdout.splitlines()[0] if stdout else ''}")
+        return failed
+    
+    def _gate(self, wave):
+        """
+        检查一批重启后的节点是否就绪：每个节点存活，且集群满足写法定数量
+        
+        同一批节点并发探测，共享restart_timeout的截止时间，全部通过时立即返回。
+        """
+        prober = self.health_checker.prober
+        hosts = [node["address"] for node in wave]
+        results = prober.probe(hosts, self.server_port, endpoints=("live",), deadline=self.restart_timeout, check_ports=False)
+        for host in hosts:
+            if not prober.all_ok(results[host]):
+                self.logger.error(f"节点 {host} 重启后存活检查失败")
+                return False
+        
+        results = prober.probe([hosts[0]], self.server_port, endpoints=("cluster",), deadline=self.restart_timeout, check_ports=False)
+        ok = prober.all_ok(results[hosts[0]])
+        if not ok:
+            self.logger.error("集群未满足写法定数量")
+        return ok
+    
+    def upgrade(self, nodes, local_path=None, parity=None, max_wave=None):
+        """
+        执行滚动升级
+        
+        Args:
+            nodes: 节点列表，每个元素为{"ssh_params", "address"(健康检查地址), "drives"(驱动器数)}，
+                   可以包含"local_path"指定该节点使用的新版本二进制（不同架构的节点使用不同的文件）
+            local_path: 控制机上新版本二进制的路径，节点未指定local_path时使用
+            parity: 标准存储类别的校验位，为None时使用MinIO默认值
+            max_wave: 每一批的节点数上限
+        
+        Returns:
+            bool: True表示所有节点升级成功（或已是目标版本）
+        """
+        start = time.monotonic()
+        checksums = {}
+        for node in nodes:
+            path = node.get("local_path", local_path)
+            if path not in checksums:
+                checksums[path] = ArtifactCache.file_sha256(path)
+        
+        # 已是目标版本的节点不需要升级
+        pending = []
+        for node in nodes:
+            facts = self.fact_gatherer.gather(node["ssh_params"])
+            if facts is None:
+                self.logger.error(f"无法收集节点 {node['address']} 的主机信息，停止升级")
+                return False
+            installed = facts.binaries.get("minio")
+            if not installed:
+                self.logger.error(f"节点 {node['address']} 上未安装MinIO，无法升级")
+                return False
+            if installed["sha256"] == checksums[node.get("local_path", local_path)]:
+                self.logger.info(f"节点 {node['address']} 已是目标版本，跳过")
+            else:
+                self.logger.info(f"节点 {node['address']} 当前版本：{installed['version'] or '未知'}")
+                pending.append(node)
+        
+        if not pending:
+            self.logger.info("所有节点均已是目标版本，无需升级")
+            return True
+        
+        # 第一阶段：并行暂存，不影响正在运行的服务
+        failed = []
+        for path, checksum in checksums.items():
+            group = [node for node in pending if node.get("local_path", local_path) == path]
+            if group:
+                self.logger.info(f"开始向 {len(group)} 个节点暂存新版本二进制：{path}，sha256：{checksum}")
+                failed.extend(self.stage(path, group))
+        if failed:
+            self.logger.error(f"以下节点暂存新版本失败，升级未开始：{', '.join(failed)}")
+            return False
+        staged_seconds = time.monotonic() - start
+        
+        # 第二阶段：按校验位分批重启
+        size = self.wave_size([node["drives"] for node in nodes], parity, max_wave)
+        waves = [pending[i:i + size] for i in range(0, len(pending), size)]
+        if size == 1 and len(nodes) == 1:
+            self.logger.warning("只有一个节点，重启期间服务将短暂不可用")
+        self.logger.info(f"开始滚动重启：每批 {size} 个节点，共 {len(waves)} 批")
+        
+        restart_seconds = 0.0
+        for index, wave in enumerate(waves, 1):
+            hosts = [node["address"] for node in wave]
+            self.logger.info(f"第 {index}/{len(waves)} 批：替换二进制并重启 {', '.join(hosts)}")
+            wave_start = time.monotonic()
+            
+            results = self._run_parallel([self._task(node, self._swap_command(), self.restart_timeout + 30) for node in wave])
+            ready = all(item["result"][0] == 0 for item in results)
+            for item in results:
+                if item["result"][0] != 0:
+                    self.logger.error(f"节点 {item['task']['host']} 重启后未就绪：{item['result'][1] or item['result'][2]}")
+            
+            for node in wave:
+                self.fact_gatherer.invalidate(node["ssh_params"])
+            
+            if not ready or not self._gate(wave):
+                if self.rollback:
+                    self.logger.warning(f"第 {index} 批升级失败，回滚该批节点到上一版本")
+                    self._run_parallel([self._task(node, self._rollback_command()) for node in wave])
+                self.logger.error(f"滚动升级在第 {index}/{len(waves)} 批停止，后续节点未升级")
+                return False
+            
+            restart_seconds += time.monotonic() - wave_start
+            self.logger.info(f"第 {index}/{len(waves)} 批升级完成，耗时 {time.monotonic() - wave_start:.2f} 秒")
+        
+        self.last_stats = {
+            "nodes": len(pending),
+            "waves": len(waves),
+            "wave_size": size,
+            "stage_seconds": staged_seconds,
+            "restart_seconds": restart_seconds,
+            "seconds": time.monotonic() - start
+        }
+        self.logger.info(
+            f"滚动升级完成：{len(pending)} 个节点，{len(waves)} 批，暂存耗时 {staged_seconds:.2f} 秒，"
+            f"重启耗时 {restart_seconds:.2f} 秒，上一版本保留在 {self.BINARY_PATH}.prev"
+        )
+        return True
@@ -16,8 +16,8 @@ def main():
     
     # 部署模式组
     mode_group = parser.add_argument_group('部署模式 (必填)')
-    mode_group.add_argument("--mode", "-m", choices=["standalone", "cluster"], required=True, 
-                        help="部署模式：standalone（单机模式）或cluster（集群模式）")
+    mode_group.add_argument("--mode", "-m", choices=["standalone", "cluster", "upgrade"], required=True, 
+                        help="部署模式：standalone（单机模式）、cluster（集群模式）或upgrade（把已部署的MinIO滚动升级到minio.version）")
     
     # 配置组
     config_group = parser.add_argument_group('配置选项')
@@ -25,12 +25,22 @@ def main():
                               help="配置文件路径，默认为当前目录下的config.yaml")
     config_group.add_argument("--dry-run", action="store_true", 
                               help="预演模式，只检查配置和显示执行计划，不执行实际部署操作")
+    config_group.add_argument("--resume", action="store_true", 
+                              help="从上次中断的位置继续部署，跳过检查点日志中已完成且输入未变化的步骤")
     
     # 日志组
     log_group = parser.add_argument_group('日志选项')
     log_group.add_argument("--log-level", choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"], 
                         default="DEBUG", 
                         help="日志级别，默认为DEBUG，可选值：DEBUG、INFO、WARNING、ERROR、CRITICAL")
+    log_group.add_argument("--log-mode", choices=["async", "sync"], default="async",
+                        help="日志写入方式：async（工作线程只入队，由后台线程写文件和控制台）或sync（调用线程直接写入），默认为async")
+    log_group.add_argument("--log-queue-size", type=int, default=10000,
+                        help="异步日志队列的容量，默认为10000")
+    log_group.add_argument("--log-overflow", choices=["block", "drop"], default="block",
+                        help="异步日志队列满时的策略：block（等待队列有空位）或drop（丢弃WARNING以下的日志），默认为block")
+    log_group.add_argument("--profile", nargs="?", const="logs/deploy-trace.json", default=None, metavar="FILE",
+                        help="记录各阶段、节点和远程调用的耗时，输出Chrome Trace格式文件（默认为logs/deploy-trace.json）")
     
     # 添加示例说明
     parser.epilog = """
@@ -38,27 +48,36 @@ def main():
   单机部署: python deploy.py -m standalone -c config.yaml
   集群部署: python deploy.py -m cluster -c cluster_config.yaml
   预演模式: python deploy.py -m standalone -c config.yaml --dry-run
+  断点续传: python deploy.py -m cluster -c cluster_config.yaml --resume
+  滚动升级: python deploy.py -m upgrade -c cluster_config.yaml
   调整日志: python deploy.py -m standalone --log-level INFO
+  丢弃积压日志: python deploy.py -m cluster -c cluster_config.yaml --log-overflow drop
+  耗时分析: python deploy.py -m cluster -c cluster_config.yaml --profile
     """
     
     args = parser.parse_args()
     
     # 初始化日志
-    logger = Logger(log_level=args.log_level).get_logger()
+    logger = Logger(
+        log_level=args.log_level,
+        async_mode=args.log_mode == "async",
+        queue_size=args.log_queue_size,
+        overflow=args.log_overflow
+    ).get_logger()
     
     try:
         logger.info("# MinIO Linux部署工具")
         logger.info("-" * 60)
         
         # 创建部署器实例
-        deployer = Deployer(args.config, args.dry_run, logger, args.mode)
+        deployer = Deployer(args.config, args.dry_run, logger, args.mode, resume=args.resume, profile_file=args.profile)
         
         # 运行部署流程
         deployer.run()
         
         logger.info("部署流程执行完成")
         sys.exit(0)
-        
+    
     except KeyboardInterrupt:
         logger.error("部署流程被用户中断")
         sys.exit(1)
@@ -0,0 +1,105 @@
+import logging
+import os
+import socket
+import subprocess
+import sys
+import threading
+
+import paramiko
+import pytest
+
+# core/没有__init__.py，测试直接从仓库根目录导入
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 让通道发送输出和EOF之后不发送退出码、也不关闭通道的特殊命令，模拟挂起的SSH通道
+HANG_AFTER_EOF = "__hang_after_eof__"
+
+
+class _StubServer(paramiko.ServerInterface):
+    def __init__(self, stub):
+        self.stub = stub
+    
+    def get_allowed_auths(self, username):
+        return "password"
+    
+    def check_auth_password(self, username, password):
+        return paramiko.AUTH_SUCCESSFUL
+    
+    def check_channel_request(self, kind, chanid):
+        return paramiko.OPEN_SUCCEEDED if kind == "session" else paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+    
+    def check_channel_exec_request(self, channel, command):
+        threading.Thread(target=self.stub.run, args=(channel, command.decode("utf-8")), daemon=True).start()
+        return True
+
+
+class SSHStub:
+    """
+    进程内的SSH服务端：在127.0.0.1的随机端口上监听，接受任意密码，命令交给本机/bin/sh执行
+    """
+    
+    def __init__(self):
+        self.host_key = paramiko.ECDSAKey.generate()
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen(32)
+        self.port = self.listener.getsockname()[1]
+        self.transports = []
+        self.release = threading.Event()
+        self.commands = []
+        threading.Thread(target=self._accept, daemon=True).start()
+    
+    def _accept(self):
+        while True:
+            try:
+                sock, _ = self.listener.accept()
+            except OSError:
+                return
+            transport = paramiko.Transport(sock)
+            transport.add_server_key(self.host_key)
+            transport.start_server(threading.Event(), _StubServer(self))
+            self.transports.append(transport)
+    
+    def run(self, channel, command):
+        self.commands.append(command)
+        try:
+            if command == HANG_AFTER_EOF:
+                channel.sendall(b"partial")
+                channel.shutdown_write()
+                self.release.wait()
+                return
+            result = subprocess.run(["/bin/sh", "-c", command], capture_output=True)
+            channel.sendall(result.stdout)
+            channel.sendall_stderr(result.stderr)
+            channel.send_exit_status(result.returncode)
+        except OSError:
+            # 客户端已取消命令并关闭了通道
+            pass
+        finally:
+            channel.close()
+    
+    def task(self, command, timeout=10):
+        """
+        AsyncRemoteExecutor.execute_parallel使用的任务字典
+        """
+        return {"host": "127.0.0.1", "port": self.port, "username": "root", "password": "stub", "command": command, "timeout": timeout}
+    
+    def close(self):
+        self.release.set()
+        self.listener.close()
+        for transport in self.transports:
+            transport.close()
+
+
+@pytest.fixture
+def ssh_stub():
+    stub = SSHStub()
+    yield stub
+    stub.close()
+
+
+@pytest.fixture
+def logger():
+    # 测试不写入仓库的logs/目录
+    return logging.getLogger("minio-deploy-tests")
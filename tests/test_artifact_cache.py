@@ -0,0 +1,73 @@
+import os
+import shutil
+
+from core.artifact_cache import ArtifactCache
+from core.minio_installer import MinioInstaller
+
+VERSION = "RELEASE.2024-01-18T22-51-48Z"
+
+
+def write_binary(path, version):
+    with open(path, "w") as f:
+        f.write(f'#!/bin/sh\necho "minio version {version} (commit-id=test)"\n')
+    os.chmod(path, 0o755)
+    return str(path)
+
+
+def test_download_url_is_versioned_per_arch(logger):
+    installer = MinioInstaller(logger=logger)
+
+    assert installer.download_url("minio", VERSION, "arm64") == f"https://dl.min.io/server/minio/release/linux-arm64/archive/minio.{VERSION}"
+    assert installer.download_url("mc", VERSION, "amd64", "https://mirror.example/{arch}/mc.{version}") == f"https://mirror.example/amd64/mc.{VERSION}"
+
+
+def test_fetch_rejects_download_of_another_version(tmp_path, logger):
+    installer = MinioInstaller(logger=logger, artifact_cache=ArtifactCache(str(tmp_path / "cache"), logger=logger))
+    latest = write_binary(tmp_path / "latest", "RELEASE.2025-01-01T00-00-00Z")
+    installer.download_file = lambda url, dest_path: bool(shutil.copyfile(latest, dest_path))
+
+    assert installer.obtain_artifact("minio", VERSION, "amd64") is None
+    assert installer.artifact_cache.lookup("minio", VERSION, "amd64") is None
+
+
+def test_stale_entry_is_dropped_on_first_hit(tmp_path, logger):
+    # 早期版本按配置的版本号缓存了latest地址下载的文件
+    cache_dir = str(tmp_path / "cache")
+    ArtifactCache(cache_dir, logger=logger).add("minio", VERSION, "amd64", write_binary(tmp_path / "latest", "RELEASE.2025-01-01T00-00-00Z"))
+    installer = MinioInstaller(logger=logger, artifact_cache=ArtifactCache(cache_dir, logger=logger))
+    good = write_binary(tmp_path / "good", VERSION)
+    installer.download_file = lambda url, dest_path: bool(shutil.copyfile(good, dest_path))
+
+    path = installer.obtain_artifact("minio", VERSION, "amd64")
+
+    assert path is not None and installer.verify_version("minio", path, VERSION)
+
+
+def make_offline_installer(tmp_path, logger, monkeypatch):
+    installer = MinioInstaller(logger=logger, artifact_cache=ArtifactCache(str(tmp_path / "cache"), logger=logger))
+    monkeypatch.setattr(installer, "check_minio_installed", lambda: False)
+    monkeypatch.setattr(installer, "download_file", lambda url, dest_path: False)
+    # 测试用的安装包是shell脚本，file命令识别不出架构
+    monkeypatch.setattr(installer, "check_file_compatibility", lambda path: True)
+    os.makedirs(tmp_path / "packages")
+    os.makedirs(tmp_path / "bin")
+    return installer, {"version": VERSION, "local_package_dir": str(tmp_path / "packages")}
+
+
+def test_offline_install_rejects_local_package_of_another_version(tmp_path, logger, monkeypatch):
+    installer, config = make_offline_installer(tmp_path, logger, monkeypatch)
+    write_binary(tmp_path / "packages" / installer.package_name("minio", VERSION), "RELEASE.2025-01-01T00-00-00Z")
+    # 不按版本命名的文件不再被扫描安装
+    write_binary(tmp_path / "packages" / "minio-old", VERSION)
+
+    assert not installer.install_minio(config, str(tmp_path / "bin"))
+    assert not os.path.exists(tmp_path / "bin" / "minio")
+
+
+def test_offline_install_uses_versioned_local_package_and_caches_it(tmp_path, logger, monkeypatch):
+    installer, config = make_offline_installer(tmp_path, logger, monkeypatch)
+    write_binary(tmp_path / "packages" / installer.package_name("minio", VERSION), VERSION)
+
+    assert installer.install_minio(config, str(tmp_path / "bin"))
+    assert installer.verify_version("minio", str(tmp_path / "bin" / "minio"), VERSION)
+    assert installer.artifact_cache.lookup("minio", VERSION, installer.system_arch) is not None
@@ -0,0 +1,67 @@
+import threading
+import time
+
+from conftest import HANG_AFTER_EOF
+from core.async_remote import AsyncRemoteExecutor
+from core.remote import RemoteExecutor
+
+
+def make_executor(logger):
+    return AsyncRemoteExecutor(RemoteExecutor(logger=logger), logger=logger, connect_workers=4)
+
+
+def test_execute_parallel_returns_results_in_task_order(ssh_stub, logger):
+    executor = make_executor(logger)
+    results = executor.execute_parallel([
+        ssh_stub.task("echo first"),
+        ssh_stub.task("echo oops >&2; exit 3"),
+        ssh_stub.task("sleep 0.2; echo third")
+    ])
+    
+    assert [item["result"] for item in results] == [(0, "first", ""), (3, "", "oops"), (0, "third", "")]
+
+
+def test_concurrent_calls_from_several_threads_do_not_interfere(ssh_stub, logger):
+    # DAG的工作线程各自调用execute_parallel，每次调用运行在自己的事件循环中
+    executor = make_executor(logger)
+    outputs = {}
+    
+    def worker(index):
+        results = executor.execute_parallel([ssh_stub.task(f"sleep 0.1; echo {index}-{n}") for n in range(3)], fail_fast=index == 0)
+        outputs[index] = [item["result"] for item in results]
+    
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+    
+    assert outputs == {index: [(0, f"{index}-{n}", "") for n in range(3)] for index in range(4)}
+
+
+def test_fail_fast_cancels_only_its_own_commands(ssh_stub, logger):
+    executor = make_executor(logger)
+    results = executor.execute_parallel([ssh_stub.task("exit 1"), ssh_stub.task("sleep 5; echo late")], fail_fast=True)
+    
+    assert results[0]["result"][0] == 1
+    assert results[1]["result"] == (1, "", "命令已取消")
+
+
+def pool_threads():
+    return [thread for thread in threading.enumerate() if thread.name.startswith("ThreadPoolExecutor")]
+
+
+def test_hung_exit_status_is_bounded_by_timeout(ssh_stub, logger):
+    # 通道已EOF但一直收不到退出码：等待退出码在有界线程池中进行，也受命令超时限制
+    executor = make_executor(logger)
+    start = time.monotonic()
+    results = executor.execute_parallel([ssh_stub.task(HANG_AFTER_EOF, timeout=1)])
+    
+    assert time.monotonic() - start < 5
+    assert results[0]["result"] == (1, "", "命令执行超时（1秒）")
+    
+    # 超时后关闭通道，等待退出码的线程随即结束，不会泄漏
+    deadline = time.monotonic() + 3
+    while pool_threads() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert pool_threads() == []
@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+from core.disk import DiskManager
+
+
+@pytest.fixture
+def disk_manager(logger, monkeypatch):
+    # 只保留fstab来源的计算，检查、格式化、挂载等访问系统的步骤都视为成功
+    manager = DiskManager(logger=logger)
+    manager.fstab_entries = []
+    for name in ("check_os_partition", "check_disk", "format_disk", "mount_disk", "check_disk_space", "set_permissions"):
+        monkeypatch.setattr(manager, name, lambda *args, **kwargs: True)
+    monkeypatch.setattr(manager, "add_to_fstab", lambda source, mount_point, *args: manager.fstab_entries.append((source, mount_point)) or True)
+    return manager
+
+
+@pytest.fixture
+def blkid(tmp_path, monkeypatch):
+    """
+    PATH中的blkid替身，输出由uuid.value文件决定（文件为空时模拟获取不到UUID）
+    """
+    value = tmp_path / "uuid.value"
+    script = tmp_path / "blkid"
+    script.write_text(f'#!/bin/sh\ncat {value}\n')
+    os.chmod(script, 0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path}:{os.environ['PATH']}")
+    return value
+
+
+def test_prepare_disk_without_formatting_mounts_by_device(disk_manager):
+    assert disk_manager.prepare_disk("/dev/sdb", "/data/minio")
+    assert disk_manager.fstab_entries == [("/dev/sdb", "/data/minio")]
+
+
+def test_prepare_disk_performance_profile_mounts_by_uuid(disk_manager, blkid):
+    blkid.write_text("0b5a7c1e-1111-2222-3333-444455556666\n")
+
+    assert disk_manager.prepare_disk("/dev/sdb", "/data/minio", "xfs", format_disk=True, profile="performance")
+    assert disk_manager.fstab_entries == [("UUID=0b5a7c1e-1111-2222-3333-444455556666", "/data/minio")]
+
+
+def test_prepare_disk_fails_when_uuid_is_missing(disk_manager, blkid):
+    blkid.write_text("")
+
+    assert not disk_manager.prepare_disk("/dev/sdb", "/data/minio", "xfs", format_disk=True, profile="performance")
+    assert disk_manager.fstab_entries == []
@@ -0,0 +1,90 @@
+import re
+
+import pytest
+
+from core.distributor import BinaryDistributor
+
+NODES = [
+    {"host": f"10.0.0.{index}", "port": 22, "username": "root", "ssh_key": None, "password": "secret"}
+    for index in range(1, 7)
+]
+
+
+class FakeExecutor:
+    """
+    按命令类型应答的并行执行器：接力到relay_fail中的节点失败，verify_fail中的节点校验失败
+    """
+
+    max_concurrency = 4
+
+    def __init__(self, relay_fail=(), verify_fail=()):
+        self.relay_fail = set(relay_fail)
+        self.verify_fail = set(verify_fail)
+        self.commands = []
+
+    def respond(self, task):
+        command = task["command"]
+        target = task.get("target", {}).get("host")
+        if "ssh-keygen" in command:
+            token = re.search(r"-C minio-deploy-relay-(\w+)", command).group(1)
+            return 0, f"ssh-ed25519 AAAA{task['host']} minio-deploy-relay-{token}\n", ""
+        if command.startswith("scp "):
+            self.commands.append(("relay", task["host"], target))
+            return (1, "", "Connection refused") if target in self.relay_fail else (0, "", "")
+        if "sha256sum" in command:
+            self.commands.append(("verify", task["host"]))
+            return (1, "", "sha256校验失败") if target in self.verify_fail else (0, "", "")
+        if "sed -i" in command:
+            self.commands.append(("revoke", task["host"]))
+        return 0, "", ""
+
+    def execute_parallel(self, tasks, fail_fast=False):
+        return [{"task": task, "result": self.respond(task)} for task in tasks]
+
+
+@pytest.fixture
+def binary(tmp_path):
+    path = tmp_path / "minio"
+    path.write_bytes(b"minio binary")
+    return str(path)
+
+
+def make_distributor(logger, monkeypatch, executor, **kwargs):
+    distributor = BinaryDistributor(async_executor=executor, logger=logger, fanout=2, **kwargs)
+    distributor.uploads = []
+    monkeypatch.setattr(distributor, "_upload", lambda local_path, remote_path, node, checksum, mode: distributor.uploads.append(node["host"]) or True)
+    return distributor
+
+
+def test_failed_relay_and_verify_fall_back_to_direct_upload(logger, monkeypatch, binary):
+    executor = FakeExecutor(relay_fail={"10.0.0.3"}, verify_fail={"10.0.0.4"})
+    distributor = make_distributor(logger, monkeypatch, executor)
+
+    results = distributor.distribute(binary, "/usr/local/bin/minio", NODES)
+
+    assert results == {node["host"]: True for node in NODES}
+    # 种子节点和接力失败的节点由控制机直接上传，其余节点都由持有者接力
+    assert sorted(distributor.uploads) == ["10.0.0.1", "10.0.0.2", "10.0.0.3", "10.0.0.4"]
+    assert [command for command in executor.commands if command[0] == "relay"] == [
+        ("relay", "10.0.0.1", "10.0.0.3"), ("relay", "10.0.0.2", "10.0.0.4"),
+        ("relay", "10.0.0.1", "10.0.0.5"), ("relay", "10.0.0.2", "10.0.0.6")
+    ]
+    # 分发结束后所有节点都撤销了一次性密钥
+    assert sorted(command[1] for command in executor.commands if command[0] == "revoke") == [node["host"] for node in NODES]
+
+    stats = dict(distributor.last_stats)
+    assert stats.pop("seconds") >= 0
+    assert stats == {"nodes": 6, "rounds": 2, "direct_uploads": 4, "relayed": 2, "failed": 0}
+
+
+def test_failed_hops_without_fallback_are_reported_as_failed(logger, monkeypatch, binary):
+    executor = FakeExecutor(relay_fail={"10.0.0.3"}, verify_fail={"10.0.0.4"})
+    distributor = make_distributor(logger, monkeypatch, executor, fallback_direct=False)
+
+    results = distributor.distribute(binary, "/usr/local/bin/minio", NODES)
+
+    assert [host for host, ok in results.items() if not ok] == ["10.0.0.3", "10.0.0.4"]
+    assert sorted(distributor.uploads) == ["10.0.0.1", "10.0.0.2"]
+    assert {key: distributor.last_stats[key] for key in ("rounds", "direct_uploads", "relayed", "failed")} == {
+        "rounds": 2, "direct_uploads": 2, "relayed": 2, "failed": 2
+    }
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from core.minio_installer import MinioInstaller
+
+CHUNK_SIZE = 64 * 1024
+
+
+class FileServer:
+    """
+    http.server搭建的下载服务器：可以关闭Range支持、发布sha256文件，以及让指定偏移之后的分段请求失败
+    """
+
+    def __init__(self, payload):
+        self.payload = payload
+        self.ranges = True
+        self.checksum = None
+        self.fail_from = None
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_HEAD(self):
+                self.respond(head=True)
+
+            def do_GET(self):
+                self.respond(head=False)
+
+            def respond(self, head):
+                if self.path == "/minio.sha256" and server.checksum:
+                    body = f"{server.checksum}  minio\n".encode()
+                    self.send_response(200)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(b"" if head else body)
+                    return
+                if self.path != "/minio":
+                    self.send_error(404)
+                    return
+
+                requested = self.headers.get("Range")
+                server.requests.append((self.command, requested))
+                if requested and server.ranges and not head:
+                    start, end = (int(value) for value in requested[len("bytes="):].split("-"))
+                    if server.fail_from is not None and start >= server.fail_from:
+                        self.send_error(500)
+                        return
+                    body = server.payload[start:end + 1]
+                    self.send_response(206)
+                    self.send_header("Content-Range", f"bytes {start}-{end}/{len(server.payload)}")
+                else:
+                    body = server.payload
+                    self.send_response(200)
+                if server.ranges:
+                    self.send_header("Accept-Ranges", "bytes")
+                    self.send_header("ETag", '"v1"')
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if not head:
+                    self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/minio"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def range_starts(self):
+        return {int(requested[len("bytes="):].split("-")[0]) for _, requested in self.requests if requested}
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def payload():
+    return os.urandom(10 * CHUNK_SIZE + 123)
+
+
+@pytest.fixture
+def file_server(payload):
+    server = FileServer(payload)
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def installer(logger, monkeypatch):
+    # 分段失败后的重试不等待
+    monkeypatch.setattr(time, "sleep", lambda seconds: None)
+    return MinioInstaller(logger=logger, download_segments=2, download_chunk_size=CHUNK_SIZE)
+
+
+def test_parallel_ranges_reassemble_file_and_match_sha256(tmp_path, installer, file_server, payload):
+    dest = str(tmp_path / "minio")
+
+    installer._download_native(file_server.url, dest, hashlib.sha256(payload).hexdigest())
+
+    with open(dest, "rb") as f:
+        assert f.read() == payload
+    assert file_server.range_starts() == {index * CHUNK_SIZE for index in range(11)}
+    assert not os.path.exists(f"{dest}.part") and not os.path.exists(f"{dest}.part.json")
+
+
+def test_interrupted_download_resumes_only_missing_chunks(tmp_path, installer, file_server, payload):
+    dest = str(tmp_path / "minio")
+    file_server.fail_from = 6 * CHUNK_SIZE
+
+    with pytest.raises(Exception):
+        installer._download_native(file_server.url, dest, hashlib.sha256(payload).hexdigest())
+
+    with open(f"{dest}.part.json", encoding="utf-8") as f:
+        state = json.load(f)
+    assert set(state["written"]) == set(range(6))
+    assert not os.path.exists(dest)
+
+    file_server.fail_from = None
+    file_server.requests.clear()
+    installer._download_native(file_server.url, dest, hashlib.sha256(payload).hexdigest())
+
+    # 续传时已写入的分块只从.part文件读取用于计算sha256，不再请求
+    assert file_server.range_starts() == {index * CHUNK_SIZE for index in range(6, 11)}
+    with open(dest, "rb") as f:
+        assert f.read() == payload
+    assert not os.path.exists(f"{dest}.part.json")
+
+
+def test_server_without_range_support_uses_single_stream(tmp_path, installer, file_server, payload):
+    dest = str(tmp_path / "minio")
+    file_server.ranges = False
+
+    installer._download_native(file_server.url, dest, hashlib.sha256(payload).hexdigest())
+
+    with open(dest, "rb") as f:
+        assert f.read() == payload
+    assert file_server.requests == [("HEAD", None), ("GET", None)]
+
+
+def test_checksum_mismatch_discards_partial_download(tmp_path, installer, file_server):
+    dest = str(tmp_path / "minio")
+
+    with pytest.raises(IOError, match="sha256"):
+        installer._download_native(file_server.url, dest, "0" * 64)
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_download_file_verifies_published_checksum(tmp_path, installer, file_server, payload):
+    file_server.checksum = hashlib.sha256(payload).hexdigest()
+
+    assert installer.download_file(file_server.url, str(tmp_path / "minio"))
+    with open(tmp_path / "minio", "rb") as f:
+        assert f.read() == payload
+
+
+def test_download_file_fallbacks_reject_mismatched_checksum(tmp_path, installer, file_server):
+    # 内置下载器校验失败后回退到curl和wget，回退路径同样校验官方sha256，不留下文件
+    file_server.checksum = "0" * 64
+
+    assert not installer.download_file(file_server.url, str(tmp_path / "minio"))
+    assert not os.path.exists(tmp_path / "minio")
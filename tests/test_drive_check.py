@@ -0,0 +1,47 @@
+import logging
+
+import pytest
+
+from core.drive_check import DriveBenchmark
+
+
+def drive(path, **overrides):
+    result = {"path": path, "seq_write": 1000.0, "seq_read": 2000.0, "rand_read": 50000.0, "rand_write": 20000.0,
+              "rand_read_p99": 0.5, "rand_write_p99": 1.0}
+    result.update(overrides)
+    return result
+
+
+RESULTS = {
+    "node1": [drive("/data1"), drive("/data2", seq_write=950.0), drive("/data3", seq_write=300.0), drive("/data4")],
+    # node2整体较慢，只与本节点的中位数比较：顺序写一致的盘不被标记，写延迟超过中位数2倍的盘被标记
+    "node2": [drive(f"/data{index}", seq_write=400.0, rand_write_p99=3.0) for index in (1, 2)] + [drive("/data3", seq_write=400.0, rand_write_p99=9.0)]
+}
+
+
+def flagged_paths(caplog):
+    return sorted(record.getMessage().split(" 性能异常")[0] for record in caplog.records if "性能异常" in record.getMessage())
+
+
+@pytest.mark.parametrize("action, accepted, level", [("warn", True, logging.WARNING), ("reject", False, logging.ERROR)])
+def test_evaluate_flags_drives_against_node_median(logger, caplog, action, accepted, level):
+    benchmark = DriveBenchmark(logger=logger, action=action)
+
+    with caplog.at_level(logging.INFO, logger=logger.name):
+        assert benchmark.evaluate(RESULTS) is accepted
+
+    assert flagged_paths(caplog) == ["节点 node1 的数据目录 /data3", "节点 node2 的数据目录 /data3"]
+    assert {record.levelno for record in caplog.records if "性能异常" in record.getMessage()} == {level}
+    assert any("顺序写MB/s 300，低于中位数 975 的 0.5 倍" in record.getMessage() for record in caplog.records)
+    assert any("写p99(ms) 9.00，高于中位数 3.00 的 2 倍" in record.getMessage() for record in caplog.records)
+
+
+def test_evaluate_accepts_uniform_drives_and_rejects_failed_ones(logger, caplog):
+    benchmark = DriveBenchmark(logger=logger, action="reject")
+
+    assert benchmark.evaluate({"node1": [drive("/data1"), drive("/data2")]}) is True
+
+    failed = benchmark._parse(["/data1", "/data2"], 127, "", "sh: python3: not found")
+    with caplog.at_level(logging.INFO, logger=logger.name):
+        assert benchmark.evaluate({"node1": failed}) is False
+    assert "测试失败：节点上没有python3，无法测试" in caplog.text
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from core.journal import DeploymentJournal
+from core.scheduler import TaskGraph
+
+SCOPE = {"config": "config.yaml", "mode": "cluster"}
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return str(tmp_path / "deploy-journal.json")
+
+
+def run_graph(logger, journal_path, fingerprints, resume):
+    """
+    按给定指纹执行a -> b和独立的c三个任务，返回实际执行的任务
+    """
+    journal = DeploymentJournal(journal_path, logger=logger)
+    journal.open(SCOPE, resume=resume)
+    calls = []
+    graph = TaskGraph(logger=logger, max_workers=2, journal=journal)
+    graph.add_task("a", lambda: calls.append("a"), fingerprint=fingerprints["a"])
+    graph.add_task("b", lambda: calls.append("b"), deps=["a"], fingerprint=fingerprints["b"])
+    graph.add_task("c", lambda: calls.append("c"), fingerprint=fingerprints["c"])
+    assert graph.run() is True
+    return sorted(calls)
+
+
+def test_resume_skips_completed_tasks_with_unchanged_inputs(logger, journal_path):
+    fingerprints = {"a": "a1", "b": "b1", "c": "c1"}
+
+    assert run_graph(logger, journal_path, fingerprints, resume=False) == ["a", "b", "c"]
+    assert run_graph(logger, journal_path, fingerprints, resume=True) == []
+    # 不续传时清空已有记录
+    assert run_graph(logger, journal_path, fingerprints, resume=False) == ["a", "b", "c"]
+
+
+def test_changed_upstream_fingerprint_invalidates_downstream_tasks(logger, journal_path):
+    run_graph(logger, journal_path, {"a": "a1", "b": "b1", "c": "c1"}, resume=False)
+
+    # b自身的输入没有变化，但上游a的指纹变化后b的链式指纹随之变化
+    assert run_graph(logger, journal_path, {"a": "a2", "b": "b1", "c": "c1"}, resume=True) == ["a", "b"]
+
+
+def test_scope_mismatch_ignores_existing_entries(logger, journal_path):
+    run_graph(logger, journal_path, {"a": "a1", "b": "b1", "c": "c1"}, resume=False)
+
+    journal = DeploymentJournal(journal_path, logger=logger)
+    journal.open({"config": "other.yaml", "mode": "cluster"}, resume=True)
+    assert journal.completed() == []
+
+
+def test_truncated_journal_starts_from_scratch(logger, journal_path):
+    run_graph(logger, journal_path, {"a": "a1", "b": "b1", "c": "c1"}, resume=False)
+    with open(journal_path, encoding="utf-8") as f:
+        content = f.read()
+    with open(journal_path, "w", encoding="utf-8") as f:
+        f.write(content[:len(content) // 2])
+
+    assert run_graph(logger, journal_path, {"a": "a1", "b": "b1", "c": "c1"}, resume=True) == ["a", "b", "c"]
+
+
+def test_corrupted_entries_are_ignored_on_resume(logger, journal_path):
+    run_graph(logger, journal_path, {"a": "a1", "b": "b1", "c": "c1"}, resume=False)
+    with open(journal_path, encoding="utf-8") as f:
+        data = json.load(f)
+    data["entries"]["b"] = "garbage"
+    del data["entries"]["c"]["fingerprint"]
+    with open(journal_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+    # 损坏的记录视为未完成，完好的a仍然跳过
+    assert run_graph(logger, journal_path, {"a": "a1", "b": "b1", "c": "c1"}, resume=True) == ["b", "c"]
+
+    with open(journal_path, encoding="utf-8") as f:
+        assert set(json.load(f)["entries"]) == {"a", "b", "c"}
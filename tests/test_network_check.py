@@ -0,0 +1,96 @@
+import itertools
+import json
+import socket
+
+import pytest
+
+from core.async_remote import AsyncRemoteExecutor
+from core.network_check import NetworkMeshTest
+from core.remote import RemoteExecutor
+
+
+class RecordingExecutor:
+    """
+    记录每一批并行命令的异步执行器包装
+    """
+
+    def __init__(self, executor):
+        self.executor = executor
+        self.batches = []
+
+    def execute_parallel(self, tasks, fail_fast=False):
+        self.batches.append(tasks)
+        return self.executor.execute_parallel(tasks, fail_fast)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.mark.parametrize("count", [2, 3, 4, 5, 8])
+def test_schedule_covers_every_pair_once_without_reusing_a_node_in_a_round(count):
+    names = [f"node{index}" for index in range(count)]
+    rounds = NetworkMeshTest.schedule(names)
+
+    for pairs in rounds:
+        members = [name for pair in pairs for name in pair]
+        assert len(members) == len(set(members))
+    scheduled = [frozenset(pair) for pairs in rounds for pair in pairs]
+    assert sorted(scheduled, key=sorted) == sorted((frozenset(pair) for pair in itertools.combinations(names, 2)), key=sorted)
+
+
+def test_run_measures_every_link_against_loopback_responders(ssh_stub, logger, tmp_path):
+    # 每个模拟节点的应答进程监听在不同的回环地址上，SSH用户名区分命令来自哪个节点
+    names = [f"node{index}" for index in range(4)]
+    addresses = {name: f"127.0.0.{index + 2}" for index, name in enumerate(names)}
+    targets = [
+        (name, {"host": "127.0.0.1", "port": ssh_stub.port, "username": name, "ssh_key": None, "password": "stub"}, addresses[name])
+        for name in names
+    ]
+    executor = RecordingExecutor(AsyncRemoteExecutor(RemoteExecutor(logger=logger), logger=logger))
+    mesh = NetworkMeshTest(executor, logger=logger, enabled=True, pings=5, seconds=0.2, report_file=str(tmp_path / "mesh.json"))
+
+    links = mesh.run(targets, free_port())
+
+    # 每一批探测中每个节点只出现一次，同一条链路不会在一批中被测试两次
+    probes = [batch for batch in executor.batches if " probe " in batch[0]["command"]]
+    assert len(probes) == 2 * len(NetworkMeshTest.schedule(names))
+    for batch in probes:
+        sources = [task["username"] for task in batch]
+        destinations = [next(name for name in names if f" {addresses[name]} " in task["command"]) for task in batch]
+        assert len(set(sources + destinations)) == 2 * len(batch)
+
+    assert set(links) == {(source, target) for source in names for target in names if source != target}
+    for link in links.values():
+        assert "error" not in link
+        assert link["rtt_ms"] > 0 and link["mbps"] > 0
+
+    assert mesh.evaluate(names, links) is True
+    with open(tmp_path / "mesh.json", encoding="utf-8") as f:
+        report = json.load(f)
+    assert len(report["links"]) == 12
+
+
+def test_evaluate_flags_slow_and_asymmetric_links(logger, tmp_path):
+    names = ["a", "b", "c"]
+    links = {
+        ("a", "b"): {"rtt_ms": 0.2, "mbps": 1000.0},
+        ("b", "a"): {"rtt_ms": 0.2, "mbps": 1000.0},
+        ("a", "c"): {"rtt_ms": 0.2, "mbps": 1000.0},
+        ("c", "a"): {"rtt_ms": 0.2, "mbps": 950.0},
+        # b -> c既慢又与反方向不对称，c -> b的RTT过高
+        ("b", "c"): {"rtt_ms": 0.2, "mbps": 100.0},
+        ("c", "b"): {"rtt_ms": 5.0, "mbps": 1000.0}
+    }
+    mesh = NetworkMeshTest(logger=logger, enabled=True, action="reject", report_file=str(tmp_path / "mesh.json"))
+
+    assert mesh.evaluate(names, links) is False
+
+    with open(tmp_path / "mesh.json", encoding="utf-8") as f:
+        flagged = {(link["source"], link["target"]): link["flagged"] for link in json.load(f)["links"] if link["flagged"]}
+    assert set(flagged) == {("b", "c"), ("c", "b")}
+    assert any("低于中位数" in reason for reason in flagged[("b", "c")])
+    assert any("不对称" in reason for reason in flagged[("b", "c")])
+    assert any("RTT" in reason for reason in flagged[("c", "b")])
@@ -0,0 +1,103 @@
+import threading
+
+import pytest
+
+from core.deployer import Deployer
+from core.scheduler import TaskGraph
+
+# 可以先于minio_exists屏障运行的只读任务
+READ_ONLY_PHASES = ("ssh_trust@", "os_partitions@", "minio_probe@")
+
+
+def test_failed_task_skips_everything_downstream(logger):
+    calls = []
+    graph = TaskGraph(logger=logger, max_workers=4)
+
+    def task(name, result=None):
+        return lambda: calls.append(name) or result
+
+    graph.add_task("a", task("a", False))
+    graph.add_task("b", task("b"), deps=["a"])
+    graph.add_task("c", task("c"), deps=["b"])
+    graph.add_task("d", task("d"))
+    graph.add_task("e", task("e"), deps=["b", "d"])
+
+    assert graph.run() is False
+
+    assert sorted(calls) == ["a", "d"]
+    assert graph.failed_tasks() == ["a"]
+    assert {name: task.status for name, task in graph.tasks.items()} == {
+        "a": "failed", "b": "skipped", "c": "skipped", "d": "done", "e": "skipped"
+    }
+
+
+def test_exception_stops_scheduling_and_is_reraised(logger):
+    calls = []
+    graph = TaskGraph(logger=logger, max_workers=2)
+
+    def fail():
+        raise RuntimeError("boom")
+
+    graph.add_task("a", fail)
+    graph.add_task("b", lambda: calls.append("b"), deps=["a"])
+
+    with pytest.raises(RuntimeError, match="boom"):
+        graph.run()
+    assert calls == []
+    assert graph.tasks["b"].status == "skipped"
+
+
+@pytest.fixture
+def cluster_graph(logger):
+    """
+    三节点集群的部署任务图，启用所有可选阶段，任务函数替换为记录调用顺序的桩
+    """
+    deployer = Deployer("config.yaml", dry_run=True, logger=logger)
+    deployer.config = {
+        "deployment_mode": "cluster",
+        "cluster": {"nodes": [{"host": f"10.0.0.{index}", "data_dirs": ["/data/minio"]} for index in range(1, 4)]},
+        "minio": {}
+    }
+    deployer.tuner.enabled = True
+    deployer.drive_check.enabled = True
+    deployer.network_check.enabled = True
+    return deployer.build_task_graph()
+
+
+@pytest.mark.parametrize("existing", [False, True])
+def test_minio_exists_barrier_blocks_mutating_tasks(cluster_graph, existing):
+    lock = threading.Lock()
+    calls = []
+    at_barrier = []
+
+    def record(name):
+        with lock:
+            calls.append(name)
+
+    def barrier():
+        with lock:
+            at_barrier.extend(calls)
+            calls.append("minio_exists")
+        if existing:
+            # 已有MinIO服务时_evaluate_minio_exists调用exit中止部署
+            exit(1)
+
+    for name, task in cluster_graph.tasks.items():
+        task.func = barrier if name == "minio_exists" else (lambda name=name: record(name))
+
+    if existing:
+        with pytest.raises(SystemExit):
+            cluster_graph.run()
+    else:
+        assert cluster_graph.run() is True
+
+    # 屏障执行时只有只读任务运行过，并且所有节点都已完成探测
+    assert at_barrier and all(name.startswith(READ_ONLY_PHASES) for name in at_barrier)
+    assert {name for name in at_barrier if name.startswith("minio_probe@")} == {f"minio_probe@10.0.0.{index}" for index in range(1, 4)}
+
+    mutating = [name for name in cluster_graph.tasks if not name.startswith(READ_ONLY_PHASES) and name != "minio_exists"]
+    if existing:
+        assert not set(mutating) & set(calls)
+    else:
+        barrier_index = calls.index("minio_exists")
+        assert all(calls.index(name) > barrier_index for name in mutating)
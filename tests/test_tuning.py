@@ -0,0 +1,63 @@
+import logging
+import subprocess
+
+from core.tuning import SystemTuner
+
+OUTPUT = "\n".join([
+    "OK|vm.swappiness|0|0",
+    "CHANGED|vm.dirty_ratio|20|10",
+    "SKIP|net.ipv4.tcp_mtu_probing||内核不支持该参数",
+    "FAILED|cpu_governor|powersave|performance",
+    "mkdir: cannot create directory",
+    "CHANGED|/etc/sysctl.d/60-minio.conf||已写入",
+    "UNKNOWN|x|y|z"
+])
+
+
+def test_parse_keeps_only_status_lines(logger):
+    assert SystemTuner(logger=logger).parse(OUTPUT) == [
+        ("OK", "vm.swappiness", "0", "0"),
+        ("CHANGED", "vm.dirty_ratio", "20", "10"),
+        ("SKIP", "net.ipv4.tcp_mtu_probing", "", "内核不支持该参数"),
+        ("FAILED", "cpu_governor", "powersave", "performance"),
+        ("CHANGED", "/etc/sysctl.d/60-minio.conf", "", "已写入")
+    ]
+
+
+def test_report_summarizes_diff_and_fails_only_on_script_error(logger, caplog):
+    tuner = SystemTuner(logger=logger)
+
+    with caplog.at_level(logging.DEBUG, logger=logger.name):
+        assert tuner.report("node1", 0, OUTPUT, "") is True
+    assert "node1 vm.dirty_ratio：20 -> 10" in caplog.text
+    assert "node1 cpu_governor 修改失败" in caplog.text
+    assert "2 项已修改，1 项已符合，1 项不支持，1 项修改失败" in caplog.text
+
+    assert tuner.report("node1", 1, "", "bash: sysctl: not found\n") is False
+
+
+def test_command_is_deterministic(logger):
+    devices = ["/dev/nvme0n1", "/data/minio"]
+    tuner = SystemTuner(logger=logger, sysctl={"vm.swappiness": "1", "net.core.somaxconn": None})
+
+    command = tuner.command(devices)
+
+    assert command == tuner.command(devices)
+    assert command == SystemTuner(logger=logger, sysctl={"vm.swappiness": "1", "net.core.somaxconn": None}).command(devices)
+    assert "tune_sysctl vm.swappiness 1" in command
+    assert "net.core.somaxconn" not in command
+
+
+def test_persisted_file_is_not_rewritten_when_unchanged(tmp_path):
+    # 配置文件内容未变化时不重写，第二次执行只报告OK
+    target = tmp_path / "sysctl.d" / "60-minio.conf"
+    script = f"{SystemTuner.FUNCTIONS}\nprintf 'vm.swappiness = 0\\n' | persist {target}\n"
+
+    first = subprocess.run(["bash", "-c", script], capture_output=True, text=True)
+    mtime = target.stat().st_mtime_ns
+    second = subprocess.run(["bash", "-c", script], capture_output=True, text=True)
+
+    assert first.stdout == f"CHANGED|{target}||已写入\n"
+    assert second.stdout == f"OK|{target}||\n"
+    assert target.read_text() == "vm.swappiness = 0\n"
+    assert target.stat().st_mtime_ns == mtime